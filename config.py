@@ -36,10 +36,100 @@ class MarketDataSettings(BaseSettings):
         default=600,
         description="How long to keep unused feeds alive in seconds"
     )
+    order_book_max_staleness: float = Field(
+        default=2.0,
+        description="Maximum age in seconds of an order book served to queries before a fresh REST snapshot is fetched"
+    )
+    price_cache_ttl: float = Field(
+        default=2.0,
+        description="Seconds last traded prices are served from cache before the exchange is queried again"
+    )
+    candles_stream_interval: float = Field(
+        default=1.0,
+        description="Seconds between checks for new or updated candles on streamed candle feeds"
+    )
 
     model_config = SettingsConfigDict(env_prefix="MARKET_DATA_", extra="ignore")
 
 
+class CandlesStoreSettings(BaseSettings):
+    """Local historical candles store used by historical candles and backtesting."""
+
+    enabled: bool = Field(default=True, description="Serve historical candles through the local candles store")
+    path: str = Field(
+        default="bots/data/candles",
+        description="Directory of the candles store, partitioned by connector, trading pair, interval and month"
+    )
+
+    model_config = SettingsConfigDict(env_prefix="CANDLES_STORE_", extra="ignore")
+
+
+class BacktestingSettings(BaseSettings):
+    """Backtesting job execution."""
+
+    max_workers: int = Field(default=2, ge=1, description="Maximum number of backtests running at the same time")
+    job_timeout: float = Field(default=3600, description="Seconds a backtest may run before it is terminated")
+    results_path: str = Field(default="bots/data/backtesting", description="Directory backtest jobs and results are stored in")
+    max_sweep_combinations: int = Field(default=500, description="Maximum number of parameter combinations of a sweep")
+    result_cache_enabled: bool = Field(default=True, description="Reuse results of identical backtests")
+    result_cache_max_entries: int = Field(default=200, description="Maximum number of cached backtest results")
+    result_cache_max_bytes: int = Field(default=2_000_000_000, description="Maximum total size of cached backtest results")
+    max_jobs: int = Field(default=1000, description="Maximum number of jobs kept; the oldest finished ones are removed")
+    job_retention_days: float = Field(default=30, description="Days finished jobs and their results are kept")
+
+    model_config = SettingsConfigDict(env_prefix="BACKTESTING_", extra="ignore")
+
+
+class ArchivedBotsSettings(BaseSettings):
+    """Archived bot databases."""
+
+    performance_cache_enabled: bool = Field(default=True, description="Cache computed performance of archived databases")
+    performance_cache_path: str = Field(
+        default="bots/data/performance", description="Directory computed performance frames are cached in"
+    )
+    performance_cache_max_entries: int = Field(default=500, description="Maximum number of cached performance frames")
+
+    model_config = SettingsConfigDict(env_prefix="ARCHIVED_BOTS_", extra="ignore")
+
+
+class AccountStateRetentionSettings(BaseSettings):
+    """Retention and compaction policy for account state snapshots."""
+
+    enabled: bool = Field(default=True, description="Run the account state compaction job")
+    full_resolution_days: int = Field(
+        default=7,
+        description="Days of account state snapshots kept at full resolution"
+    )
+    hourly_resolution_days: int = Field(
+        default=90,
+        description="Days of account state snapshots kept at hourly resolution; older data is kept daily"
+    )
+    retention_days: int = Field(
+        default=0,
+        description="Days of account state snapshots kept at all (0 keeps daily snapshots forever)"
+    )
+    batch_size: int = Field(default=1000, description="Account states deleted per transaction")
+    run_interval: int = Field(default=3600, description="How often to run compaction in seconds")
+
+    model_config = SettingsConfigDict(env_prefix="ACCOUNT_STATE_RETENTION_", extra="ignore")
+
+
+class ConnectorRefreshSettings(BaseSettings):
+    """Connector state refresh settings."""
+
+    concurrency_per_exchange: int = Field(
+        default=4,
+        description="Maximum number of accounts refreshed concurrently against the same exchange connector"
+    )
+    timeout: float = Field(default=60.0, description="Seconds allowed for one connector refresh before it is abandoned")
+    trading_rules_ttl: int = Field(
+        default=3600,
+        description="Seconds trading rules fetched for an exchange are shared by all its accounts before refetching"
+    )
+
+    model_config = SettingsConfigDict(env_prefix="CONNECTOR_REFRESH_", extra="ignore")
+
+
 class SecuritySettings(BaseSettings):
     """Security and authentication configuration."""
     
@@ -131,6 +221,10 @@ class AppSettings(BaseSettings):
         default=120,
         description="Seconds without MQTT activity before a bot is treated as inactive"
     )
+    docker_inventory_resync_interval: float = Field(
+        default=60.0,
+        description="Seconds between full Docker container listings backing up the Docker events stream"
+    )
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -146,6 +240,11 @@ class Settings(BaseSettings):
     broker: BrokerSettings = Field(default_factory=BrokerSettings)
     database: DatabaseSettings = Field(default_factory=DatabaseSettings)
     market_data: MarketDataSettings = Field(default_factory=MarketDataSettings)
+    candles_store: CandlesStoreSettings = Field(default_factory=CandlesStoreSettings)
+    backtesting: BacktestingSettings = Field(default_factory=BacktestingSettings)
+    archived_bots: ArchivedBotsSettings = Field(default_factory=ArchivedBotsSettings)
+    account_state_retention: AccountStateRetentionSettings = Field(default_factory=AccountStateRetentionSettings)
+    connector_refresh: ConnectorRefreshSettings = Field(default_factory=ConnectorRefreshSettings)
     security: SecuritySettings = Field(default_factory=SecuritySettings)
     secrets: SecretsSettings = Field(default_factory=SecretsSettings)
     aws: AWSSettings = Field(default_factory=AWSSettings)
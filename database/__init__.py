@@ -1,19 +1,22 @@
 from .models import (
-    AccountState, TokenState, Order, Trade, PositionSnapshot, FundingPayment, BotRun,
+    AccountState, TokenState, LatestAccountState, PortfolioHistoryBucket, PortfolioHistoryBackfill,
+    Order, Trade, PositionSnapshot, FundingPayment, BotRun,
     GatewaySwap, GatewayCLMMPosition, GatewayCLMMEvent,
     Base
 )
 from .connection import AsyncDatabaseManager
 from .repositories import (
-    AccountRepository, BotRunRepository,
+    AccountRepository, BotRunRepository, PortfolioHistoryRepository,
     OrderRepository, TradeRepository, FundingRepository,
     GatewaySwapRepository, GatewayCLMMRepository
 )
 
 __all__ = [
-    "AccountState", "TokenState", "Order", "Trade", "PositionSnapshot", "FundingPayment", "BotRun",
+    "AccountState", "TokenState", "LatestAccountState", "PortfolioHistoryBucket", "PortfolioHistoryBackfill",
+    "Order", "Trade", "PositionSnapshot", "FundingPayment", "BotRun",
     "GatewaySwap", "GatewayCLMMPosition", "GatewayCLMMEvent",
     "Base", "AsyncDatabaseManager",
-    "AccountRepository", "BotRunRepository", "OrderRepository", "TradeRepository", "FundingRepository",
+    "AccountRepository", "BotRunRepository", "PortfolioHistoryRepository",
+    "OrderRepository", "TradeRepository", "FundingRepository",
     "GatewaySwapRepository", "GatewayCLMMRepository"
 ]
\ No newline at end of file
@@ -44,6 +44,9 @@ class AsyncDatabaseManager:
         try:
             async with self.engine.begin() as conn:
                 await conn.run_sync(Base.metadata.create_all)
+
+                # create_all does not add indexes to tables that already exist
+                await self._ensure_indexes(conn)
                 
                 # Drop Hummingbot's native tables since we use our custom orders/trades tables
                 await self._drop_hummingbot_tables(conn)
@@ -53,6 +56,15 @@ class AsyncDatabaseManager:
             logger.error(f"Failed to create database tables: {e}")
             raise
     
+    async def _ensure_indexes(self, conn):
+        """Create indexes added to existing tables after their initial creation."""
+        indexes = [
+            "CREATE INDEX IF NOT EXISTS ix_token_states_account_state_id ON token_states (account_state_id)",
+        ]
+
+        for statement in indexes:
+            await conn.execute(text(statement))
+
     async def _drop_hummingbot_tables(self, conn):
         """Drop Hummingbot's native database tables since we use custom ones."""
         hummingbot_tables = [
@@ -1,7 +1,9 @@
 from sqlalchemy import (
     TIMESTAMP,
+    BigInteger,
     Column,
     ForeignKey,
+    Index,
     Integer,
     Numeric,
     String,
@@ -29,7 +31,7 @@ class TokenState(Base):
     __tablename__ = "token_states"
 
     id = Column(Integer, primary_key=True, index=True)
-    account_state_id = Column(Integer, ForeignKey("account_states.id"), nullable=False)
+    account_state_id = Column(Integer, ForeignKey("account_states.id"), nullable=False, index=True)
     token = Column(String, nullable=False, index=True)
     units = Column(Numeric(precision=30, scale=18), nullable=False)
     price = Column(Numeric(precision=30, scale=18), nullable=False)
@@ -39,6 +41,57 @@ class TokenState(Base):
     account_state = relationship("AccountState", back_populates="token_states")
 
 
+class LatestAccountState(Base):
+    __tablename__ = "latest_account_states"
+    __table_args__ = (
+        Index("ix_latest_account_states_account_connector", "account_name", "connector_name"),
+    )
+
+    # Latest token balances per account/connector, replaced in the same transaction as each snapshot write
+    id = Column(Integer, primary_key=True, index=True)
+    timestamp = Column(TIMESTAMP(timezone=True), nullable=False)
+    account_name = Column(String, nullable=False)
+    connector_name = Column(String, nullable=False)
+    token = Column(String, nullable=False, index=True)
+    units = Column(Numeric(precision=30, scale=18), nullable=False)
+    price = Column(Numeric(precision=30, scale=18), nullable=False)
+    value = Column(Numeric(precision=30, scale=18), nullable=False)
+    available_units = Column(Numeric(precision=30, scale=18), nullable=False)
+
+
+class PortfolioHistoryBucket(Base):
+    __tablename__ = "portfolio_history_buckets"
+    __table_args__ = (
+        Index("ix_portfolio_history_buckets_lookup", "resolution", "bucket_epoch", "account_name", "connector_name"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # Bucket identification (resolution: 5m, 1h, 1d; bucket_epoch: bucket start in unix seconds)
+    resolution = Column(String, nullable=False)
+    bucket_epoch = Column(BigInteger, nullable=False)
+
+    # Timestamp of the snapshot currently held by this bucket (latest one received within the bucket)
+    timestamp = Column(TIMESTAMP(timezone=True), nullable=False)
+
+    account_name = Column(String, nullable=False)
+    connector_name = Column(String, nullable=False)
+    token = Column(String, nullable=False)
+    units = Column(Numeric(precision=30, scale=18), nullable=False)
+    price = Column(Numeric(precision=30, scale=18), nullable=False)
+    value = Column(Numeric(precision=30, scale=18), nullable=False)
+    available_units = Column(Numeric(precision=30, scale=18), nullable=False)
+
+
+class PortfolioHistoryBackfill(Base):
+    __tablename__ = "portfolio_history_backfill"
+
+    # Single row tracking how far raw account states have been rolled into the history buckets
+    id = Column(Integer, primary_key=True)
+    last_account_state_id = Column(Integer, nullable=False, default=0)
+    completed_at = Column(TIMESTAMP(timezone=True), nullable=True)
+
+
 class Order(Base):
     __tablename__ = "orders"
     
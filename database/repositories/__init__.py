@@ -2,6 +2,7 @@ from .account_repository import AccountRepository
 from .bot_run_repository import BotRunRepository
 from .funding_repository import FundingRepository
 from .order_repository import OrderRepository
+from .portfolio_history_repository import PortfolioHistoryRepository
 from .trade_repository import TradeRepository
 from .gateway_swap_repository import GatewaySwapRepository
 from .gateway_clmm_repository import GatewayCLMMRepository
@@ -11,6 +12,7 @@ __all__ = [
     "BotRunRepository",
     "FundingRepository",
     "OrderRepository",
+    "PortfolioHistoryRepository",
     "TradeRepository",
     "GatewaySwapRepository",
     "GatewayCLMMRepository",
@@ -4,64 +4,33 @@ from typing import Dict, List, Optional, Tuple
 import base64
 import json
 
-from sqlalchemy import desc, select, func
+from sqlalchemy import BigInteger, cast, delete, desc, insert, select, func, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload
 
-from database import AccountState, TokenState
+from database import AccountState, LatestAccountState, TokenState
 
 
-class AccountRepository:
-    def __init__(self, session: AsyncSession):
-        self.session = session
-
-    @staticmethod
-    def _interval_to_minutes(interval: str) -> int:
-        """Convert interval string to minutes."""
-        interval_map = {
-            "5m": 5,
-            "15m": 15,
-            "30m": 30,
-            "1h": 60,
-            "4h": 240,
-            "12h": 720,
-            "1d": 1440
-        }
-        return interval_map.get(interval, 5)  # Default to 5 minutes
+def copy_accounts_state(accounts_state: Dict[str, Dict[str, List[Dict]]]) -> Dict[str, Dict[str, List[Dict]]]:
+    """Copy of the account/connector token lists of a state, unaffected by later changes to it."""
+    return {
+        account_name: {connector_name: [dict(token_info) for token_info in tokens_info]
+                       for connector_name, tokens_info in list(connectors.items())}
+        for account_name, connectors in list(accounts_state.items())
+    }
 
-    @staticmethod
-    def _sample_history_by_interval(history: List[Dict], interval_minutes: int) -> List[Dict]:
-        """
-        Sample historical data points based on the specified interval.
-
-        Args:
-            history: List of historical data points sorted by timestamp (descending)
-            interval_minutes: Sampling interval in minutes
 
-        Returns:
-            Sampled list of data points
-        """
-        if not history or interval_minutes <= 5:
-            return history  # Return all data for 5m or less
-
-        sampled = []
-        last_sampled_time = None
-
-        for item in history:
-            item_time = datetime.fromisoformat(item["timestamp"].replace('Z', '+00:00'))
+class AccountRepository:
+    # asyncpg caps a statement at 32767 bind parameters; token_states rows use 6 each
+    BULK_INSERT_CHUNK_SIZE = 5000
 
-            if last_sampled_time is None:
-                # Always include the first (most recent) data point
-                sampled.append(item)
-                last_sampled_time = item_time
-            else:
-                # Check if enough time has passed since last sampled point
-                time_diff = (last_sampled_time - item_time).total_seconds() / 60
-                if time_diff >= interval_minutes:
-                    sampled.append(item)
-                    last_sampled_time = item_time
+    def __init__(self, session: AsyncSession):
+        self.session = session
 
-        return sampled
+    def _epoch_seconds(self, column):
+        """SQL expression converting a timestamp column to integer unix seconds."""
+        if self.session.bind.dialect.name == "sqlite":
+            return cast(func.strftime("%s", column), BigInteger)
+        return cast(func.floor(func.extract("epoch", column)), BigInteger)
 
     async def save_account_state(self, account_name: str, connector_name: str, tokens_info: List[Dict], 
                                 snapshot_timestamp: Optional[datetime] = None) -> AccountState:
@@ -93,242 +62,212 @@ class AccountRepository:
                 available_units=Decimal(str(token_info["available_units"]))
             )
             self.session.add(token_state)
+
+        await self._replace_latest_states({account_name: {connector_name: tokens_info}}, account_state.timestamp)
         
         await self.session.commit()
         return account_state
 
-    async def get_latest_account_states(self) -> Dict[str, Dict[str, List[Dict]]]:
-        """
-        Get the latest account states for all accounts and connectors.
+    async def save_account_snapshot(self, accounts_state: Dict[str, Dict[str, List[Dict]]],
+                                    snapshot_timestamp: datetime) -> Dict[str, int]:
         """
-        # Get the latest timestamp for each account-connector combination
-        subquery = (
-            select(
-                AccountState.account_name,
-                AccountState.connector_name,
-                func.max(AccountState.timestamp).label("max_timestamp")
-            )
-            .group_by(AccountState.account_name, AccountState.connector_name)
-            .subquery()
-        )
-        
-        # Get the full records for the latest timestamps
-        query = (
-            select(AccountState)
-            .options(joinedload(AccountState.token_states))
-            .join(
-                subquery,
-                (AccountState.account_name == subquery.c.account_name) &
-                (AccountState.connector_name == subquery.c.connector_name) &
-                (AccountState.timestamp == subquery.c.max_timestamp)
-            )
-        )
-        
-        result = await self.session.execute(query)
-        account_states = result.unique().scalars().all()
-        
-        # Convert to the expected format
-        accounts_state = {}
-        for account_state in account_states:
-            if account_state.account_name not in accounts_state:
-                accounts_state[account_state.account_name] = {}
-                
-            token_info = []
-            for token_state in account_state.token_states:
-                token_info.append({
-                    "token": token_state.token,
-                    "units": float(token_state.units),
-                    "price": float(token_state.price),
-                    "value": float(token_state.value),
-                    "available_units": float(token_state.available_units)
-                })
-            
-            accounts_state[account_state.account_name][account_state.connector_name] = token_info
-        
-        return accounts_state
+        Save a full snapshot (every account/connector with its tokens) in a single transaction.
+        Does not commit, so other snapshot-derived writes can join the same transaction.
 
-    async def get_account_state_history(self,
-                                      limit: Optional[int] = None,
-                                      account_name: Optional[str] = None,
-                                      connector_name: Optional[str] = None,
-                                      cursor: Optional[str] = None,
-                                      start_time: Optional[datetime] = None,
-                                      end_time: Optional[datetime] = None,
-                                      interval: str = "5m") -> Tuple[List[Dict], Optional[str], bool]:
-        """
-        Get historical account states with cursor-based pagination and interval sampling.
+        Account states are written with one multi-row INSERT ... RETURNING to obtain their ids, and
+        token states with multi-row INSERTs chunked to stay under the driver's bind-parameter limit.
 
         Args:
-            limit: Maximum number of records to return
-            account_name: Filter by account name
-            connector_name: Filter by connector name
-            cursor: Cursor for pagination
-            start_time: Start time filter
-            end_time: End time filter
-            interval: Sampling interval (5m, 15m, 30m, 1h, 4h, 12h, 1d)
+            accounts_state: Mapping of account_name -> connector_name -> list of token info dicts
+            snapshot_timestamp: Timestamp shared by every row of the snapshot
 
         Returns:
-            Tuple of (data, next_cursor, has_more)
+            Dictionary with the number of account_states and token_states rows written
         """
-        interval_minutes = self._interval_to_minutes(interval)
-        query = (
-            select(AccountState)
-            .options(joinedload(AccountState.token_states))
-            .order_by(desc(AccountState.timestamp))
-        )
-        
-        # Apply filters
-        if account_name:
-            query = query.filter(AccountState.account_name == account_name)
-        if connector_name:
-            query = query.filter(AccountState.connector_name == connector_name)
-        if start_time:
-            query = query.filter(AccountState.timestamp >= start_time)
-        if end_time:
-            query = query.filter(AccountState.timestamp <= end_time)
-            
-        # Handle cursor-based pagination
-        if cursor:
-            try:
-                cursor_time = datetime.fromisoformat(cursor.replace('Z', '+00:00'))
-                query = query.filter(AccountState.timestamp < cursor_time)
-            except (ValueError, TypeError):
-                # Invalid cursor, ignore it
-                pass
-
-        # Fetch more records than requested to ensure we have enough after sampling
-        # For intervals > 5m, we need to fetch more data to get enough sampled points
-        sampling_multiplier = max(1, interval_minutes // 5)  # How many 5m intervals per sample
-        fetch_limit = (limit * sampling_multiplier + 1) if limit else (100 * sampling_multiplier + 1)
-        query = query.limit(fetch_limit)
-            
-        result = await self.session.execute(query)
-        account_states = result.unique().scalars().all()
-
-        # Format response - Group by minute to aggregate account/connector states
-        minute_groups = {}
-        for account_state in account_states:
-            token_info = []
-            for token_state in account_state.token_states:
-                token_info.append({
-                    "token": token_state.token,
-                    "units": float(token_state.units),
-                    "price": float(token_state.price),
-                    "value": float(token_state.value),
-                    "available_units": float(token_state.available_units)
-                })
+        # The live state can change while this awaits the database, so work on a copy of it
+        accounts_state = copy_accounts_state(accounts_state)
+        account_rows = [
+            {"account_name": account_name, "connector_name": connector_name, "timestamp": snapshot_timestamp}
+            for account_name, connectors in accounts_state.items()
+            for connector_name, tokens_info in connectors.items()
+            if tokens_info
+        ]
+        if not account_rows:
+            return {"account_states": 0, "token_states": 0}
 
-            # Round timestamp to the nearest minute for grouping
-            minute_timestamp = account_state.timestamp.replace(second=0, microsecond=0)
-            minute_key = minute_timestamp.isoformat()
-
-            # Initialize minute group if it doesn't exist
-            if minute_key not in minute_groups:
-                minute_groups[minute_key] = {
-                    "timestamp": minute_key,
-                    "state": {}
-                }
+        result = await self.session.execute(
+            insert(AccountState)
+            .values(account_rows)
+            .returning(AccountState.id, AccountState.account_name, AccountState.connector_name)
+        )
+        account_state_ids = {(account_name, connector_name): state_id for state_id, account_name, connector_name in result.all()}
 
-            # Add account/connector to the minute group
-            if account_state.account_name not in minute_groups[minute_key]["state"]:
-                minute_groups[minute_key]["state"][account_state.account_name] = {}
+        token_rows = []
+        for (account_name, connector_name), account_state_id in account_state_ids.items():
+            for token_info in accounts_state[account_name][connector_name]:
+                token_rows.append({
+                    "account_state_id": account_state_id,
+                    "token": token_info["token"],
+                    "units": Decimal(str(token_info["units"])),
+                    "price": Decimal(str(token_info["price"])),
+                    "value": Decimal(str(token_info["value"])),
+                    "available_units": Decimal(str(token_info["available_units"]))
+                })
 
-            minute_groups[minute_key]["state"][account_state.account_name][account_state.connector_name] = token_info
+        for start in range(0, len(token_rows), self.BULK_INSERT_CHUNK_SIZE):
+            await self.session.execute(insert(TokenState).values(token_rows[start:start + self.BULK_INSERT_CHUNK_SIZE]))
 
-        # Convert to list and maintain chronological order (most recent first)
-        history = list(minute_groups.values())
-        history.sort(key=lambda x: x["timestamp"], reverse=True)
+        await self._replace_latest_states(accounts_state, snapshot_timestamp)
+        return {"account_states": len(account_rows), "token_states": len(token_rows)}
 
-        # Apply interval sampling
-        sampled_history = self._sample_history_by_interval(history, interval_minutes)
+    async def _replace_latest_states(self, accounts_state: Dict[str, Dict[str, List[Dict]]],
+                                     snapshot_timestamp: datetime):
+        """
+        Replace the latest_account_states rows of every account/connector in the snapshot,
+        unless a newer snapshot of that account/connector is already stored.
+        """
+        accounts_state = copy_accounts_state(accounts_state)
+        pairs = [
+            (account_name, connector_name)
+            for account_name, connectors in accounts_state.items()
+            for connector_name, tokens_info in connectors.items()
+            if tokens_info
+        ]
+        if not pairs:
+            return
 
-        # Apply limit and check if there are more records after sampling
-        has_more = len(sampled_history) > limit if limit else False
-        if has_more:
-            sampled_history = sampled_history[:limit]
+        pair_column = tuple_(LatestAccountState.account_name, LatestAccountState.connector_name)
+        newer = await self.session.execute(
+            select(LatestAccountState.account_name, LatestAccountState.connector_name)
+            .where(pair_column.in_(pairs), LatestAccountState.timestamp > snapshot_timestamp)
+            .distinct()
+        )
+        newer_pairs = {tuple(row) for row in newer.all()}
+        pairs = [pair for pair in pairs if pair not in newer_pairs]
+        if not pairs:
+            return
 
-        # Generate next cursor from the last sampled item
-        next_cursor = None
-        if has_more and sampled_history:
-            next_cursor = sampled_history[-1]["timestamp"]
+        await self.session.execute(delete(LatestAccountState).where(pair_column.in_(pairs)))
+        rows = [
+            {
+                "timestamp": snapshot_timestamp,
+                "account_name": account_name,
+                "connector_name": connector_name,
+                "token": token_info["token"],
+                "units": Decimal(str(token_info["units"])),
+                "price": Decimal(str(token_info["price"])),
+                "value": Decimal(str(token_info["value"])),
+                "available_units": Decimal(str(token_info["available_units"]))
+            }
+            for account_name, connector_name in pairs
+            for token_info in accounts_state[account_name][connector_name]
+        ]
+        for start in range(0, len(rows), self.BULK_INSERT_CHUNK_SIZE):
+            await self.session.execute(insert(LatestAccountState).values(rows[start:start + self.BULK_INSERT_CHUNK_SIZE]))
 
-        return sampled_history, next_cursor, has_more
-    
-    async def get_account_current_state(self, account_name: str) -> Dict[str, List[Dict]]:
+    async def rebuild_latest_account_states(self) -> int:
         """
-        Get the current state for a specific account.
+        Rebuild latest_account_states from the latest snapshot of each account/connector in account_states.
+        Used to populate the table for databases created before it existed.
+
+        Returns:
+            Number of rows written
         """
-        subquery = (
+        latest = (
             select(
+                AccountState.account_name,
                 AccountState.connector_name,
                 func.max(AccountState.timestamp).label("max_timestamp")
             )
-            .filter(AccountState.account_name == account_name)
-            .group_by(AccountState.connector_name)
+            .group_by(AccountState.account_name, AccountState.connector_name)
             .subquery()
         )
-        
-        query = (
-            select(AccountState)
-            .options(joinedload(AccountState.token_states))
+        source = (
+            select(
+                AccountState.timestamp,
+                AccountState.account_name,
+                AccountState.connector_name,
+                TokenState.token,
+                TokenState.units,
+                TokenState.price,
+                TokenState.value,
+                TokenState.available_units
+            )
+            .join(TokenState)
             .join(
-                subquery,
-                (AccountState.connector_name == subquery.c.connector_name) &
-                (AccountState.timestamp == subquery.c.max_timestamp)
+                latest,
+                (AccountState.account_name == latest.c.account_name) &
+                (AccountState.connector_name == latest.c.connector_name) &
+                (AccountState.timestamp == latest.c.max_timestamp)
             )
-            .filter(AccountState.account_name == account_name)
         )
-        
-        result = await self.session.execute(query)
-        account_states = result.unique().scalars().all()
-        
+
+        await self.session.execute(delete(LatestAccountState))
+        result = await self.session.execute(
+            insert(LatestAccountState).from_select(
+                ["timestamp", "account_name", "connector_name", "token", "units", "price", "value", "available_units"],
+                source
+            )
+        )
+        return result.rowcount
+
+    async def has_latest_account_states(self) -> bool:
+        """
+        Check whether latest_account_states is populated.
+        """
+        result = await self.session.execute(select(LatestAccountState.id).limit(1))
+        return result.first() is not None
+
+    @staticmethod
+    def _latest_token_info(latest_state: LatestAccountState) -> Dict:
+        return {
+            "token": latest_state.token,
+            "units": float(latest_state.units),
+            "price": float(latest_state.price),
+            "value": float(latest_state.value),
+            "available_units": float(latest_state.available_units)
+        }
+
+    async def get_latest_account_states(self) -> Dict[str, Dict[str, List[Dict]]]:
+        """
+        Get the latest account states for all accounts and connectors.
+        """
+        result = await self.session.execute(select(LatestAccountState))
+
+        accounts_state = {}
+        for latest_state in result.scalars().all():
+            accounts_state.setdefault(latest_state.account_name, {}).setdefault(latest_state.connector_name, []).append(
+                self._latest_token_info(latest_state)
+            )
+
+        return accounts_state
+
+    async def get_account_current_state(self, account_name: str) -> Dict[str, List[Dict]]:
+        """
+        Get the current state for a specific account.
+        """
+        result = await self.session.execute(
+            select(LatestAccountState).where(LatestAccountState.account_name == account_name)
+        )
+
         state = {}
-        for account_state in account_states:
-            token_info = []
-            for token_state in account_state.token_states:
-                token_info.append({
-                    "token": token_state.token,
-                    "units": float(token_state.units),
-                    "price": float(token_state.price),
-                    "value": float(token_state.value),
-                    "available_units": float(token_state.available_units)
-                })
-            state[account_state.connector_name] = token_info
-        
+        for latest_state in result.scalars().all():
+            state.setdefault(latest_state.connector_name, []).append(self._latest_token_info(latest_state))
+
         return state
     
     async def get_connector_current_state(self, account_name: str, connector_name: str) -> List[Dict]:
         """
         Get the current state for a specific connector.
         """
-        query = (
-            select(AccountState)
-            .options(joinedload(AccountState.token_states))
-            .filter(
-                AccountState.account_name == account_name,
-                AccountState.connector_name == connector_name
+        result = await self.session.execute(
+            select(LatestAccountState).where(
+                LatestAccountState.account_name == account_name,
+                LatestAccountState.connector_name == connector_name
             )
-            .order_by(desc(AccountState.timestamp))
-            .limit(1)
         )
-        
-        result = await self.session.execute(query)
-        account_state = result.unique().scalar_one_or_none()
-        
-        if not account_state:
-            return []
-        
-        token_info = []
-        for token_state in account_state.token_states:
-            token_info.append({
-                "token": token_state.token,
-                "units": float(token_state.units),
-                "price": float(token_state.price),
-                "value": float(token_state.value),
-                "available_units": float(token_state.available_units)
-            })
-        
-        return token_info
+
+        return [self._latest_token_info(latest_state) for latest_state in result.scalars().all()]
     
     async def get_all_unique_tokens(self) -> List[str]:
         """
@@ -349,41 +288,19 @@ class AccountRepository:
         """
         Get current state of a specific token across all accounts.
         """
-        # Get latest timestamps for each account-connector combination
-        subquery = (
-            select(
-                AccountState.id,
-                AccountState.account_name,
-                AccountState.connector_name,
-                func.max(AccountState.timestamp).label("max_timestamp")
-            )
-            .group_by(AccountState.account_name, AccountState.connector_name, AccountState.id)
-            .subquery()
-        )
-        
-        query = (
-            select(TokenState, AccountState.account_name, AccountState.connector_name)
-            .join(AccountState)
-            .join(
-                subquery,
-                (AccountState.id == subquery.c.id) &
-                (AccountState.timestamp == subquery.c.max_timestamp)
-            )
-            .filter(TokenState.token == token)
+        result = await self.session.execute(
+            select(LatestAccountState).where(LatestAccountState.token == token)
         )
-        
-        result = await self.session.execute(query)
-        token_states = result.all()
-        
+
         states = []
-        for token_state, account_name, connector_name in token_states:
+        for latest_state in result.scalars().all():
             states.append({
-                "account_name": account_name,
-                "connector_name": connector_name,
-                "units": float(token_state.units),
-                "price": float(token_state.price),
-                "value": float(token_state.value),
-                "available_units": float(token_state.available_units)
+                "account_name": latest_state.account_name,
+                "connector_name": latest_state.connector_name,
+                "units": float(latest_state.units),
+                "price": float(latest_state.price),
+                "value": float(latest_state.value),
+                "available_units": float(latest_state.available_units)
             })
         
         return states
@@ -392,36 +309,16 @@ class AccountRepository:
         """
         Get total portfolio value, optionally filtered by account.
         """
-        # Get latest timestamps
-        subquery = (
+        query = (
             select(
-                AccountState.account_name,
-                AccountState.connector_name,
-                func.max(AccountState.timestamp).label("max_timestamp")
+                LatestAccountState.account_name,
+                func.sum(LatestAccountState.value).label("total_value")
             )
-            .group_by(AccountState.account_name, AccountState.connector_name)
+            .group_by(LatestAccountState.account_name)
         )
         
         if account_name:
-            subquery = subquery.filter(AccountState.account_name == account_name)
-        
-        subquery = subquery.subquery()
-        
-        # Get token values
-        query = (
-            select(
-                AccountState.account_name,
-                func.sum(TokenState.value).label("total_value")
-            )
-            .join(TokenState)
-            .join(
-                subquery,
-                (AccountState.account_name == subquery.c.account_name) &
-                (AccountState.connector_name == subquery.c.connector_name) &
-                (AccountState.timestamp == subquery.c.max_timestamp)
-            )
-            .group_by(AccountState.account_name)
-        )
+            query = query.where(LatestAccountState.account_name == account_name)
         
         result = await self.session.execute(query)
         values = result.all()
@@ -435,4 +332,72 @@ class AccountRepository:
             portfolio["accounts"][account] = float(value or 0)
             portfolio["total_value"] += float(value or 0)
         
-        return portfolio
\ No newline at end of file
+        return portfolio
+
+    async def get_oldest_account_state_timestamp(self) -> Optional[datetime]:
+        """
+        Get the timestamp of the oldest stored account state.
+        """
+        result = await self.session.execute(select(func.min(AccountState.timestamp)))
+        return result.scalar_one_or_none()
+
+    async def get_compactable_account_state_ids(self, start_time: datetime, end_time: datetime,
+                                                bucket_seconds: int, limit: int) -> List[int]:
+        """
+        Get ids of account states in [start_time, end_time) that are not the latest snapshot of their
+        account/connector within their time bucket.
+
+        Args:
+            start_time: Window start (inclusive)
+            end_time: Window end (exclusive)
+            bucket_seconds: Bucket size in seconds (e.g. 3600 to keep hourly snapshots)
+            limit: Maximum number of ids to return
+        """
+        bucket = self._epoch_seconds(AccountState.timestamp) // bucket_seconds
+        ranked = (
+            select(
+                AccountState.id,
+                func.row_number().over(
+                    partition_by=(AccountState.account_name, AccountState.connector_name, bucket),
+                    order_by=(desc(AccountState.timestamp), desc(AccountState.id))
+                ).label("rank")
+            )
+            .where(AccountState.timestamp >= start_time, AccountState.timestamp < end_time)
+            .subquery()
+        )
+        query = select(ranked.c.id).where(ranked.c.rank > 1).order_by(ranked.c.id).limit(limit)
+
+        result = await self.session.execute(query)
+        return list(result.scalars().all())
+
+    async def get_expired_account_state_ids(self, before: datetime, limit: int) -> List[int]:
+        """
+        Get ids of account states older than the given time.
+        """
+        query = (
+            select(AccountState.id)
+            .where(AccountState.timestamp < before)
+            .order_by(AccountState.id)
+            .limit(limit)
+        )
+
+        result = await self.session.execute(query)
+        return list(result.scalars().all())
+
+    async def delete_account_states(self, account_state_ids: List[int]) -> Tuple[int, int]:
+        """
+        Delete account states and their token states.
+
+        Returns:
+            Tuple of (account_states deleted, token_states deleted)
+        """
+        if not account_state_ids:
+            return 0, 0
+
+        token_result = await self.session.execute(
+            delete(TokenState).where(TokenState.account_state_id.in_(account_state_ids))
+        )
+        account_result = await self.session.execute(
+            delete(AccountState).where(AccountState.id.in_(account_state_ids))
+        )
+        return account_result.rowcount, token_result.rowcount
@@ -66,6 +66,15 @@ class FundingRepository:
         )
         return result.scalar_one_or_none() is not None
 
+    async def get_existing_funding_payment_ids(self, funding_payment_ids: List[str]) -> set:
+        """Get which of the given funding payment IDs are already stored."""
+        if not funding_payment_ids:
+            return set()
+        result = await self.session.execute(
+            select(FundingPayment.funding_payment_id).where(FundingPayment.funding_payment_id.in_(funding_payment_ids))
+        )
+        return set(result.scalars().all())
+
     def to_dict(self, funding: FundingPayment) -> Dict:
         """Convert FundingPayment model to dictionary format."""
         return {
@@ -2,13 +2,16 @@ from datetime import datetime
 from typing import Dict, List, Optional
 from decimal import Decimal
 
-from sqlalchemy import desc, select
+from sqlalchemy import case, desc, func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from database.models import Order
 
 
 class OrderRepository:
+    # Keeps IN (...) lists well below the bind parameter limits of SQLite and asyncpg
+    BATCH_SIZE = 1000
+
     def __init__(self, session: AsyncSession):
         self.session = session
 
@@ -40,6 +43,51 @@ class OrderRepository:
             await self.session.flush()
         return order
 
+    async def get_order_statuses(self, client_order_ids: List[str]) -> Dict[str, str]:
+        """Get the status of several orders by client order ID (unknown IDs are omitted)."""
+        statuses = {}
+        for start in range(0, len(client_order_ids), self.BATCH_SIZE):
+            result = await self.session.execute(
+                select(Order.client_order_id, Order.status)
+                .where(Order.client_order_id.in_(client_order_ids[start:start + self.BATCH_SIZE]))
+            )
+            statuses.update({client_order_id: status for client_order_id, status in result.all()})
+        return statuses
+
+    async def bulk_update_order_status(self, statuses: Dict[str, str]) -> int:
+        """
+        Set the status of several orders with one UPDATE per batch.
+
+        Args:
+            statuses: Mapping of client order ID to its new status
+
+        Returns:
+            Number of orders updated
+        """
+        client_order_ids = list(statuses)
+        updated = 0
+        for start in range(0, len(client_order_ids), self.BATCH_SIZE):
+            batch = {client_order_id: statuses[client_order_id]
+                     for client_order_id in client_order_ids[start:start + self.BATCH_SIZE]}
+            result = await self.session.execute(
+                update(Order)
+                .where(Order.client_order_id.in_(batch))
+                .values(status=case(batch, value=Order.client_order_id), updated_at=func.now())
+                .execution_options(synchronize_session=False)
+            )
+            updated += result.rowcount
+        return updated
+
+    async def get_orders_by_client_ids(self, client_order_ids: List[str]) -> Dict[str, Order]:
+        """Get several orders by client order ID (unknown IDs are omitted)."""
+        orders = {}
+        for start in range(0, len(client_order_ids), self.BATCH_SIZE):
+            result = await self.session.execute(
+                select(Order).where(Order.client_order_id.in_(client_order_ids[start:start + self.BATCH_SIZE]))
+            )
+            orders.update({order.client_order_id: order for order in result.scalars().all()})
+        return orders
+
     async def update_order_fill(self, client_order_id: str, filled_amount: Decimal,
                               average_fill_price: Decimal, fee_paid: Decimal = None,
                               fee_currency: str = None, exchange_order_id: str = None) -> Optional[Order]:
@@ -49,32 +97,38 @@ class OrderRepository:
         )
         order = result.scalar_one_or_none()
         if order:
-            # Add to existing filled amount instead of replacing
-            previous_filled = Decimal(str(order.filled_amount or 0))
-            order.filled_amount = float(previous_filled + filled_amount)
-            
-            # Update average price (simplified - use latest fill price)
-            order.average_fill_price = float(average_fill_price)
-            
-            # Add to existing fees
-            if fee_paid is not None:
-                previous_fee = Decimal(str(order.fee_paid or 0))
-                order.fee_paid = float(previous_fee + fee_paid)
-            if fee_currency:
-                order.fee_currency = fee_currency
-            if exchange_order_id:
-                order.exchange_order_id = exchange_order_id
-            
-            # Update status based on total filled amount
-            total_filled = Decimal(str(order.filled_amount))
-            if total_filled >= Decimal(str(order.amount)):
-                order.status = "FILLED"
-            elif total_filled > 0:
-                order.status = "PARTIALLY_FILLED"
-            
+            self.apply_order_fill(order, filled_amount, average_fill_price, fee_paid, fee_currency, exchange_order_id)
             await self.session.flush()
         return order
 
+    @staticmethod
+    def apply_order_fill(order: Order, filled_amount: Decimal,
+                         average_fill_price: Decimal, fee_paid: Decimal = None,
+                         fee_currency: str = None, exchange_order_id: str = None):
+        """Apply fill information to an already loaded order (written on the next flush)."""
+        # Add to existing filled amount instead of replacing
+        previous_filled = Decimal(str(order.filled_amount or 0))
+        order.filled_amount = float(previous_filled + filled_amount)
+
+        # Update average price (simplified - use latest fill price)
+        order.average_fill_price = float(average_fill_price)
+
+        # Add to existing fees
+        if fee_paid is not None:
+            previous_fee = Decimal(str(order.fee_paid or 0))
+            order.fee_paid = float(previous_fee + fee_paid)
+        if fee_currency:
+            order.fee_currency = fee_currency
+        if exchange_order_id:
+            order.exchange_order_id = exchange_order_id
+
+        # Update status based on total filled amount
+        total_filled = Decimal(str(order.filled_amount))
+        if total_filled >= Decimal(str(order.amount)):
+            order.status = "FILLED"
+        elif total_filled > 0:
+            order.status = "PARTIALLY_FILLED"
+
     async def get_orders(self, account_name: Optional[str] = None, 
                         connector_name: Optional[str] = None,
                         trading_pair: Optional[str] = None, 
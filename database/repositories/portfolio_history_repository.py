@@ -0,0 +1,330 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, delete, desc, func, insert, or_, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+
+from database.models import AccountState, PortfolioHistoryBackfill, PortfolioHistoryBucket
+from database.repositories.account_repository import copy_accounts_state
+
+
+class PortfolioHistoryRepository:
+    """
+    Time-bucketed portfolio history.
+
+    Every snapshot is rolled into 5m, 1h and 1d buckets per account/connector/token, each bucket holding the
+    latest snapshot received within it. Queries re-bucket the closest stored resolution in SQL, so the amount
+    of data read is proportional to the number of buckets returned instead of the number of raw snapshots.
+    Fine resolutions are pruned sooner than coarse ones, so older ranges fall back to the next stored resolution.
+    """
+    # Stored resolutions in seconds
+    RESOLUTIONS = {
+        "5m": 300,
+        "1h": 3600,
+        "1d": 86400,
+    }
+    INTERVALS = {
+        "5m": 300,
+        "15m": 900,
+        "30m": 1800,
+        "1h": 3600,
+        "4h": 14400,
+        "12h": 43200,
+        "1d": 86400,
+    }
+    # asyncpg caps a statement at 32767 bind parameters; bucket rows use 10 each
+    BULK_INSERT_CHUNK_SIZE = 3000
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    @classmethod
+    def _source_resolution(cls, interval_seconds: int) -> Tuple[str, int]:
+        """Pick the coarsest stored resolution that evenly divides the requested interval."""
+        candidates = [(name, seconds) for name, seconds in cls.RESOLUTIONS.items() if interval_seconds % seconds == 0]
+        return max(candidates, key=lambda item: item[1]) if candidates else ("5m", cls.RESOLUTIONS["5m"])
+
+    async def _resolution_filter(self, resolution: str, scope_filters: List):
+        """
+        Build the filter selecting `resolution` rows and, before the oldest of them, rows of coarser resolutions.
+
+        The compactor prunes fine resolutions sooner than coarse ones, so this keeps older history readable at
+        the finest resolution still stored for it.
+        """
+        result = await self.session.execute(
+            select(PortfolioHistoryBucket.resolution, func.min(PortfolioHistoryBucket.timestamp))
+            .where(*scope_filters)
+            .group_by(PortfolioHistoryBucket.resolution)
+        )
+        oldest = dict(result.all())
+
+        conditions = []
+        cutoff = None
+        for name, seconds in sorted(self.RESOLUTIONS.items(), key=lambda item: item[1]):
+            if seconds < self.RESOLUTIONS[resolution] or name not in oldest:
+                continue
+            condition = PortfolioHistoryBucket.resolution == name
+            conditions.append(and_(condition, PortfolioHistoryBucket.timestamp < cutoff) if cutoff is not None else condition)
+            cutoff = oldest[name] if cutoff is None else min(cutoff, oldest[name])
+        if not conditions:
+            return PortfolioHistoryBucket.resolution == resolution
+        return or_(*conditions)
+
+    async def record_snapshot(self, accounts_state: Dict[str, Dict[str, List[Dict]]],
+                              snapshot_timestamp: datetime) -> int:
+        """
+        Roll a snapshot into every stored resolution. Does not commit, so it can share the snapshot transaction.
+
+        For each resolution the bucket entries of the snapshot's account/connectors are replaced, unless the
+        bucket already holds a newer snapshot of that account/connector, in which case it is left untouched.
+
+        Returns:
+            Number of bucket rows written
+        """
+        # The live state can change while this awaits the database, so work on a copy of it
+        accounts_state = copy_accounts_state(accounts_state)
+        pairs = [
+            (account_name, connector_name)
+            for account_name, connectors in accounts_state.items()
+            for connector_name, tokens_info in connectors.items()
+            if tokens_info
+        ]
+        if not pairs:
+            return 0
+
+        epoch = int(snapshot_timestamp.timestamp())
+        rows = []
+        for resolution, seconds in self.RESOLUTIONS.items():
+            bucket_epoch = epoch - epoch % seconds
+            bucket_filters = [
+                PortfolioHistoryBucket.resolution == resolution,
+                PortfolioHistoryBucket.bucket_epoch == bucket_epoch,
+                tuple_(PortfolioHistoryBucket.account_name, PortfolioHistoryBucket.connector_name).in_(pairs)
+            ]
+            newer_result = await self.session.execute(
+                select(PortfolioHistoryBucket.account_name, PortfolioHistoryBucket.connector_name)
+                .where(*bucket_filters, PortfolioHistoryBucket.timestamp > snapshot_timestamp)
+                .distinct()
+            )
+            newer_pairs = {tuple(row) for row in newer_result.all()}
+            stale_pairs = [pair for pair in pairs if pair not in newer_pairs]
+            if not stale_pairs:
+                continue
+            await self.session.execute(
+                delete(PortfolioHistoryBucket).where(
+                    *bucket_filters[:2],
+                    tuple_(PortfolioHistoryBucket.account_name, PortfolioHistoryBucket.connector_name).in_(stale_pairs)
+                )
+            )
+            for account_name, connector_name in stale_pairs:
+                for token_info in accounts_state[account_name][connector_name]:
+                    rows.append({
+                        "resolution": resolution,
+                        "bucket_epoch": bucket_epoch,
+                        "timestamp": snapshot_timestamp,
+                        "account_name": account_name,
+                        "connector_name": connector_name,
+                        "token": token_info["token"],
+                        "units": Decimal(str(token_info["units"])),
+                        "price": Decimal(str(token_info["price"])),
+                        "value": Decimal(str(token_info["value"])),
+                        "available_units": Decimal(str(token_info["available_units"]))
+                    })
+
+        for start in range(0, len(rows), self.BULK_INSERT_CHUNK_SIZE):
+            await self.session.execute(insert(PortfolioHistoryBucket).values(rows[start:start + self.BULK_INSERT_CHUNK_SIZE]))
+        return len(rows)
+
+    async def has_data(self) -> bool:
+        """Check whether any bucket has been recorded yet."""
+        result = await self.session.execute(select(PortfolioHistoryBucket.id).limit(1))
+        return result.first() is not None
+
+    async def get_backfill_progress(self) -> Tuple[int, bool]:
+        """
+        Get how far raw account states have been backfilled into the buckets.
+
+        Returns:
+            Tuple of (id of the last backfilled account state, whether the backfill completed)
+        """
+        progress = await self.session.get(PortfolioHistoryBackfill, 1)
+        if progress is None:
+            return 0, False
+        return progress.last_account_state_id, progress.completed_at is not None
+
+    async def save_backfill_progress(self, last_account_state_id: int, completed: bool = False):
+        """Persist the backfill watermark. Does not commit, so it can share the backfill batch transaction."""
+        progress = await self.session.get(PortfolioHistoryBackfill, 1)
+        if progress is None:
+            progress = PortfolioHistoryBackfill(id=1)
+            self.session.add(progress)
+        progress.last_account_state_id = last_account_state_id
+        progress.completed_at = datetime.now(timezone.utc) if completed else None
+
+    async def backfill_from_account_states(self, after_id: int = 0, batch_size: int = 500) -> Optional[int]:
+        """
+        Roll a batch of raw account states (ordered by id) into the buckets.
+
+        Args:
+            after_id: Only process account states with a greater id
+            batch_size: Maximum number of account states to process
+
+        Returns:
+            Id of the last processed account state, or None when there is nothing left to backfill
+        """
+        result = await self.session.execute(
+            select(AccountState)
+            .options(joinedload(AccountState.token_states))
+            .where(AccountState.id > after_id)
+            .order_by(AccountState.id)
+            .limit(batch_size)
+        )
+        account_states = result.unique().scalars().all()
+        if not account_states:
+            return None
+
+        snapshots: Dict[datetime, Dict[str, Dict[str, List[Dict]]]] = {}
+        for account_state in account_states:
+            snapshot = snapshots.setdefault(account_state.timestamp, {})
+            snapshot.setdefault(account_state.account_name, {})[account_state.connector_name] = [
+                {
+                    "token": token_state.token,
+                    "units": token_state.units,
+                    "price": token_state.price,
+                    "value": token_state.value,
+                    "available_units": token_state.available_units
+                }
+                for token_state in account_state.token_states
+            ]
+
+        for snapshot_timestamp in sorted(snapshots):
+            await self.record_snapshot(snapshots[snapshot_timestamp], snapshot_timestamp)
+        return account_states[-1].id
+
+    async def get_history(self,
+                          limit: Optional[int] = None,
+                          account_name: Optional[str] = None,
+                          connector_name: Optional[str] = None,
+                          cursor: Optional[str] = None,
+                          start_time: Optional[datetime] = None,
+                          end_time: Optional[datetime] = None,
+                          interval: str = "5m") -> Tuple[List[Dict], Optional[str], bool]:
+        """
+        Get portfolio history downsampled to the requested interval, most recent bucket first.
+
+        Each returned bucket holds, per account/connector, the latest snapshot recorded within it.
+
+        Args:
+            limit: Maximum number of buckets to return
+            account_name: Filter by account name
+            connector_name: Filter by connector name
+            cursor: Cursor for pagination (timestamp of the last bucket of the previous page)
+            start_time: Start time filter
+            end_time: End time filter
+            interval: Bucket interval (5m, 15m, 30m, 1h, 4h, 12h, 1d)
+
+        Returns:
+            Tuple of (data, next_cursor, has_more)
+        """
+        interval_seconds = self.INTERVALS.get(interval, self.INTERVALS["5m"])
+        resolution, _ = self._source_resolution(interval_seconds)
+        bucket = (PortfolioHistoryBucket.bucket_epoch // interval_seconds) * interval_seconds
+
+        scope_filters = []
+        if account_name:
+            scope_filters.append(PortfolioHistoryBucket.account_name == account_name)
+        if connector_name:
+            scope_filters.append(PortfolioHistoryBucket.connector_name == connector_name)
+        filters = [await self._resolution_filter(resolution, scope_filters), *scope_filters]
+        if start_time:
+            filters.append(PortfolioHistoryBucket.timestamp >= start_time)
+        if end_time:
+            filters.append(PortfolioHistoryBucket.timestamp <= end_time)
+        if cursor:
+            try:
+                cursor_time = datetime.fromisoformat(cursor.replace('Z', '+00:00'))
+                if cursor_time.tzinfo is None:
+                    cursor_time = cursor_time.replace(tzinfo=timezone.utc)
+                filters.append(bucket < int(cursor_time.timestamp()))
+            except (ValueError, TypeError):
+                # Invalid cursor, ignore it
+                pass
+
+        # Pick the page of bucket boundaries first
+        page_size = limit or 100
+        buckets_result = await self.session.execute(
+            select(bucket.label("bucket")).where(*filters).group_by(bucket).order_by(desc("bucket")).limit(page_size + 1)
+        )
+        buckets = [row.bucket for row in buckets_result]
+        has_more = len(buckets) > page_size if limit else False
+        buckets = buckets[:page_size]
+        if not buckets:
+            return [], None, False
+
+        # Latest snapshot per account/connector within each bucket
+        latest = (
+            select(
+                bucket.label("bucket"),
+                PortfolioHistoryBucket.account_name,
+                PortfolioHistoryBucket.connector_name,
+                func.max(PortfolioHistoryBucket.timestamp).label("max_timestamp")
+            )
+            .where(*filters, bucket.in_(buckets))
+            .group_by(bucket, PortfolioHistoryBucket.account_name, PortfolioHistoryBucket.connector_name)
+            .subquery()
+        )
+        result = await self.session.execute(
+            select(PortfolioHistoryBucket, latest.c.bucket)
+            .join(
+                latest,
+                and_(
+                    PortfolioHistoryBucket.account_name == latest.c.account_name,
+                    PortfolioHistoryBucket.connector_name == latest.c.connector_name,
+                    PortfolioHistoryBucket.timestamp == latest.c.max_timestamp
+                )
+            )
+            .where(*filters, bucket == latest.c.bucket)
+        )
+
+        groups: Dict[int, Dict] = {}
+        for row, bucket_epoch in result.all():
+            group = groups.setdefault(bucket_epoch, {
+                "timestamp": datetime.fromtimestamp(bucket_epoch, tz=timezone.utc).isoformat(),
+                "state": {}
+            })
+            group["state"].setdefault(row.account_name, {}).setdefault(row.connector_name, []).append({
+                "token": row.token,
+                "units": float(row.units),
+                "price": float(row.price),
+                "value": float(row.value),
+                "available_units": float(row.available_units)
+            })
+
+        history = [groups[bucket_epoch] for bucket_epoch in sorted(groups, reverse=True)]
+        next_cursor = history[-1]["timestamp"] if has_more and history else None
+        return history, next_cursor, has_more
+
+    async def delete_buckets_before(self, before: datetime, limit: int, resolution: Optional[str] = None) -> int:
+        """
+        Delete up to `limit` bucket rows holding snapshots older than the given time.
+
+        Args:
+            before: Delete rows whose snapshot timestamp is older than this
+            limit: Maximum number of rows to delete
+            resolution: Only delete rows of this resolution (all resolutions if None)
+
+        Returns:
+            Number of rows deleted
+        """
+        query = select(PortfolioHistoryBucket.id).where(PortfolioHistoryBucket.timestamp < before)
+        if resolution:
+            query = query.where(PortfolioHistoryBucket.resolution == resolution)
+        result = await self.session.execute(query.limit(limit))
+        ids = list(result.scalars().all())
+        if not ids:
+            return 0
+
+        await self.session.execute(delete(PortfolioHistoryBucket).where(PortfolioHistoryBucket.id.in_(ids)))
+        return len(ids)
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from fastapi import Request
 from services.bots_orchestrator import BotsOrchestrator
 from services.accounts_service import AccountsService
@@ -5,7 +7,10 @@ from services.docker_service import DockerService
 from services.gateway_service import GatewayService
 from services.market_data_feed_manager import MarketDataFeedManager
 from services.bot_state_sync import BotStateSyncService
+from services.account_state_compactor import AccountStateCompactionService
+from services.backtesting_service import BacktestingService
 from utils.bot_archiver import BotArchiver
+from utils.performance_cache import PerformanceCache
 from database import AsyncDatabaseManager
 
 
@@ -46,4 +51,19 @@ def get_database_manager(request: Request) -> AsyncDatabaseManager:
 
 def get_bot_state_sync(request: Request) -> BotStateSyncService:
     """Get BotStateSyncService from app state."""
-    return request.app.state.bot_state_sync
\ No newline at end of file
+    return request.app.state.bot_state_sync
+
+
+def get_account_state_compactor(request: Request) -> AccountStateCompactionService:
+    """Get AccountStateCompactionService from app state."""
+    return request.app.state.account_state_compactor
+
+
+def get_backtesting_service(request: Request) -> BacktestingService:
+    """Get BacktestingService from app state."""
+    return request.app.state.backtesting_service
+
+
+def get_performance_cache(request: Request) -> Optional[PerformanceCache]:
+    """Get the archived bots PerformanceCache from app state (None when disabled)."""
+    return request.app.state.performance_cache
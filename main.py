@@ -1,3 +1,4 @@
+import os
 import secrets
 from contextlib import asynccontextmanager
 from typing import Annotated
@@ -43,8 +44,13 @@ from services.docker_service import DockerService
 from services.gateway_service import GatewayService
 from services.market_data_feed_manager import MarketDataFeedManager
 from services.bot_state_sync import BotStateSyncService
+from services.account_state_compactor import AccountStateCompactionService
+from services.backtesting_service import BacktestingService
 # from services.executor_service import ExecutorService
 from utils.bot_archiver import BotArchiver
+from utils.backtest_result_cache import BacktestResultCache
+from utils.candles_store import CandlesStore
+from utils.performance_cache import PerformanceCache
 from routers import (
     accounts,
     archived_bots,
@@ -157,15 +163,21 @@ async def lifespan(app: FastAPI):
         market_data_provider=market_data_provider,
         rate_oracle=rate_oracle_instance,
         cleanup_interval=settings.market_data.cleanup_interval,
-        feed_timeout=settings.market_data.feed_timeout
+        feed_timeout=settings.market_data.feed_timeout,
+        order_book_max_staleness=settings.market_data.order_book_max_staleness,
+        price_cache_ttl=settings.market_data.price_cache_ttl,
+        candles_stream_interval=settings.market_data.candles_stream_interval,
+        candles_store=CandlesStore(settings.candles_store.path) if settings.candles_store.enabled else None
     )
 
     # Initialize services
+    docker_service = DockerService()
     bots_orchestrator = BotsOrchestrator(
         broker_host=settings.broker.host,
         broker_port=settings.broker.port,
         broker_username=settings.broker.username,
-        broker_password=settings.broker.password
+        broker_password=settings.broker.password,
+        container_inventory=docker_service.inventory
     )
 
     accounts_service = AccountsService(
@@ -173,7 +185,6 @@ async def lifespan(app: FastAPI):
         market_data_feed_manager=market_data_feed_manager,
         gateway_url=settings.gateway.url
     )
-    docker_service = DockerService()
     gateway_service = GatewayService()
     bot_archiver = BotArchiver(
         settings.aws.api_key,
@@ -192,6 +203,39 @@ async def lifespan(app: FastAPI):
         sync_interval=10.0,  # Sync every 10 seconds
     )
 
+    # Initialize AccountStateCompactionService to keep account state history bounded
+    retention = settings.account_state_retention
+    account_state_compactor = AccountStateCompactionService(
+        db_manager=accounts_service.db_manager,
+        full_resolution_days=retention.full_resolution_days,
+        hourly_resolution_days=retention.hourly_resolution_days,
+        retention_days=retention.retention_days,
+        batch_size=retention.batch_size,
+        run_interval=retention.run_interval,
+    )
+
+    # Initialize BacktestingService to run backtests in worker processes
+    backtesting_service = BacktestingService(
+        results_path=settings.backtesting.results_path,
+        max_workers=settings.backtesting.max_workers,
+        job_timeout=settings.backtesting.job_timeout,
+        max_jobs=settings.backtesting.max_jobs,
+        job_retention=settings.backtesting.job_retention_days * 86400,
+        candles_store_path=settings.candles_store.path if settings.candles_store.enabled else None,
+        result_cache=BacktestResultCache(
+            os.path.join(settings.backtesting.results_path, "cache"),
+            max_entries=settings.backtesting.result_cache_max_entries,
+            max_bytes=settings.backtesting.result_cache_max_bytes,
+        ) if settings.backtesting.result_cache_enabled else None,
+        controllers_path=settings.app.controllers_module.replace(".", os.sep),
+    )
+
+    # Cache of computed performance of archived bot databases
+    performance_cache = PerformanceCache(
+        settings.archived_bots.performance_cache_path,
+        max_entries=settings.archived_bots.performance_cache_max_entries,
+    ) if settings.archived_bots.performance_cache_enabled else None
+
     # # Initialize ExecutorService for running executors directly via API
     # executor_service = ExecutorService(
     #     connector_manager=accounts_service.connector_manager,
@@ -212,6 +256,9 @@ async def lifespan(app: FastAPI):
     app.state.bot_archiver = bot_archiver
     app.state.market_data_feed_manager = market_data_feed_manager
     app.state.bot_state_sync = bot_state_sync
+    app.state.account_state_compactor = account_state_compactor
+    app.state.backtesting_service = backtesting_service
+    app.state.performance_cache = performance_cache
     # app.state.executor_service = executor_service
 
     # Start services
@@ -219,13 +266,20 @@ async def lifespan(app: FastAPI):
     accounts_service.start()
     market_data_feed_manager.start()
     bot_state_sync.start()  # Start bot state synchronization
+    if retention.enabled:
+        account_state_compactor.start()
+    backtesting_service.start()
     # executor_service.start()
 
     yield
 
     # Shutdown services
     bot_state_sync.stop()  # Stop state sync first
+    account_state_compactor.stop()
     bots_orchestrator.stop()
+    await backtesting_service.stop()
+    if performance_cache:
+        await performance_cache.stop()
     await accounts_service.stop()
 
     # Stop executor service
@@ -76,6 +76,8 @@ from .market_data import (
     PriceRequest,
     PriceData,
     PricesResponse,
+    BatchPriceRequest,
+    BatchPricesResponse,
     FundingInfoRequest,
     FundingInfoResponse,
     OrderBookRequest,
@@ -88,6 +90,11 @@ from .market_data import (
     PriceForQuoteVolumeRequest,
     VWAPForVolumeRequest,
     OrderBookQueryResult,
+    OrderBookBatchQuery,
+    OrderBookBatchQueryRequest,
+    OrderBookBatchQueryResult,
+    OrderBookBatchPairResult,
+    OrderBookBatchQueryResponse,
 )
 
 # Account models
@@ -118,7 +125,14 @@ from .gateway import (
 )
 
 # Backtesting models
-from .backtesting import BacktestingConfig
+from .backtesting import (
+    BacktestingConfig,
+    BacktestJobResponse,
+    BacktestingSweepRequest,
+    BacktestSweepResponse,
+    BacktestSweepRow,
+    ParameterRange,
+)
 
 # Pagination models
 from .pagination import PaginatedResponse, PaginationParams, TimeRangePaginationParams
@@ -266,6 +280,8 @@ __all__ = [
     "PriceRequest",
     "PriceData",
     "PricesResponse",
+    "BatchPriceRequest",
+    "BatchPricesResponse",
     "FundingInfoRequest",
     "FundingInfoResponse",
     "OrderBookRequest",
@@ -278,6 +294,11 @@ __all__ = [
     "PriceForQuoteVolumeRequest",
     "VWAPForVolumeRequest",
     "OrderBookQueryResult",
+    "OrderBookBatchQuery",
+    "OrderBookBatchQueryRequest",
+    "OrderBookBatchQueryResult",
+    "OrderBookBatchPairResult",
+    "OrderBookBatchQueryResponse",
     # Account models
     "LeverageRequest",
     "PositionModeRequest",
@@ -297,6 +318,11 @@ __all__ = [
     "AddTokenRequest",
     # Backtesting models
     "BacktestingConfig",
+    "BacktestJobResponse",
+    "BacktestingSweepRequest",
+    "BacktestSweepResponse",
+    "BacktestSweepRow",
+    "ParameterRange",
     # Pagination models
     "PaginatedResponse",
     "PaginationParams",
@@ -1,5 +1,5 @@
-from typing import Dict, Union
-from pydantic import BaseModel
+from typing import Any, Dict, List, Optional, Union
+from pydantic import BaseModel, Field
 
 
 class BacktestingConfig(BaseModel):
@@ -7,4 +7,52 @@ class BacktestingConfig(BaseModel):
     end_time: int = 1738368000  # 2025-02-01 00:00:00
     backtesting_resolution: str = "1m"
     trade_cost: float = 0.0006
-    config: Union[Dict, str]
\ No newline at end of file
+    config: Union[Dict, str]
+
+
+class BacktestJobResponse(BaseModel):
+    job_id: str
+    status: str
+    submitted_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+    summary: Optional[Dict] = None
+    cached: bool = False
+
+
+class ParameterRange(BaseModel):
+    start: float
+    stop: float
+    step: float = Field(gt=0)
+
+
+class BacktestingSweepRequest(BacktestingConfig):
+    parameters: Dict[str, Union[List[Any], ParameterRange]] = Field(
+        min_length=1,
+        description="Controller config keys (dotted for nested keys) to the values to try, "
+                    "as a list or a {start, stop, step} range including stop"
+    )
+    rank_by: str = Field(default="net_pnl", description="Backtest results metric the combinations are ranked by")
+    ascending: bool = Field(default=False, description="Rank the lowest values first")
+
+
+class BacktestSweepRow(BaseModel):
+    rank: Optional[int] = None
+    job_id: str
+    parameters: Dict[str, Any]
+    status: str
+    cached: bool = False
+    error: Optional[str] = None
+    results: Optional[Dict] = None
+
+
+class BacktestSweepResponse(BaseModel):
+    sweep_id: str
+    status: str
+    rank_by: str
+    ascending: bool
+    submitted_at: float
+    finished_at: Optional[float] = None
+    combinations: int
+    table: List[BacktestSweepRow] = Field(default_factory=list)
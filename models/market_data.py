@@ -1,6 +1,6 @@
 from datetime import datetime
 from decimal import Decimal
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Literal, Optional
 
 from pydantic import BaseModel, Field
 
@@ -87,6 +87,18 @@ class PricesResponse(BaseModel):
     timestamp: float = Field(description="Response timestamp")
 
 
+class BatchPriceRequest(BaseModel):
+    """Request model for getting prices from several connectors at once"""
+    requests: List[PriceRequest] = Field(min_length=1, max_length=50, description="Price requests, one per connector")
+
+
+class BatchPricesResponse(BaseModel):
+    """Response for prices from several connectors"""
+    prices: Dict[str, Dict[str, float]] = Field(description="Connector to trading pair to price mapping")
+    errors: Dict[str, str] = Field(default_factory=dict, description="Error message per connector that failed")
+    timestamp: float = Field(description="Response timestamp")
+
+
 class FundingInfoRequest(BaseModel):
     """Request model for getting funding info"""
     connector_name: str = Field(description="Name of the connector")
@@ -165,4 +177,57 @@ class OrderBookQueryResult(BaseModel):
     result_volume: Optional[float] = Field(default=None, description="Resulting volume")
     result_quote_volume: Optional[float] = Field(default=None, description="Resulting quote volume")
     average_price: Optional[float] = Field(default=None, description="Average/VWAP price")
-    timestamp: float = Field(description="Query timestamp")
\ No newline at end of file
+    timestamp: float = Field(description="Query timestamp")
+
+
+class OrderBookBatchQuery(BaseModel):
+    """Single depth query of a batch"""
+    query_type: Literal[
+        "price_for_volume",
+        "volume_for_price",
+        "price_for_quote_volume",
+        "quote_volume_for_price",
+        "vwap_for_volume",
+    ] = Field(description="Query to evaluate, same semantics as the matching /order-book/* endpoint")
+    is_buy: bool = Field(description="True for buy side, False for sell side")
+    value: float = Field(gt=0, description="Queried volume, price or quote volume, depending on the query type")
+
+
+class OrderBookBatchQueryRequest(BaseModel):
+    """Request model for evaluating many depth queries against one order book snapshot per pair"""
+    connector_name: str = Field(description="Name of the connector")
+    trading_pairs: List[str] = Field(min_length=1, max_length=50, description="Trading pairs to query")
+    queries: List[OrderBookBatchQuery] = Field(
+        min_length=1, max_length=1000, description="Queries evaluated against the order book of every trading pair"
+    )
+
+
+class OrderBookBatchQueryResult(BaseModel):
+    """Result of a single depth query of a batch"""
+    query_type: str = Field(description="Evaluated query")
+    is_buy: bool = Field(description="Query side (buy/sell)")
+    value: float = Field(description="Queried volume, price or quote volume")
+    result_price: Optional[float] = Field(default=None, description="Resulting (last level) price")
+    result_volume: Optional[float] = Field(default=None, description="Resulting base volume")
+    result_quote_volume: Optional[float] = Field(default=None, description="Resulting quote volume")
+    average_price: Optional[float] = Field(default=None, description="Average/VWAP price")
+    price_impact_pct: Optional[float] = Field(
+        default=None, description="Distance of the average (or resulting) price from the mid price, in percent"
+    )
+
+
+class OrderBookBatchPairResult(BaseModel):
+    """Batch query results of one trading pair"""
+    trading_pair: str = Field(description="Trading pair")
+    best_bid: Optional[float] = Field(default=None, description="Best bid of the snapshot")
+    best_ask: Optional[float] = Field(default=None, description="Best ask of the snapshot")
+    mid_price: Optional[float] = Field(default=None, description="Mid price of the snapshot")
+    results: List[OrderBookBatchQueryResult] = Field(default_factory=list, description="Results in query order")
+    error: Optional[str] = Field(default=None, description="Error if the order book could not be loaded")
+
+
+class OrderBookBatchQueryResponse(BaseModel):
+    """Response for batch order book queries"""
+    connector_name: str = Field(description="Name of the connector")
+    results: List[OrderBookBatchPairResult] = Field(description="Results per trading pair")
+    timestamp: float = Field(description="Query timestamp")
@@ -1,12 +1,43 @@
-from typing import List, Optional
-from fastapi import APIRouter, HTTPException, Query
+import asyncio
+import json
+from typing import Any, Dict, Iterator, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 
+from deps import get_performance_cache
 from utils.file_system import fs_util
 from utils.hummingbot_database_reader import HummingbotDatabase
+from utils.performance_cache import PerformanceCache
 
 router = APIRouter(tags=["Archived Bots"], prefix="/archived-bots")
 
 
+def _stream_rows(db_path: str, key: str, rows: Iterator[Dict[str, Any]], fields: Dict[str, Any],
+                 batch_size: int = 500) -> StreamingResponse:
+    """
+    Stream {"db_path": ..., key: [rows...], **fields} as rows are read from the database.
+
+    Null values are sent as 0, like the previous `fillna(0)` responses.
+    """
+    def body():
+        yield f'{{"db_path": {json.dumps(db_path)}, "{key}": ['.encode()
+        batch, first = [], True
+        for row in rows:
+            batch.append(json.dumps({k: 0 if v is None else v for k, v in row.items()}, default=str))
+            if len(batch) >= batch_size:
+                yield (("" if first else ", ") + ", ".join(batch)).encode()
+                batch, first = [], False
+        if batch:
+            yield (("" if first else ", ") + ", ".join(batch)).encode()
+        yield f'], {json.dumps(fields)[1:]}'.encode()
+
+    return StreamingResponse(body(), media_type="application/json")
+
+
+def _pagination(total: int, limit: int, offset: int) -> Dict[str, Any]:
+    return {"total": total, "limit": limit, "offset": offset, "has_more": offset + limit < total}
+
+
 @router.get("/", response_model=List[str])
 async def list_databases():
     """
@@ -18,6 +49,35 @@ async def list_databases():
     return fs_util.list_databases()
 
 
+def _compute_performance(db_path: str):
+    return HummingbotDatabase(db_path).calculate_trade_based_performance()
+
+
+@router.post("/performance/precompute")
+async def precompute_performance(performance_cache: Optional[PerformanceCache] = Depends(get_performance_cache)):
+    """
+    Compute and cache the performance of every archived database in the background.
+    
+    Databases whose performance is already cached for their current file are skipped.
+    
+    Returns:
+        Precompute progress; poll GET /archived-bots/performance/cache for updates
+    """
+    if performance_cache is None:
+        raise HTTPException(status_code=400, detail="Performance cache is disabled")
+    return performance_cache.start_precompute(fs_util.list_databases(), _compute_performance)
+
+
+@router.get("/performance/cache")
+async def get_performance_cache_metrics(performance_cache: Optional[PerformanceCache] = Depends(get_performance_cache)):
+    """
+    Get performance cache hit/miss counters, size and precompute progress.
+    """
+    if performance_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **performance_cache.get_metrics()}
+
+
 @router.get("/{db_path:path}/status")
 async def get_database_status(db_path: str):
     """
@@ -53,33 +113,19 @@ async def get_database_summary(db_path: str):
     """
     try:
         db = HummingbotDatabase(db_path)
-        
-        # Get basic counts
-        orders = db.get_orders()
-        trades = db.get_trade_fills()
-        executors = db.get_executors_data()
-        positions = db.get_positions()
-        controllers = db.get_controllers_data()
-        
-        return {
-            "db_path": db_path,
-            "total_orders": len(orders),
-            "total_trades": len(trades),
-            "total_executors": len(executors),
-            "total_positions": len(positions),
-            "total_controllers": len(controllers),
-            "trading_pairs": orders["trading_pair"].unique().tolist() if len(orders) > 0 else [],
-            "exchanges": orders["connector_name"].unique().tolist() if len(orders) > 0 else [],
-        }
+        return {"db_path": db_path, **db.get_summary()}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error analyzing database: {str(e)}")
 
 
 @router.get("/{db_path:path}/performance")
-async def get_database_performance(db_path: str):
+async def get_database_performance(db_path: str,
+                                   performance_cache: Optional[PerformanceCache] = Depends(get_performance_cache)):
     """
     Get trade-based performance analysis for a bot database.
     
+    The computed performance is cached per database file, so repeated views skip the computation.
+    
     Args:
         db_path: Full path to the database file
         
@@ -87,10 +133,13 @@ async def get_database_performance(db_path: str):
         Trade-based performance metrics with rolling calculations
     """
     try:
-        db = HummingbotDatabase(db_path)
-        
         # Use new trade-based performance calculation
-        performance_data = db.calculate_trade_based_performance()
+        if performance_cache is not None:
+            performance_data = await asyncio.to_thread(
+                performance_cache.get_or_compute, db_path, lambda: _compute_performance(db_path)
+            )
+        else:
+            performance_data = await asyncio.to_thread(_compute_performance, db_path)
         
         if len(performance_data) == 0:
             return {
@@ -130,39 +179,35 @@ async def get_database_performance(db_path: str):
 async def get_database_trades(
     db_path: str,
     limit: int = Query(default=100, description="Limit number of trades returned"),
-    offset: int = Query(default=0, description="Offset for pagination")
+    offset: int = Query(default=0, description="Offset for pagination"),
+    connector_name: Optional[str] = Query(default=None, description="Filter by connector"),
+    trading_pair: Optional[str] = Query(default=None, description="Filter by trading pair"),
+    trade_type: Optional[str] = Query(default=None, description="Filter by trade type (BUY or SELL)")
 ):
     """
     Get trade history from a database.
     
+    Filters and pagination are applied by SQLite and the page is streamed as it is read.
+    
     Args:
         db_path: Full path to the database file
         limit: Maximum number of trades to return
         offset: Offset for pagination
+        connector_name: Optional connector filter
+        trading_pair: Optional trading pair filter
+        trade_type: Optional trade type filter
         
     Returns:
         List of trades with pagination info
     """
+    filters = {"connector_name": connector_name, "trading_pair": trading_pair, "trade_type": trade_type}
     try:
         db = HummingbotDatabase(db_path)
-        trades = db.get_trade_fills()
-        
-        # Apply pagination
-        total_trades = len(trades)
-        trades_page = trades.iloc[offset:offset + limit]
-        
-        return {
-            "db_path": db_path,
-            "trades": trades_page.fillna(0).to_dict('records'),
-            "pagination": {
-                "total": total_trades,
-                "limit": limit,
-                "offset": offset,
-                "has_more": offset + limit < total_trades
-            }
-        }
+        total_trades = db.count("trade_fills", filters)
+        rows = db.iter_rows("trade_fills", filters, limit=limit, offset=offset)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching trades: {str(e)}")
+    return _stream_rows(db_path, "trades", rows, {"pagination": _pagination(total_trades, limit, offset)})
 
 
 @router.get("/{db_path:path}/orders")
@@ -170,75 +215,74 @@ async def get_database_orders(
     db_path: str,
     limit: int = Query(default=100, description="Limit number of orders returned"),
     offset: int = Query(default=0, description="Offset for pagination"),
-    status: Optional[str] = Query(default=None, description="Filter by order status")
+    status: Optional[str] = Query(default=None, description="Filter by order status"),
+    connector_name: Optional[str] = Query(default=None, description="Filter by connector"),
+    trading_pair: Optional[str] = Query(default=None, description="Filter by trading pair")
 ):
     """
     Get order history from a database.
     
+    Filters and pagination are applied by SQLite and the page is streamed as it is read.
+    
     Args:
         db_path: Full path to the database file
         limit: Maximum number of orders to return
         offset: Offset for pagination
         status: Optional status filter
+        connector_name: Optional connector filter
+        trading_pair: Optional trading pair filter
         
     Returns:
         List of orders with pagination info
     """
+    filters = {"last_status": status, "connector_name": connector_name, "trading_pair": trading_pair}
     try:
         db = HummingbotDatabase(db_path)
-        orders = db.get_orders()
-        
-        # Apply status filter if provided
-        if status:
-            orders = orders[orders["last_status"] == status]
-        
-        # Apply pagination
-        total_orders = len(orders)
-        orders_page = orders.iloc[offset:offset + limit]
-        
-        return {
-            "db_path": db_path,
-            "orders": orders_page.fillna(0).to_dict('records'),
-            "pagination": {
-                "total": total_orders,
-                "limit": limit,
-                "offset": offset,
-                "has_more": offset + limit < total_orders
-            }
-        }
+        total_orders = db.count("orders", filters)
+        rows = db.iter_rows("orders", filters, limit=limit, offset=offset)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching orders: {str(e)}")
+    return _stream_rows(db_path, "orders", rows, {"pagination": _pagination(total_orders, limit, offset)})
 
 
 @router.get("/{db_path:path}/executors")
-async def get_database_executors(db_path: str):
+async def get_database_executors(
+    db_path: str,
+    limit: Optional[int] = Query(default=None, description="Limit number of executors returned (all by default)"),
+    offset: int = Query(default=0, description="Offset for pagination"),
+    controller_id: Optional[str] = Query(default=None, description="Filter by controller id"),
+    type: Optional[str] = Query(default=None, description="Filter by executor type")
+):
     """
     Get executor data from a database.
     
     Args:
         db_path: Full path to the database file
+        limit: Optional maximum number of executors to return
+        offset: Offset for pagination
+        controller_id: Optional controller filter
+        type: Optional executor type filter
         
     Returns:
         List of executors with their configurations and results
     """
+    filters = {"controller_id": controller_id, "type": type}
     try:
         db = HummingbotDatabase(db_path)
-        executors = db.get_executors_data()
-        
-        return {
-            "db_path": db_path,
-            "executors": executors.fillna(0).to_dict('records'),
-            "total": len(executors)
-        }
+        total_executors = db.count("executors", filters)
+        rows = db.iter_rows("executors", filters, limit=limit, offset=offset)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching executors: {str(e)}")
+    return _stream_rows(db_path, "executors", rows, {"total": total_executors})
 
 
 @router.get("/{db_path:path}/positions")
 async def get_database_positions(
     db_path: str,
     limit: int = Query(default=100, description="Limit number of positions returned"),
-    offset: int = Query(default=0, description="Offset for pagination")
+    offset: int = Query(default=0, description="Offset for pagination"),
+    controller_id: Optional[str] = Query(default=None, description="Filter by controller id"),
+    trading_pair: Optional[str] = Query(default=None, description="Filter by trading pair")
 ):
     """
     Get position data from a database.
@@ -247,30 +291,20 @@ async def get_database_positions(
         db_path: Full path to the database file
         limit: Maximum number of positions to return
         offset: Offset for pagination
+        controller_id: Optional controller filter
+        trading_pair: Optional trading pair filter
         
     Returns:
         List of positions with pagination info
     """
+    filters = {"controller_id": controller_id, "trading_pair": trading_pair}
     try:
         db = HummingbotDatabase(db_path)
-        positions = db.get_positions()
-        
-        # Apply pagination
-        total_positions = len(positions)
-        positions_page = positions.iloc[offset:offset + limit]
-        
-        return {
-            "db_path": db_path,
-            "positions": positions_page.fillna(0).to_dict('records'),
-            "pagination": {
-                "total": total_positions,
-                "limit": limit,
-                "offset": offset,
-                "has_more": offset + limit < total_positions
-            }
-        }
+        total_positions = db.count("positions", filters)
+        rows = db.iter_rows("positions", filters, limit=limit, offset=offset)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching positions: {str(e)}")
+    return _stream_rows(db_path, "positions", rows, {"pagination": _pagination(total_positions, limit, offset)})
 
 
 @router.get("/{db_path:path}/controllers")
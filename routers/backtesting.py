@@ -1,55 +1,269 @@
-from fastapi import APIRouter
+import asyncio
+import os
+from typing import List, Literal, Optional
+
+import yaml
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse, StreamingResponse
 from hummingbot.data_feed.candles_feed.candles_factory import CandlesFactory
-from hummingbot.strategy_v2.backtesting.backtesting_engine_base import BacktestingEngineBase
 
 from config import settings
-from models.backtesting import BacktestingConfig
+from deps import get_backtesting_service
+from models.backtesting import BacktestingConfig, BacktestingSweepRequest, BacktestJobResponse, BacktestSweepResponse
+from services.backtesting_service import BacktestingService
+from utils.backtesting_results import compact_backtesting_result, stream_json_with_fields
 
 router = APIRouter(tags=["Backtesting"], prefix="/backtesting")
 candles_factory = CandlesFactory()
-backtesting_engine = BacktestingEngineBase()
+
+
+def get_result_options(
+    output_format: Literal["full", "columnar"] = Query(
+        default="full", alias="format",
+        description="full: processed_data as {column: {index: value}}; columnar: {index: [...], columns: {column: [...]}}"),
+    columns: Optional[List[str]] = Query(default=None, description="Processed data columns to return"),
+    max_points: Optional[int] = Query(default=None, ge=2, description="Downsample processed data to this many rows"),
+    include_executors: Optional[bool] = Query(
+        default=None, description="Return every executor (default: only with the full format); "
+                                  "an executors summary is always returned"),
+) -> dict:
+    return {"output_format": output_format, "columns": columns, "max_points": max_points, "include_executors": include_executors}
+
+
+def _load_controller_config(config):
+    """Load a controller config given as a yml file name, so identical configs hash the same."""
+    if isinstance(config, str):
+        with open(os.path.join(settings.app.controllers_path, config)) as f:
+            return yaml.safe_load(f)
+    return config
+
+
+async def _result_response(backtesting_service: BacktestingService, job_id: str, options: dict):
+    job = backtesting_service.get_job(job_id)
+    result_path = backtesting_service.get_result_path(job_id)
+    if result_path is None:
+        raise HTTPException(status_code=404, detail=f"Result of backtest job {job_id} not found")
+    fields = {"job_id": job_id, "cached": job.cached}
+    if options["output_format"] == "full" and not options["columns"] and not options["max_points"] \
+            and options["include_executors"] is not False:
+        # The stored result is the full response body: stream it without parsing and re-serializing
+        return StreamingResponse(stream_json_with_fields(result_path, fields), media_type="application/json")
+
+    def load_compact_result():
+        return compact_backtesting_result(backtesting_service.get_result(job_id), **options)
+
+    return JSONResponse({**fields, **await asyncio.to_thread(load_compact_result)})
 
 
 @router.post("/run-backtesting")
-async def run_backtesting(backtesting_config: BacktestingConfig):
+async def run_backtesting(
+    backtesting_config: BacktestingConfig,
+    result_options: dict = Depends(get_result_options),
+    backtesting_service: BacktestingService = Depends(get_backtesting_service)
+):
     """
-    Run a backtesting simulation with the provided configuration.
-    
+    Run a backtesting simulation with the provided configuration and wait for its result.
+
+    The simulation runs as a backtest job in a worker process; use the /backtesting/jobs endpoints to
+    submit it without waiting. An identical earlier backtest is answered from the result cache, which the
+    response's `cached` field reports.
+
     Args:
         backtesting_config: Configuration for the backtesting including start/end time,
                           resolution, trade cost, and controller config
-                          
+        result_options: Output format, processed data columns, downsampling and executors detail
+
     Returns:
         Dictionary containing executors, processed data, and results from the backtest
-        
+
     Raises:
         Returns error dictionary if backtesting fails
     """
     try:
-        if isinstance(backtesting_config.config, str):
-            controller_config = backtesting_engine.get_controller_config_instance_from_yml(
-                config_path=backtesting_config.config,
-                controllers_conf_dir_path=settings.app.controllers_path,
-                controllers_module=settings.app.controllers_module
-            )
-        else:
-            controller_config = backtesting_engine.get_controller_config_instance_from_dict(
-                config_data=backtesting_config.config,
-                controllers_module=settings.app.controllers_module
-            )
-        backtesting_results = await backtesting_engine.run_backtesting(
-            controller_config=controller_config, trade_cost=backtesting_config.trade_cost,
-            start=int(backtesting_config.start_time), end=int(backtesting_config.end_time),
-            backtesting_resolution=backtesting_config.backtesting_resolution)
-        processed_data = backtesting_results["processed_data"]["features"].fillna(0)
-        executors_info = [e.to_dict() for e in backtesting_results["executors"]]
-        backtesting_results["processed_data"] = processed_data.to_dict()
-        results = backtesting_results["results"]
-        results["sharpe_ratio"] = results["sharpe_ratio"] if results["sharpe_ratio"] is not None else 0
-        return {
-            "executors": executors_info,
-            "processed_data": backtesting_results["processed_data"],
-            "results": backtesting_results["results"],
-        }
+        config = backtesting_config.model_dump()
+        config["config"] = _load_controller_config(config["config"])
+        job = backtesting_service.submit(config)
+        job = await backtesting_service.wait(job.job_id)
+        if job.status != "completed":
+            return {"error": job.error or f"Backtest {job.status}"}
+        return await _result_response(backtesting_service, job.job_id, result_options)
     except Exception as e:
         return {"error": str(e)}
+
+
+@router.post("/jobs", response_model=BacktestJobResponse)
+async def submit_backtesting_job(
+    backtesting_config: BacktestingConfig,
+    backtesting_service: BacktestingService = Depends(get_backtesting_service)
+):
+    """
+    Submit a backtest to run in the background.
+
+    Args:
+        backtesting_config: Configuration for the backtesting
+
+    Returns:
+        The queued job; poll /backtesting/jobs/{job_id} for its status
+    """
+    config = backtesting_config.model_dump()
+    try:
+        config["config"] = _load_controller_config(config["config"])
+    except OSError as e:
+        raise HTTPException(status_code=400, detail=f"Error loading controller config {config['config']}: {e}")
+    job = backtesting_service.submit(config)
+    return job.to_dict(include_config=False)
+
+
+@router.get("/jobs", response_model=List[BacktestJobResponse])
+async def list_backtesting_jobs(
+    status: Optional[str] = None,
+    backtesting_service: BacktestingService = Depends(get_backtesting_service)
+):
+    """
+    List backtest jobs, most recent first.
+
+    Args:
+        status: Only return jobs with this status (queued, running, completed, failed, cancelled)
+    """
+    return [job.to_dict(include_config=False) for job in backtesting_service.list_jobs(status)]
+
+
+@router.get("/jobs/metrics")
+async def get_backtesting_jobs_metrics(backtesting_service: BacktestingService = Depends(get_backtesting_service)):
+    """Get the number of jobs per status and the running worker processes."""
+    return backtesting_service.get_metrics()
+
+
+@router.get("/jobs/{job_id}", response_model=BacktestJobResponse)
+async def get_backtesting_job(job_id: str, backtesting_service: BacktestingService = Depends(get_backtesting_service)):
+    """
+    Get the status of a backtest job.
+
+    Raises:
+        HTTPException: 404 if the job does not exist
+    """
+    job = backtesting_service.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Backtest job {job_id} not found")
+    return job.to_dict(include_config=False)
+
+
+@router.get("/jobs/{job_id}/result")
+async def get_backtesting_job_result(
+    job_id: str,
+    result_options: dict = Depends(get_result_options),
+    backtesting_service: BacktestingService = Depends(get_backtesting_service)
+):
+    """
+    Get the result of a completed backtest job.
+
+    By default the full stored result is returned. The columnar format, a column selection and
+    downsampling shrink the processed data, and executors are summarized unless requested.
+
+    Returns:
+        Dictionary containing executors, processed data, and results from the backtest
+
+    Raises:
+        HTTPException: 404 if the job does not exist, 409 if it has not completed
+    """
+    job = backtesting_service.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Backtest job {job_id} not found")
+    if job.status != "completed":
+        raise HTTPException(status_code=409, detail=f"Backtest job {job_id} is {job.status}")
+    return await _result_response(backtesting_service, job_id, result_options)
+
+
+@router.post("/jobs/{job_id}/cancel", response_model=BacktestJobResponse)
+async def cancel_backtesting_job(job_id: str, backtesting_service: BacktestingService = Depends(get_backtesting_service)):
+    """
+    Cancel a queued or running backtest job. Finished jobs are returned unchanged.
+
+    Raises:
+        HTTPException: 404 if the job does not exist
+    """
+    job = backtesting_service.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Backtest job {job_id} not found")
+    return job.to_dict(include_config=False)
+
+
+def _sweep_response(backtesting_service: BacktestingService, sweep_id: str) -> dict:
+    sweep = backtesting_service.get_sweep(sweep_id)
+    if sweep is None:
+        raise HTTPException(status_code=404, detail=f"Backtest sweep {sweep_id} not found")
+    return {
+        "sweep_id": sweep.sweep_id,
+        "status": sweep.status,
+        "rank_by": sweep.rank_by,
+        "ascending": sweep.ascending,
+        "submitted_at": sweep.submitted_at,
+        "finished_at": sweep.finished_at,
+        "combinations": len(sweep.job_ids),
+        "table": backtesting_service.get_sweep_table(sweep_id),
+    }
+
+
+@router.post("/sweeps", response_model=BacktestSweepResponse)
+async def submit_backtesting_sweep(
+    sweep_request: BacktestingSweepRequest,
+    backtesting_service: BacktestingService = Depends(get_backtesting_service)
+):
+    """
+    Backtest every combination of controller parameter values.
+
+    Each combination runs as a backtest job. The first one loads the candles into the candles store and
+    the others, run in parallel, read them from there.
+
+    Args:
+        sweep_request: Backtesting configuration with the base controller config (dict or yml file name)
+                       and the parameter ranges to sweep
+
+    Returns:
+        The queued sweep; poll /backtesting/sweeps/{sweep_id} for the ranked results table
+
+    Raises:
+        HTTPException: 400 if the controller config cannot be loaded or the sweep is too large
+    """
+    try:
+        config = _load_controller_config(sweep_request.config)
+    except OSError as e:
+        raise HTTPException(status_code=400, detail=f"Error loading controller config {sweep_request.config}: {e}")
+
+    parameters = {
+        key: spec.model_dump() if hasattr(spec, "model_dump") else spec
+        for key, spec in sweep_request.parameters.items()
+    }
+    backtesting_config = sweep_request.model_dump(exclude={"parameters", "rank_by", "ascending"})
+    backtesting_config["config"] = config
+    try:
+        sweep = backtesting_service.submit_sweep(
+            backtesting_config, parameters, rank_by=sweep_request.rank_by, ascending=sweep_request.ascending,
+            max_combinations=settings.backtesting.max_sweep_combinations
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _sweep_response(backtesting_service, sweep.sweep_id)
+
+
+@router.get("/sweeps/{sweep_id}", response_model=BacktestSweepResponse)
+async def get_backtesting_sweep(sweep_id: str, backtesting_service: BacktestingService = Depends(get_backtesting_service)):
+    """
+    Get the status of a sweep and its combinations ranked by the sweep's metric.
+
+    Raises:
+        HTTPException: 404 if the sweep does not exist
+    """
+    return _sweep_response(backtesting_service, sweep_id)
+
+
+@router.post("/sweeps/{sweep_id}/cancel", response_model=BacktestSweepResponse)
+async def cancel_backtesting_sweep(sweep_id: str, backtesting_service: BacktestingService = Depends(get_backtesting_service)):
+    """
+    Cancel the queued and running backtests of a sweep.
+
+    Raises:
+        HTTPException: 404 if the sweep does not exist
+    """
+    backtesting_service.cancel_sweep(sweep_id)
+    return _sweep_response(backtesting_service, sweep_id)
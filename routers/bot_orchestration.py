@@ -1,10 +1,12 @@
 import asyncio
+import json
 import logging
 import os
 import time
 from typing import Optional
 
 from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Query
+from fastapi.responses import StreamingResponse
 
 # Create module-specific logger
 logger = logging.getLogger(__name__)
@@ -107,16 +109,49 @@ def get_active_bots_status(bots_manager: BotsOrchestrator = Depends(get_bots_orc
     return {"status": "success", "data": bots_manager.get_all_bots_status()}
 
 
+@router.get("/status/stream")
+async def stream_bots_status(
+    keepalive_interval: float = Query(default=15.0, gt=0, description="Seconds between keepalives when idle"),
+    bots_manager: BotsOrchestrator = Depends(get_bots_orchestrator),
+):
+    """
+    Stream bot status changes as Server-Sent Events instead of polling the status endpoints.
+    
+    The first `snapshot` event carries every active bot with its latest compact performance samples. Then
+    `bot_discovered`, `bot_lost`, `bot_stopping`, `performance` and `error_log` events push only what changed.
+    They come from MQTT messages and the orchestrator's active-bot tracking, so connected dashboards add no
+    Docker API calls. Idle streams receive a keepalive comment.
+    
+    Args:
+        keepalive_interval: Seconds without events before a keepalive is sent
+        bots_manager: Bot orchestrator service dependency
+        
+    Returns:
+        text/event-stream response; each event's data is {"timestamp": ..., "data": {...}}
+    """
+    async def events():
+        async for event in bots_manager.stream_status(keepalive_interval=keepalive_interval):
+            if event["type"] == "keepalive":
+                yield f": keepalive {json.dumps(event['data'])}\n\n"
+            else:
+                payload = json.dumps({"timestamp": event["timestamp"], "data": event["data"]}, default=str)
+                yield f"event: {event['type']}\ndata: {payload}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
 @router.get("/mqtt")
 def get_mqtt_status(bots_manager: BotsOrchestrator = Depends(get_bots_orchestrator)):
     """
-    Get MQTT connection status and discovered bots.
+    Get MQTT connection status, discovered bots and ingestion queue metrics.
     
     Args:
         bots_manager: Bot orchestrator service dependency
         
     Returns:
-        Dictionary with MQTT connection status, discovered bots, and broker information
+        Dictionary with MQTT connection status, discovered bots, broker information and, per channel,
+        ingestion queue depth, dropped messages and processing latency, and duplicate log lines dropped
     """
     mqtt_connected = bots_manager.mqtt_manager.is_connected
     discovered_bots = bots_manager.mqtt_manager.get_discovered_bots(
@@ -136,11 +171,39 @@ def get_mqtt_status(bots_manager: BotsOrchestrator = Depends(get_bots_orchestrat
             "broker_host": bots_manager.broker_host,
             "broker_port": bots_manager.broker_port,
             "broker_username": bots_manager.broker_username,
-            "client_state": client_state
+            "client_state": client_state,
+            "ingestion": bots_manager.mqtt_manager.get_ingestion_metrics(),
+            "log_dedup": bots_manager.mqtt_manager.get_log_dedup_metrics(),
+            "status_stream": bots_manager.events.get_metrics()
         }
     }
 
 
+@router.get("/performance")
+def get_bots_performance_history(
+    since: Optional[float] = Query(default=None, description="Only return samples newer than this timestamp"),
+    bots_manager: BotsOrchestrator = Depends(get_bots_orchestrator),
+):
+    """
+    Get compact performance samples (pnl, volume, positions) of every bot, for incremental dashboard updates.
+    
+    Args:
+        since: Timestamp of the previous pull; use the returned server_time as the next value
+        bots_manager: Bot orchestrator service dependency
+        
+    Returns:
+        Samples per bot and controller newer than `since`; bots without new samples are omitted
+    """
+    server_time = time.time()
+    mqtt_manager = bots_manager.mqtt_manager
+    bots = {}
+    for bot_name in mqtt_manager.performance_history.bots():
+        history = mqtt_manager.get_bot_performance_history(bot_name, since)
+        if history:
+            bots[bot_name] = history
+    return {"status": "success", "data": {"server_time": server_time, "bots": bots}}
+
+
 @router.get("/instances")
 def get_instances_summary(
     bots_manager: BotsOrchestrator = Depends(get_bots_orchestrator),
@@ -315,6 +378,36 @@ def get_bot_status(bot_name: str, bots_manager: BotsOrchestrator = Depends(get_b
     }
 
 
+@router.get("/{bot_name}/performance")
+def get_bot_performance_history(
+    bot_name: str,
+    since: Optional[float] = Query(default=None, description="Only return samples newer than this timestamp"),
+    latest: bool = Query(default=False, description="Only return the latest sample of each controller"),
+    bots_manager: BotsOrchestrator = Depends(get_bots_orchestrator),
+):
+    """
+    Get compact performance samples (pnl, volume, positions) of a bot's controllers.
+    
+    Samples are kept at a bounded resolution in a ring buffer fed by the bot's MQTT performance reports.
+    
+    Args:
+        bot_name: Name of the bot
+        since: Only return samples newer than this timestamp (all retained samples when omitted)
+        latest: Return only the latest sample of each controller
+        bots_manager: Bot orchestrator service dependency
+        
+    Returns:
+        Samples per controller and the server time to pass as the next `since`
+    """
+    mqtt_manager = bots_manager.mqtt_manager
+    server_time = time.time()
+    if latest:
+        performance = mqtt_manager.get_bot_performance_latest(bot_name)
+    else:
+        performance = mqtt_manager.get_bot_performance_history(bot_name, since)
+    return {"status": "success", "data": {"server_time": server_time, "bot_name": bot_name, "performance": performance}}
+
+
 @router.get("/{bot_name}/history")
 async def get_bot_history(
     bot_name: str, 
@@ -57,6 +57,22 @@ async def active_containers(name_filter: str = None, docker_service: DockerServi
     return docker_service.get_active_containers(name_filter)
 
 
+@router.get("/container-inventory")
+async def container_inventory_metrics(docker_service: DockerService = Depends(get_docker_service)):
+    """
+    Get the state of the event-driven container inventory behind the container listings.
+    
+    Args:
+        docker_service: Docker service dependency
+        
+    Returns:
+        Container count, Docker events processed, resyncs and whether the events stream is connected
+    """
+    if docker_service.inventory is None:
+        return {"enabled": False}
+    return {"enabled": True, **docker_service.inventory.get_metrics()}
+
+
 @router.get("/exited-containers")
 async def exited_containers(name_filter: str = None, docker_service: DockerService = Depends(get_docker_service)):
     """
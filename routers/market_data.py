@@ -1,17 +1,20 @@
 import asyncio
+import json
 import time
 
-from fastapi import APIRouter, Request, HTTPException, Depends
+from fastapi import APIRouter, Request, HTTPException, Depends, Query
+from fastapi.responses import StreamingResponse
 from hummingbot.data_feed.candles_feed.data_types import HistoricalCandlesConfig, CandlesConfig
 from hummingbot.data_feed.candles_feed.candles_factory import CandlesFactory
 
 from models.market_data import CandlesConfigRequest
 from services.market_data_feed_manager import MarketDataFeedManager
 from models import (
-    PriceRequest, PricesResponse, FundingInfoRequest, FundingInfoResponse,
+    PriceRequest, PricesResponse, BatchPriceRequest, BatchPricesResponse, FundingInfoRequest, FundingInfoResponse,
     OrderBookRequest, OrderBookResponse, OrderBookLevel,
     VolumeForPriceRequest, PriceForVolumeRequest, QuoteVolumeForPriceRequest,
-    PriceForQuoteVolumeRequest, VWAPForVolumeRequest, OrderBookQueryResult
+    PriceForQuoteVolumeRequest, VWAPForVolumeRequest, OrderBookQueryResult,
+    OrderBookBatchQueryRequest, OrderBookBatchQueryResponse
 )
 from deps import get_market_data_feed_manager
 
@@ -63,6 +66,45 @@ async def get_candles(request: Request, candles_config: CandlesConfigRequest):
         return {"error": str(e)}
 
 
+@router.get("/candles/stream")
+async def stream_candles(
+    connector_name: str,
+    trading_pair: str,
+    interval: str = "1m",
+    max_records: int = Query(default=500, ge=1, le=10000),
+    market_data_manager: MarketDataFeedManager = Depends(get_market_data_feed_manager)
+):
+    """
+    Stream real-time candles as Server-Sent Events.
+
+    The first `snapshot` event carries the current window of up to `max_records` candles. Following `update`
+    events carry only candles that were added, plus the latest candle whenever it changes while still open.
+    The underlying feed is kept alive while the stream is connected.
+
+    Args:
+        connector_name: Name of the connector
+        trading_pair: Trading pair
+        interval: Candle interval
+        max_records: Number of candles in the initial window
+        market_data_manager: Injected market data feed manager
+
+    Returns:
+        text/event-stream response
+    """
+    candles_cfg = CandlesConfig(connector=connector_name, trading_pair=trading_pair,
+                                interval=interval, max_records=max_records)
+
+    async def events():
+        try:
+            async for message in market_data_manager.stream_candles(candles_cfg):
+                yield f"event: {message['type']}\ndata: {json.dumps(message['candles'])}\n\n"
+        except Exception as e:
+            yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
 @router.post("/historical-candles")
 async def get_historical_candles(request: Request, config: HistoricalCandlesConfig):
     """
@@ -77,18 +119,8 @@ async def get_historical_candles(request: Request, config: HistoricalCandlesConf
     try:
         market_data_feed_manager: MarketDataFeedManager = request.app.state.market_data_feed_manager
         
-        # Create candles config from historical config
-        candles_config = CandlesConfig(
-            connector=config.connector_name,
-            trading_pair=config.trading_pair,
-            interval=config.interval
-        )
-        
-        # Get or create the candles feed (this will track access time)
-        candles = market_data_feed_manager.get_candles_feed(candles_config)
-        
-        # Fetch historical candles
-        historical_data = await candles.get_historical_candles(config=config)
+        # Fetch historical candles (served from the local candles store where already fetched)
+        historical_data = await market_data_feed_manager.get_historical_candles(config)
         
         if historical_data is not None and not historical_data.empty:
             # Convert to dict for JSON serialization
@@ -100,6 +132,23 @@ async def get_historical_candles(request: Request, config: HistoricalCandlesConf
         return {"error": str(e)}
 
 
+@router.get("/candles-store")
+async def get_candles_store_metrics(request: Request):
+    """
+    Get metrics of the local historical candles store.
+
+    Args:
+        request: FastAPI request object to access application state
+
+    Returns:
+        Dictionary with requests served without fetching, gap fetches and rows fetched and served
+    """
+    market_data_feed_manager: MarketDataFeedManager = request.app.state.market_data_feed_manager
+    if market_data_feed_manager.candles_store is None:
+        return {"enabled": False}
+    return {"enabled": True, **market_data_feed_manager.candles_store.get_metrics()}
+
+
 @router.get("/active-feeds")
 async def get_active_feeds(request: Request):
     """
@@ -118,6 +167,24 @@ async def get_active_feeds(request: Request):
         return {"error": str(e)}
 
 
+@router.get("/order-book-cache")
+async def get_order_book_cache_metrics(request: Request):
+    """
+    Get metrics of the order book cache used by the order book endpoints.
+
+    Args:
+        request: FastAPI request object to access application state
+
+    Returns:
+        Dictionary with live book hits, REST snapshot hits and fetches, and the cached order books
+    """
+    try:
+        market_data_feed_manager: MarketDataFeedManager = request.app.state.market_data_feed_manager
+        return market_data_feed_manager.get_order_book_cache_metrics()
+    except Exception as e:
+        return {"error": str(e)}
+
+
 @router.get("/settings")
 async def get_market_data_settings():
     """
@@ -130,7 +197,13 @@ async def get_market_data_settings():
     return {
         "cleanup_interval": settings.market_data.cleanup_interval,
         "feed_timeout": settings.market_data.feed_timeout,
-        "description": "cleanup_interval: seconds between cleanup runs, feed_timeout: seconds before unused feeds expire"
+        "order_book_max_staleness": settings.market_data.order_book_max_staleness,
+        "price_cache_ttl": settings.market_data.price_cache_ttl,
+        "candles_stream_interval": settings.market_data.candles_stream_interval,
+        "description": "cleanup_interval: seconds between cleanup runs, feed_timeout: seconds before unused feeds expire, "
+                       "order_book_max_staleness: seconds an order book is served to queries before refetching, "
+                       "price_cache_ttl: seconds prices are served from cache, "
+                       "candles_stream_interval: seconds between candle stream updates"
     }
 
 
@@ -185,6 +258,51 @@ async def get_prices(
         raise HTTPException(status_code=500, detail=f"Error fetching prices: {str(e)}")
 
 
+@router.post("/prices/batch", response_model=BatchPricesResponse)
+async def get_prices_batch(
+    request: BatchPriceRequest,
+    market_data_manager: MarketDataFeedManager = Depends(get_market_data_feed_manager)
+):
+    """
+    Get current prices from several connectors in one request.
+
+    Connectors are queried in parallel with one exchange request each; prices fetched within the price cache
+    TTL and requests already in flight are reused. A failing connector is reported in `errors` without
+    failing the others.
+
+    Args:
+        request: Price requests, one per connector (trading pairs of repeated connectors are merged)
+        market_data_manager: Injected market data feed manager
+
+    Returns:
+        Prices per connector and the errors of the connectors that failed
+    """
+    requests = {}
+    for price_request in request.requests:
+        requests.setdefault(price_request.connector_name, []).extend(price_request.trading_pairs)
+
+    prices, errors = await market_data_manager.get_prices_batch(requests)
+    return BatchPricesResponse(prices=prices, errors=errors, timestamp=time.time())
+
+
+@router.get("/price-cache")
+async def get_price_cache_metrics(request: Request):
+    """
+    Get metrics of the price cache used by the price endpoints.
+
+    Args:
+        request: FastAPI request object to access application state
+
+    Returns:
+        Dictionary with cache hits, coalesced requests, exchange requests and errors
+    """
+    try:
+        market_data_feed_manager: MarketDataFeedManager = request.app.state.market_data_feed_manager
+        return market_data_feed_manager.get_price_cache_metrics()
+    except Exception as e:
+        return {"error": str(e)}
+
+
 @router.post("/funding-info", response_model=FundingInfoResponse)
 async def get_funding_info(
     request: FundingInfoRequest,
@@ -435,3 +553,30 @@ async def get_vwap_for_volume(
         raise HTTPException(status_code=500, detail=f"Error in order book query: {str(e)}")
 
 
+@router.post("/order-book/batch-query", response_model=OrderBookBatchQueryResponse)
+async def get_order_book_batch_query(
+    request: OrderBookBatchQueryRequest,
+    market_data_manager: MarketDataFeedManager = Depends(get_market_data_feed_manager)
+):
+    """
+    Evaluate many depth queries (price-for-volume, volume-for-price, price-for-quote-volume,
+    quote-volume-for-price, vwap-for-volume) against one order book snapshot per trading pair.
+
+    A list of increasing volumes on one side returns a full price impact curve in a single call.
+    
+    Args:
+        request: Request with connector, trading pairs and the queries to evaluate
+        market_data_manager: Injected market data feed manager
+        
+    Returns:
+        Results of every query per trading pair, with best bid/ask and mid price of the snapshot used
+    """
+    try:
+        result = await market_data_manager.get_order_book_batch_query_result(
+            request.connector_name,
+            request.trading_pairs,
+            [query.model_dump() for query in request.queries]
+        )
+        return OrderBookBatchQueryResponse(**result)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error in batch order book query: {str(e)}")
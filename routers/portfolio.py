@@ -10,7 +10,8 @@ from models.trading import (
     AccountsDistributionFilterRequest
 )
 from services.accounts_service import AccountsService
-from deps import get_accounts_service
+from services.account_state_compactor import AccountStateCompactionService
+from deps import get_accounts_service, get_account_state_compactor
 from models import PaginatedResponse
 
 router = APIRouter(tags=["Portfolio"], prefix="/portfolio")
@@ -74,6 +75,43 @@ async def get_portfolio_state(
     return all_states
 
 
+@router.get("/snapshot-metrics")
+async def get_snapshot_metrics(accounts_service: AccountsService = Depends(get_accounts_service)):
+    """
+    Get write metrics of the most recent portfolio snapshot saved to the database.
+
+    Returns:
+        Dictionary with the snapshot timestamp, rows written, duration and rows/sec,
+        or an empty dictionary if no snapshot has been saved yet
+    """
+    return accounts_service.last_snapshot_metrics or {}
+
+
+@router.get("/refresh-metrics")
+async def get_refresh_metrics(accounts_service: AccountsService = Depends(get_accounts_service)):
+    """
+    Get timing metrics of the connector state refreshes feeding the portfolio.
+
+    Returns:
+        Dictionary with a summary of the last refresh cycle and, per account/connector,
+        the queue wait, total duration, per-stage durations and whether the refresh timed out
+    """
+    return accounts_service.connector_manager.get_refresh_metrics()
+
+
+@router.get("/compaction-metrics")
+async def get_compaction_metrics(
+    compactor: AccountStateCompactionService = Depends(get_account_state_compactor)
+):
+    """
+    Get progress metrics of the account state retention and compaction job.
+
+    Returns:
+        Dictionary with the current stage, run timings and rows deleted (last run and total)
+    """
+    return compactor.get_metrics()
+
+
 @router.post("/history", response_model=PaginatedResponse)
 async def get_portfolio_history(
     filter_request: PortfolioHistoryFilterRequest,
@@ -91,7 +129,8 @@ async def get_portfolio_history(
     - 12h: One data point every 12 hours
     - 1d: One data point every day
 
-    Using larger intervals significantly reduces response size and improves performance.
+    Each data point holds the latest snapshot of every account/connector within its interval bucket.
+    History is served from pre-aggregated 5m/1h/1d buckets, so larger intervals read proportionally less data.
 
     Args:
         filter_request: JSON payload with filtering criteria (account_names, connector_names,
@@ -691,6 +691,18 @@ async def get_funding_payments(
         raise HTTPException(status_code=500, detail=f"Error fetching funding payments: {str(e)}")
 
 
+@router.get("/recorder-metrics")
+async def get_recorder_metrics(accounts_service: AccountsService = Depends(get_accounts_service)):
+    """
+    Get write-behind queue metrics of the order and funding recorders.
+
+    Returns:
+        Dictionary keyed by "account:connector" with, per recorder, the queue depth,
+        the age of the oldest buffered event and the flush size, duration and lag
+    """
+    return accounts_service.connector_manager.get_recorder_metrics()
+
+
 def _standardize_in_flight_order_response(order, account_name: str, connector_name: str) -> dict:
     """
     Convert a Hummingbot InFlightOrder to standardized format matching the orders search response.
@@ -0,0 +1,221 @@
+"""Account State Compaction Service.
+
+account_states/token_states receive one snapshot per connector every account update interval.
+This service keeps that history bounded:
+
+1. Snapshots newer than `full_resolution_days` are kept untouched
+2. Snapshots older than that are thinned to the latest one per account/connector per hour
+3. Snapshots older than `hourly_resolution_days` are thinned to the latest one per day
+4. Snapshots older than `retention_days` (if set) are deleted
+
+Deletes run in small batches, each in its own transaction, so the job never holds long locks.
+The pre-aggregated portfolio history buckets are pruned with the same policy.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from database import AccountRepository, AsyncDatabaseManager, PortfolioHistoryRepository
+
+logger = logging.getLogger(__name__)
+
+
+class AccountStateCompactionService:
+    """Service that downsamples and prunes stored account state snapshots."""
+
+    HOUR = 3600
+    DAY = 86400
+
+    def __init__(
+        self,
+        db_manager: AsyncDatabaseManager,
+        full_resolution_days: int = 7,
+        hourly_resolution_days: int = 90,
+        retention_days: int = 0,
+        batch_size: int = 1000,
+        run_interval: float = 3600.0,
+    ):
+        self.db_manager = db_manager
+        self.full_resolution_days = full_resolution_days
+        self.hourly_resolution_days = max(hourly_resolution_days, full_resolution_days)
+        self.retention_days = retention_days
+        self.batch_size = batch_size
+        self.run_interval = run_interval
+        self._compaction_task: Optional[asyncio.Task] = None
+        self._running = False
+
+        # Everything before these points is already compacted to the tier's resolution
+        self._compacted_until: Dict[int, Optional[datetime]] = {self.HOUR: None, self.DAY: None}
+
+        self.metrics: Dict = {
+            "running": False,
+            "current_stage": None,
+            "current_window_start": None,
+            "runs": 0,
+            "last_run_started": None,
+            "last_run_finished": None,
+            "last_run_duration_seconds": None,
+            "last_run_account_states_deleted": 0,
+            "last_run_token_states_deleted": 0,
+            "last_run_history_buckets_deleted": 0,
+            "total_account_states_deleted": 0,
+            "total_token_states_deleted": 0,
+            "total_history_buckets_deleted": 0,
+            "batches": 0,
+            "last_error": None,
+        }
+
+    def start(self):
+        """Start the compaction service."""
+        if self._running:
+            return
+        self._running = True
+        self._compaction_task = asyncio.create_task(self._compaction_loop())
+        logger.info("AccountStateCompactionService started")
+
+    def stop(self):
+        """Stop the compaction service."""
+        self._running = False
+        if self._compaction_task:
+            self._compaction_task.cancel()
+            self._compaction_task = None
+        logger.info("AccountStateCompactionService stopped")
+
+    def get_metrics(self) -> Dict:
+        """Get progress metrics of the compaction job."""
+        return dict(self.metrics)
+
+    async def _compaction_loop(self):
+        """Main loop that runs compaction periodically."""
+        while self._running:
+            try:
+                await self.run_compaction()
+            except Exception as e:
+                self.metrics["last_error"] = str(e)
+                logger.error(f"Error compacting account states: {e}", exc_info=True)
+
+            await asyncio.sleep(self.run_interval)
+
+    @staticmethod
+    def _floor(value: datetime, seconds: int) -> datetime:
+        epoch = int(value.timestamp())
+        return datetime.fromtimestamp(epoch - epoch % seconds, tz=timezone.utc)
+
+    async def run_compaction(self, now: Optional[datetime] = None):
+        """Run one full compaction pass.
+
+        Args:
+            now: Reference time for the retention windows (defaults to the current time)
+        """
+        now = now or datetime.now(timezone.utc)
+        started = time.perf_counter()
+        self.metrics.update({
+            "running": True,
+            "last_run_started": now.isoformat(),
+            "last_run_account_states_deleted": 0,
+            "last_run_token_states_deleted": 0,
+            "last_run_history_buckets_deleted": 0,
+            "last_error": None,
+        })
+
+        try:
+            hourly_until = self._floor(now - timedelta(days=self.full_resolution_days), self.HOUR)
+            daily_until = self._floor(now - timedelta(days=self.hourly_resolution_days), self.DAY)
+
+            if self.retention_days > 0:
+                expire_before = self._floor(now - timedelta(days=self.retention_days), self.DAY)
+                await self._expire(expire_before)
+
+            await self._compact_tier(self.DAY, daily_until)
+            await self._compact_tier(self.HOUR, hourly_until)
+
+            await self._prune_history_buckets("5m", hourly_until)
+            await self._prune_history_buckets("1h", daily_until)
+            if self.retention_days > 0:
+                await self._prune_history_buckets(None, expire_before)
+        finally:
+            duration = time.perf_counter() - started
+            self.metrics.update({
+                "running": False,
+                "current_stage": None,
+                "current_window_start": None,
+                "runs": self.metrics["runs"] + 1,
+                "last_run_finished": datetime.now(timezone.utc).isoformat(),
+                "last_run_duration_seconds": round(duration, 3),
+            })
+
+        logger.info(
+            f"Account state compaction finished in {duration:.1f}s: "
+            f"{self.metrics['last_run_account_states_deleted']} account states, "
+            f"{self.metrics['last_run_token_states_deleted']} token states, "
+            f"{self.metrics['last_run_history_buckets_deleted']} history buckets deleted"
+        )
+
+    async def _compact_tier(self, bucket_seconds: int, until: datetime):
+        """Thin snapshots older than `until` to one per account/connector per bucket, one day at a time."""
+        stage = "daily" if bucket_seconds == self.DAY else "hourly"
+        self.metrics["current_stage"] = stage
+
+        window_start = self._compacted_until[bucket_seconds]
+        if window_start is None:
+            async with self.db_manager.get_session_context() as session:
+                oldest = await AccountRepository(session).get_oldest_account_state_timestamp()
+            if oldest is None:
+                return
+            if oldest.tzinfo is None:
+                oldest = oldest.replace(tzinfo=timezone.utc)
+            window_start = self._floor(oldest, self.DAY)
+
+        while window_start < until:
+            window_end = min(window_start + timedelta(days=1), until)
+            self.metrics["current_window_start"] = window_start.isoformat()
+            while True:
+                async with self.db_manager.get_session_context() as session:
+                    repository = AccountRepository(session)
+                    ids = await repository.get_compactable_account_state_ids(
+                        window_start, window_end, bucket_seconds, self.batch_size
+                    )
+                    deleted = await repository.delete_account_states(ids)
+                self._record_deleted(*deleted)
+                if len(ids) < self.batch_size:
+                    break
+                await asyncio.sleep(0)
+            window_start = window_end
+            self._compacted_until[bucket_seconds] = window_start
+            await asyncio.sleep(0)
+
+    async def _expire(self, before: datetime):
+        """Delete every snapshot older than `before`."""
+        self.metrics["current_stage"] = "expire"
+        while True:
+            async with self.db_manager.get_session_context() as session:
+                repository = AccountRepository(session)
+                ids = await repository.get_expired_account_state_ids(before, self.batch_size)
+                deleted = await repository.delete_account_states(ids)
+            self._record_deleted(*deleted)
+            if len(ids) < self.batch_size:
+                break
+            await asyncio.sleep(0)
+
+    async def _prune_history_buckets(self, resolution: Optional[str], before: datetime):
+        """Delete portfolio history buckets of a resolution (or all) older than `before`."""
+        self.metrics["current_stage"] = f"history_buckets_{resolution or 'all'}"
+        while True:
+            async with self.db_manager.get_session_context() as session:
+                deleted = await PortfolioHistoryRepository(session).delete_buckets_before(
+                    before, self.batch_size, resolution=resolution
+                )
+            self.metrics["last_run_history_buckets_deleted"] += deleted
+            self.metrics["total_history_buckets_deleted"] += deleted
+            if deleted < self.batch_size:
+                break
+            await asyncio.sleep(0)
+
+    def _record_deleted(self, account_states: int, token_states: int):
+        self.metrics["batches"] += 1
+        self.metrics["last_run_account_states_deleted"] += account_states
+        self.metrics["last_run_token_states_deleted"] += token_states
+        self.metrics["total_account_states_deleted"] += account_states
+        self.metrics["total_token_states_deleted"] += token_states
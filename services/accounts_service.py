@@ -1,5 +1,6 @@
 import asyncio
 import logging
+import time
 from datetime import datetime, timezone
 from decimal import Decimal
 from typing import Dict, List, Optional
@@ -10,12 +11,16 @@ from hummingbot.core.data_type.common import OrderType, TradeType, PositionActio
 from hummingbot.strategy_v2.executors.data_types import ConnectorPair
 
 from config import settings
-from database import AsyncDatabaseManager, AccountRepository, OrderRepository, TradeRepository, FundingRepository
+from database import (
+    AsyncDatabaseManager, AccountRepository, PortfolioHistoryRepository, OrderRepository, TradeRepository,
+    FundingRepository
+)
 from services.market_data_feed_manager import MarketDataFeedManager
 from services.gateway_client import GatewayClient
 from services.gateway_transaction_poller import GatewayTransactionPoller
 from utils.connector_manager import ConnectorManager
 from utils.file_system import fs_util
+from utils.portfolio_aggregator import PortfolioAggregator
 
 # Create module-specific logger
 logger = logging.getLogger(__name__)
@@ -58,19 +63,28 @@ class AccountsService:
         """
         self.secrets_manager = ETHKeyFileSecretManger(settings.secrets.config_password)
         self.accounts_state = {}
+        self.portfolio_aggregator = PortfolioAggregator()
         self.update_account_state_interval = account_update_interval * 60
         self.order_status_poll_interval = 60  # Poll order status every 1 minute
         self.default_quote = default_quote
         self.market_data_feed_manager = market_data_feed_manager
         self._update_account_state_task: Optional[asyncio.Task] = None
         self._order_status_polling_task: Optional[asyncio.Task] = None
+        self._history_backfill_task: Optional[asyncio.Task] = None
+        self.last_snapshot_metrics: Optional[Dict] = None
 
         # Database setup for account states and orders
         self.db_manager = AsyncDatabaseManager(settings.database.url)
         self._db_initialized = False
 
         # Initialize connector manager with db_manager
-        self.connector_manager = ConnectorManager(self.secrets_manager, self.db_manager)
+        self.connector_manager = ConnectorManager(
+            self.secrets_manager,
+            self.db_manager,
+            refresh_concurrency_per_exchange=settings.connector_refresh.concurrency_per_exchange,
+            refresh_timeout=settings.connector_refresh.timeout,
+            trading_rules_ttl=settings.connector_refresh.trading_rules_ttl
+        )
 
         # Initialize Gateway client
         self.gateway_client = GatewayClient(gateway_url)
@@ -90,10 +104,44 @@ class AccountsService:
         if not self._db_initialized:
             await self.db_manager.create_tables()
             self._db_initialized = True
+            await self._ensure_latest_account_states()
+
+    async def _ensure_latest_account_states(self):
+        """Populate latest_account_states from account_states for databases created before the table existed."""
+        try:
+            async with self.db_manager.get_session_context() as session:
+                repository = AccountRepository(session)
+                if not await repository.has_latest_account_states():
+                    rows = await repository.rebuild_latest_account_states()
+                    if rows:
+                        logger.info(f"Rebuilt latest account states table with {rows} rows")
+        except Exception as e:
+            logger.error(f"Error rebuilding latest account states: {e}")
     
     def get_accounts_state(self):
         return self.accounts_state
 
+    def _ensure_account_state(self, account_name: str):
+        """Track an account in the in-memory state even before it has connector balances."""
+        self.accounts_state.setdefault(account_name, {})
+        self.portfolio_aggregator.ensure_account(account_name)
+
+    def _set_connector_state(self, account_name: str, connector_name: str, tokens_info: List[Dict]):
+        """Replace the balances of one account/connector and apply the change to the portfolio totals."""
+        self.accounts_state.setdefault(account_name, {})[connector_name] = tokens_info
+        self.portfolio_aggregator.set_connector(account_name, connector_name, tokens_info)
+
+    def _remove_connector_state(self, account_name: str, connector_name: str):
+        """Remove one account/connector from the in-memory state and the portfolio totals."""
+        if account_name in self.accounts_state:
+            self.accounts_state[account_name].pop(connector_name, None)
+        self.portfolio_aggregator.remove_connector(account_name, connector_name)
+
+    def _remove_account_state(self, account_name: str):
+        """Remove an account from the in-memory state and the portfolio totals."""
+        self.accounts_state.pop(account_name, None)
+        self.portfolio_aggregator.remove_account(account_name)
+
     def get_default_market(self, token: str, connector_name: str) -> str:
         if token.startswith("LD") and token != "LDO":
             # These tokens are staked in binance earn
@@ -114,6 +162,9 @@ class AccountsService:
         self._order_status_polling_task = asyncio.create_task(self.order_status_polling_loop())
         logger.info("Order status polling started (1 minute interval)")
 
+        # Roll pre-existing account states into the bucketed history store (no-op once completed)
+        self._history_backfill_task = asyncio.create_task(self._backfill_portfolio_history())
+
         # Start Gateway transaction poller
         if not self._gateway_poller_started:
             asyncio.create_task(self._start_gateway_poller())
@@ -128,6 +179,37 @@ class AccountsService:
         except Exception as e:
             logger.error(f"Error starting Gateway transaction poller: {e}", exc_info=True)
 
+    async def _backfill_portfolio_history(self, batch_size: int = 500):
+        """
+        Roll raw account states into the bucketed portfolio history.
+
+        Progress is persisted with each batch, so an interrupted backfill resumes where it stopped on the next
+        start. Snapshots written meanwhile are already in the buckets and are not overwritten by older ones.
+        """
+        await self.ensure_db_initialized()
+        try:
+            async with self.db_manager.get_session_context() as session:
+                last_id, completed = await PortfolioHistoryRepository(session).get_backfill_progress()
+            if completed:
+                return
+
+            processed_batches = 0
+            while True:
+                async with self.db_manager.get_session_context() as session:
+                    repo = PortfolioHistoryRepository(session)
+                    next_id = await repo.backfill_from_account_states(last_id, batch_size)
+                    await repo.save_backfill_progress(next_id or last_id, completed=next_id is None)
+                if next_id is None:
+                    break
+                last_id = next_id
+                processed_batches += 1
+                # Yield to the event loop between batches
+                await asyncio.sleep(0)
+            if processed_batches:
+                logger.info(f"Backfilled portfolio history buckets up to account state id {last_id}")
+        except Exception as e:
+            logger.error(f"Error backfilling portfolio history: {e}", exc_info=True)
+
     async def stop(self):
         """
         Stop all accounts service tasks and cleanup resources.
@@ -147,6 +229,10 @@ class AccountsService:
             self._order_status_polling_task = None
             logger.info("Stopped order status polling loop")
 
+        if self._history_backfill_task:
+            self._history_backfill_task.cancel()
+            self._history_backfill_task = None
+
         # Stop Gateway transaction poller
         if self._gateway_poller_started:
             try:
@@ -197,7 +283,8 @@ class AccountsService:
     async def dump_account_state(self):
         """
         Save the current account state to the database.
-        All account/connector combinations from the same snapshot will use the same timestamp.
+        All account/connector combinations from the same snapshot are written in a single transaction
+        with the same timestamp. Duration and throughput of the write are kept in last_snapshot_metrics.
         :return:
         """
         await self.ensure_db_initialized()
@@ -205,15 +292,26 @@ class AccountsService:
         try:
             # Generate a single timestamp for this entire snapshot
             snapshot_timestamp = datetime.now(timezone.utc)
-            
+            start = time.perf_counter()
+
             async with self.db_manager.get_session_context() as session:
                 repository = AccountRepository(session)
-                
-                # Save each account-connector combination with the same timestamp
-                for account_name, connectors in self.accounts_state.items():
-                    for connector_name, tokens_info in connectors.items():
-                        if tokens_info:  # Only save if there's token data
-                            await repository.save_account_state(account_name, connector_name, tokens_info, snapshot_timestamp)
+                rows = await repository.save_account_snapshot(self.accounts_state, snapshot_timestamp)
+                await PortfolioHistoryRepository(session).record_snapshot(self.accounts_state, snapshot_timestamp)
+
+            duration = time.perf_counter() - start
+            total_rows = rows["account_states"] + rows["token_states"]
+            self.last_snapshot_metrics = {
+                "timestamp": snapshot_timestamp.isoformat(),
+                "account_states": rows["account_states"],
+                "token_states": rows["token_states"],
+                "duration_seconds": round(duration, 6),
+                "rows_per_second": round(total_rows / duration, 2) if duration > 0 else 0,
+            }
+            logger.info(
+                f"Saved account snapshot: {rows['account_states']} account states, {rows['token_states']} token states "
+                f"in {duration:.3f}s ({self.last_snapshot_metrics['rows_per_second']} rows/s)"
+            )
                             
         except Exception as e:
             logger.error(f"Error saving account state to database: {e}")
@@ -227,7 +325,7 @@ class AccountsService:
                                         end_time: Optional[datetime] = None,
                                         interval: str = "5m"):
         """
-        Load the account state history from the database with pagination and interval sampling.
+        Load the account state history from the time-bucketed history store with pagination.
 
         Args:
             limit: Maximum number of records to return
@@ -242,8 +340,8 @@ class AccountsService:
 
         try:
             async with self.db_manager.get_session_context() as session:
-                repository = AccountRepository(session)
-                return await repository.get_account_state_history(
+                repository = PortfolioHistoryRepository(session)
+                return await repository.get_history(
                     limit=limit,
                     cursor=cursor,
                     start_time=start_time,
@@ -357,8 +455,7 @@ class AccountsService:
             if account_names and account_name not in account_names:
                 continue
 
-            if account_name not in self.accounts_state:
-                self.accounts_state[account_name] = {}
+            self._ensure_account_state(account_name)
             for connector_name, connector in connectors.items():
                 if skip_gateway_connectors and ("/" in connector_name or connector_name.startswith("gateway_")):
                     continue
@@ -386,9 +483,9 @@ class AccountsService:
         for (account_name, connector_name), result in zip(task_meta, results):
             if isinstance(result, Exception):
                 logger.error(f"Error updating balances for connector {connector_name} in account {account_name}: {result}")
-                self.accounts_state[account_name][connector_name] = []
+                self._set_connector_state(account_name, connector_name, [])
             else:
-                self.accounts_state[account_name][connector_name] = result
+                self._set_connector_state(account_name, connector_name, result)
 
     async def _get_connector_tokens_info(self, connector, connector_name: str) -> List[Dict]:
         """Get token info from a connector instance using cached prices when available."""
@@ -543,8 +640,7 @@ class AccountsService:
         await self.connector_manager.stop_connector(account_name, connector_name)
 
         # Remove from account state
-        if account_name in self.accounts_state and connector_name in self.accounts_state[account_name]:
-            self.accounts_state[account_name].pop(connector_name)
+        self._remove_connector_state(account_name, connector_name)
 
         # Clear the connector from cache
         self.connector_manager.clear_cache(account_name, connector_name)
@@ -566,7 +662,7 @@ class AccountsService:
             fs_util.copy_file(f"credentials/master_account/{file}", f"credentials/{account_name}/{file}")
         
         # Initialize account state
-        self.accounts_state[account_name] = {}
+        self._ensure_account_state(account_name)
 
     async def delete_account(self, account_name: str):
         """
@@ -582,8 +678,7 @@ class AccountsService:
         fs_util.delete_folder('credentials', account_name)
         
         # Remove from account state
-        if account_name in self.accounts_state:
-            self.accounts_state.pop(account_name)
+        self._remove_account_state(account_name)
         
         # Clear all connectors for this account from cache
         self.connector_manager.clear_cache(account_name)
@@ -625,8 +720,8 @@ class AccountsService:
 
         try:
             async with self.db_manager.get_session_context() as session:
-                repository = AccountRepository(session)
-                return await repository.get_account_state_history(
+                repository = PortfolioHistoryRepository(session)
+                return await repository.get_history(
                     account_name=account_name,
                     limit=limit,
                     cursor=cursor,
@@ -667,8 +762,8 @@ class AccountsService:
         
         try:
             async with self.db_manager.get_session_context() as session:
-                repository = AccountRepository(session)
-                return await repository.get_account_state_history(
+                repository = PortfolioHistoryRepository(session)
+                return await repository.get_history(
                     account_name=account_name, 
                     connector_name=connector_name,
                     limit=limit,
@@ -745,97 +840,10 @@ class AccountsService:
     def get_portfolio_distribution(self, account_name: Optional[str] = None) -> Dict[str, any]:
         """
         Get portfolio distribution by tokens with percentages.
+        Totals are maintained incrementally by the portfolio aggregator as connector balances change.
         """
         try:
-            # Get accounts to process
-            accounts_to_process = [account_name] if account_name else list(self.accounts_state.keys())
-            
-            # Aggregate all tokens across accounts and connectors
-            token_values = {}
-            total_value = 0
-            
-            for acc_name in accounts_to_process:
-                if acc_name in self.accounts_state:
-                    for connector_name, connector_data in self.accounts_state[acc_name].items():
-                        for token_info in connector_data:
-                            token = token_info.get("token", "")
-                            value = token_info.get("value", 0)
-                            
-                            if token not in token_values:
-                                token_values[token] = {
-                                    "token": token,
-                                    "total_value": 0,
-                                    "total_units": 0,
-                                    "accounts": {}
-                                }
-                            
-                            token_values[token]["total_value"] += value
-                            token_values[token]["total_units"] += token_info.get("units", 0)
-                            total_value += value
-                            
-                            # Track by account
-                            if acc_name not in token_values[token]["accounts"]:
-                                token_values[token]["accounts"][acc_name] = {
-                                    "value": 0,
-                                    "units": 0,
-                                    "connectors": {}
-                                }
-                            
-                            token_values[token]["accounts"][acc_name]["value"] += value
-                            token_values[token]["accounts"][acc_name]["units"] += token_info.get("units", 0)
-                            
-                            # Track by connector within account
-                            if connector_name not in token_values[token]["accounts"][acc_name]["connectors"]:
-                                token_values[token]["accounts"][acc_name]["connectors"][connector_name] = {
-                                    "value": 0,
-                                    "units": 0
-                                }
-                            
-                            token_values[token]["accounts"][acc_name]["connectors"][connector_name]["value"] += value
-                            token_values[token]["accounts"][acc_name]["connectors"][connector_name]["units"] += token_info.get("units", 0)
-            
-            # Calculate percentages
-            distribution = []
-            for token_data in token_values.values():
-                percentage = (token_data["total_value"] / total_value * 100) if total_value > 0 else 0
-                
-                token_dist = {
-                    "token": token_data["token"],
-                    "total_value": round(token_data["total_value"], 6),
-                    "total_units": token_data["total_units"],
-                    "percentage": round(percentage, 4),
-                    "accounts": {}
-                }
-                
-                # Add account-level percentages
-                for acc_name, acc_data in token_data["accounts"].items():
-                    acc_percentage = (acc_data["value"] / total_value * 100) if total_value > 0 else 0
-                    token_dist["accounts"][acc_name] = {
-                        "value": round(acc_data["value"], 6),
-                        "units": acc_data["units"],
-                        "percentage": round(acc_percentage, 4),
-                        "connectors": {}
-                    }
-                    
-                    # Add connector-level data
-                    for conn_name, conn_data in acc_data["connectors"].items():
-                        token_dist["accounts"][acc_name]["connectors"][conn_name] = {
-                            "value": round(conn_data["value"], 6),
-                            "units": conn_data["units"]
-                        }
-                
-                distribution.append(token_dist)
-            
-            # Sort by value (descending)
-            distribution.sort(key=lambda x: x["total_value"], reverse=True)
-            
-            return {
-                "total_portfolio_value": round(total_value, 6),
-                "token_count": len(distribution),
-                "distribution": distribution,
-                "account_filter": account_name if account_name else "all_accounts"
-            }
-            
+            return self.portfolio_aggregator.get_portfolio_distribution(account_name)
         except Exception as e:
             logger.error(f"Error calculating portfolio distribution: {e}")
             return {
@@ -849,59 +857,10 @@ class AccountsService:
     def get_account_distribution(self) -> Dict[str, any]:
         """
         Get portfolio distribution by accounts with percentages.
+        Totals are maintained incrementally by the portfolio aggregator as connector balances change.
         """
         try:
-            account_values = {}
-            total_value = 0
-            
-            for acc_name, account_data in self.accounts_state.items():
-                account_value = 0
-                connector_values = {}
-                
-                for connector_name, connector_data in account_data.items():
-                    connector_value = 0
-                    for token_info in connector_data:
-                        value = token_info.get("value", 0)
-                        connector_value += value
-                        account_value += value
-                    
-                    connector_values[connector_name] = round(connector_value, 6)
-                
-                account_values[acc_name] = {
-                    "total_value": round(account_value, 6),
-                    "connectors": connector_values
-                }
-                total_value += account_value
-            
-            # Calculate percentages
-            distribution = []
-            for acc_name, acc_data in account_values.items():
-                percentage = (acc_data["total_value"] / total_value * 100) if total_value > 0 else 0
-                
-                connector_dist = {}
-                for conn_name, conn_value in acc_data["connectors"].items():
-                    conn_percentage = (conn_value / total_value * 100) if total_value > 0 else 0
-                    connector_dist[conn_name] = {
-                        "value": conn_value,
-                        "percentage": round(conn_percentage, 4)
-                    }
-                
-                distribution.append({
-                    "account": acc_name,
-                    "total_value": acc_data["total_value"],
-                    "percentage": round(percentage, 4),
-                    "connectors": connector_dist
-                })
-            
-            # Sort by value (descending)
-            distribution.sort(key=lambda x: x["total_value"], reverse=True)
-            
-            return {
-                "total_portfolio_value": round(total_value, 6),
-                "account_count": len(distribution),
-                "distribution": distribution
-            }
-            
+            return self.portfolio_aggregator.get_account_distribution()
         except Exception as e:
             logger.error(f"Error calculating account distribution: {e}")
             return {
@@ -1466,7 +1425,7 @@ class AccountsService:
                         ]
                         for key in stale_keys:
                             logger.info(f"Removing stale Gateway balance data for {key} (no wallets exist)")
-                            del self.accounts_state["master_account"][key]
+                            self._remove_connector_state("master_account", key)
                 return
 
             # Get all available chains and networks
@@ -1479,8 +1438,7 @@ class AccountsService:
             chain_networks_map = {c["chain"]: c["networks"] for c in chains_result["chains"]}
 
             # Ensure master_account exists in accounts_state
-            if "master_account" not in self.accounts_state:
-                self.accounts_state["master_account"] = {}
+            self._ensure_account_state("master_account")
 
             # Collect all balance query tasks for parallel execution
             balance_tasks = []
@@ -1528,13 +1486,13 @@ class AccountsService:
                     if isinstance(result, Exception):
                         logger.error(f"Error updating Gateway balances for {chain}-{network} wallet {address}: {result}")
                         # Store empty list for error state
-                        self.accounts_state["master_account"][chain_network] = []
+                        self._set_connector_state("master_account", chain_network, [])
                     elif result:
                         # Only store if there are actual balances (non-empty list)
-                        self.accounts_state["master_account"][chain_network] = result
+                        self._set_connector_state("master_account", chain_network, result)
                     else:
                         # Store empty list to indicate we checked this network
-                        self.accounts_state["master_account"][chain_network] = []
+                        self._set_connector_state("master_account", chain_network, [])
 
                 # Only remove stale keys if we're doing a full update (no filter)
                 # When filtering, we don't want to remove keys that weren't in the filter
@@ -1552,7 +1510,7 @@ class AccountsService:
 
                     for key in stale_keys:
                         logger.info(f"Removing stale Gateway balance data for {key} (wallet no longer exists)")
-                        del self.accounts_state["master_account"][key]
+                        self._remove_connector_state("master_account", key)
 
         except Exception as e:
             logger.error(f"Error updating Gateway balances: {e}")
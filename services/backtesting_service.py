@@ -0,0 +1,533 @@
+import asyncio
+import copy
+import hashlib
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from utils.backtest_result_cache import BacktestResultCache
+from utils.backtesting_worker import run_backtesting_job
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ("completed", "failed", "cancelled")
+# Candles of recent ranges may still change (open candles of any interval up to 1d), so their results are not cached
+RESULT_CACHE_MIN_AGE = 86400
+# Version of the stored result encoding, hashed into cache keys so results stored in an older encoding are not reused
+RESULT_FORMAT_VERSION = 2
+
+
+@dataclass
+class BacktestJob:
+    """A submitted backtest and its lifecycle."""
+    job_id: str
+    config: Dict
+    status: str = "queued"  # queued, running, completed, failed, cancelled
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+    summary: Optional[Dict] = None  # `results` metrics of a completed backtest
+    cache_key: Optional[str] = None
+    cached: bool = False  # result reused from an identical earlier backtest
+
+    def to_dict(self, include_config: bool = True) -> Dict:
+        data = asdict(self)
+        if not include_config:
+            data.pop("config")
+        return data
+
+
+@dataclass
+class BacktestSweep:
+    """A grid of backtests over combinations of controller parameters."""
+    sweep_id: str
+    job_ids: List[str]
+    parameters: List[Dict[str, Any]]  # combination run by the job at the same index
+    rank_by: str = "net_pnl"
+    ascending: bool = False
+    status: str = "running"  # running, completed, cancelled, failed
+    submitted_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+def expand_parameter_grid(parameters: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Expand parameter ranges into every combination.
+
+    Args:
+        parameters: Mapping of (dotted) controller config key to a list of values, or to a
+            {"start", "stop", "step"} range including stop
+
+    Returns:
+        One {key: value} dict per combination
+    """
+    values = []
+    for key, spec in parameters.items():
+        if isinstance(spec, dict):
+            start, stop, step = spec["start"], spec["stop"], spec["step"]
+            if step <= 0:
+                raise ValueError(f"Step of parameter {key} must be positive")
+            count = int((stop - start) / step + 1e-9) + 1
+            is_int = all(float(v).is_integer() for v in (start, step))
+            values.append([int(start + i * step) if is_int else round(start + i * step, 10) for i in range(count)])
+        else:
+            values.append(list(spec))
+    return [dict(zip(parameters, combination)) for combination in itertools.product(*values)]
+
+
+def apply_parameters(config: Dict, parameters: Dict[str, Any]) -> Dict:
+    """Return a copy of a controller config with (dotted) keys set to the given values."""
+    config = copy.deepcopy(config)
+    for key, value in parameters.items():
+        target = config
+        *parents, leaf = key.split(".")
+        for parent in parents:
+            target = target.setdefault(parent, {})
+        target[leaf] = value
+    return config
+
+
+class BacktestingService:
+    """
+    Runs backtests as background jobs in worker processes.
+
+    At most `max_workers` backtests run at a time, each in its own spawned process, so simulations never block
+    the API's event loop and a running job can be cancelled by terminating its process. Queued jobs wait for a
+    free worker. Job metadata and results are written to `results_path`, so they can be retrieved after the
+    request that submitted them, and after a restart.
+
+    Sweeps run one job per parameter combination. With a candles store, the first job runs alone so it loads
+    the candles into the store; the others then run in parallel and read those candles from the store's
+    memory-mapped files instead of fetching them again. Without a store, all jobs are queued at once.
+
+    Finished jobs are kept for `job_retention` seconds and at most `max_jobs` jobs are kept; beyond that the
+    oldest finished jobs are removed with their files when new jobs are submitted.
+
+    With a result cache, jobs are keyed by a hash of their normalized config, the controller's source and
+    the data range; a job identical to an earlier one completes immediately with the cached result.
+    """
+
+    def __init__(self, results_path: str, max_workers: int = 2, job_timeout: Optional[float] = 3600,
+                 max_jobs: Optional[int] = 1000, job_retention: Optional[float] = 30 * 86400,
+                 candles_store_path: Optional[str] = None, poll_interval: float = 0.5,
+                 worker: Callable = run_backtesting_job, result_cache: Optional[BacktestResultCache] = None,
+                 controllers_path: Optional[str] = None):
+        """
+        Args:
+            results_path: Directory job metadata and results are written to
+            max_workers: Maximum number of backtests running at the same time
+            job_timeout: Seconds a backtest may run before its process is terminated (none for no limit)
+            max_jobs: Maximum number of jobs kept, removing the oldest finished ones (none for no limit)
+            job_retention: Seconds finished jobs and their results are kept (none to keep them)
+            candles_store_path: Candles store directory passed to the workers (none to always fetch candles)
+            poll_interval: Seconds between checks of running worker processes
+            worker: Worker process entry point, called with (config, result_path, error_path, candles_store_path)
+            result_cache: Cache of results of identical backtests (none to always run)
+            controllers_path: Directory of the controllers' source, hashed into cache keys
+        """
+        self.results_path = results_path
+        self.max_workers = max_workers
+        self.job_timeout = job_timeout
+        self.max_jobs = max_jobs
+        self.job_retention = job_retention
+        self.candles_store_path = candles_store_path
+        self.poll_interval = poll_interval
+        self._worker = worker
+        self.result_cache = result_cache
+        self.controllers_path = controllers_path
+        self._context = multiprocessing.get_context("spawn")
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._jobs: Dict[str, BacktestJob] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._processes: Dict[str, multiprocessing.process.BaseProcess] = {}
+        self._sweeps: Dict[str, BacktestSweep] = {}
+        self._sweep_tasks: Dict[str, asyncio.Task] = {}
+
+    def start(self):
+        """Load jobs persisted by previous runs; jobs they left unfinished are marked failed."""
+        os.makedirs(self.results_path, exist_ok=True)
+        self._semaphore = asyncio.Semaphore(self.max_workers)
+        for file_name in os.listdir(self.results_path):
+            if file_name.endswith(".job.json"):
+                job = self._load(file_name, BacktestJob)
+                if job is None:
+                    continue
+                if job.status not in TERMINAL_STATUSES:
+                    job.status = "failed"
+                    job.error = "Interrupted by API restart"
+                    job.finished_at = time.time()
+                    self._save_job(job)
+                self._jobs[job.job_id] = job
+            elif file_name.endswith(".sweep.json"):
+                sweep = self._load(file_name, BacktestSweep)
+                if sweep is None:
+                    continue
+                if sweep.status == "running":
+                    sweep.status = "failed"
+                    sweep.finished_at = time.time()
+                    self._save_sweep(sweep)
+                self._sweeps[sweep.sweep_id] = sweep
+        self._evict_finished()
+        logger.info(f"BacktestingService started with max_workers={self.max_workers}, {len(self._jobs)} stored jobs")
+
+    async def stop(self):
+        """Cancel queued and running jobs and sweeps."""
+        for sweep_id in list(self._sweep_tasks):
+            self.cancel_sweep(sweep_id)
+        for job_id in list(self._tasks):
+            self.cancel(job_id)
+        tasks = [*self._sweep_tasks.values(), *self._tasks.values()]
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def submit(self, config: Dict) -> BacktestJob:
+        """
+        Queue a backtest.
+
+        Args:
+            config: BacktestingConfig fields
+
+        Returns:
+            The queued job
+        """
+        job = self._create_job(config)
+        if not self._complete_from_cache(job):
+            self._schedule(job)
+        return job
+
+    def submit_sweep(self, config: Dict, parameters: Dict[str, Any], rank_by: str = "net_pnl",
+                     ascending: bool = False, max_combinations: Optional[int] = None) -> BacktestSweep:
+        """
+        Queue one backtest per combination of parameter values.
+
+        Args:
+            config: BacktestingConfig fields, with the base controller config as a dict under "config"
+            parameters: Parameter ranges, as accepted by `expand_parameter_grid`
+            rank_by: `results` metric the sweep table is sorted by
+            ascending: Sort the table ascending instead of descending
+            max_combinations: Reject sweeps with more combinations than this
+
+        Returns:
+            The queued sweep
+        """
+        combinations = expand_parameter_grid(parameters)
+        if max_combinations and len(combinations) > max_combinations:
+            raise ValueError(f"Sweep has {len(combinations)} combinations, the maximum is {max_combinations}")
+        jobs = [
+            self._create_job({**config, "config": apply_parameters(config["config"], combination)})
+            for combination in combinations
+        ]
+        sweep = BacktestSweep(sweep_id=uuid.uuid4().hex, job_ids=[job.job_id for job in jobs],
+                              parameters=combinations, rank_by=rank_by, ascending=ascending)
+        self._sweeps[sweep.sweep_id] = sweep
+        self._save_sweep(sweep)
+        self._sweep_tasks[sweep.sweep_id] = asyncio.create_task(self._run_sweep(sweep, jobs))
+        return sweep
+
+    def get_sweep(self, sweep_id: str) -> Optional[BacktestSweep]:
+        return self._sweeps.get(sweep_id)
+
+    def get_sweep_table(self, sweep_id: str) -> List[Dict]:
+        """
+        Rank the jobs of a sweep by the sweep's metric.
+
+        Returns:
+            One row per combination with its parameters, job status and `results` metrics; completed jobs
+            first, ranked, then the others
+        """
+        sweep = self._sweeps[sweep_id]
+        rows = []
+        for job_id, parameters in zip(sweep.job_ids, sweep.parameters):
+            job = self._jobs.get(job_id)
+            rows.append({
+                "job_id": job_id,
+                "parameters": parameters,
+                "status": job.status if job else "unknown",
+                "cached": job.cached if job else False,
+                "error": job.error if job else None,
+                "results": job.summary if job else None,
+            })
+
+        def sort_key(row):
+            value = (row["results"] or {}).get(sweep.rank_by)
+            if not isinstance(value, (int, float)):
+                return (1, 0)
+            return (0, value if sweep.ascending else -value)
+
+        rows.sort(key=sort_key)
+        for rank, row in enumerate(rows, start=1):
+            row["rank"] = rank if row["results"] else None
+        return rows
+
+    def cancel_sweep(self, sweep_id: str) -> Optional[BacktestSweep]:
+        """Cancel the unfinished jobs of a sweep. Returns None for unknown sweeps."""
+        sweep = self._sweeps.get(sweep_id)
+        if sweep is None or sweep.status != "running":
+            return sweep
+        sweep.status = "cancelled"
+        sweep.finished_at = time.time()
+        self._save_sweep(sweep)
+        for job_id in sweep.job_ids:
+            self.cancel(job_id)
+        return sweep
+
+    def _create_job(self, config: Dict) -> BacktestJob:
+        if self._semaphore is None:
+            self.start()
+        job = BacktestJob(job_id=uuid.uuid4().hex, config=config, cache_key=self.cache_key(config))
+        self._jobs[job.job_id] = job
+        self._evict_finished()
+        self._save_job(job)
+        return job
+
+    def _evict_finished(self):
+        """Remove finished jobs past the retention period, then the oldest ones beyond `max_jobs`, with their files."""
+        # Jobs of running sweeps are kept so the sweep table stays complete
+        protected = {job_id for sweep in self._sweeps.values() if sweep.status == "running" for job_id in sweep.job_ids}
+        finished = sorted(
+            (job for job in self._jobs.values() if job.status in TERMINAL_STATUSES and job.job_id not in protected),
+            key=lambda job: job.finished_at or job.submitted_at
+        )
+        now = time.time()
+        excess = len(self._jobs) - self.max_jobs if self.max_jobs else 0
+        for job in finished:
+            expired = self.job_retention is not None and now - (job.finished_at or job.submitted_at) > self.job_retention
+            if not expired and excess <= 0:
+                break
+            self._jobs.pop(job.job_id, None)
+            for kind in ("job", "result", "error"):
+                self._remove_file(self._path(job.job_id, kind))
+            excess -= 1
+
+        for sweep in list(self._sweeps.values()):
+            if sweep.status != "running" and not any(job_id in self._jobs for job_id in sweep.job_ids):
+                self._sweeps.pop(sweep.sweep_id, None)
+                self._remove_file(self._path(sweep.sweep_id, "sweep"))
+
+    @staticmethod
+    def _remove_file(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def cache_key(self, config: Dict) -> Optional[str]:
+        """
+        Hash of what determines a backtest's result, or None if it must not be cached.
+
+        Covers the normalized backtesting config (without the controller config id), the source of the
+        controller and the data range. Ranges ending within RESULT_CACHE_MIN_AGE are not cached, as their
+        candles may still change.
+        """
+        controller_config = config.get("config")
+        if self.result_cache is None or not isinstance(controller_config, dict):
+            return None
+        if int(config.get("end_time", 0)) > time.time() - RESULT_CACHE_MIN_AGE:
+            return None
+        controller_config = {key: value for key, value in controller_config.items() if key != "id"}
+        payload = {
+            "config": {**config, "config": controller_config},
+            "controller_source": self._controller_source_hash(controller_config),
+            "result_format": RESULT_FORMAT_VERSION,
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+    def _controller_source_hash(self, controller_config: Dict) -> Optional[str]:
+        if not self.controllers_path:
+            return None
+        path = os.path.join(
+            self.controllers_path, str(controller_config.get("controller_type")),
+            f"{controller_config.get('controller_name')}.py"
+        )
+        try:
+            with open(path, "rb") as f:
+                return hashlib.sha256(f.read()).hexdigest()
+        except OSError:
+            return None
+
+    def _complete_from_cache(self, job: BacktestJob) -> bool:
+        if not job.cache_key or self.result_cache is None:
+            return False
+        cached = self.result_cache.get(job.cache_key)
+        if cached is None:
+            return False
+        cached_path, summary = cached
+        result_path = self._path(job.job_id, "result")
+        try:
+            os.link(cached_path, result_path)
+        except OSError:
+            shutil.copyfile(cached_path, result_path)
+        job.summary = summary
+        job.cached = True
+        job.started_at = time.time()
+        self._finish(job, "completed")
+        return True
+
+    def _schedule(self, job: BacktestJob) -> asyncio.Task:
+        task = asyncio.create_task(self._run(job))
+        self._tasks[job.job_id] = task
+        return task
+
+    async def _run_sweep(self, sweep: BacktestSweep, jobs: List[BacktestJob]):
+        try:
+            if self.candles_store_path:
+                # The first backtest loads the candles into the store, the others read them from there
+                await self._schedule(jobs[0])
+                jobs = jobs[1:]
+            # Without a store every worker fetches its own candles, so all jobs start at once
+            if jobs:
+                await asyncio.gather(*(self._schedule(job) for job in jobs))
+            if sweep.status == "running":
+                sweep.status = "completed"
+                sweep.finished_at = time.time()
+                self._save_sweep(sweep)
+        finally:
+            self._sweep_tasks.pop(sweep.sweep_id, None)
+
+    async def wait(self, job_id: str) -> BacktestJob:
+        """Wait until a job finished and return it."""
+        task = self._tasks.get(job_id)
+        if task:
+            await asyncio.shield(task)
+        return self._jobs[job_id]
+
+    def cancel(self, job_id: str) -> Optional[BacktestJob]:
+        """Cancel a queued or running job. Returns None for unknown jobs."""
+        job = self._jobs.get(job_id)
+        if job is None or job.status in TERMINAL_STATUSES:
+            return job
+        job.status = "cancelled"
+        job.finished_at = time.time()
+        self._save_job(job)
+        process = self._processes.get(job_id)
+        if process and process.is_alive():
+            process.terminate()
+        return job
+
+    def get_job(self, job_id: str) -> Optional[BacktestJob]:
+        return self._jobs.get(job_id)
+
+    def list_jobs(self, status: Optional[str] = None) -> List[BacktestJob]:
+        """List jobs, most recent first."""
+        jobs = [job for job in self._jobs.values() if status is None or job.status == status]
+        return sorted(jobs, key=lambda job: job.submitted_at, reverse=True)
+
+    def get_result(self, job_id: str) -> Optional[Dict]:
+        """Read the stored result of a completed job."""
+        try:
+            with open(self._path(job_id, "result")) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def get_result_path(self, job_id: str) -> Optional[str]:
+        """Path of the stored result of a completed job, which is the JSON body of the full result."""
+        path = self._path(job_id, "result")
+        return path if os.path.exists(path) else None
+
+    def get_metrics(self) -> Dict:
+        statuses: Dict[str, int] = {}
+        for job in self._jobs.values():
+            statuses[job.status] = statuses.get(job.status, 0) + 1
+        return {
+            "max_workers": self.max_workers,
+            "running_processes": len(self._processes),
+            "jobs": statuses,
+            "running_sweeps": len(self._sweep_tasks),
+            "result_cache": self.result_cache.get_metrics() if self.result_cache else None,
+        }
+
+    async def _run(self, job: BacktestJob):
+        try:
+            async with self._semaphore:
+                if job.status == "cancelled" or self._complete_from_cache(job):
+                    return
+                job.status = "running"
+                job.started_at = time.time()
+                self._save_job(job)
+                await self._run_process(job)
+        except Exception as e:
+            logger.error(f"Backtest job {job.job_id} failed: {e}", exc_info=True)
+            self._finish(job, "failed", str(e))
+        finally:
+            self._tasks.pop(job.job_id, None)
+
+    async def _run_process(self, job: BacktestJob):
+        result_path, error_path = self._path(job.job_id, "result"), self._path(job.job_id, "error")
+        process = self._context.Process(
+            target=self._worker, args=(job.config, result_path, error_path, self.candles_store_path), daemon=True
+        )
+        process.start()
+        self._processes[job.job_id] = process
+        try:
+            while process.is_alive():
+                if self.job_timeout and time.time() - job.started_at > self.job_timeout:
+                    process.terminate()
+                    process.join()
+                    self._finish(job, "failed", f"Backtest exceeded the {self.job_timeout}s timeout")
+                    return
+                await asyncio.sleep(self.poll_interval)
+            process.join()
+        finally:
+            self._processes.pop(job.job_id, None)
+
+        if job.status == "cancelled":
+            return
+        if os.path.exists(result_path):
+            job.summary = await asyncio.to_thread(self._read_summary, result_path)
+            self._finish(job, "completed")
+            if job.cache_key and self.result_cache is not None:
+                await asyncio.to_thread(self.result_cache.put, job.cache_key, result_path, job.summary)
+        elif os.path.exists(error_path):
+            with open(error_path) as f:
+                self._finish(job, "failed", json.load(f)["error"])
+        else:
+            self._finish(job, "failed", f"Worker process exited with code {process.exitcode}")
+
+    def _finish(self, job: BacktestJob, status: str, error: Optional[str] = None):
+        if job.status == "cancelled":
+            return
+        job.status = status
+        job.error = error
+        job.finished_at = time.time()
+        self._save_job(job)
+
+    @staticmethod
+    def _read_summary(result_path: str) -> Optional[Dict]:
+        with open(result_path) as f:
+            return json.load(f).get("results")
+
+    def _path(self, item_id: str, kind: str) -> str:
+        return os.path.join(self.results_path, f"{item_id}.{kind}.json")
+
+    def _load(self, file_name: str, cls):
+        try:
+            with open(os.path.join(self.results_path, file_name)) as f:
+                return cls(**json.load(f))
+        except Exception as e:
+            logger.warning(f"Skipping unreadable backtest file {file_name}: {e}")
+            return None
+
+    def _save_job(self, job: BacktestJob):
+        self._write(self._path(job.job_id, "job"), job.to_dict())
+
+    def _save_sweep(self, sweep: BacktestSweep):
+        self._write(self._path(sweep.sweep_id, "sweep"), sweep.to_dict())
+
+    @staticmethod
+    def _write(path: str, data: Dict):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, default=str)
+        os.replace(tmp_path, path)
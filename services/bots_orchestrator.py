@@ -1,12 +1,14 @@
 import asyncio
 import logging
-from typing import Optional
+from typing import Any, AsyncIterator, Dict, Optional
 import re
 import time
 
 import docker
 
 from config import settings
+from utils.container_inventory import ContainerInventory
+from utils.event_broadcaster import EventBroadcaster
 from utils.mqtt_manager import MQTTManager
 from utils.file_system import FileSystemUtil
 
@@ -20,17 +22,23 @@ logger = logging.getLogger(__name__)
 class BotsOrchestrator:
     """Orchestrates Hummingbot instances using Docker and MQTT communication."""
 
-    def __init__(self, broker_host, broker_port, broker_username, broker_password):
+    def __init__(self, broker_host, broker_port, broker_username, broker_password,
+                 container_inventory: Optional[ContainerInventory] = None):
         self.broker_host = broker_host
         self.broker_port = broker_port
         self.broker_username = broker_username
         self.broker_password = broker_password
 
-        # Initialize Docker client
+        # Initialize Docker client; running containers are read from the shared inventory when one is given
         self.docker_client = docker.from_env()
+        self.container_inventory = container_inventory
+
+        # Bot events pushed to status stream subscribers, published here and by the MQTT manager
+        self.events = EventBroadcaster()
 
         # Initialize MQTT manager
-        self.mqtt_manager = MQTTManager(host=broker_host, port=broker_port, username=broker_username, password=broker_password)
+        self.mqtt_manager = MQTTManager(host=broker_host, port=broker_port, username=broker_username, password=broker_password,
+                                        events=self.events)
 
         # Active bots tracking
         self.active_bots = {}
@@ -41,22 +49,35 @@ class BotsOrchestrator:
 
         # MQTT manager will be started asynchronously later
 
+    @staticmethod
+    def is_hummingbot_image(image_name: str) -> bool:
+        """Whether an image name is a Hummingbot bot image (not hummingbot-api)."""
+        pattern = r'.+/hummingbot(?!-api)[^:]*:'
+        return bool(re.match(pattern, image_name or ""))
+
     @staticmethod
     def hummingbot_containers_fiter(container):
         """Filter for Hummingbot containers based on image name pattern."""
         try:
             # Get the image name (first tag if available, otherwise the image ID)
             image_name = container.image.tags[0] if container.image.tags else str(container.image)
-            pattern = r'.+/hummingbot(?!-api)[^:]*:'
-            return bool(re.match(pattern, image_name))
+            return BotsOrchestrator.is_hummingbot_image(image_name)
         except Exception:
             return False
 
     async def get_active_containers(self):
+        if self.container_inventory is not None:
+            return self._sync_get_active_containers()
         loop = asyncio.get_event_loop()
         return await loop.run_in_executor(None, self._sync_get_active_containers)
 
     def _sync_get_active_containers(self):
+        if self.container_inventory is not None:
+            return [
+                container["name"]
+                for container in self.container_inventory.list(status="running")
+                if self.is_hummingbot_image(container["image"])
+            ]
         return [
             container.name
             for container in self.docker_client.containers.list()
@@ -128,6 +149,7 @@ class BotsOrchestrator:
                     if bot_name not in all_active_bots:
                         self.mqtt_manager.clear_bot_data(bot_name)
                         del self.active_bots[bot_name]
+                        self.events.publish("bot_lost", {"bot_name": bot_name})
 
                 # Add new bots
                 for bot_name in all_active_bots:
@@ -137,6 +159,7 @@ class BotsOrchestrator:
                             "status": "connected",
                             "source": "docker" if bot_name in docker_bots else "mqtt",
                         }
+                        self.events.publish("bot_discovered", dict(self.active_bots[bot_name]))
                         # Subscribe to this specific bot's topics
                         await self.mqtt_manager.subscribe_to_bot(bot_name)
 
@@ -313,6 +336,36 @@ class BotsOrchestrator:
             all_bots_status[bot] = status
         return all_bots_status
 
+    def get_status_snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Lightweight view of every active bot, built from in-memory state only (no Docker or file reads)."""
+        last_seen_map = self.mqtt_manager.get_last_seen_map()
+        return {
+            bot_name: {
+                **bot,
+                "stopping": self.is_bot_stopping(bot_name),
+                "mqtt_last_seen": last_seen_map.get(bot_name),
+                "performance": self.mqtt_manager.get_bot_performance_latest(bot_name),
+            }
+            for bot_name, bot in self.active_bots.items()
+        }
+
+    async def stream_status(self, keepalive_interval: float = 15.0) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream bot status changes: a snapshot of all active bots once, then incremental events.
+
+        Events are "bot_discovered", "bot_lost", "bot_stopping", "performance" (the new compact sample of each
+        reporting controller) and "error_log". A "keepalive" event is yielded after `keepalive_interval`
+        seconds without events.
+
+        Yields:
+            {"type": ..., "timestamp": ..., "data": {...}}
+        """
+        with self.events.subscribe() as subscription:
+            yield {"type": "snapshot", "timestamp": time.time(), "data": self.get_status_snapshot()}
+            while True:
+                event = await subscription.get(timeout=keepalive_interval)
+                yield event or {"type": "keepalive", "timestamp": time.time(), "data": {"dropped": subscription.dropped}}
+
     def get_bot_status(self, bot_name):
         """
         Get status information for a specific bot.
@@ -392,6 +445,7 @@ class BotsOrchestrator:
     def set_bot_stopping(self, bot_name: str):
         """Mark a bot as currently being stopped and archived."""
         self.stopping_bots.add(bot_name)
+        self.events.publish("bot_stopping", {"bot_name": bot_name})
         logger.info(f"Marked bot {bot_name} as stopping")
     
     def clear_bot_stopping(self, bot_name: str):
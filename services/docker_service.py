@@ -19,6 +19,7 @@ from models import V2ScriptDeployment
 from utils.file_system import fs_util
 from utils.script_config import normalize_script_config_name
 from utils.bot_core_overrides import build_bot_core_override_volumes
+from utils.container_inventory import ContainerInventory
 
 
 class DockerService:
@@ -32,11 +33,17 @@ class DockerService:
         self._pull_status: Dict[str, Dict] = {}
         self._cleanup_thread = None
         self._stop_cleanup = threading.Event()
+        self.inventory: Optional[ContainerInventory] = None
         
         try:
             self.client = docker.from_env()
             # Start background cleanup thread
             self._start_cleanup_thread()
+            # Container listings are served from an inventory kept current by Docker events
+            self.inventory = ContainerInventory(
+                self.client, resync_interval=settings.app.docker_inventory_resync_interval
+            )
+            self.inventory.start()
         except DockerException as e:
             logger.error(f"It was not possible to connect to Docker. Please make sure Docker is running. Error: {e}")
 
@@ -128,7 +135,21 @@ class DockerService:
 
         return "unknown"
 
+    def _refresh_inventory(self, container_name: Optional[str] = None):
+        """Apply a change made through this service right away instead of waiting for its Docker event."""
+        if self.inventory is None:
+            return
+        try:
+            if container_name:
+                self.inventory.refresh(container_name)
+            else:
+                self.inventory.resync()
+        except DockerException as e:
+            logger.debug(f"Could not refresh container inventory: {e}")
+
     def get_active_containers(self, name_filter: str = None):
+        if self.inventory is not None:
+            return self.inventory.list(status="running", name_filter=name_filter)
         try:
             all_containers = self.client.containers.list(filters={"status": "running"})
         except DockerException as e:
@@ -170,6 +191,8 @@ class DockerService:
             return {"success": False, "error": str(e)}
 
     def get_exited_containers(self, name_filter: str = None):
+        if self.inventory is not None:
+            return self.inventory.list(status="exited", name_filter=name_filter)
         try:
             all_containers = self.client.containers.list(filters={"status": "exited"}, all=True)
         except DockerException as e:
@@ -192,6 +215,7 @@ class DockerService:
     def clean_exited_containers(self):
         try:
             self.client.containers.prune()
+            self._refresh_inventory()
         except DockerException as e:
             return str(e)
 
@@ -206,6 +230,7 @@ class DockerService:
         try:
             container = self.client.containers.get(container_name)
             container.stop()
+            self._refresh_inventory(container_name)
         except DockerException as e:
             return str(e)
 
@@ -213,6 +238,7 @@ class DockerService:
         try:
             container = self.client.containers.get(container_name)
             container.start()
+            self._refresh_inventory(container_name)
         except DockerException as e:
             return str(e)
 
@@ -258,6 +284,7 @@ class DockerService:
         try:
             container = self.client.containers.get(container_name)
             container.remove(force=force)
+            self._refresh_inventory(container_name)
             return {"success": True, "message": f"Container {container_name} removed successfully."}
         except DockerException as e:
             return {"success": False, "message": str(e)}
@@ -519,6 +546,7 @@ class DockerService:
             if not use_host_network:
                 self._connect_to_bot_network(container)
 
+            self._refresh_inventory(instance_name)
             return {"success": True, "message": f"Instance {instance_name} created successfully."}
         except docker.errors.DockerException as e:
             return {"success": False, "message": str(e)}
@@ -663,3 +691,5 @@ class DockerService:
         self._stop_cleanup.set()
         if self._cleanup_thread:
             self._cleanup_thread.join(timeout=1)
+        if self.inventory is not None:
+            self.inventory.stop()
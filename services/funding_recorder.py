@@ -1,28 +1,36 @@
-import asyncio
 import logging
 from datetime import datetime
 from decimal import Decimal, InvalidOperation
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
 
 from hummingbot.connector.connector_base import ConnectorBase
 from hummingbot.core.event.event_forwarder import SourceInfoEventForwarder
 from hummingbot.core.event.events import MarketEvent, FundingPaymentCompletedEvent
 
 from database import AsyncDatabaseManager, FundingRepository
+from utils.write_behind_queue import WriteBehindQueue
 
 
 class FundingRecorder:
     """
     Records funding payment events and associates them with position data.
-    Follows the same pattern as OrdersRecorder for consistency.
+    Follows the same pattern as OrdersRecorder for consistency, including the write-behind queue:
+    payments are buffered and written in batched transactions.
     """
 
-    def __init__(self, db_manager: AsyncDatabaseManager, account_name: str, connector_name: str):
+    def __init__(self, db_manager: AsyncDatabaseManager, account_name: str, connector_name: str,
+                 max_batch_size: int = 200, flush_interval: float = 0.25):
         self.db_manager = db_manager
         self.account_name = account_name
         self.connector_name = connector_name
         self._connector: Optional[ConnectorBase] = None
         self.logger = logging.getLogger(__name__)
+        self._queue = WriteBehindQueue(
+            self._flush_funding_payments,
+            name=f"funding:{account_name}/{connector_name}",
+            max_batch_size=max_batch_size,
+            flush_interval=flush_interval
+        )
         
         # Create event forwarder for funding payments
         self._funding_payment_forwarder = SourceInfoEventForwarder(self._did_funding_payment)
@@ -35,6 +43,7 @@ class FundingRecorder:
     def start(self, connector: ConnectorBase):
         """Start recording funding payments for the given connector"""
         self._connector = connector
+        self._queue.start()
         
         # Subscribe to funding payment events
         for event, forwarder in self._event_pairs:
@@ -48,17 +57,27 @@ class FundingRecorder:
             for event, forwarder in self._event_pairs:
                 self._connector.remove_listener(event, forwarder)
             self.logger.info(f"FundingRecorder stopped for {self.account_name}/{self.connector_name}")
+
+        # Write the payments still buffered
+        await self._queue.stop()
+
+    def get_metrics(self) -> Dict:
+        """Get write-behind queue depth and flush lag metrics."""
+        return self._queue.get_metrics()
     
     def _did_funding_payment(self, event_tag: int, market: ConnectorBase, event: FundingPaymentCompletedEvent):
         """Handle funding payment events - called by SourceInfoEventForwarder"""
         try:
-            asyncio.create_task(self._handle_funding_payment(event))
+            # Capture the position now: it may change before the queue is flushed
+            position_data = self._get_position_data(event)
+            funding_data = self._build_funding_data(event, self.account_name, self.connector_name, position_data)
+            if funding_data:
+                self._queue.put(funding_data["funding_payment_id"], funding_data)
         except Exception as e:
             self.logger.error(f"Error in _did_funding_payment: {e}")
-    
-    async def _handle_funding_payment(self, event: FundingPaymentCompletedEvent):
-        """Handle funding payment events"""
-        # Get current position data if available
+
+    def _get_position_data(self, event: FundingPaymentCompletedEvent) -> Optional[Dict]:
+        """Get the current position data of the event's trading pair, if available"""
         position_data = None
         if self._connector and hasattr(self._connector, 'account_positions'):
             try:
@@ -73,15 +92,64 @@ class FundingRecorder:
                             break
             except Exception as e:
                 self.logger.warning(f"Could not get position data for funding payment: {e}")
-        
-        # Record the funding payment
-        await self.record_funding_payment(event, self.account_name, self.connector_name, position_data)
+        return position_data
+
+    def _build_funding_data(self, event: FundingPaymentCompletedEvent, account_name: str, connector_name: str,
+                            position_data: Optional[Dict] = None) -> Optional[Dict]:
+        """Build the funding payment record of an event, or None if the event values are invalid"""
+        try:
+            # Validate and convert funding data
+            funding_rate = Decimal(str(event.funding_rate))
+            funding_payment = Decimal(str(event.amount))
+        except (ValueError, InvalidOperation) as e:
+            self.logger.error(f"Error processing funding payment for {event.trading_pair}: {e}, skipping update")
+            return None
+
+        # Create funding payment record
+        funding_data = {
+            "funding_payment_id": f"{connector_name}_{event.trading_pair}_{event.timestamp.timestamp()}",
+            "timestamp": event.timestamp,
+            "account_name": account_name,
+            "connector_name": connector_name,
+            "trading_pair": event.trading_pair,
+            "funding_rate": float(funding_rate),
+            "funding_payment": float(funding_payment),
+            "fee_currency": getattr(event, 'fee_currency', 'USDT'),  # Default to USDT if not provided
+            "exchange_funding_id": getattr(event, 'exchange_funding_id', None),
+        }
+
+        # Add position data if provided
+        if position_data:
+            funding_data.update({
+                "position_size": float(position_data.get("size", 0)),
+                "position_side": position_data.get("side"),
+            })
+        return funding_data
+
+    async def _flush_funding_payments(self, batch: List[Tuple[str, List[Dict]]]):
+        """Write a batch of buffered funding payments in one transaction, skipping already stored ones"""
+        async with self.db_manager.get_session_context() as session:
+            funding_repo = FundingRepository(session)
+            existing_ids = await funding_repo.get_existing_funding_payment_ids([payment_id for payment_id, _ in batch])
+
+            for payment_id, payments in batch:
+                if payment_id in existing_ids:
+                    self.logger.info(f"Funding payment {payment_id} already exists, skipping")
+                    continue
+                # Duplicate events of the same payment are coalesced into one record
+                funding_data = payments[0]
+                await funding_repo.create_funding_payment(funding_data)
+                self.logger.info(
+                    f"Recorded funding payment for {funding_data['account_name']}/{funding_data['connector_name']}: "
+                    f"{funding_data['trading_pair']} - Rate: {funding_data['funding_rate']}, "
+                    f"Payment: {funding_data['funding_payment']} {funding_data['fee_currency']}"
+                )
 
     async def record_funding_payment(self, event: FundingPaymentCompletedEvent, 
                                    account_name: str, connector_name: str, 
                                    position_data: Optional[Dict] = None):
         """
-        Record a funding payment event with optional position association.
+        Record a funding payment event with optional position association, bypassing the write-behind queue.
         
         Args:
             event: FundingPaymentCompletedEvent from Hummingbot
@@ -90,30 +158,10 @@ class FundingRecorder:
             position_data: Optional position data at time of payment
         """
         try:
-            # Validate and convert funding data
-            funding_rate = Decimal(str(event.funding_rate))
-            funding_payment = Decimal(str(event.amount))
-            
-            # Create funding payment record
-            funding_data = {
-                "funding_payment_id": f"{connector_name}_{event.trading_pair}_{event.timestamp.timestamp()}",
-                "timestamp": event.timestamp,
-                "account_name": account_name,
-                "connector_name": connector_name,
-                "trading_pair": event.trading_pair,
-                "funding_rate": float(funding_rate),
-                "funding_payment": float(funding_payment),
-                "fee_currency": getattr(event, 'fee_currency', 'USDT'),  # Default to USDT if not provided
-                "exchange_funding_id": getattr(event, 'exchange_funding_id', None),
-            }
-            
-            # Add position data if provided
-            if position_data:
-                funding_data.update({
-                    "position_size": float(position_data.get("size", 0)),
-                    "position_side": position_data.get("side"),
-                })
-            
+            funding_data = self._build_funding_data(event, account_name, connector_name, position_data)
+            if not funding_data:
+                return
+
             # Save to database
             async with self.db_manager.get_session() as session:
                 funding_repo = FundingRepository(session)
@@ -128,15 +176,12 @@ class FundingRecorder:
                 
                 self.logger.info(
                     f"Recorded funding payment for {account_name}/{connector_name}: "
-                    f"{event.trading_pair} - Rate: {funding_rate}, Payment: {funding_payment} "
-                    f"{funding_data['fee_currency']}"
+                    f"{event.trading_pair} - Rate: {funding_data['funding_rate']}, "
+                    f"Payment: {funding_data['funding_payment']} {funding_data['fee_currency']}"
                 )
                 
                 return funding_payment
                 
-        except (ValueError, InvalidOperation) as e:
-            self.logger.error(f"Error processing funding payment for {event.trading_pair}: {e}, skipping update")
-            return
         except Exception as e:
             self.logger.error(f"Unexpected error recording funding payment: {e}")
-            return
\ No newline at end of file
+            return
@@ -1,13 +1,18 @@
 import asyncio
+import math
 import time
-from typing import Dict, Optional, Callable, List
+from typing import Any, AsyncIterator, Dict, Optional, Callable, List, Set, Tuple
 import logging
 from enum import Enum
 
 from hummingbot.core.rate_oracle.rate_oracle import RateOracle
-from hummingbot.data_feed.candles_feed.data_types import CandlesConfig
+from hummingbot.data_feed.candles_feed.data_types import CandlesConfig, HistoricalCandlesConfig
 from hummingbot.data_feed.market_data_provider import MarketDataProvider
 
+from utils.candles_store import CandlesStore
+from utils.order_book_depth import OrderBookDepth
+from utils.price_service import PriceService
+
 
 class FeedType(Enum):
     """Types of market data feeds that can be managed."""
@@ -24,9 +29,24 @@ class MarketDataFeedManager:
     This service wraps the MarketDataProvider and tracks when any type of market data feed
     is last accessed. Feeds that haven't been accessed within the specified timeout period 
     are automatically stopped and cleaned up.
+
+    Order book queries are served from the live, websocket-maintained order book when it has been
+    updated within `order_book_max_staleness` seconds. Otherwise a REST snapshot is fetched and shared by
+    the queries of the next `order_book_max_staleness` seconds. Both are released with the feed on cleanup.
+
+    Last traded prices go through a PriceService, which caches them for `price_cache_ttl` seconds and
+    coalesces concurrent requests for the same pairs into one exchange call.
+
+    Candle feeds can be streamed: subscribers get the initial window once and then only new or updated
+    candles. A feed with connected subscribers is kept alive regardless of `feed_timeout`.
+
+    Historical candles are read through the CandlesStore when one is given, so only ranges that were not
+    fetched before are requested from the exchange.
     """
     
-    def __init__(self, market_data_provider: MarketDataProvider, rate_oracle: RateOracle, cleanup_interval: int = 300, feed_timeout: int = 600):
+    def __init__(self, market_data_provider: MarketDataProvider, rate_oracle: RateOracle, cleanup_interval: int = 300,
+                 feed_timeout: int = 600, order_book_max_staleness: float = 2.0, price_cache_ttl: float = 2.0,
+                 candles_stream_interval: float = 1.0, candles_store: Optional[CandlesStore] = None):
         """
         Initialize the MarketDataFeedManager.
         
@@ -34,6 +54,10 @@ class MarketDataFeedManager:
             market_data_provider: The underlying MarketDataProvider instance
             cleanup_interval: How often to run cleanup (seconds, default: 5 minutes)
             feed_timeout: How long to keep unused feeds alive (seconds, default: 10 minutes)
+            order_book_max_staleness: Maximum age of an order book served to queries (seconds, default: 2, 0 disables caching)
+            price_cache_ttl: How long last traded prices are cached (seconds, default: 2, 0 disables caching)
+            candles_stream_interval: How often streamed candle feeds are checked for changes (seconds, default: 1)
+            candles_store: Local store consulted for historical candles before the exchange (default: none)
         """
         self.market_data_provider = market_data_provider
         self.rate_oracle = rate_oracle
@@ -44,6 +68,24 @@ class MarketDataFeedManager:
         self._cleanup_task: Optional[asyncio.Task] = None
         self._is_running = False
         self.logger = logging.getLogger(__name__)
+
+        # Order book cache for depth queries
+        self.order_book_max_staleness = order_book_max_staleness
+        self._order_book_snapshots: Dict[str, Tuple[float, Any]] = {}  # feed_key -> (fetched_at, REST order book)
+        self._order_book_locks: Dict[str, asyncio.Lock] = {}
+        # feed_key -> (update ids, oldest possible time of the last update, last query time)
+        self._live_order_book_updates: Dict[str, Tuple[Any, float, float]] = {}
+        self._live_order_book_subscriptions: Set[str] = set()
+        self.order_book_metrics = {"live_hits": 0, "snapshot_hits": 0, "rest_fetches": 0}
+
+        # Cached, coalesced last traded prices
+        self.price_service = PriceService(self._fetch_last_traded_prices, ttl=price_cache_ttl)
+
+        # Streaming subscribers per feed key
+        self.candles_stream_interval = candles_stream_interval
+        self._feed_subscribers: Dict[str, int] = {}
+
+        self.candles_store = candles_store
         
         # Registry of cleanup functions for different feed types
         self._cleanup_functions: Dict[FeedType, Callable] = {
@@ -94,6 +136,100 @@ class MarketDataFeedManager:
         
         self.logger.debug(f"Accessed candle feed: {feed_key}")
         return feed
+
+    async def get_historical_candles(self, config: HistoricalCandlesConfig):
+        """
+        Get historical candles, from the candles store when configured.
+
+        Args:
+            config: HistoricalCandlesConfig with connector, trading pair, interval, start and end time
+
+        Returns:
+            DataFrame of candles
+        """
+        candles_config = CandlesConfig(connector=config.connector_name, trading_pair=config.trading_pair,
+                                       interval=config.interval)
+        candles_feed = self.get_candles_feed(candles_config)
+        if self.candles_store is None:
+            return await candles_feed.get_historical_candles(config=config)
+
+        async def fetch(start_time: int, end_time: int):
+            return await candles_feed.get_historical_candles(config=HistoricalCandlesConfig(
+                connector_name=config.connector_name, trading_pair=config.trading_pair, interval=config.interval,
+                start_time=start_time, end_time=end_time))
+
+        return await self.candles_store.get_candles(
+            config.connector_name, config.trading_pair, config.interval, config.start_time, config.end_time, fetch
+        )
+
+    async def stream_candles(self, config: CandlesConfig) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream a candles feed: the current window once, then only new or updated candles.
+
+        The feed's last access time is refreshed on every check while the stream is consumed, so it is not
+        cleaned up under a connected subscriber.
+
+        Args:
+            config: CandlesConfig for the desired feed (max_records bounds the initial window)
+
+        Yields:
+            {"type": "snapshot", "candles": [...]} once, then {"type": "update", "candles": [...]} whenever
+            candles were added or the latest one changed
+        """
+        feed_key = self._generate_feed_key(FeedType.CANDLES, config.connector, config.trading_pair, config.interval)
+        feed = self.get_candles_feed(config)
+        self._feed_subscribers[feed_key] = self._feed_subscribers.get(feed_key, 0) + 1
+        try:
+            while not feed.ready:
+                await asyncio.sleep(0.1)
+                self.last_access_times[feed_key] = time.time()
+
+            candles = self._candle_records(feed.candles_df, config.max_records)
+            yield {"type": "snapshot", "candles": candles}
+            last_candle = candles[-1] if candles else None
+
+            while True:
+                await asyncio.sleep(self.candles_stream_interval)
+                self.last_access_times[feed_key] = time.time()
+                changes = self._candle_changes(feed.candles_df, last_candle, config.max_records)
+                if changes:
+                    last_candle = changes[-1]
+                    yield {"type": "update", "candles": changes}
+        finally:
+            self._feed_subscribers[feed_key] -= 1
+            if not self._feed_subscribers[feed_key]:
+                del self._feed_subscribers[feed_key]
+            if feed_key in self.last_access_times:
+                self.last_access_times[feed_key] = time.time()
+
+    @staticmethod
+    def _to_records(df) -> List[Dict[str, Any]]:
+        """Candle rows as dicts, with NaN values as None so unchanged candles compare equal."""
+        return [
+            {key: None if isinstance(value, float) and math.isnan(value) else value for key, value in record.items()}
+            for record in df.to_dict(orient="records")
+        ]
+
+    @staticmethod
+    def _candle_records(df, max_records: int) -> List[Dict[str, Any]]:
+        if df is None or df.empty:
+            return []
+        df = df.tail(max_records).drop_duplicates(subset=["timestamp"], keep="last")
+        return MarketDataFeedManager._to_records(df)
+
+    @staticmethod
+    def _candle_changes(df, last_candle: Optional[Dict[str, Any]], max_records: int) -> List[Dict[str, Any]]:
+        """Candles newer than `last_candle`, preceded by the last candle itself if its values changed."""
+        if last_candle is None:
+            return MarketDataFeedManager._candle_records(df, max_records)
+        if df is None or df.empty:
+            return []
+        recent = df[df["timestamp"] >= last_candle["timestamp"]].tail(max_records)
+        recent = recent.drop_duplicates(subset=["timestamp"], keep="last")
+        return [
+            candle for candle in MarketDataFeedManager._to_records(recent)
+            if candle["timestamp"] > last_candle["timestamp"] or candle != last_candle
+        ]
     
     def get_candles_df(self, connector_name: str, trading_pair: str, interval: str, max_records: int = 500):
         """
@@ -251,21 +387,39 @@ class MarketDataFeedManager:
             Dictionary mapping trading pairs to their current prices
         """
         try:
-            # Access connector through MarketDataProvider's _non_trading_connectors LazyDict
-            connector = self.market_data_provider._non_trading_connectors[connector_name]
-
-            # Get last traded prices
-            prices = await connector.get_last_traded_prices(trading_pairs)
-            
-            # Convert Decimal to float for JSON serialization
-            result = {pair: float(price) for pair, price in prices.items()}
-            
+            result = await self.price_service.get_prices(connector_name, trading_pairs)
             self.logger.debug(f"Retrieved prices for {connector_name}: {len(result)} pairs")
             return result
             
         except Exception as e:
             self.logger.error(f"Error getting prices for {connector_name}: {e}")
             return {"error": str(e)}
+
+    async def get_prices_batch(self, requests: Dict[str, List[str]]) -> Tuple[Dict[str, Dict[str, float]], Dict[str, str]]:
+        """
+        Get current prices from several connectors in parallel.
+
+        Args:
+            requests: Mapping of connector name to the trading pairs to get prices for
+
+        Returns:
+            Tuple of (prices per connector, error message per connector that failed)
+        """
+        return await self.price_service.get_prices_batch(requests)
+
+    def get_price_cache_metrics(self) -> Dict:
+        """Get hit, coalescing and exchange request counters of the price cache."""
+        return self.price_service.get_metrics()
+
+    async def _fetch_last_traded_prices(self, connector_name: str, trading_pairs: List[str]) -> Dict[str, float]:
+        # Access connector through MarketDataProvider's _non_trading_connectors LazyDict
+        connector = self.market_data_provider._non_trading_connectors[connector_name]
+
+        # Get last traded prices
+        prices = await connector.get_last_traded_prices(trading_pairs)
+
+        # Convert Decimal to float for JSON serialization
+        return {pair: float(price) for pair, price in prices.items()}
     
     async def get_funding_info(self, connector_name: str, trading_pair: str) -> Dict:
         """
@@ -322,15 +476,9 @@ class MarketDataFeedManager:
             Dictionary containing bid and ask data
         """
         try:
-            # Access connector through MarketDataProvider's _non_trading_connectors LazyDict
-            connector = self.market_data_provider._non_trading_connectors[connector_name]
-            
-            # Access the order book data source
-            if hasattr(connector, '_orderbook_ds') and connector._orderbook_ds:
-                orderbook_ds = connector._orderbook_ds
-                
-                # Get new order book using the data source method
-                order_book = await orderbook_ds.get_new_order_book(trading_pair)
+            # Live order book, or a recent REST snapshot
+            order_book = await self._get_query_order_book(connector_name, trading_pair)
+            if order_book is not None:
                 snapshot = order_book.snapshot
                 
                 result = {
@@ -351,7 +499,7 @@ class MarketDataFeedManager:
     
     async def get_order_book_query_result(self, connector_name: str, trading_pair: str, is_buy: bool, **kwargs) -> Dict:
         """
-        Generic method for order book queries using fresh OrderBook from data source.
+        Generic method for order book queries using the live or a recent OrderBook (see `_get_query_order_book`).
         
         Args:
             connector_name: Name of the connector
@@ -365,16 +513,9 @@ class MarketDataFeedManager:
         try:
             current_time = time.time()
             
-            # Access connector through MarketDataProvider's _non_trading_connectors LazyDict
-            connector = self.market_data_provider._non_trading_connectors[connector_name]
-            
-            # Access the order book data source
-            if hasattr(connector, '_orderbook_ds') and connector._orderbook_ds:
-                orderbook_ds = connector._orderbook_ds
-                
-                # Get fresh order book using the data source method
-                order_book = await orderbook_ds.get_new_order_book(trading_pair)
-                
+            # Live order book, or a recent REST snapshot
+            order_book = await self._get_query_order_book(connector_name, trading_pair)
+            if order_book is not None:
                 if 'volume' in kwargs:
                     # Get price for volume
                     result = order_book.get_price_for_volume(is_buy, kwargs['volume'])
@@ -489,6 +630,163 @@ class MarketDataFeedManager:
             self.logger.error(f"Error in order book query for {connector_name}/{trading_pair}: {e}")
             return {"error": str(e)}
     
+    async def get_order_book_batch_query_result(self, connector_name: str, trading_pairs: List[str],
+                                                queries: List[Dict]) -> Dict:
+        """
+        Evaluate many depth queries against a single order book snapshot per trading pair.
+
+        Args:
+            connector_name: Name of the connector
+            trading_pairs: Trading pairs to query
+            queries: Dicts with query_type, is_buy and value (see OrderBookDepth.query)
+
+        Returns:
+            Dictionary with the results of every query, per trading pair
+        """
+        current_time = time.time()
+
+        async def query_pair(trading_pair: str) -> Dict:
+            try:
+                order_book = await self._get_query_order_book(connector_name, trading_pair)
+                if order_book is None:
+                    return {"trading_pair": trading_pair,
+                            "error": f"Order book data source not available for {connector_name}"}
+                depth = OrderBookDepth.from_snapshot(order_book.snapshot)
+                return {
+                    "trading_pair": trading_pair,
+                    "best_bid": depth.best_bid,
+                    "best_ask": depth.best_ask,
+                    "mid_price": depth.mid_price,
+                    "results": depth.query(queries)
+                }
+            except Exception as e:
+                self.logger.error(f"Error in batch order book query for {connector_name}/{trading_pair}: {e}")
+                return {"trading_pair": trading_pair, "error": str(e)}
+
+        results = await asyncio.gather(*(query_pair(trading_pair) for trading_pair in trading_pairs))
+        return {"connector_name": connector_name, "results": list(results), "timestamp": current_time}
+
+    async def _get_query_order_book(self, connector_name: str, trading_pair: str):
+        """
+        Get an order book to answer depth queries, tracking the order book feed for cleanup.
+
+        The live order book is used when it changed within `order_book_max_staleness` seconds. Otherwise the
+        latest REST snapshot is reused if it is at most that old, or a new one is fetched (concurrent queries
+        share one fetch). Order books are shared and must not be modified by callers.
+
+        Returns:
+            The order book, or None if the connector has no order book data source
+        """
+        feed_key = self._generate_feed_key(FeedType.ORDER_BOOK, connector_name, trading_pair)
+        now = time.time()
+        self.last_access_times[feed_key] = now
+        self.feed_configs[feed_key] = (FeedType.ORDER_BOOK, (connector_name, trading_pair))
+
+        order_book = self._get_live_order_book(feed_key, connector_name, trading_pair, now)
+        if order_book is not None:
+            self.order_book_metrics["live_hits"] += 1
+            return order_book
+
+        cached = self._order_book_snapshots.get(feed_key)
+        if cached and now - cached[0] <= self.order_book_max_staleness:
+            self.order_book_metrics["snapshot_hits"] += 1
+            return cached[1]
+
+        lock = self._order_book_locks.setdefault(feed_key, asyncio.Lock())
+        async with lock:
+            # Another query may have fetched a snapshot while we were waiting
+            cached = self._order_book_snapshots.get(feed_key)
+            if cached and time.time() - cached[0] <= self.order_book_max_staleness:
+                self.order_book_metrics["snapshot_hits"] += 1
+                return cached[1]
+
+            # Access connector through MarketDataProvider's _non_trading_connectors LazyDict
+            connector = self.market_data_provider._non_trading_connectors[connector_name]
+            if not (hasattr(connector, '_orderbook_ds') and connector._orderbook_ds):
+                return None
+
+            order_book = await connector._orderbook_ds.get_new_order_book(trading_pair)
+            self.order_book_metrics["rest_fetches"] += 1
+            if self.order_book_max_staleness > 0:
+                self._order_book_snapshots[feed_key] = (time.time(), order_book)
+            return order_book
+
+    def _get_live_order_book(self, feed_key: str, connector_name: str, trading_pair: str, now: float):
+        """
+        Get the websocket-maintained order book if it is being updated, subscribing to it on first use.
+
+        An order book counts as live once its update ids change between two queries, and stays usable while its
+        last update is at most `order_book_max_staleness` seconds old. Updates are only observed at query time,
+        so a change is dated to the previous query that still saw the old ids: the book may have stopped
+        updating right after it, and that is the oldest its last update can be.
+        """
+        if self.order_book_max_staleness <= 0:
+            return None
+        if feed_key not in self._live_order_book_subscriptions:
+            self._subscribe_live_order_book(feed_key, connector_name, trading_pair)
+
+        try:
+            order_book = self.market_data_provider.get_order_book(connector_name, trading_pair)
+        except Exception:
+            # Not tracked (yet) by the provider
+            return None
+        if order_book is None:
+            return None
+
+        update_ids = (getattr(order_book, "snapshot_uid", None), getattr(order_book, "last_diff_uid", None))
+        previous = self._live_order_book_updates.get(feed_key)
+        if previous is None:
+            # Unknown age until the book is seen changing
+            updated_at = 0.0
+        elif previous[0] != update_ids:
+            updated_at = previous[2]
+        else:
+            updated_at = previous[1]
+        self._live_order_book_updates[feed_key] = (update_ids, updated_at, now)
+
+        if now - updated_at > self.order_book_max_staleness:
+            return None
+        return order_book
+
+    def _subscribe_live_order_book(self, feed_key: str, connector_name: str, trading_pair: str):
+        """Ask the MarketDataProvider to start tracking an order book over websocket, when supported."""
+        self._live_order_book_subscriptions.add(feed_key)
+        initialize_order_book = getattr(self.market_data_provider, "initialize_order_book", None)
+        if initialize_order_book is None:
+            return
+
+        async def subscribe():
+            try:
+                result = initialize_order_book(connector_name, trading_pair)
+                if asyncio.iscoroutine(result):
+                    await result
+                self.logger.info(f"Subscribed to live order book: {feed_key}")
+            except Exception as e:
+                self.logger.warning(f"Live order book not available for {connector_name}/{trading_pair}, using REST: {e}")
+
+        asyncio.create_task(subscribe())
+
+    def get_order_book_cache_metrics(self) -> Dict:
+        """
+        Get metrics of the order book cache used by depth queries.
+
+        Returns:
+            Dictionary with hit/fetch counters and, per cached order book, its source and age
+        """
+        current_time = time.time()
+        order_books = {}
+        for feed_key, (fetched_at, _) in self._order_book_snapshots.items():
+            order_books[feed_key] = {"source": "rest", "age_seconds": round(current_time - fetched_at, 3)}
+        for feed_key, (_, updated_at, _) in self._live_order_book_updates.items():
+            if updated_at and current_time - updated_at <= self.order_book_max_staleness:
+                order_books[feed_key] = {"source": "live", "age_seconds": round(current_time - updated_at, 3)}
+        return {
+            **self.order_book_metrics,
+            "max_staleness": self.order_book_max_staleness,
+            "live_subscriptions": len(self._live_order_book_subscriptions),
+            "order_books": order_books
+        }
+
     async def _cleanup_loop(self):
         """Background task that periodically cleans up unused feeds."""
         while self._is_running:
@@ -505,8 +803,11 @@ class MarketDataFeedManager:
         """Clean up feeds that haven't been accessed within the timeout period."""
         current_time = time.time()
         feeds_to_remove = []
+        self.price_service.prune()
         
         for feed_key, last_access_time in self.last_access_times.items():
+            if self._feed_subscribers.get(feed_key):
+                continue
             if current_time - last_access_time > self.feed_timeout:
                 feeds_to_remove.append(feed_key)
         
@@ -537,10 +838,20 @@ class MarketDataFeedManager:
         self.market_data_provider.stop_candle_feed(config)
     
     def _cleanup_order_book_feed(self, config: tuple):
-        """Clean up an order book feed."""
-        # Order books are typically managed by connectors, so we might not need explicit cleanup
-        # This is a placeholder for future implementation if needed
-        pass
+        """Clean up an order book feed: drop the cached snapshot and the live order book subscription."""
+        connector_name, trading_pair = config
+        feed_key = self._generate_feed_key(FeedType.ORDER_BOOK, connector_name, trading_pair)
+        self._order_book_snapshots.pop(feed_key, None)
+        self._order_book_locks.pop(feed_key, None)
+        self._live_order_book_updates.pop(feed_key, None)
+
+        if feed_key in self._live_order_book_subscriptions:
+            self._live_order_book_subscriptions.discard(feed_key)
+            remove_order_book = getattr(self.market_data_provider, "remove_order_book", None)
+            if remove_order_book is not None:
+                result = remove_order_book(connector_name, trading_pair)
+                if asyncio.iscoroutine(result):
+                    asyncio.create_task(result)
     
     def _generate_feed_key(self, feed_type: FeedType, connector: str, trading_pair: str, interval: str = None) -> str:
         """Generate a unique key for a market data feed."""
@@ -566,6 +877,7 @@ class MarketDataFeedManager:
                 "last_access_time": last_access,
                 "seconds_since_access": current_time - last_access,
                 "will_expire_in": max(0, self.feed_timeout - (current_time - last_access)),
+                "subscribers": self._feed_subscribers.get(feed_key, 0),
                 "config": str(config)  # String representation of config
             }
         
@@ -1,9 +1,8 @@
-import asyncio
 import logging
 import math
 import time
 
-from typing import Any, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 from datetime import datetime
 from decimal import Decimal, InvalidOperation
 
@@ -16,7 +15,8 @@ from hummingbot.core.event.events import (
     MarketEvent
 )
 from hummingbot.connector.connector_base import ConnectorBase
-from database import AsyncDatabaseManager, OrderRepository, TradeRepository
+from database import AsyncDatabaseManager, Order, OrderRepository, TradeRepository
+from utils.write_behind_queue import WriteBehindQueue
 
 # Initialize logger
 logger = logging.getLogger(__name__)
@@ -26,13 +26,23 @@ class OrdersRecorder:
     """
     Custom orders recorder that mimics Hummingbot's MarketsRecorder functionality
     but uses our AsyncDatabaseManager for storage.
+
+    Events are buffered in a write-behind queue keyed by client order ID and written in batched
+    transactions, so bursts of fills do not wait on one database round trip per event.
     """
     
-    def __init__(self, db_manager: AsyncDatabaseManager, account_name: str, connector_name: str):
+    def __init__(self, db_manager: AsyncDatabaseManager, account_name: str, connector_name: str,
+                 max_batch_size: int = 200, flush_interval: float = 0.25):
         self.db_manager = db_manager
         self.account_name = account_name
         self.connector_name = connector_name
         self._connector: Optional[ConnectorBase] = None
+        self._queue = WriteBehindQueue(
+            self._flush_events,
+            name=f"orders:{account_name}/{connector_name}",
+            max_batch_size=max_batch_size,
+            flush_interval=flush_interval
+        )
         
         # Create event forwarders similar to MarketsRecorder
         self._create_order_forwarder = SourceInfoEventForwarder(self._did_create_order)
@@ -55,6 +65,7 @@ class OrdersRecorder:
     def start(self, connector: ConnectorBase):
         """Start recording orders for the given connector"""
         self._connector = connector
+        self._queue.start()
         
         # Subscribe to order events using the same pattern as MarketsRecorder
         for event, forwarder in self._event_pairs:
@@ -88,6 +99,9 @@ class OrdersRecorder:
             # Remove all event listeners
             for event, forwarder in self._event_pairs:
                 self._connector.remove_listener(event, forwarder)
+
+        # Write the events still buffered
+        await self._queue.stop()
             
         logger.info(f"OrdersRecorder stopped for {self.account_name}/{self.connector_name}")
     
@@ -103,182 +117,185 @@ class OrdersRecorder:
         # If no error message found, create a descriptive one
         return f"Order failed: {event.__class__.__name__}"
     
+    def get_metrics(self) -> Dict:
+        """Get write-behind queue depth and flush lag metrics."""
+        return self._queue.get_metrics()
+
     def _did_create_order(self, event_tag: int, market: ConnectorBase, event: Union[BuyOrderCreatedEvent, SellOrderCreatedEvent]):
         """Handle order creation events - called by SourceInfoEventForwarder"""
         logger.info(f"OrdersRecorder: _did_create_order called for order {getattr(event, 'order_id', 'unknown')}")
         try:
             # Determine trade type from event
             trade_type = TradeType.BUY if isinstance(event, BuyOrderCreatedEvent) else TradeType.SELL
-            logger.info(f"OrdersRecorder: Creating task to handle order created - {trade_type} order")
-            asyncio.create_task(self._handle_order_created(event, trade_type))
+            self._queue.put(event.order_id, (self._handle_order_created, event, trade_type))
         except Exception as e:
             logger.error(f"Error in _did_create_order: {e}")
     
     def _did_fill_order(self, event_tag: int, market: ConnectorBase, event: OrderFilledEvent):
         """Handle order fill events - called by SourceInfoEventForwarder"""
         try:
-            asyncio.create_task(self._handle_order_filled(event))
+            self._queue.put(event.order_id, (self._handle_order_filled, event))
         except Exception as e:
             logger.error(f"Error in _did_fill_order: {e}")
     
     def _did_cancel_order(self, event_tag: int, market: ConnectorBase, event: Any):
         """Handle order cancel events - called by SourceInfoEventForwarder"""
         try:
-            asyncio.create_task(self._handle_order_cancelled(event))
+            self._queue.put(event.order_id, (self._handle_order_cancelled, event))
         except Exception as e:
             logger.error(f"Error in _did_cancel_order: {e}")
     
     def _did_fail_order(self, event_tag: int, market: ConnectorBase, event: Any):
         """Handle order failure events - called by SourceInfoEventForwarder"""
         try:
-            asyncio.create_task(self._handle_order_failed(event))
+            # Capture the tracked order now: the connector may drop it before the queue is flushed
+            order_details = self._get_order_details_from_connector(event.order_id)
+            self._queue.put(event.order_id, (self._handle_order_failed, event, order_details))
         except Exception as e:
             logger.error(f"Error in _did_fail_order: {e}")
     
     def _did_complete_order(self, event_tag: int, market: ConnectorBase, event: Any):
         """Handle order completion events - called by SourceInfoEventForwarder"""
         try:
-            asyncio.create_task(self._handle_order_completed(event))
+            self._queue.put(event.order_id, (self._handle_order_completed, event))
         except Exception as e:
             logger.error(f"Error in _did_complete_order: {e}")
+
+    async def _flush_events(self, batch: List[Tuple[str, List[tuple]]]):
+        """
+        Write a batch of buffered events in one transaction.
+
+        All orders referenced by the batch are loaded with one query, then each order's events are applied
+        in arrival order.
+        """
+        async with self.db_manager.get_session_context() as session:
+            order_repo = OrderRepository(session)
+            trade_repo = TradeRepository(session)
+            orders = await order_repo.get_orders_by_client_ids([order_id for order_id, _ in batch])
+
+            for _, events in batch:
+                for handler, event, *args in events:
+                    await handler(order_repo, trade_repo, orders, event, *args)
     
-    async def _handle_order_created(self, event: Union[BuyOrderCreatedEvent, SellOrderCreatedEvent], trade_type: TradeType):
+    async def _handle_order_created(self, order_repo: OrderRepository, trade_repo: TradeRepository,
+                                    orders: Dict[str, Order],
+                                    event: Union[BuyOrderCreatedEvent, SellOrderCreatedEvent], trade_type: TradeType):
         """Handle order creation events"""
-        logger.info(f"OrdersRecorder: _handle_order_created started for order {event.order_id}")
-        try:
-            async with self.db_manager.get_session_context() as session:
-                order_repo = OrderRepository(session)
-                
-                # Check if order already exists first
-                existing_order = await order_repo.get_order_by_client_id(event.order_id)
-                if existing_order:
-                    logger.info(f"OrdersRecorder: Order {event.order_id} already exists with status {existing_order.status}")
-                    
-                    # Update exchange_order_id if we have it now and it was missing
-                    exchange_order_id = getattr(event, 'exchange_order_id', None)
-                    if exchange_order_id and not existing_order.exchange_order_id:
-                        existing_order.exchange_order_id = exchange_order_id
-                        logger.info(f"OrdersRecorder: Updated exchange_order_id to {exchange_order_id} for order {event.order_id}")
-                    
-                    # Update status if it's still in PENDING_CREATE or similar early state
-                    if existing_order.status in ["PENDING_CREATE", "PENDING", "SUBMITTED"]:
-                        existing_order.status = "OPEN"
-                        logger.info(f"OrdersRecorder: Updated status to OPEN for order {event.order_id}")
-                    
-                    await session.flush()
-                    return
-                
-                order_data = {
-                    "client_order_id": event.order_id,
-                    "account_name": self.account_name,
-                    "connector_name": self.connector_name,
-                    "trading_pair": event.trading_pair,
-                    "trade_type": trade_type.name,
-                    "order_type": event.type.name if hasattr(event, 'type') else 'UNKNOWN',
-                    "amount": float(event.amount),
-                    "price": float(event.price) if event.price else None,
-                    "status": "OPEN",
-                    "exchange_order_id": getattr(event, 'exchange_order_id', None)
-                }
-                await order_repo.create_order(order_data)
-                
-            logger.info(f"OrdersRecorder: Successfully recorded order created: {event.order_id}")
-        except Exception as e:
-            logger.error(f"OrdersRecorder: Error recording order created: {e}")
+        # Check if order already exists first
+        existing_order = orders.get(event.order_id)
+        if existing_order:
+            logger.info(f"OrdersRecorder: Order {event.order_id} already exists with status {existing_order.status}")
+
+            # Update exchange_order_id if we have it now and it was missing
+            exchange_order_id = getattr(event, 'exchange_order_id', None)
+            if exchange_order_id and not existing_order.exchange_order_id:
+                existing_order.exchange_order_id = exchange_order_id
+                logger.info(f"OrdersRecorder: Updated exchange_order_id to {exchange_order_id} for order {event.order_id}")
+
+            # Update status if it's still in PENDING_CREATE or similar early state
+            if existing_order.status in ["PENDING_CREATE", "PENDING", "SUBMITTED"]:
+                existing_order.status = "OPEN"
+                logger.info(f"OrdersRecorder: Updated status to OPEN for order {event.order_id}")
+            return
+
+        order_data = {
+            "client_order_id": event.order_id,
+            "account_name": self.account_name,
+            "connector_name": self.connector_name,
+            "trading_pair": event.trading_pair,
+            "trade_type": trade_type.name,
+            "order_type": event.type.name if hasattr(event, 'type') else 'UNKNOWN',
+            "amount": float(event.amount),
+            "price": float(event.price) if event.price else None,
+            "status": "OPEN",
+            "exchange_order_id": getattr(event, 'exchange_order_id', None)
+        }
+        orders[event.order_id] = await order_repo.create_order(order_data)
+        logger.info(f"OrdersRecorder: Successfully recorded order created: {event.order_id}")
     
-    async def _handle_order_filled(self, event: OrderFilledEvent):
+    async def _handle_order_filled(self, order_repo: OrderRepository, trade_repo: TradeRepository,
+                                   orders: Dict[str, Order], event: OrderFilledEvent):
         """Handle order fill events"""
-        try:
-            async with self.db_manager.get_session_context() as session:
-                order_repo = OrderRepository(session)
-                trade_repo = TradeRepository(session)
+        # Calculate fees
+        trade_fee_paid = 0
+        trade_fee_currency = None
 
-                # Calculate fees
+        if event.trade_fee:
+            try:
+                base_asset, quote_asset = event.trading_pair.split("-")
+                fee_in_quote = event.trade_fee.fee_amount_in_token(
+                    trading_pair=event.trading_pair,
+                    price=event.price,
+                    order_amount=event.amount,
+                    token=quote_asset,
+                    exchange=self._connector,
+                )
+                trade_fee_paid = float(fee_in_quote)
+                trade_fee_currency = quote_asset
+            except Exception as e:
+                logger.error(f"Error calculating trade fee: {e}")
                 trade_fee_paid = 0
                 trade_fee_currency = None
-                
-                if event.trade_fee:
-                    try:
-                        base_asset, quote_asset = event.trading_pair.split("-")
-                        fee_in_quote = event.trade_fee.fee_amount_in_token(
-                            trading_pair=event.trading_pair,
-                            price=event.price,
-                            order_amount=event.amount,
-                            token=quote_asset,
-                            exchange=self._connector,
-                        )
-                        trade_fee_paid = float(fee_in_quote)
-                        trade_fee_currency = quote_asset
-                    except Exception as e:
-                        logger.error(f"Error calculating trade fee: {e}")
-                        trade_fee_paid = 0
-                        trade_fee_currency = None
-                
-                # Update order with fill information (handle potential NaN values like Hummingbot does)
-                try:
-                    filled_amount = Decimal(str(event.amount))
-                    average_fill_price = Decimal(str(event.price))
-                    fee_paid_decimal = Decimal(str(trade_fee_paid)) if trade_fee_paid else None
-                    
-                    order = await order_repo.update_order_fill(
-                        client_order_id=event.order_id,
-                        filled_amount=filled_amount,
-                        average_fill_price=average_fill_price,
-                        fee_paid=fee_paid_decimal,
-                        fee_currency=trade_fee_currency
-                    )
-                except (ValueError, InvalidOperation) as e:
-                    logger.error(f"Error processing order fill for {event.order_id}: {e}, skipping update")
-                    return
-                
-                # Create trade record using validated values
-                if order:
-                    try:
-                        # Validate all values before creating trade record
-                        validated_timestamp = event.timestamp if event.timestamp and not math.isnan(event.timestamp) else time.time()
-                        validated_fee = trade_fee_paid if trade_fee_paid and not math.isnan(trade_fee_paid) else 0
 
-                        # Use exchange_trade_id if available (unique per fill), fallback to generated id
-                        exchange_trade_id = getattr(event, 'exchange_trade_id', None)
-                        if exchange_trade_id:
-                            trade_id = f"{event.order_id}_{exchange_trade_id}"
-                        else:
-                            # Fallback: include amount to differentiate partial fills at same timestamp
-                            trade_id = f"{event.order_id}_{validated_timestamp}_{float(filled_amount)}"
+        # Update order with fill information (handle potential NaN values like Hummingbot does)
+        order = orders.get(event.order_id)
+        try:
+            filled_amount = Decimal(str(event.amount))
+            average_fill_price = Decimal(str(event.price))
+            fee_paid_decimal = Decimal(str(trade_fee_paid)) if trade_fee_paid else None
 
-                        trade_data = {
-                            "order_id": order.id,
-                            "trade_id": trade_id,
-                            "timestamp": datetime.fromtimestamp(validated_timestamp),
-                            "trading_pair": event.trading_pair,
-                            "trade_type": event.trade_type.name,
-                            "amount": float(filled_amount),  # Use validated amount
-                            "price": float(average_fill_price),  # Use validated price
-                            "fee_paid": validated_fee,
-                            "fee_currency": trade_fee_currency
-                        }
-                        await trade_repo.create_trade(trade_data)
-                    except (ValueError, TypeError) as e:
-                        logger.error(f"Error creating trade record for {event.order_id}: {e}")
-                        logger.error(f"Trade data that failed: timestamp={event.timestamp}, amount={event.amount}, price={event.price}, fee={trade_fee_paid}")
-                
-            logger.debug(f"Recorded order fill: {event.order_id} - {event.amount} @ {event.price}")
-        except Exception as e:
-            logger.error(f"Error recording order fill: {e}")
+            if order:
+                order_repo.apply_order_fill(
+                    order,
+                    filled_amount=filled_amount,
+                    average_fill_price=average_fill_price,
+                    fee_paid=fee_paid_decimal,
+                    fee_currency=trade_fee_currency
+                )
+        except (ValueError, InvalidOperation) as e:
+            logger.error(f"Error processing order fill for {event.order_id}: {e}, skipping update")
+            return
+
+        # Create trade record using validated values
+        if order:
+            try:
+                # Validate all values before creating trade record
+                validated_timestamp = event.timestamp if event.timestamp and not math.isnan(event.timestamp) else time.time()
+                validated_fee = trade_fee_paid if trade_fee_paid and not math.isnan(trade_fee_paid) else 0
+
+                # Use exchange_trade_id if available (unique per fill), fallback to generated id
+                exchange_trade_id = getattr(event, 'exchange_trade_id', None)
+                if exchange_trade_id:
+                    trade_id = f"{event.order_id}_{exchange_trade_id}"
+                else:
+                    # Fallback: include amount to differentiate partial fills at same timestamp
+                    trade_id = f"{event.order_id}_{validated_timestamp}_{float(filled_amount)}"
+
+                trade_data = {
+                    "order_id": order.id,
+                    "trade_id": trade_id,
+                    "timestamp": datetime.fromtimestamp(validated_timestamp),
+                    "trading_pair": event.trading_pair,
+                    "trade_type": event.trade_type.name,
+                    "amount": float(filled_amount),  # Use validated amount
+                    "price": float(average_fill_price),  # Use validated price
+                    "fee_paid": validated_fee,
+                    "fee_currency": trade_fee_currency
+                }
+                await trade_repo.create_trade(trade_data)
+            except (ValueError, TypeError) as e:
+                logger.error(f"Error creating trade record for {event.order_id}: {e}")
+                logger.error(f"Trade data that failed: timestamp={event.timestamp}, amount={event.amount}, price={event.price}, fee={trade_fee_paid}")
+
+        logger.debug(f"Recorded order fill: {event.order_id} - {event.amount} @ {event.price}")
     
-    async def _handle_order_cancelled(self, event: Any):
+    async def _handle_order_cancelled(self, order_repo: OrderRepository, trade_repo: TradeRepository,
+                                      orders: Dict[str, Order], event: Any):
         """Handle order cancellation events"""
-        try:
-            async with self.db_manager.get_session_context() as session:
-                order_repo = OrderRepository(session)
-                await order_repo.update_order_status(
-                    client_order_id=event.order_id,
-                    status="CANCELLED"
-                )
-                    
-            logger.debug(f"Recorded order cancelled: {event.order_id}")
-        except Exception as e:
-            logger.error(f"Error recording order cancellation: {e}")
+        order = orders.get(event.order_id)
+        if order:
+            order.status = "CANCELLED"
+        logger.debug(f"Recorded order cancelled: {event.order_id}")
     
     def _get_order_details_from_connector(self, order_id: str) -> Optional[dict]:
         """Try to get order details from connector's tracked orders"""
@@ -297,88 +314,58 @@ class OrdersRecorder:
             logger.error(f"Error getting order details from connector: {e}")
         return None
     
-    async def _handle_order_failed(self, event: Any):
+    async def _handle_order_failed(self, order_repo: OrderRepository, trade_repo: TradeRepository,
+                                   orders: Dict[str, Order], event: Any, order_details: Optional[dict] = None):
         """Handle order failure events"""
-        try:
-            async with self.db_manager.get_session_context() as session:
-                order_repo = OrderRepository(session)
-                
-                # Check if order exists, if not try to get details from connector's tracked orders
-                existing_order = await order_repo.get_order_by_client_id(event.order_id)
-                if existing_order:
-                    # Extract error message from various possible attributes
-                    error_msg = self._extract_error_message(event)
-                    
-                    # Update existing order with failure status and error message
-                    await order_repo.update_order_status(
-                        client_order_id=event.order_id,
-                        status="FAILED",
-                        error_message=error_msg
-                    )
-                    logger.info(f"Updated existing order {event.order_id} to FAILED status")
-                else:
-                    # Try to get order details from connector's tracked orders
-                    order_details = self._get_order_details_from_connector(event.order_id)
-                    if order_details:
-                        logger.info(f"Retrieved order details from connector for {event.order_id}: {order_details}")
-                    
-                    # Create order record as FAILED with available details
-                    if order_details:
-                        order_data = {
-                            "client_order_id": event.order_id,
-                            "account_name": self.account_name,
-                            "connector_name": self.connector_name,
-                            "trading_pair": order_details["trading_pair"],
-                            "trade_type": order_details["trade_type"],
-                            "order_type": order_details["order_type"],
-                            "amount": order_details["amount"],
-                            "price": order_details["price"],
-                            "status": "FAILED",
-                            "error_message": self._extract_error_message(event)
-                        }
-                    else:
-                        # Fallback with minimal details
-                        order_data = {
-                            "client_order_id": event.order_id,
-                            "account_name": self.account_name,
-                            "connector_name": self.connector_name,
-                            "trading_pair": "UNKNOWN",
-                            "trade_type": "UNKNOWN", 
-                            "order_type": "UNKNOWN",
-                            "amount": 0.0,
-                            "price": None,
-                            "status": "FAILED",
-                            "error_message": self._extract_error_message(event)
-                        }
-                    
-                    try:
-                        await order_repo.create_order(order_data)
-                        logger.info(f"Created failed order record for {event.order_id}")
-                    except Exception as create_error:
-                        # If creation fails due to duplicate key, try to update existing order
-                        if "duplicate key" in str(create_error).lower() or "unique constraint" in str(create_error).lower():
-                            logger.info(f"Order {event.order_id} already exists, updating status to FAILED")
-                            await order_repo.update_order_status(
-                                client_order_id=event.order_id,
-                                status="FAILED",
-                                error_message=self._extract_error_message(event)
-                            )
-                        else:
-                            raise create_error
-                    
-        except Exception as e:
-            logger.error(f"Error recording order failure: {e}")
+        # Extract error message from various possible attributes
+        error_msg = self._extract_error_message(event)
+
+        existing_order = orders.get(event.order_id)
+        if existing_order:
+            # Update existing order with failure status and error message
+            existing_order.status = "FAILED"
+            existing_order.error_message = error_msg
+            logger.info(f"Updated existing order {event.order_id} to FAILED status")
+            return
+
+        # Create order record as FAILED with the details tracked by the connector when the event fired
+        if order_details:
+            logger.info(f"Retrieved order details from connector for {event.order_id}: {order_details}")
+            order_data = {
+                "client_order_id": event.order_id,
+                "account_name": self.account_name,
+                "connector_name": self.connector_name,
+                "trading_pair": order_details["trading_pair"],
+                "trade_type": order_details["trade_type"],
+                "order_type": order_details["order_type"],
+                "amount": order_details["amount"],
+                "price": order_details["price"],
+                "status": "FAILED",
+                "error_message": error_msg
+            }
+        else:
+            # Fallback with minimal details
+            order_data = {
+                "client_order_id": event.order_id,
+                "account_name": self.account_name,
+                "connector_name": self.connector_name,
+                "trading_pair": "UNKNOWN",
+                "trade_type": "UNKNOWN",
+                "order_type": "UNKNOWN",
+                "amount": 0.0,
+                "price": None,
+                "status": "FAILED",
+                "error_message": error_msg
+            }
+
+        orders[event.order_id] = await order_repo.create_order(order_data)
+        logger.info(f"Created failed order record for {event.order_id}")
     
-    async def _handle_order_completed(self, event: Any):
+    async def _handle_order_completed(self, order_repo: OrderRepository, trade_repo: TradeRepository,
+                                      orders: Dict[str, Order], event: Any):
         """Handle order completion events"""
-        try:
-            async with self.db_manager.get_session_context() as session:
-                order_repo = OrderRepository(session)
-                order = await order_repo.get_order_by_client_id(event.order_id)
-                if order:
-                    order.status = "FILLED"
-                    order.exchange_order_id = getattr(event, 'exchange_order_id', None)
-                    
-            logger.debug(f"Recorded order completed: {event.order_id}")
-        except Exception as e:
-            logger.error(f"Error recording order completion: {e}")
\ No newline at end of file
+        order = orders.get(event.order_id)
+        if order:
+            order.status = "FILLED"
+            order.exchange_order_id = getattr(event, 'exchange_order_id', None)
+        logger.debug(f"Recorded order completed: {event.order_id}")
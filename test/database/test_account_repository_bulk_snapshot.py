@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from database.models import AccountState, Base, TokenState
+from database.repositories.account_repository import AccountRepository
+
+
+def _token(token: str, units: float, price: float) -> dict:
+    return {"token": token, "units": units, "price": price, "value": units * price, "available_units": units}
+
+
+@pytest.mark.asyncio
+async def test_save_account_snapshot_writes_all_rows_with_shared_timestamp():
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    Session = async_sessionmaker(engine, expire_on_commit=False)
+    now = datetime(2026, 2, 7, tzinfo=timezone.utc)
+    accounts_state = {
+        "acc-1": {
+            "binance": [_token("BTC", 1, 50000), _token("USDT", 100, 1)],
+            "kucoin": [],
+        },
+        "acc-2": {
+            "okx": [_token("ETH", 2, 3000)],
+        },
+    }
+
+    async with Session() as session:
+        repo = AccountRepository(session)
+        rows = await repo.save_account_snapshot(accounts_state, now)
+
+        assert rows == {"account_states": 2, "token_states": 3}
+        assert await session.scalar(select(func.count()).select_from(AccountState)) == 2
+        assert await session.scalar(select(func.count(func.distinct(AccountState.timestamp)))) == 1
+
+        latest = await repo.get_latest_account_states()
+        assert set(latest) == {"acc-1", "acc-2"}
+        assert {t["token"] for t in latest["acc-1"]["binance"]} == {"BTC", "USDT"}
+        assert latest["acc-2"]["okx"][0]["value"] == 6000
+
+        eth = (await session.execute(select(TokenState).where(TokenState.token == "ETH"))).scalar_one()
+        assert float(eth.units) == 2
+
+
+@pytest.mark.asyncio
+async def test_save_account_snapshot_with_no_tokens_is_a_noop():
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    Session = async_sessionmaker(engine, expire_on_commit=False)
+
+    async with Session() as session:
+        repo = AccountRepository(session)
+        rows = await repo.save_account_snapshot({"acc": {"binance": []}}, datetime.now(timezone.utc))
+
+        assert rows == {"account_states": 0, "token_states": 0}
+        assert await session.scalar(select(func.count()).select_from(AccountState)) == 0
+
+
+@pytest.mark.asyncio
+async def test_current_state_queries_read_latest_snapshot_only():
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    Session = async_sessionmaker(engine, expire_on_commit=False)
+    now = datetime(2026, 2, 7, tzinfo=timezone.utc)
+
+    async with Session() as session:
+        repo = AccountRepository(session)
+        await repo.save_account_snapshot(
+            {
+                "acc-1": {"binance": [_token("BTC", 1, 50000), _token("USDT", 100, 1)]},
+                "acc-2": {"okx": [_token("BTC", 1, 50000)]},
+            },
+            now - timedelta(minutes=10),
+        )
+        # Newer snapshot drops USDT from binance; okx is not part of it
+        await repo.save_account_snapshot({"acc-1": {"binance": [_token("BTC", 2, 50000)]}}, now)
+        # A late, older snapshot must not replace the newer one
+        await repo.save_account_snapshot({"acc-1": {"binance": [_token("ETH", 1, 3000)]}}, now - timedelta(minutes=5))
+        await session.commit()
+
+        assert await repo.get_account_current_state("acc-1") == {
+            "binance": [{"token": "BTC", "units": 2.0, "price": 50000.0, "value": 100000.0, "available_units": 2.0}]
+        }
+        assert [t["token"] for t in await repo.get_connector_current_state("acc-2", "okx")] == ["BTC"]
+        assert {(s["account_name"], s["units"]) for s in await repo.get_token_current_state("BTC")} == {
+            ("acc-1", 2.0), ("acc-2", 1.0)
+        }
+        assert await repo.get_token_current_state("USDT") == []
+        assert await repo.get_portfolio_value() == {"accounts": {"acc-1": 100000.0, "acc-2": 50000.0}, "total_value": 150000.0}
+        assert (await repo.get_portfolio_value("acc-2"))["total_value"] == 50000.0
+
+        rebuilt = await repo.rebuild_latest_account_states()
+        assert rebuilt == 2
+        assert set(await repo.get_latest_account_states()) == {"acc-1", "acc-2"}
+
+
+@pytest.mark.asyncio
+async def test_save_account_snapshot_survives_state_changes_during_writes():
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    Session = async_sessionmaker(engine, expire_on_commit=False)
+    now = datetime(2026, 2, 7, tzinfo=timezone.utc)
+    accounts_state = {"acc-1": {"binance": [_token("BTC", 1, 50000)], "okx": [_token("ETH", 2, 3000)]}}
+
+    async with Session() as session:
+        execute = session.execute
+
+        async def execute_while_connector_is_removed(*args, **kwargs):
+            # Like _remove_connector_state running while the snapshot awaits the database
+            accounts_state["acc-1"].pop("okx", None)
+            return await execute(*args, **kwargs)
+
+        session.execute = execute_while_connector_is_removed
+        rows = await AccountRepository(session).save_account_snapshot(accounts_state, now)
+        session.execute = execute
+
+        assert rows == {"account_states": 2, "token_states": 2}
+        latest = await AccountRepository(session).get_latest_account_states()
+        assert latest["acc-1"]["okx"][0]["token"] == "ETH"
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from database.models import Base, Order
+from database.repositories.order_repository import OrderRepository
+
+
+def _order(client_order_id: str, status: str = "SUBMITTED") -> dict:
+    return {
+        "client_order_id": client_order_id,
+        "account_name": "acc-1",
+        "connector_name": "binance",
+        "trading_pair": "BTC-USDT",
+        "trade_type": "BUY",
+        "order_type": "LIMIT",
+        "amount": 1,
+        "price": 100,
+        "status": status,
+    }
+
+
+@pytest.mark.asyncio
+async def test_bulk_status_sync_loads_and_updates_in_batches(monkeypatch):
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    Session = async_sessionmaker(engine, expire_on_commit=False)
+    monkeypatch.setattr(OrderRepository, "BATCH_SIZE", 2)
+
+    async with Session() as session:
+        repo = OrderRepository(session)
+        for i in range(5):
+            await repo.create_order(_order(f"order-{i}", "OPEN" if i % 2 else "SUBMITTED"))
+        await session.commit()
+
+    async with Session() as session:
+        repo = OrderRepository(session)
+        statuses = await repo.get_order_statuses([f"order-{i}" for i in range(5)] + ["unknown"])
+        assert statuses == {
+            "order-0": "SUBMITTED",
+            "order-1": "OPEN",
+            "order-2": "SUBMITTED",
+            "order-3": "OPEN",
+            "order-4": "SUBMITTED",
+        }
+
+        updated = await repo.bulk_update_order_status({
+            "order-0": "FILLED",
+            "order-1": "CANCELLED",
+            "order-4": "OPEN",
+            "unknown": "FILLED",
+        })
+        await session.commit()
+        assert updated == 3
+
+    async with Session() as session:
+        result = await session.execute(select(Order.client_order_id, Order.status).order_by(Order.client_order_id))
+        assert dict(result.all()) == {
+            "order-0": "FILLED",
+            "order-1": "CANCELLED",
+            "order-2": "SUBMITTED",
+            "order-3": "OPEN",
+            "order-4": "OPEN",
+        }
+
+    await engine.dispose()
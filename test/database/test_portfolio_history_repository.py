@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from database.models import Base, PortfolioHistoryBucket
+from database.repositories.account_repository import AccountRepository
+from database.repositories.portfolio_history_repository import PortfolioHistoryRepository
+
+
+def _state(value: float) -> dict:
+    return {"acc": {"binance": [{"token": "USDT", "units": value, "price": 1, "value": value, "available_units": value}]}}
+
+
+async def _session_factory():
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    return async_sessionmaker(engine, expire_on_commit=False)
+
+
+@pytest.mark.asyncio
+async def test_history_returns_latest_snapshot_per_bucket():
+    Session = await _session_factory()
+    start = datetime(2026, 2, 7, tzinfo=timezone.utc)
+
+    async with Session() as session:
+        repo = PortfolioHistoryRepository(session)
+        # 12 hours of 5 minute snapshots, value encodes the snapshot index
+        for i in range(144):
+            await repo.record_snapshot(_state(i), start + timedelta(minutes=5 * i))
+        await session.commit()
+
+        hourly, next_cursor, has_more = await repo.get_history(limit=3, interval="1h")
+        assert [item["timestamp"] for item in hourly] == [
+            (start + timedelta(hours=h)).isoformat() for h in (11, 10, 9)
+        ]
+        assert [item["state"]["acc"]["binance"][0]["value"] for item in hourly] == [143, 131, 119]
+        assert has_more is True
+        assert next_cursor == hourly[-1]["timestamp"]
+
+        next_page, _, _ = await repo.get_history(limit=3, interval="1h", cursor=next_cursor)
+        assert next_page[0]["timestamp"] == (start + timedelta(hours=8)).isoformat()
+
+        four_hourly, _, has_more = await repo.get_history(limit=10, interval="4h")
+        assert [item["state"]["acc"]["binance"][0]["value"] for item in four_hourly] == [143, 95, 47]
+        assert has_more is False
+
+        fifteen, _, _ = await repo.get_history(limit=2, interval="15m")
+        assert [item["state"]["acc"]["binance"][0]["value"] for item in fifteen] == [143, 140]
+
+
+@pytest.mark.asyncio
+async def test_history_keeps_newer_snapshot_when_older_one_arrives_late():
+    Session = await _session_factory()
+    now = datetime(2026, 2, 7, 10, 30, tzinfo=timezone.utc)
+
+    async with Session() as session:
+        repo = PortfolioHistoryRepository(session)
+        await repo.record_snapshot(_state(2), now)
+        await repo.record_snapshot(_state(1), now - timedelta(minutes=10))
+        await session.commit()
+
+        daily, _, _ = await repo.get_history(interval="1d")
+        assert len(daily) == 1
+        assert daily[0]["state"]["acc"]["binance"] == [
+            {"token": "USDT", "units": 2.0, "price": 1.0, "value": 2.0, "available_units": 2.0}
+        ]
+        # The late snapshot only gets its own 5m bucket, no stale rows next to the newer 1h and 1d ones
+        row_count = await session.scalar(select(func.count()).select_from(PortfolioHistoryBucket))
+        assert row_count == 4
+
+
+@pytest.mark.asyncio
+async def test_backfill_rolls_raw_account_states_into_buckets():
+    Session = await _session_factory()
+    start = datetime(2026, 2, 7, tzinfo=timezone.utc)
+
+    async with Session() as session:
+        account_repo = AccountRepository(session)
+        for i in range(6):
+            await account_repo.save_account_snapshot(_state(i), start + timedelta(minutes=30 * i))
+        await session.commit()
+
+        repo = PortfolioHistoryRepository(session)
+        assert await repo.has_data() is False
+
+        last_id = 0
+        while (next_id := await repo.backfill_from_account_states(last_id, batch_size=4)) is not None:
+            last_id = next_id
+        await session.commit()
+
+        hourly, _, _ = await repo.get_history(interval="1h")
+        assert [item["state"]["acc"]["binance"][0]["value"] for item in hourly] == [5, 3, 1]
+
+
+@pytest.mark.asyncio
+async def test_backfill_progress_resumes_after_interruption():
+    Session = await _session_factory()
+    start = datetime(2026, 2, 7, tzinfo=timezone.utc)
+
+    async with Session() as session:
+        account_repo = AccountRepository(session)
+        for i in range(6):
+            await account_repo.save_account_snapshot(_state(i), start + timedelta(minutes=30 * i))
+        await session.commit()
+
+        repo = PortfolioHistoryRepository(session)
+        assert await repo.get_backfill_progress() == (0, False)
+
+        # Interrupted after the first batch, while a live snapshot lands in the buckets
+        last_id = await repo.backfill_from_account_states(0, batch_size=2)
+        await repo.save_backfill_progress(last_id)
+        await repo.record_snapshot(_state(99), start + timedelta(hours=5))
+        await session.commit()
+        assert await repo.get_backfill_progress() == (last_id, False)
+
+        last_id, _ = await repo.get_backfill_progress()
+        while (next_id := await repo.backfill_from_account_states(last_id, batch_size=2)) is not None:
+            last_id = next_id
+        await repo.save_backfill_progress(last_id, completed=True)
+        await session.commit()
+        assert await repo.get_backfill_progress() == (last_id, True)
+
+        hourly, _, _ = await repo.get_history(interval="1h")
+        assert [item["state"]["acc"]["binance"][0]["value"] for item in hourly] == [99, 5, 3, 1]
+
+
+@pytest.mark.asyncio
+async def test_history_falls_back_to_coarser_resolution_past_pruning_horizon():
+    Session = await _session_factory()
+    start = datetime(2026, 2, 7, tzinfo=timezone.utc)
+
+    async with Session() as session:
+        repo = PortfolioHistoryRepository(session)
+        # 4 days of 4 hour snapshots, value encodes the snapshot index
+        for i in range(24):
+            await repo.record_snapshot(_state(i), start + timedelta(hours=4 * i))
+        await session.commit()
+
+        # Prune the 1h buckets of the first two days, as the compactor does past its hourly horizon
+        await repo.delete_buckets_before(start + timedelta(days=2), limit=1000, resolution="1h")
+        await session.commit()
+
+        four_hourly, _, _ = await repo.get_history(limit=100, interval="4h")
+        assert [item["state"]["acc"]["binance"][0]["value"] for item in four_hourly] == list(range(23, 11, -1)) + [11, 5]
+        assert [item["timestamp"] for item in four_hourly[-2:]] == [
+            (start + timedelta(days=1)).isoformat(),
+            start.isoformat(),
+        ]
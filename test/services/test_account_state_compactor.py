@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import importlib.util
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from database.models import AccountState, Base, TokenState
+from database.repositories.account_repository import AccountRepository
+
+
+def _load_compaction_service_class():
+    # Load the module directly so services/__init__ (and its hummingbot imports) is not required.
+    repo_root = Path(__file__).resolve().parents[2]
+    module_path = repo_root / "services" / "account_state_compactor.py"
+    spec = importlib.util.spec_from_file_location("account_state_compactor", module_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.AccountStateCompactionService
+
+
+AccountStateCompactionService = _load_compaction_service_class()
+
+
+class _SqliteDatabaseManager:
+    def __init__(self, session_factory):
+        self._session_factory = session_factory
+
+    @asynccontextmanager
+    async def get_session_context(self):
+        async with self._session_factory() as session:
+            try:
+                yield session
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                raise
+
+
+async def _seed(days: int, now: datetime) -> _SqliteDatabaseManager:
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    Session = async_sessionmaker(engine, expire_on_commit=False)
+
+    token = {"token": "USDT", "units": 1, "price": 1, "value": 1, "available_units": 1}
+    async with Session() as session:
+        repo = AccountRepository(session)
+        for i in range(days * 24 * 4):
+            timestamp = now - timedelta(minutes=15 * (i + 1))
+            await repo.save_account_snapshot({"acc": {"binance": [token], "okx": [token]}}, timestamp)
+        await session.commit()
+    return _SqliteDatabaseManager(Session)
+
+
+async def _timestamps(db_manager, connector_name: str):
+    async with db_manager.get_session_context() as session:
+        result = await session.execute(
+            select(AccountState.timestamp)
+            .where(AccountState.connector_name == connector_name)
+            .order_by(AccountState.timestamp)
+        )
+        return [ts.replace(tzinfo=timezone.utc) for ts in result.scalars().all()]
+
+
+@pytest.mark.asyncio
+async def test_compaction_downsamples_by_age_tier():
+    now = datetime(2026, 2, 10, tzinfo=timezone.utc)
+    db_manager = await _seed(days=6, now=now)
+    compactor = AccountStateCompactionService(
+        db_manager, full_resolution_days=1, hourly_resolution_days=3, batch_size=50
+    )
+
+    await compactor.run_compaction(now=now)
+
+    timestamps = await _timestamps(db_manager, "binance")
+    recent = [ts for ts in timestamps if ts >= now - timedelta(days=1)]
+    hourly = [ts for ts in timestamps if now - timedelta(days=3) <= ts < now - timedelta(days=1)]
+    daily = [ts for ts in timestamps if ts < now - timedelta(days=3)]
+
+    assert len(recent) == 24 * 4
+    assert len(hourly) == 2 * 24
+    assert all(ts.minute == 45 for ts in hourly)
+    assert len(daily) == 3
+    assert all((ts.hour, ts.minute) == (23, 45) for ts in daily)
+    assert len(await _timestamps(db_manager, "okx")) == len(timestamps)
+
+    async with db_manager.get_session_context() as session:
+        assert await session.scalar(select(func.count()).select_from(TokenState)) == 2 * len(timestamps)
+
+    metrics = compactor.get_metrics()
+    assert metrics["running"] is False
+    assert metrics["runs"] == 1
+    assert metrics["last_run_account_states_deleted"] == 2 * (6 * 24 * 4 - len(timestamps))
+    assert metrics["last_run_token_states_deleted"] == metrics["last_run_account_states_deleted"]
+
+    await compactor.run_compaction(now=now)
+    assert compactor.get_metrics()["last_run_account_states_deleted"] == 0
+
+
+@pytest.mark.asyncio
+async def test_compaction_expires_snapshots_past_retention():
+    now = datetime(2026, 2, 10, tzinfo=timezone.utc)
+    db_manager = await _seed(days=4, now=now)
+    compactor = AccountStateCompactionService(
+        db_manager, full_resolution_days=1, hourly_resolution_days=2, retention_days=3, batch_size=100
+    )
+
+    await compactor.run_compaction(now=now)
+
+    timestamps = await _timestamps(db_manager, "binance")
+    assert min(timestamps) >= now - timedelta(days=3)
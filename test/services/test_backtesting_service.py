@@ -0,0 +1,294 @@
+import asyncio
+import importlib.util
+import json
+import multiprocessing  # noqa: F401 - imported before patch.dict(sys.modules) so it is not unloaded afterwards
+import os
+import sys
+import time
+import types
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from utils.backtest_result_cache import BacktestResultCache
+
+
+_CLOSED_RANGE = {"start_time": 1735689600, "end_time": 1738368000, "backtesting_resolution": "1m", "trade_cost": 0.0006}
+
+
+def _load_backtesting_service_module():
+    """Load `services/backtesting_service.py` without the hummingbot-dependent worker module."""
+    worker_stub = types.ModuleType("utils.backtesting_worker")
+    worker_stub.run_backtesting_job = None
+    repo_root = Path(__file__).resolve().parents[2]
+    module_path = repo_root / "services" / "backtesting_service.py"
+    spec = importlib.util.spec_from_file_location("backtesting_service_under_test", module_path)
+    assert spec and spec.loader
+    module = importlib.util.module_from_spec(spec)
+    with patch.dict(sys.modules, {"utils.backtesting_worker": worker_stub}):
+        spec.loader.exec_module(module)
+    return module
+
+
+backtesting_service = _load_backtesting_service_module()
+
+
+# Worker entry points run in spawned processes, so they must be importable module-level functions
+
+def _write(path, data):
+    with open(path, "w") as f:
+        json.dump(data, f)
+
+
+def _completing_worker(config, result_path, error_path, candles_store_path):
+    _write(result_path, {"results": {"net_pnl": config["trade_cost"]}, "candles_store": candles_store_path})
+
+
+def _failing_worker(config, result_path, error_path, candles_store_path):
+    _write(error_path, {"error": "controller not found"})
+
+
+def _sleeping_worker(config, result_path, error_path, candles_store_path):
+    time.sleep(30)
+
+
+def _scoring_worker(config, result_path, error_path, candles_store_path):
+    controller = config["config"]
+    if controller["bb_length"] == 300:
+        _write(error_path, {"error": "not enough candles"})
+        return
+    net_pnl = controller["bb_std"] * 10 - abs(controller["bb_length"] - 100) / 100
+    _write(result_path, {"results": {"net_pnl": net_pnl, "sharpe_ratio": 1.0}})
+
+
+class TestBacktestingService(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self._tmp = TemporaryDirectory()
+        self.results_path = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _service(self, worker, **kwargs):
+        service = backtesting_service.BacktestingService(
+            results_path=self.results_path, poll_interval=0.02, worker=worker, **kwargs
+        )
+        service.start()
+        return service
+
+    async def test_completed_job_result_is_persisted(self):
+        service = self._service(_completing_worker, candles_store_path="/data/candles")
+
+        job = service.submit({"trade_cost": 0.001})
+        self.assertEqual(job.status, "queued")
+        job = await service.wait(job.job_id)
+
+        self.assertEqual(job.status, "completed")
+        self.assertEqual(service.get_result(job.job_id)["results"], {"net_pnl": 0.001})
+        self.assertEqual(service.get_result(job.job_id)["candles_store"], "/data/candles")
+
+        restarted = self._service(_completing_worker)
+        self.assertEqual(restarted.get_job(job.job_id).status, "completed")
+        self.assertEqual(restarted.get_result(job.job_id)["results"], {"net_pnl": 0.001})
+
+    async def test_worker_error_fails_job(self):
+        service = self._service(_failing_worker)
+
+        job = await service.wait(service.submit({}).job_id)
+
+        self.assertEqual(job.status, "failed")
+        self.assertEqual(job.error, "controller not found")
+        self.assertIsNone(service.get_result(job.job_id))
+
+    async def test_cancel_terminates_running_job(self):
+        service = self._service(_sleeping_worker)
+        job = service.submit({})
+        while job.job_id not in service._processes:
+            await asyncio.sleep(0.01)
+        process = service._processes[job.job_id]
+
+        service.cancel(job.job_id)
+        job = await service.wait(job.job_id)
+
+        self.assertEqual(job.status, "cancelled")
+        self.assertFalse(process.is_alive())
+
+    async def test_workers_are_bounded_and_queued_jobs_cancellable(self):
+        service = self._service(_sleeping_worker, max_workers=1)
+        running = service.submit({})
+        queued = service.submit({})
+        while running.status != "running":
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.05)
+
+        self.assertEqual(queued.status, "queued")
+        self.assertEqual(service.get_metrics()["running_processes"], 1)
+
+        service.cancel(queued.job_id)
+        await service.stop()
+        self.assertEqual({job.status for job in service.list_jobs()}, {"cancelled"})
+
+    async def test_timeout_terminates_job(self):
+        service = self._service(_sleeping_worker, job_timeout=0.2)
+
+        job = await service.wait(service.submit({}).job_id)
+
+        self.assertEqual(job.status, "failed")
+        self.assertIn("timeout", job.error)
+
+    async def test_unfinished_jobs_fail_on_restart(self):
+        job = backtesting_service.BacktestJob(job_id="abc", config={}, status="running")
+        _write(Path(self.results_path) / "abc.job.json", job.to_dict())
+
+        service = self._service(_completing_worker)
+
+        self.assertEqual(service.get_job("abc").status, "failed")
+        self.assertEqual(service.get_job("abc").error, "Interrupted by API restart")
+
+    async def test_oldest_finished_jobs_are_evicted_with_their_files(self):
+        service = self._service(_completing_worker, max_jobs=2)
+        first = await service.wait(service.submit({"trade_cost": 0.001}).job_id)
+        second = await service.wait(service.submit({"trade_cost": 0.002}).job_id)
+
+        third = service.submit({"trade_cost": 0.003})
+        await service.wait(third.job_id)
+
+        self.assertIsNone(service.get_job(first.job_id))
+        self.assertIsNone(service.get_result(first.job_id))
+        self.assertFalse(any(name.startswith(first.job_id) for name in os.listdir(self.results_path)))
+        self.assertEqual({job.job_id for job in service.list_jobs()}, {second.job_id, third.job_id})
+
+    async def test_expired_jobs_are_evicted_on_start(self):
+        job = backtesting_service.BacktestJob(job_id="old", config={}, status="completed", finished_at=time.time() - 100)
+        _write(Path(self.results_path) / "old.job.json", job.to_dict())
+        _write(Path(self.results_path) / "old.result.json", {"results": {}})
+
+        service = self._service(_completing_worker, job_retention=60)
+
+        self.assertIsNone(service.get_job("old"))
+        self.assertEqual(os.listdir(self.results_path), [])
+
+
+class TestParameterGrid(unittest.TestCase):
+    def test_expand_lists_and_ranges(self):
+        grid = backtesting_service.expand_parameter_grid({
+            "bb_length": [50, 100],
+            "bb_std": {"start": 1.0, "stop": 2.0, "step": 0.5},
+        })
+
+        self.assertEqual(len(grid), 6)
+        self.assertEqual(grid[0], {"bb_length": 50, "bb_std": 1.0})
+        self.assertEqual([combination["bb_std"] for combination in grid[:3]], [1.0, 1.5, 2.0])
+
+    def test_integer_ranges_stay_integers(self):
+        grid = backtesting_service.expand_parameter_grid({"bb_length": {"start": 20, "stop": 60, "step": 20}})
+        self.assertEqual(grid, [{"bb_length": 20}, {"bb_length": 40}, {"bb_length": 60}])
+
+    def test_apply_dotted_parameters_copies_config(self):
+        base = {"controller_name": "pmm", "spreads": {"buy": [0.01]}}
+
+        config = backtesting_service.apply_parameters(base, {"spreads.buy": [0.02], "leverage": 5})
+
+        self.assertEqual(config, {"controller_name": "pmm", "spreads": {"buy": [0.02]}, "leverage": 5})
+        self.assertEqual(base["spreads"]["buy"], [0.01])
+
+
+class TestBacktestingSweep(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self._tmp = TemporaryDirectory()
+        self.service = backtesting_service.BacktestingService(
+            results_path=self._tmp.name, max_workers=3, poll_interval=0.02, worker=_scoring_worker
+        )
+        self.service.start()
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    async def test_sweep_ranks_combinations(self):
+        sweep = self.service.submit_sweep(
+            {"trade_cost": 0.0006, "config": {"controller_name": "bollinger_v1", "bb_std": 2.0}},
+            {"bb_length": [100, 200, 300], "bb_std": [1.0, 2.0]},
+        )
+        await self.service._sweep_tasks[sweep.sweep_id]
+
+        self.assertEqual(sweep.status, "completed")
+        table = self.service.get_sweep_table(sweep.sweep_id)
+        self.assertEqual(len(table), 6)
+        self.assertEqual([row["rank"] for row in table], [1, 2, 3, 4, None, None])
+        self.assertEqual(table[0]["parameters"], {"bb_length": 100, "bb_std": 2.0})
+        self.assertEqual(table[0]["results"]["net_pnl"], 20.0)
+        self.assertEqual({row["status"] for row in table[4:]}, {"failed"})
+
+    async def test_first_combination_runs_before_the_others(self):
+        self.service.candles_store_path = str(Path(self._tmp.name) / "candles")
+        sweep = self.service.submit_sweep(
+            {"config": {"bb_std": 1.0}}, {"bb_length": [100, 150, 200]}
+        )
+        await self.service._sweep_tasks[sweep.sweep_id]
+
+        first, *others = [self.service.get_job(job_id) for job_id in sweep.job_ids]
+        self.assertTrue(all(job.started_at >= first.finished_at for job in others))
+
+    async def test_combinations_start_together_without_candles_store(self):
+        sweep = self.service.submit_sweep(
+            {"config": {"bb_std": 1.0}}, {"bb_length": [100, 150, 200]}
+        )
+        await self.service._sweep_tasks[sweep.sweep_id]
+
+        first, *others = [self.service.get_job(job_id) for job_id in sweep.job_ids]
+        self.assertTrue(all(job.started_at < first.finished_at for job in others))
+
+    async def test_sweep_size_is_bounded(self):
+        with self.assertRaises(ValueError):
+            self.service.submit_sweep({"config": {}}, {"a": list(range(10)), "b": list(range(10))}, max_combinations=50)
+
+
+class TestBacktestResultCaching(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self._tmp = TemporaryDirectory()
+        controllers_path = Path(self._tmp.name) / "controllers"
+        (controllers_path / "directional_trading").mkdir(parents=True)
+        self.controller_source = controllers_path / "directional_trading" / "bollinger_v1.py"
+        self.controller_source.write_text("# v1")
+        self.service = backtesting_service.BacktestingService(
+            results_path=str(Path(self._tmp.name) / "results"), poll_interval=0.02, worker=_completing_worker,
+            result_cache=BacktestResultCache(str(Path(self._tmp.name) / "cache")),
+            controllers_path=str(controllers_path),
+        )
+        self.service.start()
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _config(self, **controller):
+        return {**_CLOSED_RANGE, "config": {"controller_type": "directional_trading",
+                                            "controller_name": "bollinger_v1", **controller}}
+
+    async def test_identical_backtest_is_served_from_cache(self):
+        first = await self.service.wait(self.service.submit(self._config(id="a", bb_length=100)).job_id)
+        self.assertFalse(first.cached)
+
+        second = self.service.submit(self._config(id="b", bb_length=100))
+
+        self.assertEqual(second.status, "completed")
+        self.assertTrue(second.cached)
+        self.assertEqual(second.summary, first.summary)
+        self.assertEqual(self.service.get_result(second.job_id), self.service.get_result(first.job_id))
+
+    async def test_cache_key_covers_config_and_controller_source(self):
+        key = self.service.cache_key(self._config(bb_length=100))
+
+        self.assertEqual(key, self.service.cache_key(self._config(bb_length=100, id="other")))
+        self.assertNotEqual(key, self.service.cache_key(self._config(bb_length=200)))
+        self.assertNotEqual(key, self.service.cache_key({**self._config(bb_length=100), "trade_cost": 0.001}))
+        self.controller_source.write_text("# v2")
+        self.assertNotEqual(key, self.service.cache_key(self._config(bb_length=100)))
+
+    async def test_recent_ranges_are_not_cached(self):
+        config = {**self._config(), "end_time": int(time.time())}
+        self.assertIsNone(self.service.cache_key(config))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+import asyncio
+import importlib.util
+import sys
+import types
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import pandas as pd
+
+
+def _make_test_stubs() -> dict:
+    """`services/market_data_feed_manager.py` only needs these hummingbot names to exist."""
+    stubs = {}
+    for name in (
+        "hummingbot",
+        "hummingbot.core",
+        "hummingbot.core.rate_oracle",
+        "hummingbot.core.rate_oracle.rate_oracle",
+        "hummingbot.data_feed",
+        "hummingbot.data_feed.candles_feed",
+        "hummingbot.data_feed.candles_feed.data_types",
+        "hummingbot.data_feed.market_data_provider",
+    ):
+        stubs[name] = types.ModuleType(name)
+    stubs["hummingbot.core.rate_oracle.rate_oracle"].RateOracle = object
+    stubs["hummingbot.data_feed.candles_feed.data_types"].CandlesConfig = object
+    stubs["hummingbot.data_feed.candles_feed.data_types"].HistoricalCandlesConfig = object
+    stubs["hummingbot.data_feed.market_data_provider"].MarketDataProvider = object
+    return stubs
+
+
+def _load_feed_manager_module():
+    repo_root = Path(__file__).resolve().parents[2]
+    module_path = repo_root / "services" / "market_data_feed_manager.py"
+    spec = importlib.util.spec_from_file_location("market_data_feed_manager_under_test", module_path)
+    assert spec and spec.loader
+    module = importlib.util.module_from_spec(spec)
+    with patch.dict(sys.modules, _make_test_stubs()):
+        spec.loader.exec_module(module)
+    return module
+
+
+def _candles(rows):
+    return pd.DataFrame(rows, columns=["timestamp", "open", "close"])
+
+
+class _FakeCandlesFeed:
+    def __init__(self, rows):
+        self.ready = True
+        self.candles_df = _candles(rows)
+
+
+class _FakeProvider:
+    def __init__(self, feed):
+        self.feed = feed
+        self.stopped = []
+
+    def get_candles_feed(self, config):
+        return self.feed
+
+    def stop_candle_feed(self, config):
+        self.stopped.append(config)
+
+
+class TestCandlesStream(unittest.IsolatedAsyncioTestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.module = _load_feed_manager_module()
+
+    def setUp(self):
+        self.config = types.SimpleNamespace(connector="binance", trading_pair="BTC-USDT", interval="1m", max_records=2)
+        self.feed = _FakeCandlesFeed([(60, 1.0, 1.5), (120, 1.5, 2.0), (180, 2.0, 2.5)])
+        self.provider = _FakeProvider(self.feed)
+        self.manager = self.module.MarketDataFeedManager(
+            self.provider, rate_oracle=None, feed_timeout=0, candles_stream_interval=0.01
+        )
+
+    async def test_snapshot_then_only_changed_candles(self):
+        stream = self.manager.stream_candles(self.config)
+
+        snapshot = await anext(stream)
+        self.assertEqual(snapshot["type"], "snapshot")
+        self.assertEqual([candle["timestamp"] for candle in snapshot["candles"]], [120, 180])
+
+        # The open candle changes and a new one is added
+        self.feed.candles_df = _candles([(60, 1.0, 1.5), (120, 1.5, 2.0), (180, 2.0, 2.7), (240, 2.7, 2.8)])
+        update = await anext(stream)
+        self.assertEqual(update["type"], "update")
+        self.assertEqual([(c["timestamp"], c["close"]) for c in update["candles"]], [(180, 2.7), (240, 2.8)])
+
+        # Only the open candle changes
+        self.feed.candles_df = _candles([(180, 2.0, 2.7), (240, 2.7, 2.9)])
+        update = await anext(stream)
+        self.assertEqual([(c["timestamp"], c["close"]) for c in update["candles"]], [(240, 2.9)])
+
+        await stream.aclose()
+
+    def test_candles_with_nan_fields_are_not_resent(self):
+        df = _candles([(120, float("nan"), 2.0), (180, 2.0, float("nan"))])
+        snapshot = self.module.MarketDataFeedManager._candle_records(df, max_records=2)
+
+        self.assertIsNone(snapshot[-1]["close"])
+        self.assertEqual(self.module.MarketDataFeedManager._candle_changes(df, snapshot[-1], max_records=2), [])
+
+    async def test_subscribed_feed_is_not_cleaned_up(self):
+        stream = self.manager.stream_candles(self.config)
+        await anext(stream)
+        self.assertEqual(list(self.manager.get_active_feeds_info().values())[0]["subscribers"], 1)
+
+        await asyncio.sleep(0.01)
+        await self.manager._cleanup_unused_feeds()
+        self.assertEqual(self.provider.stopped, [])
+
+        await stream.aclose()
+        await asyncio.sleep(0.01)
+        await self.manager._cleanup_unused_feeds()
+        self.assertEqual(len(self.provider.stopped), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,179 @@
+import asyncio
+import importlib.util
+import sys
+import types
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import pandas as pd
+
+
+def _make_test_stubs() -> dict:
+    """`services/market_data_feed_manager.py` only needs these hummingbot names to exist."""
+    stubs = {}
+    for name in (
+        "hummingbot",
+        "hummingbot.core",
+        "hummingbot.core.rate_oracle",
+        "hummingbot.core.rate_oracle.rate_oracle",
+        "hummingbot.data_feed",
+        "hummingbot.data_feed.candles_feed",
+        "hummingbot.data_feed.candles_feed.data_types",
+        "hummingbot.data_feed.market_data_provider",
+    ):
+        stubs[name] = types.ModuleType(name)
+    stubs["hummingbot.core.rate_oracle.rate_oracle"].RateOracle = object
+    stubs["hummingbot.data_feed.candles_feed.data_types"].CandlesConfig = object
+    stubs["hummingbot.data_feed.candles_feed.data_types"].HistoricalCandlesConfig = object
+    stubs["hummingbot.data_feed.market_data_provider"].MarketDataProvider = object
+    return stubs
+
+
+def _load_feed_manager_module():
+    repo_root = Path(__file__).resolve().parents[2]
+    module_path = repo_root / "services" / "market_data_feed_manager.py"
+    spec = importlib.util.spec_from_file_location("market_data_feed_manager_under_test", module_path)
+    assert spec and spec.loader
+    module = importlib.util.module_from_spec(spec)
+    with patch.dict(sys.modules, _make_test_stubs()):
+        spec.loader.exec_module(module)
+    return module
+
+
+class _FakeOrderBook:
+    def __init__(self, name: str):
+        self.name = name
+        self.snapshot_uid = 1
+        self.last_diff_uid = 1
+
+    def get_price_for_volume(self, is_buy, volume):
+        return types.SimpleNamespace(result_price=100, result_volume=volume)
+
+    @property
+    def snapshot(self):
+        bids = pd.DataFrame({"price": [99.0, 98.0], "amount": [1.0, 2.0]})
+        asks = pd.DataFrame({"price": [101.0, 102.0], "amount": [1.0, 2.0]})
+        return bids, asks
+
+
+class _FakeDataSource:
+    def __init__(self):
+        self.requests = 0
+
+    async def get_new_order_book(self, trading_pair):
+        self.requests += 1
+        await asyncio.sleep(0.01)
+        return _FakeOrderBook(f"rest-{self.requests}")
+
+
+class _FakeProvider:
+    def __init__(self, live_order_book=None):
+        self.data_source = _FakeDataSource()
+        self._non_trading_connectors = {"binance": types.SimpleNamespace(_orderbook_ds=self.data_source)}
+        self.live_order_book = live_order_book
+        self.subscribed = []
+        self.removed = []
+
+    def get_order_book(self, connector_name, trading_pair):
+        if self.live_order_book is None:
+            raise ValueError("not tracked")
+        return self.live_order_book
+
+    async def initialize_order_book(self, connector_name, trading_pair):
+        self.subscribed.append((connector_name, trading_pair))
+
+    async def remove_order_book(self, connector_name, trading_pair):
+        self.removed.append((connector_name, trading_pair))
+
+
+class TestOrderBookCache(unittest.IsolatedAsyncioTestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.module = _load_feed_manager_module()
+
+    def _manager(self, provider, **kwargs):
+        return self.module.MarketDataFeedManager(provider, rate_oracle=None, **kwargs)
+
+    async def test_rest_snapshot_is_shared_within_staleness_bound(self):
+        provider = _FakeProvider()
+        manager = self._manager(provider, order_book_max_staleness=60)
+
+        results = await asyncio.gather(*(
+            manager.get_order_book_query_result("binance", "BTC-USDT", True, volume=1) for _ in range(5)
+        ))
+
+        self.assertTrue(all(result["result_price"] == 100 for result in results))
+        self.assertEqual(provider.data_source.requests, 1)
+        metrics = manager.get_order_book_cache_metrics()
+        self.assertEqual(metrics["rest_fetches"], 1)
+        self.assertEqual(metrics["snapshot_hits"], 4)
+        await asyncio.sleep(0)
+        self.assertEqual(provider.subscribed, [("binance", "BTC-USDT")])
+
+    async def test_zero_staleness_always_fetches(self):
+        provider = _FakeProvider()
+        manager = self._manager(provider, order_book_max_staleness=0)
+
+        await manager.get_order_book_query_result("binance", "BTC-USDT", True, volume=1)
+        await manager.get_order_book_query_result("binance", "BTC-USDT", True, volume=1)
+
+        self.assertEqual(provider.data_source.requests, 2)
+
+    async def test_live_order_book_used_once_seen_updating(self):
+        live = _FakeOrderBook("live")
+        provider = _FakeProvider(live_order_book=live)
+        manager = self._manager(provider, order_book_max_staleness=60)
+
+        first = await manager._get_query_order_book("binance", "BTC-USDT")
+        self.assertEqual(first.name, "rest-1")
+
+        live.last_diff_uid += 1
+        second = await manager._get_query_order_book("binance", "BTC-USDT")
+        self.assertIs(second, live)
+        self.assertEqual(manager.get_order_book_cache_metrics()["live_hits"], 1)
+
+    async def test_live_order_book_past_staleness_bound_is_not_served(self):
+        live = _FakeOrderBook("live")
+        manager = self._manager(_FakeProvider(live_order_book=live), order_book_max_staleness=1)
+        key = "binance_BTC-USDT"
+
+        self.assertIsNone(manager._get_live_order_book(key, "binance", "BTC-USDT", now=1000.0))
+        live.last_diff_uid += 1
+        # The update may have happened right after the query at 1000, so it can be 5s old
+        self.assertIsNone(manager._get_live_order_book(key, "binance", "BTC-USDT", now=1005.0))
+        live.last_diff_uid += 1
+        self.assertIs(manager._get_live_order_book(key, "binance", "BTC-USDT", now=1005.5), live)
+        # No updates since: served until the bound, then dropped
+        self.assertIs(manager._get_live_order_book(key, "binance", "BTC-USDT", now=1006.0), live)
+        self.assertIsNone(manager._get_live_order_book(key, "binance", "BTC-USDT", now=1006.5))
+
+    async def test_batch_query_uses_one_book_per_pair(self):
+        provider = _FakeProvider()
+        manager = self._manager(provider, order_book_max_staleness=60)
+        queries = [{"query_type": "vwap_for_volume", "is_buy": True, "value": volume} for volume in (0.5, 1, 2, 3)]
+
+        result = await manager.get_order_book_batch_query_result("binance", ["BTC-USDT", "ETH-USDT"], queries)
+
+        self.assertEqual(provider.data_source.requests, 2)
+        self.assertEqual([pair["trading_pair"] for pair in result["results"]], ["BTC-USDT", "ETH-USDT"])
+        curve = result["results"][0]["results"]
+        self.assertEqual(len(curve), 4)
+        self.assertEqual(curve[0]["average_price"], 101.0)
+        self.assertLess(curve[0]["price_impact_pct"], curve[-1]["price_impact_pct"])
+
+    async def test_cleanup_releases_order_book_feed(self):
+        provider = _FakeProvider(live_order_book=_FakeOrderBook("live"))
+        manager = self._manager(provider, order_book_max_staleness=60, feed_timeout=0)
+        await manager._get_query_order_book("binance", "BTC-USDT")
+
+        await asyncio.sleep(0.01)
+        await manager._cleanup_unused_feeds()
+        await asyncio.sleep(0)
+
+        self.assertEqual(provider.removed, [("binance", "BTC-USDT")])
+        self.assertEqual(manager.get_order_book_cache_metrics()["order_books"], {})
+
+
+if __name__ == "__main__":
+    unittest.main()
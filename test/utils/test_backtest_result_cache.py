@@ -0,0 +1,47 @@
+import json
+import os
+
+from utils.backtest_result_cache import BacktestResultCache
+
+
+def _result_file(tmp_path, name, size=10):
+    path = tmp_path / f"{name}.json"
+    path.write_text(json.dumps({"results": {"net_pnl": 1}, "padding": "x" * size}))
+    return str(path)
+
+
+def test_put_and_get(tmp_path):
+    cache = BacktestResultCache(str(tmp_path / "cache"))
+    assert cache.get("abc") is None
+
+    cache.put("abc", _result_file(tmp_path, "job"), {"net_pnl": 1})
+    cached_path, summary = cache.get("abc")
+
+    assert summary == {"net_pnl": 1}
+    with open(cached_path) as f:
+        assert json.load(f)["results"] == {"net_pnl": 1}
+    metrics = cache.get_metrics()
+    assert (metrics["hits"], metrics["misses"], metrics["entries"]) == (1, 1, 1)
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = BacktestResultCache(str(tmp_path / "cache"), max_entries=2)
+    for index, key in enumerate(("a", "b")):
+        cache.put(key, _result_file(tmp_path, key), None)
+        os.utime(os.path.join(cache.path, f"{key}.meta.json"), (1000 + index, 1000 + index))
+
+    cache.get("a")  # "b" becomes the least recently used
+    cache.put("c", _result_file(tmp_path, "c"), None)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.get_metrics()["evictions"] == 1
+
+
+def test_size_bound(tmp_path):
+    cache = BacktestResultCache(str(tmp_path / "cache"), max_bytes=1500)
+    cache.put("a", _result_file(tmp_path, "a", size=1000), None)
+    cache.put("b", _result_file(tmp_path, "b", size=1000), None)
+
+    assert cache.get_metrics()["entries"] == 1
+    assert cache.get("b") is not None
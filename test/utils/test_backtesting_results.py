@@ -0,0 +1,90 @@
+import json
+
+from utils.backtesting_results import (
+    compact_backtesting_result,
+    downsample_positions,
+    stream_json_with_fields,
+    summarize_executors,
+)
+
+
+def _result(rows: int = 10) -> dict:
+    return {
+        "processed_data": {
+            "timestamp": {str(i): 1700000000 + i * 60 for i in range(rows)},
+            "close": {str(i): 100.0 + i for i in range(rows)},
+            "signal": {str(i): i % 3 - 1 for i in range(rows)},
+        },
+        "executors": [
+            # Stored as the API encodes them: enums as their values (CloseType.TAKE_PROFIT, TradeType.BUY, ...)
+            {"id": "a", "close_type": 3, "side": 1, "net_pnl_quote": 2.5,
+             "filled_amount_quote": 100, "cum_fees_quote": 0.1, "status": 4},
+            {"id": "b", "close_type": 2, "side": 2, "net_pnl_quote": -1.0,
+             "filled_amount_quote": 50, "cum_fees_quote": 0.05, "status": 4},
+        ],
+        "results": {"net_pnl": 0.015, "sharpe_ratio": 1.2},
+    }
+
+
+def test_full_format_keeps_payload_shape():
+    result = _result()
+
+    compact = compact_backtesting_result(result)
+
+    assert compact["processed_data"] == result["processed_data"]
+    assert compact["executors"] == result["executors"]
+    assert compact["results"] == result["results"]
+
+
+def test_columnar_format_with_column_selection():
+    compact = compact_backtesting_result(_result(), output_format="columnar", columns=["timestamp", "close", "missing"])
+
+    processed = compact["processed_data"]
+    assert list(processed["columns"]) == ["timestamp", "close"]
+    assert processed["index"] == [str(i) for i in range(10)]
+    assert processed["columns"]["close"][3] == 103.0
+    assert processed["rows"] == processed["total_rows"] == 10
+    assert "executors" not in compact
+    assert len(json.dumps(compact)) < len(json.dumps(_result()))
+
+
+def test_downsampling_keeps_first_and_last_rows():
+    assert downsample_positions(10, None) == list(range(10))
+    assert downsample_positions(10, 20) == list(range(10))
+    assert downsample_positions(10, 4) == [0, 3, 6, 9]
+    assert downsample_positions(11, 4) == [0, 3, 6, 10]
+
+    compact = compact_backtesting_result(_result(1000), output_format="columnar", max_points=100)
+    processed = compact["processed_data"]
+    assert processed["rows"] == 100
+    assert processed["total_rows"] == 1000
+    assert processed["index"][0] == "0" and processed["index"][-1] == "999"
+
+    full = compact_backtesting_result(_result(1000), max_points=100)
+    assert len(full["processed_data"]["close"]) == 100
+
+
+def test_executors_are_summarized():
+    summary = summarize_executors(_result()["executors"])
+
+    assert summary["total"] == 2
+    assert summary["net_pnl_quote"] == 1.5
+    assert summary["filled_amount_quote"] == 150
+    assert summary["close_types"] == {"3": 1, "2": 1}
+    assert summary["sides"] == {"1": 1, "2": 1}
+    assert summary["statuses"] == {"4": 2}
+
+    compact = compact_backtesting_result(_result(), output_format="columnar", include_executors=True)
+    assert len(compact["executors"]) == 2
+
+
+def test_stream_json_with_fields(tmp_path):
+    path = tmp_path / "result.json"
+    path.write_text(json.dumps(_result()))
+
+    body = b"".join(stream_json_with_fields(str(path), {"cached": True}, chunk_size=64))
+
+    assert json.loads(body) == {"cached": True, **_result()}
+
+    path.write_text("{}")
+    assert json.loads(b"".join(stream_json_with_fields(str(path), {"cached": False}))) == {"cached": False}
@@ -0,0 +1,67 @@
+import importlib.util
+import json
+import sys
+import types
+from decimal import Decimal
+from enum import Enum
+from pathlib import Path
+from unittest.mock import patch
+
+
+class _CloseType(Enum):
+    TAKE_PROFIT = 3
+
+
+class _TradeType(Enum):
+    BUY = 1
+
+
+def _make_test_stubs() -> dict:
+    """`utils/backtesting_worker.py` only needs these hummingbot and app names to exist."""
+    engine_module = types.ModuleType("hummingbot.strategy_v2.backtesting.backtesting_engine_base")
+    engine_module.BacktestingEngineBase = object
+    data_provider_module = types.ModuleType("utils.backtesting_data_provider")
+    data_provider_module.CandlesStoreBacktestingDataProvider = object
+    config_module = types.ModuleType("config")
+    config_module.settings = types.SimpleNamespace()
+    return {
+        "hummingbot.strategy_v2.backtesting.backtesting_engine_base": engine_module,
+        "utils.backtesting_data_provider": data_provider_module,
+        "config": config_module,
+    }
+
+
+def _load_backtesting_worker_module():
+    repo_root = Path(__file__).resolve().parents[2]
+    module_path = repo_root / "utils" / "backtesting_worker.py"
+    spec = importlib.util.spec_from_file_location("backtesting_worker_under_test", module_path)
+    assert spec and spec.loader
+    module = importlib.util.module_from_spec(spec)
+    with patch.dict(sys.modules, _make_test_stubs()):
+        spec.loader.exec_module(module)
+    return module
+
+
+backtesting_worker = _load_backtesting_worker_module()
+
+
+def test_result_encodes_decimals_as_numbers_and_enums_as_values(tmp_path):
+    async def run_backtesting(config, candles_store_path):
+        return {
+            "executors": [{
+                "net_pnl_quote": Decimal("0.0123"),
+                "filled_amount_quote": Decimal("0"),
+                "close_type": _CloseType.TAKE_PROFIT,
+                "config": {"side": _TradeType.BUY},
+            }],
+            "processed_data": {},
+            "results": {"net_pnl": 0.01},
+        }
+
+    result_path, error_path = tmp_path / "result.json", tmp_path / "error.json"
+    with patch.object(backtesting_worker, "run_backtesting", run_backtesting):
+        backtesting_worker.run_backtesting_job({}, str(result_path), str(error_path))
+
+    executor = json.loads(result_path.read_text())["executors"][0]
+    assert executor == {"net_pnl_quote": 0.0123, "filled_amount_quote": 0.0, "close_type": 3, "config": {"side": 1}}
+    assert not error_path.exists()
@@ -0,0 +1,128 @@
+import asyncio
+import os
+
+import pandas as pd
+import pytest
+
+from utils.candles_store import CandlesStore, interval_to_seconds
+
+MINUTE = 60
+# 2024-01-31 23:00 UTC, so ranges cross a monthly partition
+BASE = 1706742000
+
+
+class _Exchange:
+    def __init__(self):
+        self.calls = []
+
+    async def fetch(self, start_time, end_time):
+        self.calls.append((start_time, end_time))
+        timestamps = range(start_time, end_time + 1, MINUTE)
+        return pd.DataFrame({
+            "timestamp": [float(ts) for ts in timestamps],
+            "open": [ts / MINUTE for ts in timestamps],
+            "close": [ts / MINUTE + 1 for ts in timestamps],
+            "n_trades": [10 for _ in timestamps],
+        })
+
+
+async def _get(store, exchange, start, end):
+    return await store.get_candles("binance", "BTC-USDT", "1m", start, end, exchange.fetch)
+
+
+def test_interval_to_seconds():
+    assert interval_to_seconds("1m") == 60
+    assert interval_to_seconds("4h") == 14400
+    assert interval_to_seconds("1M") == 2592000
+    with pytest.raises(ValueError):
+        interval_to_seconds("1x")
+
+
+@pytest.mark.asyncio
+async def test_overlapping_ranges_only_fetch_gaps(tmp_path):
+    store = CandlesStore(str(tmp_path))
+    exchange = _Exchange()
+
+    first = await _get(store, exchange, BASE, BASE + 120 * MINUTE)
+    assert len(first) == 121
+    assert exchange.calls == [(BASE, BASE + 120 * MINUTE)]
+
+    second = await _get(store, exchange, BASE - 30 * MINUTE, BASE + 150 * MINUTE)
+    assert exchange.calls[1:] == [(BASE - 30 * MINUTE, BASE - MINUTE), (BASE + 121 * MINUTE, BASE + 150 * MINUTE)]
+    assert len(second) == 181
+    assert second["timestamp"].is_monotonic_increasing
+    assert second["timestamp"].is_unique
+
+    third = await _get(store, exchange, BASE + 10 * MINUTE, BASE + 100 * MINUTE)
+    assert len(exchange.calls) == 3
+    assert third["timestamp"].tolist() == [float(BASE + i * MINUTE) for i in range(10, 101)]
+    assert third["close"].iloc[0] == (BASE + 10 * MINUTE) / MINUTE + 1
+    assert store.get_metrics()["full_hits"] == 1
+
+    series = tmp_path / "binance" / "BTC-USDT" / "1m"
+    assert sorted(os.listdir(series)) == [".lock", "2024-01.npy", "2024-02.npy", "meta.json"]
+
+
+@pytest.mark.asyncio
+async def test_store_persists_across_instances(tmp_path):
+    exchange = _Exchange()
+    await _get(CandlesStore(str(tmp_path)), exchange, BASE, BASE + 10 * MINUTE)
+
+    candles = await _get(CandlesStore(str(tmp_path)), exchange, BASE + 5 * MINUTE, BASE + 10 * MINUTE)
+
+    assert len(exchange.calls) == 1
+    assert list(candles.columns) == ["timestamp", "open", "close", "n_trades"]
+    assert len(candles) == 6
+
+
+@pytest.mark.asyncio
+async def test_concurrent_writers_keep_each_others_coverage(tmp_path):
+    # Separate instances stand in for the API process and a backtesting worker sharing the store
+    class _SlowExchange(_Exchange):
+        async def fetch(self, start_time, end_time):
+            await asyncio.sleep(0.01)
+            return await super().fetch(start_time, end_time)
+
+    exchange = _SlowExchange()
+    await asyncio.gather(
+        _get(CandlesStore(str(tmp_path)), exchange, BASE, BASE + 30 * MINUTE),
+        _get(CandlesStore(str(tmp_path)), exchange, BASE + 60 * MINUTE, BASE + 90 * MINUTE),
+    )
+
+    candles = await _get(CandlesStore(str(tmp_path)), exchange, BASE, BASE + 30 * MINUTE)
+    assert len(candles) == 31
+    candles = await _get(CandlesStore(str(tmp_path)), exchange, BASE + 60 * MINUTE, BASE + 90 * MINUTE)
+    assert len(candles) == 31
+    assert len(exchange.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_open_candles_are_not_stored(tmp_path, monkeypatch):
+    now = BASE + 10 * MINUTE + 30
+    monkeypatch.setattr("utils.candles_store.time.time", lambda: now)
+    store = CandlesStore(str(tmp_path))
+    exchange = _Exchange()
+
+    candles = await _get(store, exchange, BASE, now)
+    assert candles["timestamp"].iloc[-1] == BASE + 10 * MINUTE
+
+    await _get(store, exchange, BASE, now)
+    # Only the candle still open at `now` is fetched again
+    assert exchange.calls[-1] == (BASE + 10 * MINUTE, BASE + 10 * MINUTE)
+
+
+@pytest.mark.asyncio
+async def test_failed_fetch_keeps_stored_candles(tmp_path):
+    store = CandlesStore(str(tmp_path))
+    exchange = _Exchange()
+    await _get(store, exchange, BASE, BASE + 10 * MINUTE)
+
+    async def failing_fetch(start_time, end_time):
+        raise RuntimeError("exchange unavailable")
+
+    with pytest.raises(RuntimeError):
+        await store.get_candles("binance", "BTC-USDT", "1m", BASE, BASE + 20 * MINUTE, failing_fetch)
+
+    candles = await _get(store, exchange, BASE, BASE + 10 * MINUTE)
+    assert len(candles) == 11
+    assert len(exchange.calls) == 1
@@ -0,0 +1,117 @@
+import asyncio
+
+import pytest
+
+from utils.channel_queue import BLOCK, DROP_NEWEST, DROP_OLDEST, LATEST, ChannelQueue
+
+
+class _Recorder:
+    def __init__(self, delay: float = 0.0):
+        self.items = []
+        self.delay = delay
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def __call__(self, item):
+        await self.release.wait()
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.items.append(item)
+
+
+async def _drain(queue: ChannelQueue):
+    while queue.depth or queue.metrics["processed"] < queue.metrics["enqueued"] - queue.metrics["replaced"]:
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_items_are_handled_in_order():
+    handler = _Recorder()
+    queue = ChannelQueue("test", handler)
+    queue.start()
+
+    for i in range(5):
+        queue.put_nowait("bot", i)
+    await _drain(queue)
+    await queue.stop()
+
+    assert handler.items == [0, 1, 2, 3, 4]
+    metrics = queue.get_metrics()
+    assert metrics["processed"] == 5 and metrics["depth"] == 0
+    assert metrics["avg_wait_seconds"] is not None
+
+
+@pytest.mark.asyncio
+async def test_drop_policies_bound_the_queue():
+    oldest = ChannelQueue("oldest", _Recorder(), maxsize=2, policy=DROP_OLDEST)
+    newest = ChannelQueue("newest", _Recorder(), maxsize=2, policy=DROP_NEWEST)
+
+    for i in range(4):
+        oldest.put_nowait("bot", i)
+        newest.put_nowait("bot", i)
+
+    assert [item for _, _, item in oldest._items] == [2, 3]
+    assert [item for _, _, item in newest._items] == [0, 1]
+    assert oldest.metrics["dropped"] == newest.metrics["dropped"] == 2
+    assert oldest.metrics["max_depth"] == 2
+
+
+@pytest.mark.asyncio
+async def test_latest_policy_coalesces_per_key():
+    handler = _Recorder()
+    handler.release.clear()
+    queue = ChannelQueue("performance", handler, policy=LATEST)
+    queue.start()
+
+    queue.put_nowait("bot_a", "a1")
+    await asyncio.sleep(0.01)  # the worker takes a1 and waits
+    for item in ("b1", "a2", "b2", "a3"):
+        queue.put_nowait(f"bot_{item[0]}", item)
+    assert queue.depth == 2
+    handler.release.set()
+    await _drain(queue)
+    await queue.stop()
+
+    assert handler.items == ["a1", "b2", "a3"]
+    assert queue.metrics["replaced"] == 2
+
+
+@pytest.mark.asyncio
+async def test_block_policy_applies_backpressure():
+    handler = _Recorder(delay=0.02)
+    queue = ChannelQueue("default", handler, maxsize=1, policy=BLOCK)
+    queue.start()
+
+    for i in range(4):
+        await queue.put("bot", i)
+        assert queue.depth <= 1
+    await _drain(queue)
+    await queue.stop()
+
+    assert handler.items == [0, 1, 2, 3]
+    assert queue.metrics["dropped"] == 0
+
+
+@pytest.mark.asyncio
+async def test_handler_errors_do_not_stop_the_worker():
+    handled = []
+
+    async def handler(item):
+        if item == "bad":
+            raise ValueError("bad payload")
+        handled.append(item)
+
+    queue = ChannelQueue("test", handler)
+    queue.start()
+    queue.put_nowait("bot", "bad")
+    queue.put_nowait("bot", "good")
+    await _drain(queue)
+    await queue.stop()
+
+    assert handled == ["good"]
+    assert queue.metrics["failed"] == 1
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        ChannelQueue("test", _Recorder(), policy="spill")
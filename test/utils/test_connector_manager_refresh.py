@@ -0,0 +1,141 @@
+import asyncio
+import importlib.util
+import sys
+import time
+import types
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+
+def _make_test_stubs() -> dict:
+    """
+    `utils/connector_manager.py` imports hummingbot and the API config helpers at module level.
+    The refresh logic only needs the names to exist, so stub them.
+    """
+    stubs = {}
+    for name in (
+        "hummingbot",
+        "hummingbot.client",
+        "hummingbot.client.config",
+        "hummingbot.client.config.config_crypt",
+        "hummingbot.client.config.config_helpers",
+        "hummingbot.client.settings",
+        "hummingbot.connector",
+        "hummingbot.connector.connector_base",
+        "hummingbot.core",
+        "hummingbot.core.data_type",
+        "hummingbot.core.data_type.common",
+        "hummingbot.core.data_type.in_flight_order",
+        "hummingbot.core.utils",
+        "hummingbot.core.utils.async_utils",
+        "utils.file_system",
+        "utils.hummingbot_api_config_adapter",
+        "utils.security",
+    ):
+        stubs[name] = types.ModuleType(name)
+
+    stubs["hummingbot.client.config.config_crypt"].ETHKeyFileSecretManger = object
+    stubs["hummingbot.client.config.config_helpers"].get_connector_class = lambda *_args: None
+    stubs["hummingbot.client.settings"].AllConnectorSettings = object
+    stubs["hummingbot.connector.connector_base"].ConnectorBase = object
+    for name in ("OrderType", "PositionAction", "PositionMode", "TradeType"):
+        setattr(stubs["hummingbot.core.data_type.common"], name, object)
+    stubs["hummingbot.core.data_type.in_flight_order"].InFlightOrder = object
+    stubs["hummingbot.core.data_type.in_flight_order"].OrderState = object
+    stubs["hummingbot.core.utils.async_utils"].safe_ensure_future = asyncio.ensure_future
+    stubs["utils.file_system"].fs_util = None
+    stubs["utils.hummingbot_api_config_adapter"].HummingbotAPIConfigAdapter = object
+    stubs["utils.security"].BackendAPISecurity = object
+    return stubs
+
+
+def _load_connector_manager_module():
+    repo_root = Path(__file__).resolve().parents[2]
+    module_path = repo_root / "utils" / "connector_manager.py"
+    spec = importlib.util.spec_from_file_location("connector_manager_under_test", module_path)
+    assert spec and spec.loader
+    module = importlib.util.module_from_spec(spec)
+    with patch.dict(sys.modules, _make_test_stubs()):
+        spec.loader.exec_module(module)
+    return module
+
+
+class _FakeConnector:
+    def __init__(self, tracker: dict, delay: float = 0.05, hang: bool = False):
+        self.tracker = tracker
+        self.delay = delay
+        self.hang = hang
+        self.in_flight_orders = {}
+
+    def _set_current_timestamp(self, _timestamp):
+        pass
+
+    async def _update_balances(self):
+        self.tracker["active"] += 1
+        self.tracker["max_active"] = max(self.tracker["max_active"], self.tracker["active"])
+        try:
+            await asyncio.sleep(10 if self.hang else self.delay)
+        finally:
+            self.tracker["active"] -= 1
+
+    async def _update_trading_rules(self):
+        pass
+
+
+class TestConnectorManagerRefresh(unittest.IsolatedAsyncioTestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.module = _load_connector_manager_module()
+
+    def _manager(self, **kwargs):
+        return self.module.ConnectorManager(secrets_manager=None, **kwargs)
+
+    async def test_refreshes_exchanges_concurrently_with_per_exchange_limit(self):
+        manager = self._manager(refresh_concurrency_per_exchange=2)
+        binance = {"active": 0, "max_active": 0}
+        kucoin = {"active": 0, "max_active": 0}
+        for i in range(6):
+            manager._connector_cache[f"account_{i}:binance"] = _FakeConnector(binance)
+        manager._connector_cache["account_0:kucoin"] = _FakeConnector(kucoin)
+
+        started = time.perf_counter()
+        await manager.update_all_connector_states()
+        duration = time.perf_counter() - started
+
+        self.assertEqual(binance["max_active"], 2)
+        # 6 binance accounts in batches of 2, kucoin in parallel: ~3 rounds instead of 7 sequential ones
+        self.assertLess(duration, 0.3)
+        metrics = manager.get_refresh_metrics()
+        self.assertEqual(metrics["last_cycle"]["connectors"], 7)
+        self.assertEqual(set(metrics["connectors"]["account_0:binance"]["stages"]), {"balances", "trading_rules"})
+
+    async def test_slow_connector_times_out_without_blocking_others(self):
+        manager = self._manager(refresh_timeout=0.1)
+        tracker = {"active": 0, "max_active": 0}
+        manager._connector_cache["account:slow_exchange"] = _FakeConnector(tracker, hang=True)
+        manager._connector_cache["account:fast_exchange"] = _FakeConnector(tracker)
+
+        started = time.perf_counter()
+        await manager.update_all_connector_states()
+
+        self.assertLess(time.perf_counter() - started, 1)
+        metrics = manager.get_refresh_metrics()
+        self.assertEqual(metrics["last_cycle"]["timed_out"], 1)
+        self.assertTrue(metrics["connectors"]["account:slow_exchange"]["timed_out"])
+        self.assertFalse(metrics["connectors"]["account:fast_exchange"]["timed_out"])
+        self.assertIn("trading_rules", metrics["connectors"]["account:fast_exchange"]["stages"])
+
+    async def test_skips_gateway_connectors(self):
+        manager = self._manager()
+        tracker = {"active": 0, "max_active": 0}
+        manager._connector_cache["account:binance"] = _FakeConnector(tracker)
+        manager._connector_cache["account:uniswap/router"] = _FakeConnector(tracker)
+
+        await manager.update_all_connector_states(skip_gateway_connectors=True)
+
+        self.assertEqual(list(manager.get_refresh_metrics()["connectors"]), ["account:binance"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+import importlib.util
+import sys
+import threading  # noqa: F401 - imported before patch.dict(sys.modules) so it is not unloaded afterwards
+import types
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+
+def _make_test_stubs() -> dict:
+    """`utils/container_inventory.py` only needs these docker names to exist."""
+    docker = types.ModuleType("docker")
+    errors = types.ModuleType("docker.errors")
+    errors.DockerException = type("DockerException", (Exception,), {})
+    errors.NotFound = type("NotFound", (errors.DockerException,), {})
+    docker.errors = errors
+    return {"docker": docker, "docker.errors": errors}
+
+
+def _load_container_inventory_module():
+    repo_root = Path(__file__).resolve().parents[2]
+    module_path = repo_root / "utils" / "container_inventory.py"
+    spec = importlib.util.spec_from_file_location("container_inventory_under_test", module_path)
+    assert spec and spec.loader
+    module = importlib.util.module_from_spec(spec)
+    with patch.dict(sys.modules, _make_test_stubs()):
+        spec.loader.exec_module(module)
+    return module
+
+
+container_inventory = _load_container_inventory_module()
+
+
+class _Summary:
+    def __init__(self, attrs):
+        self.attrs = attrs
+
+
+class _FakeContainers:
+    def __init__(self):
+        self.state = {}  # id: attrs
+        self.list_calls = []
+
+    def add(self, container_id, name, state, image="hummingbot/hummingbot:latest"):
+        self.state[container_id] = {"Id": container_id, "Names": [f"/{name}"], "State": state, "Image": image,
+                                    "ImageID": "sha256:" + "f" * 64}
+
+    def list(self, all=False, sparse=False, filters=None):
+        self.list_calls.append(filters)
+        summaries = [_Summary(dict(attrs)) for attrs in self.state.values()]
+        if filters and "id" in filters:
+            summaries = [s for s in summaries if s.attrs["Id"].startswith(filters["id"])]
+        if filters and "name" in filters:
+            summaries = [s for s in summaries if filters["name"] in s.attrs["Names"][0]]
+        return summaries
+
+
+class _FakeImages:
+    def __init__(self):
+        self.get_calls = 0
+
+    def get(self, image_id):
+        self.get_calls += 1
+        return types.SimpleNamespace(tags=["hummingbot/hummingbot:development"])
+
+
+class _FakeClient:
+    def __init__(self):
+        self.containers = _FakeContainers()
+        self.images = _FakeImages()
+
+
+BOT_ID = "a" * 64
+OTHER_ID = "b" * 64
+
+
+class TestContainerInventory(unittest.TestCase):
+    def setUp(self):
+        self.client = _FakeClient()
+        self.client.containers.add(BOT_ID, "bot-1", "running")
+        self.client.containers.add(OTHER_ID, "bot-10", "exited")
+        self.inventory = container_inventory.ContainerInventory(self.client)
+        self.inventory.resync()
+
+    def test_listing_is_served_from_memory(self):
+        calls = len(self.client.containers.list_calls)
+
+        running = self.inventory.list(status="running")
+        exited = self.inventory.list(status="exited", name_filter="BOT")
+
+        self.assertEqual(running, [{"id": BOT_ID, "name": "bot-1", "status": "running",
+                                    "image": "hummingbot/hummingbot:latest"}])
+        self.assertEqual([c["name"] for c in exited], ["bot-10"])
+        self.assertEqual(len(self.client.containers.list_calls), calls)
+
+    def test_events_refresh_only_their_container(self):
+        self.client.containers.state[BOT_ID]["State"] = "exited"
+
+        self.inventory.handle_event({"Type": "container", "Action": "die", "id": BOT_ID})
+
+        self.assertEqual(self.client.containers.list_calls[-1], {"id": BOT_ID})
+        self.assertEqual(self.inventory.get("bot-1")["status"], "exited")
+        self.assertEqual(self.inventory.get_metrics()["events"], 1)
+
+    def test_destroy_and_create_events(self):
+        self.inventory.handle_event({"Type": "container", "Action": "destroy", "Actor": {"ID": OTHER_ID}})
+        self.client.containers.add("c" * 64, "bot-2", "created")
+        self.inventory.handle_event({"Type": "container", "Action": "create", "id": "c" * 64})
+        self.inventory.handle_event({"Type": "container", "Action": "exec_start: sh", "id": BOT_ID})
+
+        self.assertIsNone(self.inventory.get("bot-10"))
+        self.assertEqual(self.inventory.get("bot-2")["status"], "created")
+        self.assertEqual(self.inventory.get_metrics()["containers"], 2)
+
+    def test_refresh_by_name_matches_exactly(self):
+        del self.client.containers.state[BOT_ID]
+
+        self.inventory.refresh("bot-1")
+
+        self.assertIsNone(self.inventory.get("bot-1"))
+        self.assertIsNotNone(self.inventory.get("bot-10"))
+
+    def test_untagged_image_references_get_the_implicit_latest_tag(self):
+        self.client.containers.add("c" * 64, "lp-bot", "running", image="someone/hummingbot-lp")
+        self.client.containers.add("d" * 64, "registry-bot", "running", image="localhost:5000/someone/hummingbot")
+        self.client.containers.add("e" * 64, "pinned-bot", "running", image="someone/hummingbot@sha256:" + "a" * 64)
+
+        self.inventory.resync()
+
+        self.assertEqual(self.inventory.get("lp-bot")["image"], "someone/hummingbot-lp:latest")
+        self.assertEqual(self.inventory.get("registry-bot")["image"], "localhost:5000/someone/hummingbot:latest")
+        self.assertEqual(self.inventory.get("pinned-bot")["image"], "someone/hummingbot@sha256:" + "a" * 64)
+
+    def test_image_ids_are_resolved_once(self):
+        for i in range(3):
+            self.client.containers.add(str(i) * 64, f"untagged-{i}", "running", image="sha256:" + "f" * 64)
+
+        self.inventory.resync()
+        self.inventory.resync()
+
+        self.assertEqual(self.inventory.get("untagged-0")["image"], "hummingbot/hummingbot:development")
+        self.assertEqual(self.client.images.get_calls, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import pytest
+
+from utils.event_broadcaster import EventBroadcaster
+
+
+@pytest.mark.asyncio
+async def test_events_fan_out_to_every_subscriber():
+    broadcaster = EventBroadcaster()
+    first, second = broadcaster.subscribe(), broadcaster.subscribe()
+
+    broadcaster.publish("bot_discovered", {"bot_name": "bot1"})
+
+    for subscription in (first, second):
+        event = await subscription.get(timeout=1)
+        assert event["type"] == "bot_discovered"
+        assert event["data"] == {"bot_name": "bot1"}
+    assert broadcaster.get_metrics() == {"published": 1, "delivered": 2, "dropped": 0, "subscribers": 2}
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_drops_its_oldest_events():
+    broadcaster = EventBroadcaster(max_queue_size=2)
+    subscription = broadcaster.subscribe()
+
+    for i in range(5):
+        broadcaster.publish("performance", {"i": i})
+
+    assert [(await subscription.get(timeout=1))["data"]["i"] for _ in range(2)] == [3, 4]
+    assert subscription.dropped == 3
+    assert await subscription.get(timeout=0.01) is None
+
+
+@pytest.mark.asyncio
+async def test_closed_subscriptions_stop_receiving():
+    broadcaster = EventBroadcaster()
+    with broadcaster.subscribe():
+        assert broadcaster.subscriber_count == 1
+
+    broadcaster.publish("bot_lost", {"bot_name": "bot1"})
+
+    assert broadcaster.subscriber_count == 0
+    assert broadcaster.metrics["delivered"] == 0
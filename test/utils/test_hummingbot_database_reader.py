@@ -0,0 +1,150 @@
+import importlib.util
+import sqlite3
+import sys
+import types
+from pathlib import Path
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+import sqlalchemy.orm  # noqa: F401 - imported before patch.dict(sys.modules) so it is not unloaded afterwards
+
+
+def _make_test_stubs() -> dict:
+    """`utils/hummingbot_database_reader.py` only needs these hummingbot names to exist."""
+    names = {
+        "hummingbot.core.data_type.common": "TradeType",
+        "hummingbot.strategy_v2.models.base": "RunnableStatus",
+        "hummingbot.strategy_v2.models.executors": "CloseType",
+        "hummingbot.strategy_v2.models.executors_info": "ExecutorInfo",
+    }
+    stubs = {}
+    for module_name, attribute in names.items():
+        parts = module_name.split(".")
+        for i in range(1, len(parts) + 1):
+            stubs.setdefault(".".join(parts[:i]), types.ModuleType(".".join(parts[:i])))
+        setattr(stubs[module_name], attribute, object)
+    return stubs
+
+
+def _load_reader_module():
+    repo_root = Path(__file__).resolve().parents[2]
+    module_path = repo_root / "utils" / "hummingbot_database_reader.py"
+    spec = importlib.util.spec_from_file_location("hummingbot_database_reader_under_test", module_path)
+    assert spec and spec.loader
+    module = importlib.util.module_from_spec(spec)
+    with patch.dict(sys.modules, _make_test_stubs()):
+        spec.loader.exec_module(module)
+    return module
+
+
+reader = _load_reader_module()
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "bot.sqlite")
+    connection = sqlite3.connect(path)
+    connection.executescript("""
+        CREATE TABLE "Order" (id TEXT PRIMARY KEY, market TEXT, symbol TEXT, amount INTEGER, price INTEGER,
+                              last_status TEXT, creation_timestamp INTEGER);
+        CREATE TABLE TradeFill (config_file_path TEXT, market TEXT, symbol TEXT, timestamp INTEGER,
+                                trade_type TEXT, amount INTEGER, price INTEGER, trade_fee TEXT,
+                                trade_fee_in_quote INTEGER);
+        CREATE TABLE Executors (id TEXT PRIMARY KEY, controller_id TEXT, type TEXT, timestamp REAL);
+        CREATE TABLE Position (id TEXT PRIMARY KEY, controller_id TEXT, trading_pair TEXT, volume_traded_quote INTEGER,
+                               amount INTEGER, breakeven_price INTEGER, unrealized_pnl_quote INTEGER,
+                               cum_fees_quote INTEGER);
+        CREATE TABLE Controllers (id TEXT PRIMARY KEY, config TEXT);
+        CREATE TABLE OrderStatus (id INTEGER PRIMARY KEY, order_id TEXT, status TEXT);
+    """)
+    connection.executemany('INSERT INTO "Order" VALUES (?, ?, ?, ?, ?, ?, ?)', [
+        ("o1", "binance", "ETH-USDT", 1_000_000, 2_000_000_000, "FILLED", 1),
+        ("o2", "kucoin", "BTC-USDT", 500_000, 60_000_000_000, "CANCELED", 2),
+        ("o3", "binance", "ETH-USDT", 2_000_000, 2_100_000_000, "FILLED", 3),
+        ("o4", "binance", "SOL-USDT", 3_000_000, 150_000_000, "FILLED", 4),
+    ])
+    connection.executemany("INSERT INTO TradeFill VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", [
+        ("conf", "binance", "ETH-USDT", 1, "BUY", 1_000_000, 2_000_000_000, "{}", 2_000_000),
+        ("conf", "kucoin", "BTC-USDT", 2, "SELL", 500_000, 60_000_000_000, "{}", 30_000_000),
+        ("conf", "binance", "ETH-USDT", 3, "SELL", 1_000_000, 2_100_000_000, "{}", 2_100_000),
+        ("conf", "binance", "ETH-USDT", 4, "BUY", 2_000_000, 2_050_000_000, "{}", None),
+    ])
+    connection.executemany("INSERT INTO Executors VALUES (?, ?, ?, ?)", [
+        ("e1", "c1", "position_executor", 1.0), ("e2", "c2", "dca_executor", 2.0),
+    ])
+    connection.execute("INSERT INTO Position VALUES ('p1', 'c1', 'ETH-USDT', 1000000, 2000000, 3000000, 0, 1000)")
+    connection.execute("INSERT INTO Controllers VALUES ('c1', '{}')")
+    connection.execute("INSERT INTO OrderStatus VALUES (1, 'o1', 'FILLED')")
+    connection.commit()
+    connection.close()
+    return path
+
+
+def _pandas_trade_fills(path):
+    """Reference implementation: the previous full-table pandas computation."""
+    with sqlite3.connect(path) as connection:
+        trade_fills = pd.read_sql_query("SELECT * FROM TradeFill", connection)
+    groupers = ["config_file_path", "connector_name", "trading_pair"]
+    float_cols = ["amount", "price", "trade_fee_in_quote"]
+    trade_fills.rename(columns={"market": "connector_name", "symbol": "trading_pair"}, inplace=True)
+    trade_fills[float_cols] = trade_fills[float_cols] / 1e6
+    trade_fills["cum_fees_in_quote"] = trade_fills.groupby(groupers)["trade_fee_in_quote"].cumsum()
+    trade_fills["trade_fee"] = trade_fills.groupby(groupers)["cum_fees_in_quote"].diff()
+    return trade_fills
+
+
+def test_trade_fills_match_pandas_computation(db_path):
+    db = reader.HummingbotDatabase(db_path)
+
+    trade_fills = db.get_trade_fills()
+
+    expected = _pandas_trade_fills(db_path)
+    assert list(trade_fills.columns) == list(expected.columns)
+    pd.testing.assert_frame_equal(trade_fills, expected, check_dtype=False)
+
+
+def test_filters_and_pagination_run_in_sql(db_path):
+    db = reader.HummingbotDatabase(db_path)
+
+    rows = list(db.iter_rows("orders", {"connector_name": "binance", "last_status": "FILLED"}, limit=2, offset=1))
+
+    assert [row["id"] for row in rows] == ["o3", "o4"]
+    assert rows[0]["amount"] == 2.0 and rows[0]["price"] == 2100.0
+    assert rows[0]["trading_pair"] == "ETH-USDT"
+    assert db.count("orders", {"connector_name": "binance"}) == 3
+    assert db.count("orders", {"last_status": ["FILLED", "CANCELED"]}) == 4
+
+
+def test_filtered_trade_fills_keep_cumulative_fees_of_the_full_table(db_path):
+    db = reader.HummingbotDatabase(db_path)
+
+    rows = list(db.iter_rows("trade_fills", {"trade_type": "SELL", "trading_pair": "ETH-USDT"}))
+
+    assert len(rows) == 1
+    assert rows[0]["cum_fees_in_quote"] == pytest.approx(4.1)
+    assert rows[0]["trade_fee"] == pytest.approx(2.1)
+
+
+def test_summary_uses_counts_and_distinct_values(db_path):
+    db = reader.HummingbotDatabase(db_path)
+
+    summary = db.get_summary()
+
+    assert summary == {
+        "total_orders": 4,
+        "total_trades": 4,
+        "total_executors": 2,
+        "total_positions": 1,
+        "total_controllers": 1,
+        "trading_pairs": ["ETH-USDT", "BTC-USDT", "SOL-USDT"],
+        "exchanges": ["binance", "kucoin"],
+    }
+    assert db.status["general_status"] is True
+
+
+def test_unknown_filter_column_is_rejected(db_path):
+    db = reader.HummingbotDatabase(db_path)
+
+    with pytest.raises(ValueError):
+        db.count("orders", {"market; DROP TABLE Order": "x"})
@@ -0,0 +1,207 @@
+import asyncio
+import importlib.util
+import json
+import sys
+import types
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from utils import channel_queue  # noqa: F401 - imported before patch.dict(sys.modules) so it is not unloaded afterwards
+
+
+def _make_test_stubs() -> dict:
+    """`utils/mqtt_manager.py` only needs these aiomqtt names to exist."""
+    aiomqtt = types.ModuleType("aiomqtt")
+    aiomqtt.Client = object
+    aiomqtt.MqttError = type("MqttError", (Exception,), {})
+    return {"aiomqtt": aiomqtt}
+
+
+def _load_mqtt_manager_module():
+    repo_root = Path(__file__).resolve().parents[2]
+    module_path = repo_root / "utils" / "mqtt_manager.py"
+    spec = importlib.util.spec_from_file_location("mqtt_manager_under_test", module_path)
+    assert spec and spec.loader
+    module = importlib.util.module_from_spec(spec)
+    with patch.dict(sys.modules, _make_test_stubs()):
+        spec.loader.exec_module(module)
+    return module
+
+
+mqtt_manager = _load_mqtt_manager_module()
+
+
+class _Message:
+    def __init__(self, topic: str, data):
+        self.topic = topic
+        self.payload = (json.dumps(data) if not isinstance(data, str) else data).encode("utf-8")
+
+
+class TestMQTTIngestion(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.manager = mqtt_manager.MQTTManager(host="localhost", port=1883, username="", password="")
+        for queue in self.manager._channel_queues.values():
+            queue.start()
+
+    async def asyncTearDown(self):
+        await self.manager.stop()
+
+    async def _drain(self):
+        queues = self.manager._channel_queues.values()
+        while any(q.depth or q.metrics["processed"] < q.metrics["enqueued"] - q.metrics["replaced"] for q in queues):
+            await asyncio.sleep(0.01)
+
+    async def test_messages_are_routed_to_channel_queues(self):
+        await self.manager._route_message(_Message("hbot/bot1/log", {"msg": "started", "level_name": "INFO"}))
+        await self.manager._route_message(_Message("hbot/bot1/performance", {"ctrl": {"performance": {"pnl": 1}}}))
+        await self.manager._route_message(_Message("hbot/bot1/external/event/fill", {"x": 1}))
+        await self._drain()
+
+        self.assertEqual(self.manager.get_bot_logs("bot1")[0]["msg"], "started")
+        self.assertEqual(self.manager.get_bot_controller_reports("bot1"), {"ctrl": {"performance": {"pnl": 1}}})
+        metrics = self.manager.get_ingestion_metrics()
+        self.assertEqual(metrics["log"]["processed"], 1)
+        self.assertEqual(metrics["performance"]["processed"], 1)
+        self.assertEqual(metrics["default"]["processed"], 1)
+
+    async def test_slow_handler_does_not_block_other_channels(self):
+        release = asyncio.Event()
+
+        async def slow_handler(bot_id, channel, data):
+            await release.wait()
+
+        self.manager.add_handler("hbot/+/performance", slow_handler)
+
+        await self.manager._route_message(_Message("hbot/bot1/performance", {"ctrl": {"performance": {"pnl": 1}}}))
+        await asyncio.sleep(0.01)  # the performance worker is now stuck in the slow handler
+        for pnl in (2, 3):
+            await self.manager._route_message(_Message("hbot/bot1/performance", {"ctrl": {"performance": {"pnl": pnl}}}))
+        await self.manager._route_message(_Message("hbot/bot2/hb", {}))
+        await self.manager._route_message(_Message("hbot/bot2/log", "plain log line"))
+        await asyncio.sleep(0.05)
+
+        self.assertEqual(set(self.manager.get_discovered_bots()), {"bot1", "bot2"})
+        self.assertEqual(self.manager.get_bot_logs("bot2")[0]["msg"], "plain log line")
+        self.assertEqual(self.manager.get_ingestion_metrics()["performance"]["depth"], 1)
+
+        release.set()
+        await self._drain()
+        self.assertEqual(self.manager.get_bot_controller_reports("bot1")["ctrl"]["performance"]["pnl"], 3)
+        self.assertEqual(self.manager.get_ingestion_metrics()["performance"]["replaced"], 1)
+
+    async def test_full_default_queue_drops_instead_of_stalling_ingestion(self):
+        await self.manager.stop()
+        self.manager = mqtt_manager.MQTTManager(host="localhost", port=1883, username="", password="",
+                                                channel_queues={"default": {"maxsize": 2}})
+        for queue in self.manager._channel_queues.values():
+            queue.start()
+        release = asyncio.Event()
+
+        async def slow_handler(bot_id, channel, data):
+            await release.wait()
+
+        self.manager.add_handler("hbot/+/external/event/+", slow_handler)
+
+        for i in range(5):
+            await asyncio.wait_for(
+                self.manager._route_message(_Message("hbot/bot1/external/event/fill", {"i": i})), timeout=1
+            )
+        await asyncio.wait_for(self.manager._route_message(_Message("hbot/bot2/log", "still ingested")), timeout=1)
+        await self.manager._route_message(_Message("hbot/bot2/response/start", {"status": 200}))
+        await asyncio.sleep(0.05)
+
+        self.assertEqual(self.manager.get_bot_logs("bot2")[0]["msg"], "still ingested")
+        metrics = self.manager.get_ingestion_metrics()
+        self.assertEqual(metrics["default"]["dropped"], 2)
+        self.assertEqual(metrics["response"]["processed"], 1)
+        release.set()
+
+    async def test_rpc_responses_resolve_without_queueing(self):
+        future = asyncio.get_running_loop().create_future()
+        self.manager._pending_responses["hummingbot-api/response/1"] = future
+
+        await self.manager._route_message(_Message("hummingbot-api/response/1", {"status": 200}))
+
+        self.assertEqual(future.result(), {"status": 200})
+        self.assertEqual(sum(q["enqueued"] for q in self.manager.get_ingestion_metrics().values()), 0)
+
+    async def test_performance_reports_feed_the_history(self):
+        report = {"ctrl": {"performance": {"realized_pnl_quote": 1.0, "volume_traded": 10.0}, "custom_info": {}}}
+
+        await self.manager._route_message(_Message("hbot/bot1/performance", report))
+        await self._drain()
+
+        latest = self.manager.get_bot_performance_latest("bot1")["ctrl"]
+        self.assertEqual((latest["realized_pnl_quote"], latest["volume_traded"]), (1.0, 10.0))
+        self.assertEqual(self.manager.get_bot_performance_history("bot1", since=latest["timestamp"]), {})
+
+    async def test_performance_and_error_logs_are_published(self):
+        with self.manager.events.subscribe() as subscription:
+            await self.manager._route_message(_Message("hbot/bot1/performance", {"ctrl": {"realized_pnl_quote": 2.0}}))
+            await self.manager._route_message(_Message("hbot/bot1/log", {"msg": "boom", "level_name": "ERROR"}))
+            await self.manager._route_message(_Message("hbot/bot1/log", {"msg": "fine", "level_name": "INFO"}))
+            await self._drain()
+
+            performance = await subscription.get(timeout=1)
+            error_log = await subscription.get(timeout=1)
+            self.assertIsNone(await subscription.get(timeout=0.01))
+
+        self.assertEqual(performance["type"], "performance")
+        self.assertEqual(performance["data"]["bot_name"], "bot1")
+        self.assertEqual(performance["data"]["performance"]["ctrl"]["realized_pnl_quote"], 2.0)
+        self.assertEqual((error_log["type"], error_log["data"]["log"]["msg"]), ("error_log", "boom"))
+        self.assertEqual(self.manager.events.subscriber_count, 0)
+
+
+class TestRecentMessages(unittest.TestCase):
+    def test_duplicates_within_ttl_are_detected(self):
+        recent = mqtt_manager.RecentMessages(ttl=10, max_size=100)
+
+        self.assertFalse(recent.seen("a", now=0))
+        self.assertTrue(recent.seen("a", now=5))
+        self.assertFalse(recent.seen("a", now=11))
+        self.assertEqual(recent.duplicates, 1)
+
+    def test_expired_hashes_are_removed_incrementally(self):
+        recent = mqtt_manager.RecentMessages(ttl=10, max_size=100)
+        for i in range(5):
+            recent.seen(f"m{i}", now=i)
+
+        recent.seen("new", now=13)
+
+        self.assertEqual(len(recent), 3)  # m3, m4 and new
+        self.assertFalse(recent.seen("m0", now=13))
+
+    def test_size_is_bounded(self):
+        recent = mqtt_manager.RecentMessages(ttl=300, max_size=3)
+        for i in range(10):
+            recent.seen(f"m{i}", now=0)
+
+        self.assertEqual(len(recent), 3)
+        self.assertTrue(recent.seen("m9", now=1))
+
+
+class TestLogDedup(unittest.IsolatedAsyncioTestCase):
+    async def test_duplicate_log_lines_are_dropped_and_counted(self):
+        manager = mqtt_manager.MQTTManager(host="localhost", port=1883, username="", password="")
+        line = {"msg": "order filled", "level_name": "INFO", "timestamp": 1700000000.2}
+
+        await manager._handle_log("bot1", line)
+        await manager._handle_log("bot1", {**line, "timestamp": 1700000000.7})
+        await manager._handle_log("bot2", line)
+        await manager._handle_log("bot1", {**line, "level_name": "ERROR", "timestamp": 1700000001})
+
+        self.assertEqual(len(manager.get_bot_logs("bot1")), 1)
+        self.assertEqual(len(manager.get_bot_error_logs("bot1")), 1)
+        self.assertEqual(len(manager.get_bot_logs("bot2")), 1)
+        metrics = manager.get_log_dedup_metrics()
+        self.assertEqual(metrics["duplicates_dropped"], 1)
+        self.assertEqual(metrics["bots"]["bot1"], {"tracked": 2, "duplicates_dropped": 1})
+
+        manager.clear_bot_data("bot1")
+        self.assertNotIn("bot1", manager.get_log_dedup_metrics()["bots"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import pytest
+
+from utils.order_book_depth import OrderBookDepth
+
+BIDS = [(99.0, 1.0), (98.0, 2.0), (97.0, 3.0)]
+ASKS = [(101.0, 1.0), (102.0, 2.0), (103.0, 3.0)]
+
+
+def _depth() -> OrderBookDepth:
+    return OrderBookDepth(
+        [price for price, _ in BIDS], [amount for _, amount in BIDS],
+        [price for price, _ in ASKS], [amount for _, amount in ASKS],
+    )
+
+
+def _vwap_reference(levels, volume):
+    # Level-by-level walk, as Hummingbot's OrderBook.get_vwap_for_volume
+    total_cost = total_volume = 0.0
+    for price, amount in levels:
+        if total_volume + amount > volume:
+            total_cost += (volume - total_volume) * price
+            total_volume = volume
+            break
+        total_cost += amount * price
+        total_volume += amount
+    return total_cost / total_volume, total_volume
+
+
+def test_snapshot_prices():
+    depth = _depth()
+    assert depth.best_bid == 99.0
+    assert depth.best_ask == 101.0
+    assert depth.mid_price == 100.0
+
+
+def test_price_for_volume_curve():
+    results = _depth().query([
+        {"query_type": "price_for_volume", "is_buy": True, "value": volume} for volume in (0.5, 1.0, 2.5, 6.0, 10.0)
+    ])
+    assert [result["result_price"] for result in results] == [101.0, 101.0, 102.0, 103.0, None]
+    assert results[-1]["result_volume"] == 6.0
+    assert results[0]["price_impact_pct"] == pytest.approx(1.0)
+
+
+def test_vwap_matches_level_walk():
+    volumes = [0.5, 1.0, 2.0, 3.5, 6.0]
+    results = _depth().query(
+        [{"query_type": "vwap_for_volume", "is_buy": True, "value": volume} for volume in volumes]
+        + [{"query_type": "vwap_for_volume", "is_buy": False, "value": volume} for volume in volumes]
+    )
+    for result, volume in zip(results[:5], volumes):
+        average_price, filled = _vwap_reference(ASKS, volume)
+        assert result["average_price"] == pytest.approx(average_price)
+        assert result["result_volume"] == pytest.approx(filled)
+    for result, volume in zip(results[5:], volumes):
+        average_price, filled = _vwap_reference(BIDS, volume)
+        assert result["average_price"] == pytest.approx(average_price)
+        assert result["is_buy"] is False
+
+
+def test_vwap_beyond_depth_consumes_whole_side():
+    result = _depth().query([{"query_type": "vwap_for_volume", "is_buy": False, "value": 100}])[0]
+    assert result["result_volume"] == 6.0
+    assert result["average_price"] == pytest.approx((99 + 98 * 2 + 97 * 3) / 6)
+
+
+def test_volume_and_quote_volume_for_price():
+    results = _depth().query([
+        {"query_type": "volume_for_price", "is_buy": True, "value": 102.0},
+        {"query_type": "volume_for_price", "is_buy": True, "value": 100.0},
+        {"query_type": "volume_for_price", "is_buy": False, "value": 98.0},
+        {"query_type": "quote_volume_for_price", "is_buy": False, "value": 98.0},
+    ])
+    assert results[0]["result_volume"] == 3.0
+    assert results[0]["result_price"] == 102.0
+    assert results[1]["result_volume"] == 0.0
+    assert results[1]["result_price"] is None
+    assert results[2]["result_volume"] == 3.0
+    assert results[3]["result_quote_volume"] == pytest.approx(99 + 98 * 2)
+
+
+def test_price_for_quote_volume():
+    results = _depth().query([
+        {"query_type": "price_for_quote_volume", "is_buy": True, "value": 101.0},
+        {"query_type": "price_for_quote_volume", "is_buy": True, "value": 200.0},
+        {"query_type": "price_for_quote_volume", "is_buy": True, "value": 10000.0},
+    ])
+    assert [result["result_price"] for result in results] == [101.0, 102.0, None]
+
+
+def test_unknown_query_type_is_rejected():
+    with pytest.raises(ValueError):
+        _depth().query([{"query_type": "depth", "is_buy": True, "value": 1}])
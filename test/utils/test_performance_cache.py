@@ -0,0 +1,111 @@
+import os
+from decimal import Decimal
+
+import pandas as pd
+import pytest
+
+from utils.performance_cache import PerformanceCache
+
+
+def _frame():
+    return pd.DataFrame({
+        "timestamp": [1700000000, 1700000060],
+        "trading_pair": ["ETH-USDT", "ETH-USDT"],
+        "trade_type": ["BUY", "SELL"],
+        "net_pnl_quote": [0.0, 1.25],
+        "position": ["OPEN", None],
+        "trade_fee": [None, None],
+        "amount": [Decimal("0.5"), None],
+    })
+
+
+@pytest.fixture
+def db_file(tmp_path):
+    path = tmp_path / "archived" / "bot.sqlite"
+    path.parent.mkdir()
+    path.write_bytes(b"sqlite")
+    return str(path)
+
+
+def test_frame_is_computed_once_per_file(tmp_path, db_file):
+    cache = PerformanceCache(str(tmp_path / "cache"))
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return _frame()
+
+    first = cache.get_or_compute(db_file, compute)
+    second = cache.get_or_compute(db_file, compute)
+
+    assert len(calls) == 1
+    pd.testing.assert_frame_equal(second, first, check_dtype=False)
+    assert second["trading_pair"].tolist() == ["ETH-USDT", "ETH-USDT"]
+    assert cache.get_metrics()["hits"] == 1
+
+
+def test_nulls_and_numeric_object_columns_round_trip(tmp_path, db_file):
+    cache = PerformanceCache(str(tmp_path / "cache"))
+    computed = _frame()
+    cache.put(db_file, computed)
+
+    cached = cache.get(db_file)
+
+    assert cached["position"].isna().tolist() == [False, True]
+    assert cached["trade_fee"].isna().all()
+    assert cached["amount"].tolist()[0] == 0.5
+    # Responses are built with fillna(0), so cached and computed frames must produce the same records
+    assert cached.fillna(0).to_dict("records") == computed.fillna(0).to_dict("records")
+
+
+def test_modified_database_is_recomputed(tmp_path, db_file):
+    cache = PerformanceCache(str(tmp_path / "cache"))
+    cache.put(db_file, _frame())
+
+    with open(db_file, "ab") as f:
+        f.write(b" more trades")
+
+    assert cache.get(db_file) is None
+
+
+def test_empty_frame_round_trips(tmp_path, db_file):
+    cache = PerformanceCache(str(tmp_path / "cache"))
+    cache.put(db_file, pd.DataFrame())
+
+    assert len(cache.get(db_file)) == 0
+
+
+def test_entries_are_bounded(tmp_path):
+    cache = PerformanceCache(str(tmp_path / "cache"), max_entries=2)
+    for i in range(3):
+        path = tmp_path / f"bot_{i}.sqlite"
+        path.write_bytes(b"x" * (i + 1))
+        cache.put(str(path), _frame())
+        os.utime(cache._path(cache.key(str(path))), (i, i))
+
+    assert cache.get_metrics()["entries"] == 2
+    assert cache.get(str(tmp_path / "bot_0.sqlite")) is None
+
+
+@pytest.mark.asyncio
+async def test_precompute_skips_cached_and_records_failures(tmp_path, db_file):
+    cache = PerformanceCache(str(tmp_path / "cache"))
+    cache.put(db_file, _frame())
+    other = tmp_path / "other.sqlite"
+    other.write_bytes(b"sqlite")
+    broken = tmp_path / "broken.sqlite"
+    broken.write_bytes(b"sqlite")
+
+    def compute(db_path):
+        if db_path == str(broken):
+            raise ValueError("no such table: TradeFill")
+        return _frame()
+
+    status = cache.start_precompute([db_file, str(other), str(broken)], compute)
+    assert cache.start_precompute([], compute) is status
+    await cache._precompute_task
+
+    assert status["running"] is False
+    assert (status["done"], status["cached"], status["computed"], status["failed"]) == (3, 1, 1, 1)
+    assert status["errors"] == {str(broken): "no such table: TradeFill"}
+    assert cache.get(str(other)) is not None
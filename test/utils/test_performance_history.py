@@ -0,0 +1,68 @@
+from utils.performance_history import PerformanceHistory, performance_sample
+
+
+def _report(pnl: float, volume: float = 100.0):
+    return {
+        "performance": {
+            "realized_pnl_quote": pnl,
+            "unrealized_pnl_quote": 0.5,
+            "global_pnl_quote": pnl + 0.5,
+            "global_pnl_pct": 0.01,
+            "volume_traded": volume,
+            "positions_summary": [{"amount": 1.5, "side": "BUY"}, {"amount": 0.5, "side": "SELL"}],
+            "close_type_counts": {"CloseType.TAKE_PROFIT": 3},
+        },
+        "custom_info": {"levels": list(range(100))},
+    }
+
+
+def test_sample_is_compact():
+    sample = performance_sample(_report(2.0), timestamp=1000.0)
+
+    assert sample == {
+        "timestamp": 1000.0,
+        "realized_pnl_quote": 2.0,
+        "unrealized_pnl_quote": 0.5,
+        "global_pnl_quote": 2.5,
+        "global_pnl_pct": 0.01,
+        "volume_traded": 100.0,
+        "open_positions": 2,
+        "position_amount": 2.0,
+    }
+    assert performance_sample({"realized_pnl_quote": 1.0}, 1.0)["realized_pnl_quote"] == 1.0
+
+
+def test_reports_within_resolution_replace_the_bucket_sample():
+    history = PerformanceHistory(resolution=10, max_samples=100)
+
+    history.record("bot", "ctrl", _report(1.0), 1000.0)
+    history.record("bot", "ctrl", _report(2.0), 1005.0)
+    history.record("bot", "ctrl", _report(3.0), 1012.0)
+
+    samples = history.since("bot")["ctrl"]
+    assert [(s["timestamp"], s["realized_pnl_quote"]) for s in samples] == [(1005.0, 2.0), (1012.0, 3.0)]
+    assert history.latest("bot")["ctrl"]["realized_pnl_quote"] == 3.0
+
+
+def test_since_returns_only_newer_samples():
+    history = PerformanceHistory(resolution=1, max_samples=100)
+    for i in range(10):
+        history.record("bot", "a", _report(float(i)), 1000.0 + i)
+    history.record("bot", "b", _report(0.0), 1001.0)
+
+    delta = history.since("bot", since=1007.0)
+
+    assert [s["timestamp"] for s in delta["a"]] == [1008.0, 1009.0]
+    assert "b" not in delta
+
+
+def test_history_is_bounded_and_clearable():
+    history = PerformanceHistory(resolution=1, max_samples=5)
+    for i in range(20):
+        history.record("bot", "ctrl", _report(float(i)), 1000.0 + i)
+
+    assert len(history.since("bot")["ctrl"]) == 5
+    assert history.since("bot")["ctrl"][0]["timestamp"] == 1015.0
+
+    history.clear("bot")
+    assert history.latest("bot") == {} and history.bots() == []
@@ -0,0 +1,84 @@
+from utils.portfolio_aggregator import PortfolioAggregator
+
+
+def _token(token: str, units: float, price: float) -> dict:
+    return {"token": token, "units": units, "price": price, "value": units * price, "available_units": units}
+
+
+def _build() -> PortfolioAggregator:
+    aggregator = PortfolioAggregator()
+    aggregator.set_connector("acc-1", "binance", [_token("BTC", 1, 60), _token("USDT", 20, 1)])
+    aggregator.set_connector("acc-1", "okx", [_token("BTC", 0.5, 60)])
+    aggregator.set_connector("acc-2", "binance", [_token("USDT", 50, 1)])
+    return aggregator
+
+
+def test_portfolio_distribution_aggregates_tokens_accounts_and_connectors():
+    distribution = _build().get_portfolio_distribution()
+
+    assert distribution["total_portfolio_value"] == 160
+    assert distribution["token_count"] == 2
+    assert distribution["account_filter"] == "all_accounts"
+
+    btc, usdt = distribution["distribution"]
+    assert (btc["token"], btc["total_value"], btc["total_units"], btc["percentage"]) == ("BTC", 90, 1.5, 56.25)
+    assert btc["accounts"]["acc-1"]["connectors"] == {
+        "binance": {"value": 60, "units": 1},
+        "okx": {"value": 30, "units": 0.5},
+    }
+    assert usdt["accounts"]["acc-2"] == {
+        "value": 50, "units": 50, "percentage": 31.25, "connectors": {"binance": {"value": 50, "units": 50}}
+    }
+
+
+def test_single_account_distribution_uses_account_total():
+    distribution = _build().get_portfolio_distribution("acc-1")
+
+    assert distribution["total_portfolio_value"] == 110
+    assert distribution["account_filter"] == "acc-1"
+    assert [(item["token"], item["percentage"]) for item in distribution["distribution"]] == [
+        ("BTC", round(90 / 110 * 100, 4)),
+        ("USDT", round(20 / 110 * 100, 4)),
+    ]
+    assert list(distribution["distribution"][1]["accounts"]) == ["acc-1"]
+
+
+def test_replacing_a_connector_applies_only_its_delta():
+    aggregator = _build()
+    before = aggregator.get_portfolio_distribution()
+    assert aggregator.get_portfolio_distribution() is before
+
+    # BTC sold on okx for ETH; binance untouched
+    aggregator.set_connector("acc-1", "okx", [_token("ETH", 2, 10)])
+    distribution = aggregator.get_portfolio_distribution()
+
+    assert distribution is not before
+    assert distribution["total_portfolio_value"] == 150
+    tokens = {item["token"]: item for item in distribution["distribution"]}
+    assert tokens["BTC"]["total_value"] == 60
+    assert list(tokens["BTC"]["accounts"]["acc-1"]["connectors"]) == ["binance"]
+    assert tokens["ETH"]["accounts"]["acc-1"]["connectors"] == {"okx": {"value": 20, "units": 2}}
+
+
+def test_account_distribution_and_removals():
+    aggregator = _build()
+    aggregator.ensure_account("empty")
+
+    distribution = aggregator.get_account_distribution()
+    assert distribution["total_portfolio_value"] == 160
+    assert [(item["account"], item["total_value"]) for item in distribution["distribution"]] == [
+        ("acc-1", 110), ("acc-2", 50), ("empty", 0)
+    ]
+    assert distribution["distribution"][0]["connectors"]["okx"] == {"value": 30, "percentage": 18.75}
+
+    aggregator.remove_connector("acc-1", "okx")
+    aggregator.remove_account("acc-2")
+
+    assert aggregator.get_account_distribution()["total_portfolio_value"] == 80
+    portfolio = aggregator.get_portfolio_distribution()
+    assert {item["token"]: item["total_value"] for item in portfolio["distribution"]} == {"BTC": 60, "USDT": 20}
+    assert "acc-2" not in portfolio["distribution"][1]["accounts"]
+
+    aggregator.set_connector("acc-1", "binance", [])
+    assert aggregator.get_portfolio_distribution()["token_count"] == 0
+    assert aggregator.total_value == 0
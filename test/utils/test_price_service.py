@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+
+from utils.price_service import PriceService
+
+
+class _Exchange:
+    def __init__(self, fail_connectors=()):
+        self.calls = []
+        self.fail_connectors = set(fail_connectors)
+
+    async def fetch(self, connector_name, trading_pairs):
+        self.calls.append((connector_name, list(trading_pairs)))
+        await asyncio.sleep(0.01)
+        if connector_name in self.fail_connectors:
+            raise RuntimeError(f"{connector_name} unavailable")
+        return {pair: 100.0 + index for index, pair in enumerate(trading_pairs) if pair != "DELISTED-USDT"}
+
+
+@pytest.mark.asyncio
+async def test_prices_are_served_from_cache_within_ttl():
+    exchange = _Exchange()
+    service = PriceService(exchange.fetch, ttl=60)
+
+    first = await service.get_prices("binance", ["BTC-USDT", "ETH-USDT"])
+    second = await service.get_prices("binance", ["ETH-USDT", "BTC-USDT"])
+
+    assert first == second == {"BTC-USDT": 100.0, "ETH-USDT": 101.0}
+    assert exchange.calls == [("binance", ["BTC-USDT", "ETH-USDT"])]
+    assert service.get_metrics()["cache_hits"] == 2
+
+
+@pytest.mark.asyncio
+async def test_only_missing_pairs_are_fetched():
+    exchange = _Exchange()
+    service = PriceService(exchange.fetch, ttl=60)
+
+    await service.get_prices("binance", ["BTC-USDT"])
+    await service.get_prices("binance", ["BTC-USDT", "SOL-USDT", "DELISTED-USDT"])
+
+    assert exchange.calls[-1] == ("binance", ["SOL-USDT", "DELISTED-USDT"])
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_are_coalesced():
+    exchange = _Exchange()
+    service = PriceService(exchange.fetch, ttl=0)
+
+    results = await asyncio.gather(*(service.get_prices("binance", ["BTC-USDT", "ETH-USDT"]) for _ in range(10)))
+
+    assert all(result == results[0] for result in results)
+    assert len(exchange.calls) == 1
+    metrics = service.get_metrics()
+    assert metrics["coalesced"] == 18
+    assert metrics["in_flight_requests"] == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_abort_shared_fetch():
+    exchange = _Exchange()
+    service = PriceService(exchange.fetch, ttl=60)
+
+    first = asyncio.create_task(service.get_prices("binance", ["BTC-USDT"]))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(service.get_prices("binance", ["BTC-USDT"]))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == {"BTC-USDT": 100.0}
+    assert len(exchange.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_batch_fans_out_and_isolates_errors():
+    exchange = _Exchange(fail_connectors={"kucoin"})
+    service = PriceService(exchange.fetch, ttl=60)
+
+    prices, errors = await service.get_prices_batch({
+        "binance": ["BTC-USDT"],
+        "okx": ["ETH-USDT"],
+        "kucoin": ["SOL-USDT"],
+    })
+
+    assert prices == {"binance": {"BTC-USDT": 100.0}, "okx": {"ETH-USDT": 100.0}}
+    assert errors == {"kucoin": "kucoin unavailable"}
+    assert service.get_metrics()["errors"] == 1
+
+    # Failures are not cached
+    await service.get_prices_batch({"kucoin": ["SOL-USDT"]})
+    assert exchange.calls.count(("kucoin", ["SOL-USDT"])) == 2
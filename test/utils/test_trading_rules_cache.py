@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+
+from utils.trading_rules_cache import TradingRulesCache
+
+
+class _FakeConnector:
+    def __init__(self, fail: bool = False):
+        self._trading_rules = {}
+        self._trading_pair_symbol_map = None
+        self.fetches = 0
+        self.fail = fail
+
+    async def _update_trading_rules(self):
+        self.fetches += 1
+        await asyncio.sleep(0.01)
+        if self.fail:
+            raise RuntimeError("exchange-info unavailable")
+        self._trading_rules.clear()
+        self._trading_rules.update({"BTC-USDT": f"rule-{self.fetches}"})
+        self._trading_pair_symbol_map = {"BTCUSDT": "BTC-USDT"}
+
+    def _set_trading_pair_symbol_map(self, symbol_map):
+        self._trading_pair_symbol_map = symbol_map
+
+
+@pytest.mark.asyncio
+async def test_connectors_of_same_exchange_share_one_fetch():
+    connectors = [_FakeConnector() for _ in range(5)]
+    cache = TradingRulesCache(lambda _name: connectors)
+
+    await asyncio.gather(*(cache.ensure("binance", connector) for connector in connectors))
+    await cache.ensure("binance", connectors[0])
+
+    assert sum(connector.fetches for connector in connectors) == 1
+    assert all(connector._trading_rules == {"BTC-USDT": "rule-1"} for connector in connectors)
+    assert all(connector._trading_pair_symbol_map == {"BTCUSDT": "BTC-USDT"} for connector in connectors)
+    # Every connector keeps its own dict
+    assert connectors[0]._trading_rules is not connectors[1]._trading_rules
+    metrics = cache.get_metrics()["binance"]
+    assert metrics["fetches"] == 1
+    assert metrics["trading_pairs"] == 1
+    cache.stop()
+
+
+@pytest.mark.asyncio
+async def test_expired_rules_are_refetched_and_propagated():
+    connectors = [_FakeConnector(), _FakeConnector()]
+    cache = TradingRulesCache(lambda _name: connectors, ttl=0)
+
+    await cache.ensure("binance", connectors[0])
+    await cache.ensure("binance", connectors[1])
+
+    assert connectors[0].fetches + connectors[1].fetches == 2
+    assert connectors[0]._trading_rules == connectors[1]._trading_rules == {"BTC-USDT": "rule-1"}
+    assert cache.get_metrics()["binance"]["fetches"] == 2
+    cache.stop()
+
+
+@pytest.mark.asyncio
+async def test_failed_refresh_keeps_stale_rules():
+    healthy = _FakeConnector()
+    failing = _FakeConnector(fail=True)
+    cache = TradingRulesCache(lambda _name: [healthy, failing], ttl=0)
+
+    await cache.ensure("binance", healthy)
+    await cache.ensure("binance", failing)
+
+    assert failing._trading_rules == {"BTC-USDT": "rule-1"}
+    assert cache.get_metrics()["binance"]["last_error"] == "exchange-info unavailable"
+
+    # Within the retry interval stale rules are served without another request
+    await cache.ensure("binance", failing)
+    assert failing.fetches == 1
+    cache.stop()
+
+
+@pytest.mark.asyncio
+async def test_apply_uses_cached_rules_for_new_connector():
+    existing = _FakeConnector()
+    cache = TradingRulesCache(lambda _name: [existing])
+    assert not cache.apply("binance", existing)
+
+    await cache.ensure("binance", existing)
+    new_connector = _FakeConnector()
+
+    assert cache.apply("binance", new_connector)
+    assert new_connector.fetches == 0
+    assert new_connector._trading_rules == {"BTC-USDT": "rule-1"}
+    cache.stop()
+
+
+@pytest.mark.asyncio
+async def test_unchanged_entry_is_not_copied_again():
+    connectors = [_FakeConnector(), _FakeConnector()]
+    cache = TradingRulesCache(lambda _name: connectors)
+    await cache.ensure("binance", connectors[0])
+    await cache.ensure("binance", connectors[1])
+
+    # A marker survives only if ensure() leaves the connector's rules untouched
+    connectors[1]._trading_rules["BTC-USDT"] = "marker"
+    await cache.ensure("binance", connectors[1])
+    assert connectors[1]._trading_rules == {"BTC-USDT": "marker"}
+
+    # Rules replaced by the connector itself are copied again
+    connectors[1]._trading_rules.clear()
+    await cache.ensure("binance", connectors[1])
+    assert connectors[1]._trading_rules == {"BTC-USDT": "rule-1"}
+    cache.stop()
@@ -0,0 +1,156 @@
+import asyncio
+
+import pytest
+
+from utils.write_behind_queue import WriteBehindQueue
+
+
+class _Sink:
+    def __init__(self, fail_keys=(), fail_batches: bool = False):
+        self.batches = []
+        self.fail_keys = set(fail_keys)
+        self.fail_batches = fail_batches
+
+    async def flush(self, batch):
+        await asyncio.sleep(0)
+        if self.fail_batches and len(batch) > 1:
+            raise RuntimeError("batch failed")
+        if any(key in self.fail_keys for key, _ in batch):
+            raise RuntimeError("bad key")
+        self.batches.append(batch)
+
+
+@pytest.mark.asyncio
+async def test_items_are_grouped_per_key_in_arrival_order():
+    sink = _Sink()
+    queue = WriteBehindQueue(sink.flush, max_batch_size=100, flush_interval=10)
+
+    queue.put("order-1", "created")
+    queue.put("order-2", "created")
+    queue.put("order-1", "filled")
+    queue.put("order-1", "completed")
+    assert queue.depth == 4
+
+    await queue.flush()
+
+    assert sink.batches == [[("order-1", ["created", "filled", "completed"]), ("order-2", ["created"])]]
+    metrics = queue.get_metrics()
+    assert metrics["queue_depth"] == 0
+    assert metrics["flushed"] == 4
+    assert metrics["flushes"] == 1
+
+
+@pytest.mark.asyncio
+async def test_flushes_on_size_threshold_and_on_stop():
+    sink = _Sink()
+    queue = WriteBehindQueue(sink.flush, max_batch_size=3, flush_interval=10)
+    queue.start()
+
+    for i in range(3):
+        queue.put(f"order-{i}", "filled")
+    await asyncio.sleep(0.05)
+    assert len(sink.batches) == 1
+
+    queue.put("order-9", "filled")
+    await queue.stop()
+    assert sink.batches[-1] == [("order-9", ["filled"])]
+    assert queue.get_metrics()["flushed"] == 4
+
+
+@pytest.mark.asyncio
+async def test_flushes_on_time_threshold():
+    sink = _Sink()
+    queue = WriteBehindQueue(sink.flush, max_batch_size=100, flush_interval=0.02)
+    queue.start()
+
+    queue.put("order-1", "created")
+    await asyncio.sleep(0.1)
+
+    assert sink.batches == [[("order-1", ["created"])]]
+    assert queue.get_metrics()["last_flush_lag_seconds"] >= 0
+    await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_batches_are_split_by_size_without_splitting_a_key():
+    sink = _Sink()
+    queue = WriteBehindQueue(sink.flush, max_batch_size=2, flush_interval=10)
+
+    queue.put("order-1", "a")
+    queue.put("order-1", "b")
+    queue.put("order-1", "c")
+    queue.put("order-2", "a")
+
+    await queue.flush()
+
+    assert sink.batches == [[("order-1", ["a", "b", "c"])], [("order-2", ["a"])]]
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_is_retried_per_key_and_bad_key_dropped():
+    sink = _Sink(fail_keys={"order-2"}, fail_batches=True)
+    queue = WriteBehindQueue(sink.flush, max_batch_size=100, flush_interval=10)
+
+    queue.put("order-1", "created")
+    queue.put("order-2", "created")
+    queue.put("order-3", "created")
+
+    await queue.flush()
+
+    assert sink.batches == [[("order-1", ["created"])], [("order-3", ["created"])]]
+    metrics = queue.get_metrics()
+    assert metrics["failed_flushes"] == 1
+    assert metrics["dropped"] == 1
+    assert metrics["flushed"] == 2
+
+
+@pytest.mark.asyncio
+async def test_failing_key_is_retried_per_item_and_only_bad_item_dropped():
+    class _ItemSink(_Sink):
+        async def flush(self, batch):
+            await asyncio.sleep(0)
+            if any("duplicate-fill" in items for _, items in batch):
+                raise RuntimeError("unique constraint failed")
+            self.batches.append(batch)
+
+    sink = _ItemSink()
+    queue = WriteBehindQueue(sink.flush, max_batch_size=100, flush_interval=10)
+
+    queue.put("order-1", "created")
+    queue.put("order-1", "duplicate-fill")
+    queue.put("order-1", "completed")
+    queue.put("order-2", "created")
+
+    await queue.flush()
+
+    assert sink.batches == [
+        [("order-1", ["created"])],
+        [("order-1", ["completed"])],
+        [("order-2", ["created"])],
+    ]
+    metrics = queue.get_metrics()
+    assert metrics["dropped"] == 1
+    assert metrics["flushed"] == 3
+
+
+@pytest.mark.asyncio
+async def test_stop_waits_for_in_flight_flush():
+    written = []
+    flush_started = asyncio.Event()
+
+    async def slow_flush(batch):
+        flush_started.set()
+        await asyncio.sleep(0.05)
+        written.extend(batch)
+
+    queue = WriteBehindQueue(slow_flush, max_batch_size=2, flush_interval=10)
+    queue.start()
+
+    queue.put("order-1", "created")
+    queue.put("order-2", "created")
+    await flush_started.wait()
+    await queue.stop()
+
+    assert written == [("order-1", ["created"]), ("order-2", ["created"])]
+    assert queue.depth == 0
+    assert queue.get_metrics()["flushed"] == 2
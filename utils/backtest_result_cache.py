@@ -0,0 +1,97 @@
+import json
+import logging
+import os
+import shutil
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class BacktestResultCache:
+    """
+    Bounded on-disk cache of backtest results keyed by a hash of what determines them.
+
+    Each entry is the result JSON plus a small metadata file holding the `results` metrics, so a hit never
+    parses the full result. Entries are hard links to the job result files where possible. When the cache
+    exceeds `max_entries` or `max_bytes`, the least recently used entries are evicted.
+    """
+
+    def __init__(self, path: str, max_entries: int = 200, max_bytes: int = 2_000_000_000):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.metrics = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    def get(self, key: str) -> Optional[Tuple[str, Optional[Dict]]]:
+        """Return (result path, results metrics) of a cached result, marking it as recently used."""
+        result_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+        except (FileNotFoundError, ValueError):
+            self.metrics["misses"] += 1
+            return None
+        if not os.path.exists(result_path):
+            self.metrics["misses"] += 1
+            return None
+        os.utime(meta_path)
+        self.metrics["hits"] += 1
+        return result_path, meta.get("summary")
+
+    def put(self, key: str, result_path: str, summary: Optional[Dict]):
+        """Store a result file under a key, then evict entries beyond the bounds."""
+        os.makedirs(self.path, exist_ok=True)
+        cached_path, meta_path = self._paths(key)
+        tmp_path = f"{cached_path}.tmp"
+        try:
+            os.link(result_path, tmp_path)
+        except OSError:
+            shutil.copyfile(result_path, tmp_path)
+        os.replace(tmp_path, cached_path)
+        with open(f"{meta_path}.tmp", "w") as f:
+            json.dump({"summary": summary, "size": os.path.getsize(cached_path)}, f, default=str)
+        os.replace(f"{meta_path}.tmp", meta_path)
+        self.metrics["stores"] += 1
+        self._evict()
+
+    def get_metrics(self) -> Dict:
+        entries = self._entries()
+        return {
+            **self.metrics,
+            "entries": len(entries),
+            "bytes": sum(size for _, _, size in entries),
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+        }
+
+    def _paths(self, key: str) -> Tuple[str, str]:
+        return os.path.join(self.path, f"{key}.result.json"), os.path.join(self.path, f"{key}.meta.json")
+
+    def _entries(self):
+        """(key, last used, size) of every entry."""
+        if not os.path.isdir(self.path):
+            return []
+        entries = []
+        for file_name in os.listdir(self.path):
+            if not file_name.endswith(".meta.json"):
+                continue
+            key = file_name[:-len(".meta.json")]
+            result_path, meta_path = self._paths(key)
+            try:
+                entries.append((key, os.path.getmtime(meta_path), os.path.getsize(result_path)))
+            except OSError:
+                continue
+        return entries
+
+    def _evict(self):
+        entries = sorted(self._entries(), key=lambda entry: entry[1])
+        total_bytes = sum(size for _, _, size in entries)
+        while entries and (len(entries) > self.max_entries or total_bytes > self.max_bytes):
+            key, _, size = entries.pop(0)
+            for path in self._paths(key):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            total_bytes -= size
+            self.metrics["evictions"] += 1
@@ -0,0 +1,40 @@
+import pandas as pd
+from hummingbot.data_feed.candles_feed.candles_factory import CandlesFactory
+from hummingbot.data_feed.candles_feed.data_types import CandlesConfig, HistoricalCandlesConfig
+from hummingbot.strategy_v2.backtesting.backtesting_data_provider import BacktestingDataProvider
+
+from utils.candles_store import CandlesStore, interval_to_seconds
+
+
+class CandlesStoreBacktestingDataProvider(BacktestingDataProvider):
+    """
+    BacktestingDataProvider reading historical candles through the local CandlesStore.
+
+    Repeated backtests over overlapping ranges only fetch the candles that are not stored yet.
+    """
+
+    def __init__(self, connectors: dict, candles_store: CandlesStore):
+        super().__init__(connectors=connectors)
+        self.candles_store = candles_store
+
+    async def get_candles_feed(self, config: CandlesConfig):
+        key = self._generate_candle_feed_key(config)
+        existing_feed = self.candles_feeds.get(key, pd.DataFrame())
+        if not existing_feed.empty:
+            if existing_feed["timestamp"].min() <= self.start_time and existing_feed["timestamp"].max() >= self.end_time:
+                return existing_feed
+
+        candle_feed = CandlesFactory.get_candle(config)
+        candles_buffer = config.max_records * interval_to_seconds(config.interval)
+
+        async def fetch(start_time: int, end_time: int):
+            return await candle_feed.get_historical_candles(config=HistoricalCandlesConfig(
+                connector_name=config.connector, trading_pair=config.trading_pair, interval=config.interval,
+                start_time=start_time, end_time=end_time))
+
+        candles_df = await self.candles_store.get_candles(
+            config.connector, config.trading_pair, config.interval,
+            self.start_time - candles_buffer, self.end_time, fetch
+        )
+        self.candles_feeds[key] = candles_df
+        return candles_df
@@ -0,0 +1,126 @@
+import json
+import math
+from typing import Any, Dict, Iterator, List, Optional
+
+
+def processed_data_columns(processed_data: Dict[str, Dict]) -> Dict[str, Any]:
+    """
+    Convert `DataFrame.to_dict()` output ({column: {index: value}}) to column-oriented form.
+
+    Returns:
+        {"index": [...], "columns": {column: [values]}} with values aligned to the index
+    """
+    index: List = []
+    for values in processed_data.values():
+        index = list(values)
+        break
+    return {
+        "index": index,
+        "columns": {column: [values.get(i) for i in index] for column, values in processed_data.items()},
+    }
+
+
+def downsample_positions(size: int, max_points: Optional[int]) -> List[int]:
+    """Evenly spaced row positions keeping at most `max_points` rows, always including the last one."""
+    if not max_points or size <= max_points:
+        return list(range(size))
+    stride = math.ceil(size / max_points)
+    positions = list(range(0, size, stride))
+    if positions[-1] != size - 1:
+        positions[-1] = size - 1
+    return positions
+
+
+def summarize_executors(executors: List[Dict]) -> Dict[str, Any]:
+    """
+    Aggregate executor dicts into counts per close type, side and status, and PnL / volume totals.
+
+    Counts are keyed by the stored enum values, as results are stored with the API's JSON encoding.
+    """
+    summary: Dict[str, Any] = {
+        "total": len(executors),
+        "net_pnl_quote": 0.0,
+        "filled_amount_quote": 0.0,
+        "cum_fees_quote": 0.0,
+        "close_types": {},
+        "sides": {},
+        "statuses": {},
+    }
+    for executor in executors:
+        for key in ("net_pnl_quote", "filled_amount_quote", "cum_fees_quote"):
+            try:
+                summary[key] += float(executor.get(key) or 0)
+            except (TypeError, ValueError):
+                pass
+        for key, field in (("close_types", "close_type"), ("sides", "side"), ("statuses", "status")):
+            value = str(executor.get(field) or (executor.get("config") or {}).get(field) or "unknown")
+            summary[key][value] = summary[key].get(value, 0) + 1
+    return summary
+
+
+def compact_backtesting_result(result: Dict, output_format: str = "full", columns: Optional[List[str]] = None,
+                               max_points: Optional[int] = None, include_executors: Optional[bool] = None) -> Dict:
+    """
+    Reduce a backtesting result before it is sent.
+
+    Args:
+        result: Stored result with executors, processed_data ({column: {index: value}}) and results
+        output_format: "full" keeps processed_data as {column: {index: value}}; "columnar" returns
+            {"index": [...], "columns": {column: [...]}}, which is much smaller once serialized
+        columns: Processed data columns to keep (all when omitted)
+        max_points: Downsample processed data to at most this many evenly spaced rows
+        include_executors: Include every executor's details; an executors summary is always included.
+            Defaults to True for the full format and False for the columnar one
+
+    Returns:
+        The reduced result
+    """
+    if include_executors is None:
+        include_executors = output_format == "full"
+
+    processed = processed_data_columns(result.get("processed_data") or {})
+    if columns:
+        processed["columns"] = {column: processed["columns"][column] for column in columns if column in processed["columns"]}
+    total_rows = len(processed["index"])
+    positions = downsample_positions(total_rows, max_points)
+    if len(positions) < total_rows:
+        processed["index"] = [processed["index"][i] for i in positions]
+        processed["columns"] = {column: [values[i] for i in positions] for column, values in processed["columns"].items()}
+
+    if output_format == "columnar":
+        processed_data = {**processed, "rows": len(processed["index"]), "total_rows": total_rows}
+    else:
+        processed_data = {
+            column: dict(zip(processed["index"], values)) for column, values in processed["columns"].items()
+        }
+
+    executors = result.get("executors") or []
+    compact = {
+        "processed_data": processed_data,
+        "results": result.get("results"),
+        "executors_summary": summarize_executors(executors),
+    }
+    if include_executors:
+        compact["executors"] = executors
+    return compact
+
+
+def stream_json_with_fields(path: str, fields: Dict[str, Any], chunk_size: int = 1 << 20) -> Iterator[bytes]:
+    """
+    Stream a stored JSON object with extra top-level fields prepended, without parsing the file.
+
+    Args:
+        path: File holding a JSON object
+        fields: Fields to add to the object
+        chunk_size: Bytes read per chunk
+    """
+    with open(path, "rb") as f:
+        content = f.read(chunk_size).lstrip()
+        if not content.startswith(b"{"):
+            raise ValueError(f"{path} does not hold a JSON object")
+        body = content[1:]
+        prefix = json.dumps(fields)[:-1].encode()  # '{"field": value' without the closing brace
+        separator = b"" if body.lstrip().startswith(b"}") else b", "
+        yield prefix + separator + body
+        while chunk := f.read(chunk_size):
+            yield chunk
@@ -0,0 +1,83 @@
+import asyncio
+import json
+import os
+import traceback
+from typing import Dict, Optional
+
+from fastapi.encoders import jsonable_encoder
+from hummingbot.strategy_v2.backtesting.backtesting_engine_base import BacktestingEngineBase
+
+from config import settings
+from utils.backtesting_data_provider import CandlesStoreBacktestingDataProvider
+from utils.candles_store import CandlesStore
+
+
+async def run_backtesting(backtesting_config: Dict, candles_store_path: Optional[str] = None) -> Dict:
+    """
+    Run one backtest and format its results for JSON serialization.
+
+    Args:
+        backtesting_config: BacktestingConfig fields (start/end time, resolution, trade cost, controller config)
+        candles_store_path: Candles store directory used for historical candles (none to always fetch)
+
+    Returns:
+        Dictionary containing executors, processed data, and results from the backtest
+    """
+    backtesting_engine = BacktestingEngineBase()
+    if candles_store_path:
+        backtesting_engine.backtesting_data_provider = CandlesStoreBacktestingDataProvider(
+            connectors={}, candles_store=CandlesStore(candles_store_path)
+        )
+
+    config = backtesting_config["config"]
+    if isinstance(config, str):
+        controller_config = backtesting_engine.get_controller_config_instance_from_yml(
+            config_path=config,
+            controllers_conf_dir_path=settings.app.controllers_path,
+            controllers_module=settings.app.controllers_module
+        )
+    else:
+        controller_config = backtesting_engine.get_controller_config_instance_from_dict(
+            config_data=config,
+            controllers_module=settings.app.controllers_module
+        )
+    backtesting_results = await backtesting_engine.run_backtesting(
+        controller_config=controller_config, trade_cost=backtesting_config["trade_cost"],
+        start=int(backtesting_config["start_time"]), end=int(backtesting_config["end_time"]),
+        backtesting_resolution=backtesting_config["backtesting_resolution"])
+    processed_data = backtesting_results["processed_data"]["features"].fillna(0)
+    executors_info = [e.to_dict() for e in backtesting_results["executors"]]
+    results = backtesting_results["results"]
+    results["sharpe_ratio"] = results["sharpe_ratio"] if results["sharpe_ratio"] is not None else 0
+    return {
+        "executors": executors_info,
+        "processed_data": processed_data.to_dict(),
+        "results": results,
+    }
+
+
+def run_backtesting_job(backtesting_config: Dict, result_path: str, error_path: str,
+                        candles_store_path: Optional[str] = None):
+    """
+    Worker process entry point: run a backtest and write its result, or its error, as JSON.
+
+    Args:
+        backtesting_config: BacktestingConfig fields
+        result_path: File the result is written to on success
+        error_path: File the error is written to on failure
+        candles_store_path: Candles store directory used for historical candles
+    """
+    try:
+        result = asyncio.run(run_backtesting(backtesting_config, candles_store_path))
+        # Encode like the API responses do: Decimals as numbers, enums as their values
+        write_json(result_path, jsonable_encoder(result))
+    except Exception as e:
+        write_json(error_path, {"error": str(e), "traceback": traceback.format_exc()})
+
+
+def write_json(path: str, data: Dict):
+    """Write JSON atomically, so readers never see a partial file."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, default=str)
+    os.replace(tmp_path, path)
@@ -0,0 +1,256 @@
+import asyncio
+import fcntl
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+CandlesFetcher = Callable[[int, int], Awaitable[Optional[pd.DataFrame]]]
+
+_INTERVAL_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800, "M": 2592000}
+
+
+def interval_to_seconds(interval: str) -> int:
+    """Convert a candle interval such as "1m", "4h" or "1M" to seconds."""
+    match = re.fullmatch(r"(\d+)([smhdwM])", interval)
+    if not match:
+        raise ValueError(f"Unsupported candle interval: {interval}")
+    return int(match.group(1)) * _INTERVAL_UNITS[match.group(2)]
+
+
+class CandlesStore:
+    """
+    Persistent historical candles store, partitioned per connector / trading pair / interval / month.
+
+    Each partition is a `.npy` file holding a structured array sorted by timestamp, read memory-mapped so a
+    query only touches the rows of the requested range. `meta.json` next to the partitions records the
+    columns and the time ranges already fetched from the exchange, so a request only fetches its gaps.
+    Only closed candles are stored; the still-open candle at the end of a range is always refetched.
+
+    The API process and the backtesting workers share the store, so partition and meta updates of a series
+    are made under an exclusive file lock, re-reading the stored meta first, and files are replaced through
+    unique temporary files. File I/O runs in worker threads to keep the event loop free.
+    """
+
+    def __init__(self, root_path: str):
+        self.root_path = root_path
+        self._locks: Dict[Tuple[str, str, str], asyncio.Lock] = {}
+        self.metrics = {"requests": 0, "full_hits": 0, "gap_fetches": 0, "fetched_rows": 0, "served_rows": 0}
+
+    async def get_candles(self, connector_name: str, trading_pair: str, interval: str,
+                          start_time: int, end_time: int, fetch: CandlesFetcher) -> pd.DataFrame:
+        """
+        Get candles with open times within [start_time, end_time], fetching only the missing ranges.
+
+        Args:
+            connector_name: Candles connector name
+            trading_pair: Trading pair
+            interval: Candle interval
+            start_time: Range start (unix seconds)
+            end_time: Range end (unix seconds)
+            fetch: Coroutine fetching the candles of a (start_time, end_time) range from the exchange
+
+        Returns:
+            DataFrame of candles sorted by timestamp
+        """
+        step = interval_to_seconds(interval)
+        start = -(-int(start_time) // step) * step
+        end = int(end_time) // step * step
+        self.metrics["requests"] += 1
+        if end < start:
+            return pd.DataFrame()
+
+        key = (connector_name, trading_pair, interval)
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            series_path = self._series_path(*key)
+            meta = await asyncio.to_thread(self._read_meta, series_path)
+            gaps = self._gaps(meta["coverage"], start, end, step)
+            if not gaps:
+                self.metrics["full_hits"] += 1
+
+            closed_until = int(time.time()) // step * step - step
+            open_candles = []
+            for gap_start, gap_end in gaps:
+                self.metrics["gap_fetches"] += 1
+                fetched = self._normalize(await fetch(gap_start, gap_end), gap_start, gap_end)
+                self.metrics["fetched_rows"] += len(fetched)
+                if len(fetched):
+                    open_candles.append(fetched[fetched["timestamp"] > closed_until])
+                    fetched = fetched[fetched["timestamp"] <= closed_until]
+                covered = (gap_start, min(gap_end, closed_until)) if gap_start <= closed_until else None
+                # Persist each gap as it is fetched, so a failing later gap does not lose it
+                if len(fetched) or covered:
+                    meta = await asyncio.to_thread(self._store, series_path, fetched, covered, step)
+
+            candles = await asyncio.to_thread(self._read, series_path, meta, start, end)
+        candles = pd.concat([candles, *open_candles], ignore_index=True) if open_candles else candles
+        if len(candles):
+            candles = candles.drop_duplicates(subset=["timestamp"], keep="last").sort_values("timestamp")
+            candles = candles.reset_index(drop=True)
+        self.metrics["served_rows"] += len(candles)
+        return candles
+
+    def get_metrics(self) -> Dict:
+        """Get request, hit and fetch counters."""
+        return {**self.metrics, "root_path": self.root_path}
+
+    # Layout
+
+    def _series_path(self, connector_name: str, trading_pair: str, interval: str) -> str:
+        return os.path.join(self.root_path, connector_name, trading_pair, interval)
+
+    @staticmethod
+    def _read_meta(series_path: str) -> Dict:
+        try:
+            with open(os.path.join(series_path, "meta.json")) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"columns": None, "coverage": []}
+
+    @staticmethod
+    def _write_meta(series_path: str, meta: Dict):
+        os.makedirs(series_path, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=series_path, prefix="meta.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(meta, f)
+            os.replace(tmp_path, os.path.join(series_path, "meta.json"))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    @staticmethod
+    @contextmanager
+    def _series_lock(series_path: str):
+        """Exclusive lock of a series shared with other processes using the store."""
+        os.makedirs(series_path, exist_ok=True)
+        with open(os.path.join(series_path, ".lock"), "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _store(self, series_path: str, candles: pd.DataFrame, covered: Optional[Tuple[int, int]], step: int) -> Dict:
+        """
+        Write closed candles and mark a range as covered. Blocking.
+
+        The stored meta is re-read under the series lock, so columns and coverage written meanwhile by another
+        process are kept.
+
+        Returns:
+            The updated meta
+        """
+        with self._series_lock(series_path):
+            meta = self._read_meta(series_path)
+            self._write(series_path, meta, candles)
+            if covered:
+                meta["coverage"] = self._merge_range(meta["coverage"], covered[0], covered[1], step)
+            self._write_meta(series_path, meta)
+        return meta
+
+    # Coverage
+
+    @staticmethod
+    def _gaps(coverage: List[List[int]], start: int, end: int, step: int) -> List[Tuple[int, int]]:
+        """Ranges of candle open times within [start, end] not covered yet."""
+        gaps = []
+        cursor = start
+        for covered_start, covered_end in coverage:
+            if covered_end < cursor:
+                continue
+            if covered_start > end:
+                break
+            if covered_start > cursor:
+                gaps.append((cursor, covered_start - step))
+            cursor = max(cursor, covered_end + step)
+        if cursor <= end:
+            gaps.append((cursor, end))
+        return gaps
+
+    @staticmethod
+    def _merge_range(coverage: List[List[int]], start: int, end: int, step: int) -> List[List[int]]:
+        merged = []
+        for covered_start, covered_end in sorted(coverage + [[start, end]]):
+            if merged and covered_start <= merged[-1][1] + step:
+                merged[-1][1] = max(merged[-1][1], covered_end)
+            else:
+                merged.append([covered_start, covered_end])
+        return merged
+
+    # Data
+
+    @staticmethod
+    def _normalize(candles: Optional[pd.DataFrame], start: int, end: int) -> pd.DataFrame:
+        if candles is None or candles.empty:
+            return pd.DataFrame()
+        candles = candles[(candles["timestamp"] >= start) & (candles["timestamp"] <= end)]
+        return candles.select_dtypes(include="number").astype(float)
+
+    def _write(self, series_path: str, meta: Dict, candles: pd.DataFrame):
+        if candles.empty:
+            return
+        if meta["columns"] is None:
+            meta["columns"] = ["timestamp"] + [column for column in candles.columns if column != "timestamp"]
+        candles = candles.reindex(columns=meta["columns"])
+        dtype = np.dtype([(column, "f8") for column in meta["columns"]])
+        os.makedirs(series_path, exist_ok=True)
+
+        partitions = pd.to_datetime(candles["timestamp"], unit="s", utc=True).dt.strftime("%Y-%m")
+        for partition, rows in candles.groupby(partitions):
+            path = os.path.join(series_path, f"{partition}.npy")
+            new = np.empty(len(rows), dtype=dtype)
+            for column in meta["columns"]:
+                new[column] = rows[column].to_numpy()
+            if os.path.exists(path):
+                existing = np.load(path)
+                # New rows replace stored rows with the same timestamp
+                new = np.concatenate([existing[~np.isin(existing["timestamp"], new["timestamp"])], new])
+            new = np.sort(new, order="timestamp")
+            fd, tmp_path = tempfile.mkstemp(dir=series_path, prefix=f"{partition}.", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    np.save(f, new)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+
+    def _read(self, series_path: str, meta: Dict, start: int, end: int) -> pd.DataFrame:
+        if meta["columns"] is None:
+            return pd.DataFrame()
+        frames = []
+        for partition in self._months_between(start, end):
+            path = os.path.join(series_path, f"{partition}.npy")
+            if not os.path.exists(path):
+                continue
+            data = np.load(path, mmap_mode="r")
+            timestamps = data["timestamp"]
+            lo = np.searchsorted(timestamps, start, side="left")
+            hi = np.searchsorted(timestamps, end, side="right")
+            if hi > lo:
+                frames.append(pd.DataFrame(np.array(data[lo:hi])))
+        if not frames:
+            return pd.DataFrame(columns=meta["columns"])
+        return pd.concat(frames, ignore_index=True)
+
+    @staticmethod
+    def _months_between(start: int, end: int) -> List[str]:
+        months = []
+        current = datetime.fromtimestamp(start, tz=timezone.utc).replace(day=1, hour=0, minute=0, second=0)
+        last = datetime.fromtimestamp(end, tz=timezone.utc)
+        while current <= last:
+            months.append(current.strftime("%Y-%m"))
+            current = current.replace(year=current.year + current.month // 12, month=current.month % 12 + 1)
+        return months
@@ -0,0 +1,172 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Overflow policies of a full queue
+DROP_OLDEST = "drop_oldest"  # Discard the oldest queued item to make room
+DROP_NEWEST = "drop_newest"  # Discard the incoming item
+LATEST = "latest"  # Keep only the newest item per key; a full queue discards the incoming item of a new key
+BLOCK = "block"  # `put` waits for room, slowing the producer down
+POLICIES = (DROP_OLDEST, DROP_NEWEST, LATEST, BLOCK)
+
+
+class ChannelQueue:
+    """
+    Bounded queue drained by worker tasks, used to decouple message ingestion from message handling.
+
+    Producers call `put` with a key (such as a bot ID) and an item; `workers` tasks call `handler(item)` for
+    each queued item. With one worker, items are handled in arrival order. When the queue holds `maxsize`
+    items, the overflow `policy` decides what happens (see POLICIES); with `latest`, an item replacing a
+    queued item of the same key keeps that item's position.
+
+    Metrics cover queue depth, dropped and replaced items, the time items waited in the queue and the time
+    the handler took.
+    """
+
+    def __init__(self,
+                 name: str,
+                 handler: Callable[[Any], Awaitable[None]],
+                 maxsize: int = 1000,
+                 policy: str = DROP_OLDEST,
+                 workers: int = 1):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown queue policy '{policy}', expected one of {POLICIES}")
+        self.name = name
+        self._handler = handler
+        self.maxsize = maxsize
+        self.policy = policy
+        self.workers = workers
+
+        # (key, enqueued_at, item) in arrival order; keyed by key for the `latest` policy
+        self._items: deque = deque()
+        self._latest: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._not_empty = asyncio.Event()
+        self._not_full = asyncio.Event()
+        self._not_full.set()
+        self._worker_tasks: List[asyncio.Task] = []
+
+        self.metrics: Dict = {
+            "enqueued": 0,
+            "processed": 0,
+            "dropped": 0,
+            "replaced": 0,
+            "failed": 0,
+            "max_depth": 0,
+            "wait_seconds_total": 0.0,
+            "max_wait_seconds": 0.0,
+            "processing_seconds_total": 0.0,
+            "max_processing_seconds": 0.0,
+        }
+
+    @property
+    def depth(self) -> int:
+        """Number of queued items."""
+        return len(self._latest) if self.policy == LATEST else len(self._items)
+
+    def start(self):
+        """Start the workers (requires a running event loop)."""
+        if self._worker_tasks:
+            return
+        self._worker_tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def stop(self):
+        """Cancel the workers; items still queued are discarded."""
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+
+    def put_nowait(self, key: str, item: Any) -> bool:
+        """
+        Queue an item without waiting, applying the overflow policy when the queue is full.
+
+        A `block` queue that is full rejects the item like `drop_newest`.
+
+        Returns:
+            Whether the item was queued
+        """
+        now = time.time()
+        if self.policy == LATEST:
+            if key in self._latest:
+                enqueued_at, _ = self._latest[key]
+                self._latest[key] = (enqueued_at, item)
+                self.metrics["replaced"] += 1
+                self.metrics["enqueued"] += 1
+                return True
+            if len(self._latest) >= self.maxsize:
+                self.metrics["dropped"] += 1
+                return False
+            self._latest[key] = (now, item)
+        else:
+            if len(self._items) >= self.maxsize:
+                if self.policy != DROP_OLDEST:
+                    self.metrics["dropped"] += 1
+                    return False
+                self._items.popleft()
+                self.metrics["dropped"] += 1
+            self._items.append((key, now, item))
+        self.metrics["enqueued"] += 1
+        self.metrics["max_depth"] = max(self.metrics["max_depth"], self.depth)
+        self._not_empty.set()
+        if self.depth >= self.maxsize:
+            self._not_full.clear()
+        return True
+
+    async def put(self, key: str, item: Any) -> bool:
+        """Queue an item; a `block` queue waits for room, other policies never wait."""
+        if self.policy == BLOCK:
+            while self.depth >= self.maxsize:
+                await self._not_full.wait()
+        return self.put_nowait(key, item)
+
+    def _pop(self) -> Optional[Tuple[float, Any]]:
+        if self.policy == LATEST:
+            if not self._latest:
+                return None
+            _, entry = self._latest.popitem(last=False)
+        else:
+            if not self._items:
+                return None
+            _, enqueued_at, item = self._items.popleft()
+            entry = (enqueued_at, item)
+        if self.depth < self.maxsize:
+            self._not_full.set()
+        return entry
+
+    async def _work(self):
+        while True:
+            entry = self._pop()
+            if entry is None:
+                self._not_empty.clear()
+                await self._not_empty.wait()
+                continue
+            enqueued_at, item = entry
+            started = time.time()
+            try:
+                await self._handler(item)
+            except Exception as e:
+                self.metrics["failed"] += 1
+                logger.error(f"Error handling {self.name} item: {e}", exc_info=True)
+            finished = time.time()
+            wait, processing = started - enqueued_at, finished - started
+            self.metrics["processed"] += 1
+            self.metrics["wait_seconds_total"] += wait
+            self.metrics["max_wait_seconds"] = max(self.metrics["max_wait_seconds"], wait)
+            self.metrics["processing_seconds_total"] += processing
+            self.metrics["max_processing_seconds"] = max(self.metrics["max_processing_seconds"], processing)
+
+    def get_metrics(self) -> Dict:
+        processed = self.metrics["processed"]
+        return {
+            **self.metrics,
+            "depth": self.depth,
+            "maxsize": self.maxsize,
+            "policy": self.policy,
+            "workers": self.workers,
+            "avg_wait_seconds": self.metrics["wait_seconds_total"] / processed if processed else None,
+            "avg_processing_seconds": self.metrics["processing_seconds_total"] / processed if processed else None,
+        }
@@ -18,6 +18,7 @@ from hummingbot.core.utils.async_utils import safe_ensure_future
 from utils.file_system import fs_util
 from utils.hummingbot_api_config_adapter import HummingbotAPIConfigAdapter
 from utils.security import BackendAPISecurity
+from utils.trading_rules_cache import TradingRulesCache
 
 
 class ConnectorManager:
@@ -27,7 +28,9 @@ class ConnectorManager:
     This is the single source of truth for all connector instances.
     """
 
-    def __init__(self, secrets_manager: ETHKeyFileSecretManger, db_manager=None):
+    def __init__(self, secrets_manager: ETHKeyFileSecretManger, db_manager=None,
+                 refresh_concurrency_per_exchange: int = 4, refresh_timeout: float = 60.0,
+                 trading_rules_ttl: float = 3600.0):
         self.secrets_manager = secrets_manager
         self.db_manager = db_manager
         self._connector_cache: Dict[str, ConnectorBase] = {}
@@ -35,6 +38,17 @@ class ConnectorManager:
         self._funding_recorders: Dict[str, any] = {}
         self._status_polling_tasks: Dict[str, asyncio.Task] = {}
 
+        # Connector state refresh: accounts sharing an exchange are limited by a per-connector semaphore
+        # so one refresh cycle does not burst past the exchange rate limits
+        self.refresh_concurrency_per_exchange = max(1, refresh_concurrency_per_exchange)
+        self.refresh_timeout = refresh_timeout
+        self._refresh_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._refresh_metrics: Dict[str, Dict] = {}
+        self.last_refresh_metrics: Optional[Dict] = None
+
+        # Trading rules are fetched once per exchange and shared by all accounts
+        self.trading_rules_cache = TradingRulesCache(self._get_exchange_connectors, ttl=trading_rules_ttl)
+
     async def get_connector(self, account_name: str, connector_name: str):
         """
         Get the connector object for the specified account and connector.
@@ -93,14 +107,17 @@ class ConnectorManager:
         if account_name and connector_name:
             cache_key = f"{account_name}:{connector_name}"
             self._connector_cache.pop(cache_key, None)
+            self._refresh_metrics.pop(cache_key, None)
         elif account_name:
             # Clear all connectors for this account
             keys_to_remove = [k for k in self._connector_cache.keys() if k.startswith(f"{account_name}:")]
             for key in keys_to_remove:
                 self._connector_cache.pop(key)
+                self._refresh_metrics.pop(key, None)
         else:
             # Clear entire cache
             self._connector_cache.clear()
+            self._refresh_metrics.clear()
 
     @staticmethod
     def get_connector_config_map(connector_name: str):
@@ -210,6 +227,16 @@ class ConnectorManager:
                 connectors.append(conn_name)
         return connectors
 
+    def _get_exchange_connectors(self, connector_name: str) -> List[ConnectorBase]:
+        """
+        Get the cached connector instances of an exchange across all accounts.
+
+        :param connector_name: The name of the connector.
+        :return: List of connector instances.
+        """
+        return [connector for cache_key, connector in self._connector_cache.items()
+                if cache_key.split(":", 1)[1] == connector_name]
+
     def get_all_connectors(self) -> Dict[str, Dict[str, ConnectorBase]]:
         """
         Get all connectors organized by account.
@@ -249,11 +276,10 @@ class ConnectorManager:
         # Create the base connector
         connector = self._create_connector(account_name, connector_name)
 
-        # Initialize symbol map
-        await connector._initialize_trading_pair_symbol_map()
-
-        # Update trading rules
-        await connector._update_trading_rules()
+        # Initialize symbol map and trading rules, reusing the copy already fetched for another account
+        if not self.trading_rules_cache.apply(connector_name, connector):
+            await connector._initialize_trading_pair_symbol_map()
+            await self.trading_rules_cache.ensure(connector_name, connector)
 
         # Update initial balances
         await connector._update_balances()
@@ -309,8 +335,7 @@ class ConnectorManager:
             # Stop any existing network tasks
             await self._stop_connector_network(connector)
             
-            # Start trading rules polling
-            connector._trading_rules_polling_task = safe_ensure_future(connector._trading_rules_polling_loop())
+            # Trading rules are not polled per connector: the shared TradingRulesCache refreshes them
 
             # Start trading fees polling
             connector._trading_fees_polling_task = safe_ensure_future(connector._trading_fees_polling_loop())
@@ -368,7 +393,8 @@ class ConnectorManager:
         except Exception as e:
             logger.error(f"Error stopping connector network: {e}")
 
-    async def _update_connector_state(self, connector: ConnectorBase, connector_name: str, account_name: str = None):
+    async def _update_connector_state(self, connector: ConnectorBase, connector_name: str, account_name: str = None,
+                                      stage_durations: Optional[Dict[str, float]] = None):
         """
         Update connector state including balances, orders, positions, and trading rules.
         This function can be called both during initialization and periodically.
@@ -376,47 +402,145 @@ class ConnectorManager:
         :param connector: The connector instance
         :param connector_name: The name of the connector
         :param account_name: The name of the account (optional, used for order sync)
+        :param stage_durations: Optional dict filled with the duration in seconds of each completed stage
         """
+        stage_durations = stage_durations if stage_durations is not None else {}
         try:
             # Update current timestamp
             connector._set_current_timestamp(time.time())
 
             # Update balances
+            stage_start = time.perf_counter()
             await connector._update_balances()
+            stage_durations["balances"] = time.perf_counter() - stage_start
 
-            # Update trading rules
-            await connector._update_trading_rules()
+            # Update trading rules (shared per exchange, only fetched when expired)
+            stage_start = time.perf_counter()
+            await self.trading_rules_cache.ensure(connector_name, connector)
+            stage_durations["trading_rules"] = time.perf_counter() - stage_start
 
             # Update positions for perpetual connectors
             if "_perpetual" in connector_name:
+                stage_start = time.perf_counter()
                 await connector._update_positions()
+                stage_durations["positions"] = time.perf_counter() - stage_start
 
             # Update order status for in-flight orders
             if hasattr(connector, '_update_order_status') and connector.in_flight_orders:
+                stage_start = time.perf_counter()
                 await connector._update_order_status()
+                stage_durations["order_status"] = time.perf_counter() - stage_start
 
                 # Sync updated order state to database and cleanup closed orders
                 if account_name:
+                    stage_start = time.perf_counter()
                     await self._sync_orders_to_database(connector, account_name, connector_name)
+                    stage_durations["order_sync"] = time.perf_counter() - stage_start
 
             logger.debug(f"Updated connector state for {connector_name}")
             
         except Exception as e:
             logger.error(f"Error updating connector state for {connector_name}: {e}")
 
+    async def _refresh_connector_state(self, cache_key: str, connector: ConnectorBase) -> Dict:
+        """
+        Refresh one cached connector, bounded by its exchange semaphore and the refresh timeout.
+
+        :return: Metrics of the refresh (wait time, total duration, per-stage durations, timeout flag)
+        """
+        account_name, connector_name = cache_key.split(":", 1)
+        semaphore = self._refresh_semaphores.get(connector_name)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.refresh_concurrency_per_exchange)
+            self._refresh_semaphores[connector_name] = semaphore
+
+        stage_durations: Dict[str, float] = {}
+        timed_out = False
+        queued = time.perf_counter()
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await asyncio.wait_for(
+                    self._update_connector_state(connector, connector_name, account_name, stage_durations),
+                    timeout=self.refresh_timeout
+                )
+            except asyncio.TimeoutError:
+                timed_out = True
+                logger.warning(f"Timed out updating state for {account_name}/{connector_name} "
+                               f"after {self.refresh_timeout}s")
+            except Exception as e:
+                logger.error(f"Error updating state for {account_name}/{connector_name}: {e}")
+            finished = time.perf_counter()
+
+        metrics = {
+            "account_name": account_name,
+            "connector_name": connector_name,
+            "wait_seconds": round(started - queued, 3),
+            "duration_seconds": round(finished - started, 3),
+            "stages": {stage: round(duration, 3) for stage, duration in stage_durations.items()},
+            "timed_out": timed_out,
+            "timestamp": time.time()
+        }
+        self._refresh_metrics[cache_key] = metrics
+        return metrics
+
     async def update_all_connector_states(self, *, skip_gateway_connectors: bool = False):
         """
         Update state for all cached connectors.
         This can be called periodically to refresh connector data.
+
+        Connectors are refreshed concurrently. Accounts on the same exchange share a concurrency limit
+        and every refresh is bounded by a timeout, so one slow exchange cannot stall the whole cycle.
         """
-        for cache_key, connector in self._connector_cache.items():
-            account_name, connector_name = cache_key.split(":", 1)
+        targets = []
+        for cache_key, connector in list(self._connector_cache.items()):
+            connector_name = cache_key.split(":", 1)[1]
             if skip_gateway_connectors and ("/" in connector_name or connector_name.startswith("gateway_")):
                 continue
-            try:
-                await self._update_connector_state(connector, connector_name, account_name)
-            except Exception as e:
-                logger.error(f"Error updating state for {account_name}/{connector_name}: {e}")
+            targets.append((cache_key, connector))
+
+        started = time.perf_counter()
+        results = await asyncio.gather(
+            *(self._refresh_connector_state(cache_key, connector) for cache_key, connector in targets),
+            return_exceptions=True
+        )
+        duration = time.perf_counter() - started
+
+        completed = [result for result in results if isinstance(result, dict)]
+        slowest = max(completed, key=lambda result: result["duration_seconds"], default=None)
+        self.last_refresh_metrics = {
+            "connectors": len(targets),
+            "timed_out": sum(1 for result in completed if result["timed_out"]),
+            "duration_seconds": round(duration, 3),
+            "slowest": f"{slowest['account_name']}/{slowest['connector_name']}" if slowest else None,
+            "timestamp": time.time()
+        }
+        logger.debug(f"Refreshed {len(targets)} connector states in {duration:.2f}s")
+
+    def get_recorder_metrics(self) -> Dict[str, Dict]:
+        """
+        Get write-behind queue metrics of the order and funding recorders.
+
+        :return: Dictionary keyed by "account:connector" with the metrics of each recorder.
+        """
+        metrics = {}
+        for cache_key, recorder in self._orders_recorders.items():
+            metrics.setdefault(cache_key, {})["orders"] = recorder.get_metrics()
+        for cache_key, recorder in self._funding_recorders.items():
+            metrics.setdefault(cache_key, {})["funding"] = recorder.get_metrics()
+        return metrics
+
+    def get_refresh_metrics(self) -> Dict:
+        """
+        Get timing metrics of the connector state refreshes.
+
+        :return: Summary of the last refresh cycle and the latest per-connector refresh metrics.
+        """
+        return {
+            "last_cycle": self.last_refresh_metrics,
+            "connectors": dict(self._refresh_metrics),
+            "trading_rules_cache": self.trading_rules_cache.get_metrics()
+        }
 
     async def sync_order_state_to_database_for_all_connectors(self):
         """
@@ -519,44 +643,43 @@ class ConnectorManager:
             return
 
         terminal_states = [OrderState.FILLED, OrderState.CANCELED, OrderState.FAILED, OrderState.COMPLETED]
-        orders_to_remove = []
-
-        # Create a copy of keys to iterate safely while potentially modifying the dict
-        order_ids = list(connector.in_flight_orders.keys())
 
-        for client_order_id in order_ids:
-            order = connector.in_flight_orders.get(client_order_id)
-            if not order:
-                continue
+        # Snapshot the orders so the dict can be modified while the database is queried
+        orders = {client_order_id: order for client_order_id, order in list(connector.in_flight_orders.items()) if order}
+        if not orders:
+            return
 
-            try:
-                # Import OrderRepository dynamically to avoid circular imports
-                from database import OrderRepository
+        try:
+            # Import OrderRepository dynamically to avoid circular imports
+            from database import OrderRepository
 
-                async with self.db_manager.get_session_context() as session:
-                    order_repo = OrderRepository(session)
-                    db_order = await order_repo.get_order_by_client_id(client_order_id)
+            async with self.db_manager.get_session_context() as session:
+                order_repo = OrderRepository(session)
+                db_statuses = await order_repo.get_order_statuses(list(orders))
 
-                    if db_order:
-                        # Map connector state to database status
-                        new_status = self._map_order_state_to_status(order.current_state)
+                # Map connector state to database status and only update changed orders
+                status_updates = {}
+                for client_order_id, db_status in db_statuses.items():
+                    new_status = self._map_order_state_to_status(orders[client_order_id].current_state)
+                    if db_status != new_status:
+                        status_updates[client_order_id] = new_status
+                        logger.debug(f"Syncing order {client_order_id} status: {db_status} -> {new_status}")
 
-                        # Only update if status changed
-                        if db_order.status != new_status:
-                            await order_repo.update_order_status(client_order_id, new_status)
-                            logger.info(f"Synced order {client_order_id} status: {db_order.status} -> {new_status}")
+                if status_updates:
+                    await order_repo.bulk_update_order_status(status_updates)
 
-                    # Mark terminal orders for removal from in_flight_orders
-                    if order.current_state in terminal_states:
-                        orders_to_remove.append(client_order_id)
+        except Exception as e:
+            logger.error(f"Error syncing orders of {account_name}/{connector_name} to database: {e}")
+            return
 
-            except Exception as e:
-                logger.error(f"Error syncing order {client_order_id} to database: {e}")
+        if status_updates:
+            logger.info(f"Synced {len(status_updates)} order statuses for {account_name}/{connector_name}")
 
         # Remove terminal orders from in_flight_orders
+        orders_to_remove = [client_order_id for client_order_id, order in orders.items()
+                            if order.current_state in terminal_states]
         for order_id in orders_to_remove:
             connector.in_flight_orders.pop(order_id, None)
-            logger.debug(f"Removed closed order {order_id} from in_flight_orders")
 
         if orders_to_remove:
             logger.info(f"Cleaned up {len(orders_to_remove)} terminal orders from {account_name}/{connector_name}")
@@ -678,6 +801,8 @@ class ConnectorManager:
         for account_name, connector_name in pairs:
             await self.stop_connector(account_name, connector_name)
 
+        self.trading_rules_cache.stop()
+
     def list_available_credentials(self, account_name: str) -> List[str]:
         """
         List all available connector credentials for an account.
@@ -0,0 +1,214 @@
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from docker.errors import DockerException, NotFound
+
+logger = logging.getLogger(__name__)
+
+# Container event actions that change what the inventory holds
+REFRESH_ACTIONS = {"create", "start", "restart", "die", "stop", "kill", "pause", "unpause", "rename", "oom"}
+REMOVE_ACTIONS = {"destroy"}
+
+
+class ContainerInventory:
+    """
+    In-memory inventory of Docker containers kept current by the Docker events stream.
+
+    A full `containers.list(all=True, sparse=True)` seeds the inventory; it is a single API call that returns
+    name, state and image without inspecting each container. After that, container events refresh or remove
+    only the container they concern, and a full resync every `resync_interval` seconds (and whenever the
+    events stream connects) corrects anything missed. Image labels are resolved once per image ID.
+
+    The events stream and the resync loop run in daemon threads, like the other Docker background work.
+    """
+
+    def __init__(self, client, resync_interval: float = 60.0, reconnect_interval: float = 5.0):
+        self.client = client
+        self.resync_interval = resync_interval
+        self.reconnect_interval = reconnect_interval
+
+        self._containers: Dict[str, Dict[str, Any]] = {}  # container id: info
+        self._image_labels: Dict[str, str] = {}  # image id: label
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._events = None
+        self._threads: List[threading.Thread] = []
+
+        self.metrics = {
+            "events": 0,
+            "resyncs": 0,
+            "container_refreshes": 0,
+            "last_resync": None,
+            "last_event": None,
+            "events_connected": False,
+        }
+
+    def start(self):
+        """Seed the inventory and start following Docker events."""
+        if self._threads:
+            return
+        self._stop.clear()
+        try:
+            self.resync()
+        except DockerException as e:
+            logger.error(f"Initial Docker container inventory failed: {e}")
+        self._threads = [
+            threading.Thread(target=self._follow_events, name="docker-inventory-events", daemon=True),
+            threading.Thread(target=self._resync_loop, name="docker-inventory-resync", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        self._stop.set()
+        events = self._events
+        if events is not None:
+            try:
+                events.close()
+            except Exception:
+                pass
+        for thread in self._threads:
+            thread.join(timeout=1)
+        self._threads = []
+
+    def list(self, status: Optional[str] = None, name_filter: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Containers as {"id", "name", "status", "image"} dicts, optionally filtered by status and name."""
+        with self._lock:
+            containers = list(self._containers.values())
+        return [
+            dict(container) for container in containers
+            if (status is None or container["status"] == status)
+            and (not name_filter or name_filter.lower() in container["name"].lower())
+        ]
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            for container in self._containers.values():
+                if container["name"] == name:
+                    return dict(container)
+        return None
+
+    def resync(self):
+        """Replace the inventory with a full container listing."""
+        summaries = self.client.containers.list(all=True, sparse=True)
+        containers = {}
+        for summary in summaries:
+            info = self._container_info(summary.attrs)
+            containers[info["id"]] = info
+        with self._lock:
+            self._containers = containers
+        self.metrics["resyncs"] += 1
+        self.metrics["last_resync"] = time.time()
+
+    def refresh(self, container_id_or_name: str):
+        """Re-read one container, removing it from the inventory if it no longer exists."""
+        self.metrics["container_refreshes"] += 1
+        if self._is_id(container_id_or_name):
+            filters = {"id": container_id_or_name}
+
+            def matches(info):
+                return info["id"].startswith(container_id_or_name)
+        else:
+            filters = {"name": container_id_or_name}
+
+            def matches(info):
+                # The name filter also matches substrings
+                return info["name"] == container_id_or_name
+        summaries = self.client.containers.list(all=True, sparse=True, filters=filters)
+        infos = [info for info in (self._container_info(summary.attrs) for summary in summaries) if matches(info)]
+        with self._lock:
+            for container_id, container in list(self._containers.items()):
+                if matches(container):
+                    del self._containers[container_id]
+            for info in infos:
+                self._containers[info["id"]] = info
+
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            count = len(self._containers)
+        return {**self.metrics, "containers": count}
+
+    def handle_event(self, event: Dict[str, Any]):
+        """Apply a container event from the Docker events stream."""
+        if event.get("Type") != "container":
+            return
+        action = (event.get("Action") or event.get("status") or "").split(":")[0]
+        container_id = event.get("id") or (event.get("Actor") or {}).get("ID")
+        if not container_id:
+            return
+        self.metrics["events"] += 1
+        self.metrics["last_event"] = time.time()
+        if action in REMOVE_ACTIONS:
+            with self._lock:
+                self._containers.pop(container_id, None)
+        elif action in REFRESH_ACTIONS:
+            self.refresh(container_id)
+
+    def _follow_events(self):
+        while not self._stop.is_set():
+            try:
+                self._events = self.client.events(decode=True, filters={"type": "container"})
+                self.metrics["events_connected"] = True
+                # Changes made before the stream was connected have no event in it
+                self.resync()
+                for event in self._events:
+                    if self._stop.is_set():
+                        break
+                    try:
+                        self.handle_event(event)
+                    except (NotFound, DockerException) as e:
+                        logger.debug(f"Error applying Docker event {event}: {e}")
+            except Exception as e:
+                if not self._stop.is_set():
+                    logger.warning(f"Docker events stream interrupted: {e}. Reconnecting...")
+            finally:
+                self.metrics["events_connected"] = False
+            self._stop.wait(self.reconnect_interval)
+
+    def _resync_loop(self):
+        while not self._stop.wait(self.resync_interval):
+            try:
+                self.resync()
+            except Exception as e:
+                logger.warning(f"Docker container inventory resync failed: {e}")
+
+    def _container_info(self, attrs: Dict[str, Any]) -> Dict[str, Any]:
+        names = attrs.get("Names") or []
+        name = names[0].lstrip("/") if names else attrs.get("Name", "").lstrip("/")
+        state = attrs.get("State")
+        status = state.get("Status") if isinstance(state, dict) else state
+        return {
+            "id": attrs.get("Id"),
+            "name": name,
+            "status": status or "unknown",
+            "image": self._image_label(attrs),
+        }
+
+    def _image_label(self, attrs: Dict[str, Any]) -> str:
+        """
+        Image name the container was created from; image IDs are resolved to their first tag once.
+
+        References created without a tag get the implicit ":latest", like Docker's image tags, so image name
+        patterns expecting a tag keep matching.
+        """
+        image = attrs.get("Image") or ""
+        if image and not image.startswith("sha256:"):
+            if "@" not in image and ":" not in image.rsplit("/", 1)[-1]:
+                image = f"{image}:latest"
+            return image
+        image_id = attrs.get("ImageID") or image
+        if not image_id:
+            return "unknown"
+        if image_id not in self._image_labels:
+            try:
+                tags = self.client.images.get(image_id).tags
+                self._image_labels[image_id] = tags[0] if tags else image_id.split(":")[-1][:12]
+            except (NotFound, DockerException):
+                return image_id.split(":")[-1][:12]
+        return self._image_labels[image_id]
+
+    @staticmethod
+    def _is_id(value: str) -> bool:
+        return len(value) >= 12 and all(c in "0123456789abcdef" for c in value)
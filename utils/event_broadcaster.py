@@ -0,0 +1,69 @@
+import asyncio
+import time
+from typing import Any, Dict, Optional, Set
+
+
+class Subscription:
+    """A subscriber's bounded queue of events; when it is full the oldest event is dropped."""
+
+    def __init__(self, broadcaster: "EventBroadcaster", maxsize: int):
+        self._broadcaster = broadcaster
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def put(self, event: Dict[str, Any]):
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+            self._broadcaster.metrics["dropped"] += 1
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Next event, or None if none arrived within `timeout` seconds."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self._broadcaster._subscribers.discard(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class EventBroadcaster:
+    """
+    In-process fan-out of events to any number of subscribers.
+
+    `publish` never blocks: each subscriber has its own bounded queue, so a slow subscriber only loses its
+    own oldest events. Subscriptions are registered when `subscribe` returns, so a subscriber can take a
+    snapshot afterwards without missing events published in between.
+    """
+
+    def __init__(self, max_queue_size: int = 1000):
+        self.max_queue_size = max_queue_size
+        self._subscribers: Set[Subscription] = set()
+        self.metrics = {"published": 0, "delivered": 0, "dropped": 0}
+
+    def publish(self, event_type: str, data: Dict[str, Any]):
+        event = {"type": event_type, "timestamp": time.time(), "data": data}
+        self.metrics["published"] += 1
+        for subscription in list(self._subscribers):
+            subscription.put(event)
+            self.metrics["delivered"] += 1
+
+    def subscribe(self) -> Subscription:
+        subscription = Subscription(self, self.max_queue_size)
+        self._subscribers.add(subscription)
+        return subscription
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {**self.metrics, "subscribers": self.subscriber_count}
@@ -1,7 +1,7 @@
 import os
 import pandas as pd
 import json
-from typing import List, Dict, Any
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 from hummingbot.core.data_type.common import TradeType
 from hummingbot.strategy_v2.models.base import RunnableStatus
@@ -11,6 +11,38 @@ from sqlalchemy import create_engine, insert, text, MetaData, Table, Column, VAR
 from sqlalchemy.orm import sessionmaker
 
 
+DECIMAL_SCALE = 1e6
+_MARKET_RENAMES = {"market": "connector_name", "symbol": "trading_pair"}
+_TRADE_FILL_WINDOW = 'OVER (PARTITION BY "config_file_path", "market", "symbol" ORDER BY rowid)'
+
+# How each table is exposed: source table, column renames, decimal columns stored scaled by 1e6,
+# columns replaced by an expression and computed columns appended after the table's own columns.
+TABLES = {
+    "orders": {"table": "Order", "renames": _MARKET_RENAMES, "scaled": ("amount", "price")},
+    "trade_fills": {
+        "table": "TradeFill",
+        "renames": _MARKET_RENAMES,
+        "scaled": ("amount", "price", "trade_fee_in_quote"),
+        "overrides": {
+            # Difference of cumulative fees: null on a pair's first fill and next to missing fees
+            "trade_fee": f'CASE WHEN LAG("trade_fee_in_quote") {_TRADE_FILL_WINDOW} IS NULL THEN NULL '
+                         f'ELSE "trade_fee_in_quote" / {DECIMAL_SCALE} END',
+        },
+        "computed": {
+            "cum_fees_in_quote": f'CASE WHEN "trade_fee_in_quote" IS NULL THEN NULL '
+                                 f'ELSE SUM("trade_fee_in_quote") {_TRADE_FILL_WINDOW} / {DECIMAL_SCALE} END',
+        },
+    },
+    "order_status": {"table": "OrderStatus"},
+    "executors": {"table": "Executors"},
+    "controllers": {"table": "Controllers"},
+    "positions": {
+        "table": "Position",
+        "scaled": ("volume_traded_quote", "amount", "breakeven_price", "unrealized_pnl_quote", "cum_fees_quote"),
+    },
+}
+
+
 class HummingbotDatabase:
     def __init__(self, db_path: str):
         self.db_name = os.path.basename(db_path)
@@ -18,23 +50,22 @@ class HummingbotDatabase:
         self.db_path = f'sqlite:///{os.path.join(db_path)}'
         self.engine = create_engine(self.db_path, connect_args={'check_same_thread': False})
         self.session_maker = sessionmaker(bind=self.engine)
+        self._table_columns: Dict[str, List[str]] = {}
 
-    @staticmethod
-    def _get_table_status(table_loader):
+    def _get_table_status(self, table: str):
         try:
-            data = table_loader()
-            return "Correct" if len(data) > 0 else f"Error - No records matched"
+            return "Correct" if self.count(table) > 0 else f"Error - No records matched"
         except Exception as e:
             return f"Error - {str(e)}"
 
     @property
     def status(self):
-        trade_fill_status = self._get_table_status(self.get_trade_fills)
-        orders_status = self._get_table_status(self.get_orders)
-        order_status_status = self._get_table_status(self.get_order_status)
-        executors_status = self._get_table_status(self.get_executors_data)
-        controller_status = self._get_table_status(self.get_controllers_data)
-        positions_status = self._get_table_status(self.get_positions)
+        trade_fill_status = self._get_table_status("trade_fills")
+        orders_status = self._get_table_status("orders")
+        order_status_status = self._get_table_status("order_status")
+        executors_status = self._get_table_status("executors")
+        controller_status = self._get_table_status("controllers")
+        positions_status = self._get_table_status("positions")
         general_status = all(status == "Correct" for status in
                              [trade_fill_status, orders_status, order_status_status, executors_status, controller_status, positions_status])
         status = {"db_name": self.db_name,
@@ -49,53 +80,150 @@ class HummingbotDatabase:
                   }
         return status
 
-    def get_orders(self):
-        with self.session_maker() as session:
-            query = "SELECT * FROM 'Order'"
-            orders = pd.read_sql_query(text(query), session.connection())
-            orders["amount"] = orders["amount"] / 1e6
-            orders["price"] = orders["price"] / 1e6
-            orders.rename(columns={"market": "connector_name", "symbol": "trading_pair"}, inplace=True)
-        return orders
-
-    def get_trade_fills(self):
-        groupers = ["config_file_path", "connector_name", "trading_pair"]
-        float_cols = ["amount", "price", "trade_fee_in_quote"]
+    def columns(self, table: str) -> List[str]:
+        """Columns of a table as exposed by this reader (after renames, including computed columns)."""
+        spec = TABLES[table]
+        renames = spec.get("renames", {})
+        return [renames.get(column, column) for column in self._source_columns(table)] + list(spec.get("computed", {}))
+
+    def _source_columns(self, table: str) -> List[str]:
+        if table not in self._table_columns:
+            with self.engine.connect() as connection:
+                rows = connection.execute(text(f'PRAGMA table_info("{TABLES[table]["table"]}")')).fetchall()
+            if not rows:
+                raise ValueError(f"no such table: {TABLES[table]['table']}")
+            self._table_columns[table] = [row[1] for row in rows]
+        return self._table_columns[table]
+
+    def _source(self, table: str, computed: bool = True) -> str:
+        """
+        Subquery exposing a table with renamed and unscaled columns, plus its rowid as `__rowid`.
+
+        Without `computed`, window-function columns are left out so SQLite can flatten the subquery
+        and use the table's indexes (used for counts and distinct values).
+        """
+        spec = TABLES[table]
+        renames = spec.get("renames", {})
+        scaled = spec.get("scaled", ())
+        overrides = spec.get("overrides", {}) if computed else {}
+        expressions = []
+        for column in self._source_columns(table):
+            if column in overrides:
+                expression = overrides[column]
+            elif column in scaled:
+                expression = f'"{column}" / {DECIMAL_SCALE}'
+            else:
+                expression = f'"{column}"'
+            expressions.append(f'{expression} AS "{renames.get(column, column)}"')
+        if computed:
+            expressions.extend(f'{expression} AS "{name}"' for name, expression in spec.get("computed", {}).items())
+        expressions.append('rowid AS "__rowid"')
+        return f'(SELECT {", ".join(expressions)} FROM "{spec["table"]}")'
+
+    def _where(self, table: str, filters: Optional[Dict[str, Any]]) -> Tuple[str, Dict[str, Any]]:
+        """
+        Build a WHERE clause from {column: value or list of values}; None values are ignored.
+
+        Raises:
+            ValueError: If a filter names a column the table does not have
+        """
+        available = set(self.columns(table))
+        clauses, params = [], {}
+        for column, value in (filters or {}).items():
+            if value is None:
+                continue
+            if column not in available:
+                raise ValueError(f"Unknown column '{column}' for {table}")
+            values = list(value) if isinstance(value, (list, tuple, set)) else [value]
+            names = []
+            for item in values:
+                names.append(f":f{len(params)}")
+                params[f"f{len(params)}"] = item
+            clauses.append(f'"{column}" IN ({", ".join(names)})')
+        return (f" WHERE {' AND '.join(clauses)}" if clauses else ""), params
+
+    def _select(self, table: str, filters: Optional[Dict[str, Any]] = None, limit: Optional[int] = None,
+                offset: int = 0) -> Tuple[str, Dict[str, Any]]:
+        where, params = self._where(table, filters)
+        columns = ", ".join(f'"{column}"' for column in self.columns(table))
+        query = f'SELECT {columns} FROM {self._source(table)}{where} ORDER BY "__rowid"'
+        if limit is not None or offset:
+            query += " LIMIT :limit OFFSET :offset"
+            params.update(limit=-1 if limit is None else limit, offset=offset)
+        return query, params
+
+    def count(self, table: str, filters: Optional[Dict[str, Any]] = None) -> int:
+        """Number of rows of a table matching the filters, counted by SQLite."""
+        where, params = self._where(table, filters)
+        with self.engine.connect() as connection:
+            return connection.execute(text(f"SELECT COUNT(*) FROM {self._source(table, computed=False)}{where}"),
+                                      params).scalar()
+
+    def distinct(self, table: str, column: str, filters: Optional[Dict[str, Any]] = None) -> List[Any]:
+        """Distinct non-null values of a column, in order of first appearance."""
+        if column not in self.columns(table):
+            raise ValueError(f"Unknown column '{column}' for {table}")
+        where, params = self._where(table, filters)
+        where = f'{where} AND "{column}" IS NOT NULL' if where else f' WHERE "{column}" IS NOT NULL'
+        query = (f'SELECT "{column}" FROM {self._source(table, computed=False)}{where} '
+                 f'GROUP BY "{column}" ORDER BY MIN("__rowid")')
+        with self.engine.connect() as connection:
+            return [row[0] for row in connection.execute(text(query), params)]
+
+    def iter_rows(self, table: str, filters: Optional[Dict[str, Any]] = None, limit: Optional[int] = None,
+                  offset: int = 0, chunk_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """
+        Stream rows of a table as dicts, fetching `chunk_size` rows at a time.
+
+        Args:
+            table: One of TABLES
+            filters: {column: value or list of values}, applied by SQLite
+            limit: Maximum number of rows (all when None)
+            offset: Rows to skip
+            chunk_size: Rows fetched from the cursor per batch
+        """
+        query, params = self._select(table, filters, limit, offset)
+        with self.engine.connect() as connection:
+            result = connection.execution_options(stream_results=True).execute(text(query), params)
+            for partition in result.mappings().partitions(chunk_size):
+                for row in partition:
+                    yield dict(row)
+
+    def read_table(self, table: str, filters: Optional[Dict[str, Any]] = None, limit: Optional[int] = None,
+                   offset: int = 0) -> pd.DataFrame:
+        query, params = self._select(table, filters, limit, offset)
         with self.session_maker() as session:
-            query = "SELECT * FROM TradeFill"
-            trade_fills = pd.read_sql_query(text(query), session.connection())
-            trade_fills.rename(columns={"market": "connector_name", "symbol": "trading_pair"}, inplace=True)
-            trade_fills[float_cols] = trade_fills[float_cols] / 1e6
-            trade_fills["cum_fees_in_quote"] = trade_fills.groupby(groupers)["trade_fee_in_quote"].cumsum()
-            trade_fills["trade_fee"] = trade_fills.groupby(groupers)["cum_fees_in_quote"].diff()
-        return trade_fills
+            return pd.read_sql_query(text(query), session.connection(), params=params)
+
+    def get_summary(self) -> Dict[str, Any]:
+        """Row counts of every table and the traded pairs and exchanges, computed with aggregate queries."""
+        return {
+            "total_orders": self.count("orders"),
+            "total_trades": self.count("trade_fills"),
+            "total_executors": self.count("executors"),
+            "total_positions": self.count("positions"),
+            "total_controllers": self.count("controllers"),
+            "trading_pairs": self.distinct("orders", "trading_pair"),
+            "exchanges": self.distinct("orders", "connector_name"),
+        }
+
+    def get_orders(self, filters: Optional[Dict[str, Any]] = None):
+        return self.read_table("orders", filters)
+
+    def get_trade_fills(self, filters: Optional[Dict[str, Any]] = None):
+        return self.read_table("trade_fills", filters)
 
     def get_order_status(self):
-        with self.session_maker() as session:
-            query = "SELECT * FROM OrderStatus"
-            order_status = pd.read_sql_query(text(query), session.connection())
-        return order_status
+        return self.read_table("order_status")
 
-    def get_executors_data(self) -> pd.DataFrame:
-        with self.session_maker() as session:
-            query = "SELECT * FROM Executors"
-            executors = pd.read_sql_query(text(query), session.connection())
-        return executors
+    def get_executors_data(self, filters: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+        return self.read_table("executors", filters)
 
     def get_controllers_data(self) -> pd.DataFrame:
-        with self.session_maker() as session:
-            query = "SELECT * FROM Controllers"
-            controllers = pd.read_sql_query(text(query), session.connection())
-        return controllers
+        return self.read_table("controllers")
 
-    def get_positions(self) -> pd.DataFrame:
-        with self.session_maker() as session:
-            query = "SELECT * FROM Position"
-            positions = pd.read_sql_query(text(query), session.connection())
-            # Convert decimal fields from stored format (divide by 1e6)
-            decimal_cols = ["volume_traded_quote", "amount", "breakeven_price", "unrealized_pnl_quote", "cum_fees_quote"]
-            positions[decimal_cols] = positions[decimal_cols] / 1e6
-        return positions
+    def get_positions(self, filters: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+        return self.read_table("positions", filters)
 
     def calculate_trade_based_performance(self) -> pd.DataFrame:
         """
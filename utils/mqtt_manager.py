@@ -8,16 +8,77 @@ from typing import Any, Callable, Dict, Optional, Set
 
 import aiomqtt
 
+from utils.channel_queue import DROP_NEWEST, DROP_OLDEST, LATEST, ChannelQueue
+from utils.event_broadcaster import EventBroadcaster
+from utils.performance_history import PerformanceHistory
+
 logger = logging.getLogger(__name__)
 
+# Ingestion queue per channel, looked up by the full channel, then by its first segment ("response/*").
+# Channels without their own queue share the "default" one. Only the newest performance report of each
+# bot matters, so a slow performance handler coalesces reports instead of queueing them. The receive loop
+# never waits on a queue, so a full "response" or "default" queue drops the incoming message (counted in
+# the queue's metrics) instead of stalling every other channel.
+DEFAULT_CHANNEL_QUEUES: Dict[str, Dict[str, Any]] = {
+    "log": {"maxsize": 5000, "policy": DROP_OLDEST},
+    "performance": {"maxsize": 1000, "policy": LATEST},
+    "hb": {"maxsize": 1000, "policy": DROP_OLDEST},
+    "status_updates": {"maxsize": 1000, "policy": DROP_OLDEST},
+    "notify": {"maxsize": 1000, "policy": DROP_OLDEST},
+    "events": {"maxsize": 1000, "policy": DROP_OLDEST},
+    "response": {"maxsize": 5000, "policy": DROP_NEWEST},
+    "default": {"maxsize": 5000, "policy": DROP_NEWEST},
+}
+
+
+class RecentMessages:
+    """
+    Message hashes seen within a TTL, used to drop duplicate log lines.
+
+    Hashes are kept in a set for O(1) lookups and in a deque in arrival order, so expired hashes are
+    removed from the front as new messages arrive instead of scanning everything. At most `max_size`
+    hashes are kept; beyond that the oldest are forgotten early.
+    """
+
+    def __init__(self, ttl: float, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.duplicates = 0
+        self._order: deque = deque()  # (seen_at, message_hash), oldest first
+        self._hashes: Set[str] = set()
+
+    def __len__(self):
+        return len(self._hashes)
+
+    def seen(self, message_hash: str, now: float) -> bool:
+        """Record a hash and return whether it was already seen within the TTL."""
+        order, hashes = self._order, self._hashes
+        while order and now - order[0][0] > self.ttl:
+            hashes.discard(order.popleft()[1])
+        if message_hash in hashes:
+            self.duplicates += 1
+            return True
+        if len(order) >= self.max_size:
+            hashes.discard(order.popleft()[1])
+        order.append((now, message_hash))
+        hashes.add(message_hash)
+        return False
+
 
 class MQTTManager:
     """
     Manages MQTT connections and message handling for Hummingbot bot communication.
     Uses asyncio-mqtt (aiomqtt) for asynchronous MQTT operations.
+
+    The receive loop only routes messages: it resolves RPC responses, marks the sending bot as seen and
+    queues the raw message on its channel's ChannelQueue. Decoding and handlers run in the queue workers,
+    so a slow handler on one channel neither delays other channels nor the broker subscription.
     """
 
-    def __init__(self, host: str, port: int, username: str, password: str):
+    def __init__(self, host: str, port: int, username: str, password: str,
+                 channel_queues: Optional[Dict[str, Dict[str, Any]]] = None,
+                 performance_resolution: float = 10.0, performance_max_samples: int = 720,
+                 events: Optional[EventBroadcaster] = None):
         self.host = host
         self.port = port
         self.username = username
@@ -26,19 +87,30 @@ class MQTTManager:
         # Message handlers by topic pattern
         self._handlers: Dict[str, Callable] = {}
 
+        # Ingestion queues by channel, with per-channel overrides of maxsize, policy and workers
+        self._channel_queues: Dict[str, ChannelQueue] = {
+            name: ChannelQueue(f"mqtt_{name}", self._process_message, **{**options, **(channel_queues or {}).get(name, {})})
+            for name, options in DEFAULT_CHANNEL_QUEUES.items()
+        }
+
         # Bot data storage - stores full controller reports (performance + custom_info)
         self._bot_controller_reports: Dict[str, Dict] = defaultdict(dict)
         self._bot_logs: Dict[str, deque] = defaultdict(lambda: deque(maxlen=100))
         self._bot_error_logs: Dict[str, deque] = defaultdict(lambda: deque(maxlen=100))
         self._bot_performance_seen: Dict[str, float] = {}
         self._bot_log_seen: Dict[str, float] = {}
+        # Compact performance samples per bot and controller, one per `performance_resolution` seconds
+        self.performance_history = PerformanceHistory(performance_resolution, performance_max_samples)
+        # Bot events for status stream subscribers: "performance" samples and "error_log" entries
+        self.events = events or EventBroadcaster()
 
         # Auto-discovered bots
         self._discovered_bots: Dict[str, float] = {}  # bot_id: last_seen_timestamp
         
-        # Message deduplication tracking
-        self._processed_messages: Dict[str, float] = {}  # message_hash: timestamp
+        # Log deduplication tracking, per bot
+        self._recent_log_messages: Dict[str, RecentMessages] = {}
         self._message_ttl = 300  # 5 minutes TTL for processed messages
+        self._max_recent_log_messages = 10000  # per bot
 
         # Connection state
         self._connected = False
@@ -97,13 +169,13 @@ class MQTTManager:
         self._connected = False
 
     async def _handle_messages(self):
-        """Main message handling loop with reconnection."""
+        """Main message receive loop with reconnection."""
         while True:
             try:
                 async with self._get_client() as client:
                     self._client = client
                     async for message in client.messages:
-                        await self._process_message(message)
+                        await self._route_message(message)
             except aiomqtt.MqttError as error:
                 logger.error(f'MQTT disconnected during message iteration: "{error}". Reconnecting...')
                 await asyncio.sleep(self._reconnect_interval)
@@ -111,8 +183,8 @@ class MQTTManager:
                 logger.error(f"Unexpected error in message handler: {e}. Reconnecting...")
                 await asyncio.sleep(self._reconnect_interval)
 
-    async def _process_message(self, message):
-        """Process incoming MQTT message."""
+    async def _route_message(self, message):
+        """Route an incoming MQTT message to its channel queue without decoding it."""
         try:
             topic = str(message.topic)
 
@@ -128,47 +200,58 @@ class MQTTManager:
                 namespace, bot_id, channel = topic_parts[0], topic_parts[1], "/".join(topic_parts[2:])
                 # Only process if it's the expected namespace
                 if namespace == "hbot":
-                    # Auto-discover bot
+                    # Auto-discover bot here, so bots stay fresh however busy the handlers are
                     self._discovered_bots[bot_id] = time.time()
-                    # Parse message
-                    try:
-                        data = json.loads(message.payload.decode("utf-8"))
-                    except json.JSONDecodeError:
-                        data = message.payload.decode("utf-8")
-
-                    # Route to appropriate handler based on Hummingbot's topics
-                    if channel == "log":
-                        await self._handle_log(bot_id, data)
-                    elif channel == "notify":
-                        await self._handle_notify(bot_id, data)
-                    elif channel == "status_updates":
-                        await self._handle_status(bot_id, data)
-                    elif channel == "hb":  # heartbeat
-                        await self._handle_heartbeat(bot_id, data)
-                    elif channel == "events":
-                        await self._handle_events(bot_id, data)
-                    elif channel == "performance":
-                        await self._handle_performance(bot_id, data)
-                    elif channel.startswith("response/"):
-                        await self._handle_command_response(bot_id, channel, data)
-                    elif channel.startswith("external/event/"):
-                        await self._handle_external_event(bot_id, channel, data)
-                    elif channel in ["history", "start", "stop", "config", "import_strategy"]:
-                        # These are command channels - responses should come on response/* topics
-                        logger.debug(f"Command channel '{channel}' for bot {bot_id} - waiting for response")
+                    queue = (self._channel_queues.get(channel) or self._channel_queues.get(channel.split("/")[0])
+                             or self._channel_queues["default"])
+                    # Never wait here: one full queue must not stall ingestion of the other channels
+                    queue.put_nowait(bot_id, (topic, bot_id, channel, message.payload))
+        except Exception as e:
+            logger.error(f"Error routing message from {message.topic}: {e}", exc_info=True)
+
+    async def _process_message(self, item):
+        """Decode a queued message and run its channel handler and the matching custom handlers."""
+        topic, bot_id, channel, payload = item
+        try:
+            # Parse message
+            try:
+                data = json.loads(payload.decode("utf-8"))
+            except json.JSONDecodeError:
+                data = payload.decode("utf-8")
+
+            # Route to appropriate handler based on Hummingbot's topics
+            if channel == "log":
+                await self._handle_log(bot_id, data)
+            elif channel == "notify":
+                await self._handle_notify(bot_id, data)
+            elif channel == "status_updates":
+                await self._handle_status(bot_id, data)
+            elif channel == "hb":  # heartbeat
+                await self._handle_heartbeat(bot_id, data)
+            elif channel == "events":
+                await self._handle_events(bot_id, data)
+            elif channel == "performance":
+                await self._handle_performance(bot_id, data)
+            elif channel.startswith("response/"):
+                await self._handle_command_response(bot_id, channel, data)
+            elif channel.startswith("external/event/"):
+                await self._handle_external_event(bot_id, channel, data)
+            elif channel in ["history", "start", "stop", "config", "import_strategy"]:
+                # These are command channels - responses should come on response/* topics
+                logger.debug(f"Command channel '{channel}' for bot {bot_id} - waiting for response")
+            else:
+                logger.info(f"Unknown channel '{channel}' for bot {bot_id}")
+
+            # Call custom handlers
+            for pattern, handler in self._handlers.items():
+                if self._match_topic(pattern, topic):
+                    if asyncio.iscoroutinefunction(handler):
+                        await handler(bot_id, channel, data)
                     else:
-                        logger.info(f"Unknown channel '{channel}' for bot {bot_id}")
-
-                    # Call custom handlers
-                    for pattern, handler in self._handlers.items():
-                        if self._match_topic(pattern, topic):
-                            if asyncio.iscoroutinefunction(handler):
-                                await handler(bot_id, channel, data)
-                            else:
-                                # Run sync handler in executor
-                                await asyncio.get_event_loop().run_in_executor(None, handler, bot_id, channel, data)
+                        # Run sync handler in executor
+                        await asyncio.get_event_loop().run_in_executor(None, handler, bot_id, channel, data)
         except Exception as e:
-            logger.error(f"Error processing message from {message.topic}: {e}", exc_info=True)
+            logger.error(f"Error processing message from {topic}: {e}", exc_info=True)
 
     def _match_topic(self, pattern: str, topic: str) -> bool:
         """Check if topic matches pattern (supports + wildcard)."""
@@ -195,11 +278,15 @@ class MQTTManager:
         }
         """
         if isinstance(data, dict):
-            self._bot_performance_seen[bot_id] = time.time()
+            now = time.time()
+            self._bot_performance_seen[bot_id] = now
+            samples = {}
             for controller_id, controller_report in data.items():
                 if bot_id not in self._bot_controller_reports:
                     self._bot_controller_reports[bot_id] = {}
                 self._bot_controller_reports[bot_id][controller_id] = controller_report
+                samples[controller_id] = self.performance_history.record(bot_id, controller_id, controller_report, now)
+            self.events.publish("performance", {"bot_name": bot_id, "performance": samples})
 
     async def _handle_log(self, bot_id: str, data: Any):
         """Handle log messages with deduplication."""
@@ -223,20 +310,15 @@ class MQTTManager:
             return  # Skip invalid data
 
         # Check for duplicates
-        current_time = time.time()
-        if message_hash in self._processed_messages:
+        recent_messages = self._recent_log_messages.get(bot_id)
+        if recent_messages is None:
+            recent_messages = RecentMessages(self._message_ttl, self._max_recent_log_messages)
+            self._recent_log_messages[bot_id] = recent_messages
+        if recent_messages.seen(message_hash, time.time()):
             # Skip duplicate message
             logger.debug(f"Skipping duplicate log message from {bot_id}: {message[:50]}...")
             return
 
-        # Clean up old message hashes (older than TTL)
-        expired_hashes = [h for h, t in self._processed_messages.items() if current_time - t > self._message_ttl]
-        for h in expired_hashes:
-            del self._processed_messages[h]
-
-        # Record this message as processed
-        self._processed_messages[message_hash] = current_time
-
         # Process the message
         if isinstance(data, dict):
             # Normalize the log entry
@@ -249,6 +331,7 @@ class MQTTManager:
 
             if level.upper() == "ERROR":
                 self._bot_error_logs[bot_id].append(log_entry)
+                self.events.publish("error_log", {"bot_name": bot_id, "log": log_entry})
             else:
                 self._bot_logs[bot_id].append(log_entry)
         elif isinstance(data, str):
@@ -306,6 +389,9 @@ class MQTTManager:
     async def start(self):
         """Start the MQTT client."""
         try:
+            for queue in self._channel_queues.values():
+                queue.start()
+
             # Create and store the main message handling task
             task = asyncio.create_task(self._handle_messages())
             self._tasks.add(task)
@@ -336,6 +422,9 @@ class MQTTManager:
         # Wait for all tasks to complete
         await asyncio.gather(*self._tasks, return_exceptions=True)
 
+        for queue in self._channel_queues.values():
+            await queue.stop()
+
         logger.info("MQTT client stopped")
 
     async def publish_command_and_wait(
@@ -490,6 +579,14 @@ class MQTTManager:
         """
         return self._bot_controller_reports.get(bot_id, {})
 
+    def get_bot_performance_latest(self, bot_id: str) -> Dict[str, Dict[str, Any]]:
+        """Get the latest compact performance sample (pnl, volume, positions) of each controller of a bot."""
+        return self.performance_history.latest(bot_id)
+
+    def get_bot_performance_history(self, bot_id: str, since: Optional[float] = None) -> Dict[str, list]:
+        """Get the compact performance samples of each controller of a bot newer than `since`."""
+        return self.performance_history.since(bot_id, since)
+
     def get_bot_logs(self, bot_id: str) -> list:
         """Get recent logs for a bot."""
         return list(self._bot_logs.get(bot_id, []))
@@ -506,11 +603,29 @@ class MQTTManager:
         self._discovered_bots.pop(bot_id, None)
         self._bot_performance_seen.pop(bot_id, None)
         self._bot_log_seen.pop(bot_id, None)
+        self._recent_log_messages.pop(bot_id, None)
+        self.performance_history.clear(bot_id)
 
     def clear_bot_controller_reports(self, bot_id: str):
         """Clear only controller report data for a bot (useful when bot is stopped)."""
         self._bot_controller_reports.pop(bot_id, None)
 
+    def get_ingestion_metrics(self) -> Dict[str, Dict]:
+        """Queue depth, drops and latency of each channel ingestion queue."""
+        return {name: queue.get_metrics() for name, queue in self._channel_queues.items()}
+
+    def get_log_dedup_metrics(self) -> Dict[str, Any]:
+        """Tracked log hashes and duplicate log lines dropped, in total and per bot."""
+        bots = {
+            bot_id: {"tracked": len(recent), "duplicates_dropped": recent.duplicates}
+            for bot_id, recent in self._recent_log_messages.items()
+        }
+        return {
+            "duplicates_dropped": sum(bot["duplicates_dropped"] for bot in bots.values()),
+            "tracked": sum(bot["tracked"] for bot in bots.values()),
+            "bots": bots,
+        }
+
     @property
     def is_connected(self) -> bool:
         """Check if connected to MQTT broker."""
@@ -0,0 +1,159 @@
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+class OrderBookDepth:
+    """
+    Cumulative depth arrays of one order book snapshot, answering many depth queries at once.
+
+    Each side keeps its prices best-first together with the cumulative base and quote volume, so every query
+    is a binary search (`np.searchsorted`) over those arrays. Queries of the same type and side are evaluated
+    together. Results follow the semantics of Hummingbot's OrderBook queries of the same name.
+    """
+    QUERY_TYPES = (
+        "price_for_volume",
+        "volume_for_price",
+        "price_for_quote_volume",
+        "quote_volume_for_price",
+        "vwap_for_volume",
+    )
+
+    def __init__(self, bid_prices: Sequence[float], bid_amounts: Sequence[float],
+                 ask_prices: Sequence[float], ask_amounts: Sequence[float]):
+        """
+        Args:
+            bid_prices: Bid prices, highest first
+            bid_amounts: Base amounts of the bid levels
+            ask_prices: Ask prices, lowest first
+            ask_amounts: Base amounts of the ask levels
+        """
+        self._sides = {
+            True: self._side(ask_prices, ask_amounts),  # buys consume asks
+            False: self._side(bid_prices, bid_amounts),  # sells consume bids
+        }
+        self.best_bid = float(bid_prices[0]) if len(bid_prices) else None
+        self.best_ask = float(ask_prices[0]) if len(ask_prices) else None
+        self.mid_price = (self.best_bid + self.best_ask) / 2 if self.best_bid and self.best_ask else None
+
+    @classmethod
+    def from_snapshot(cls, snapshot) -> "OrderBookDepth":
+        """Build from an OrderBook.snapshot tuple of (bids, asks) DataFrames with price and amount columns."""
+        bids, asks = snapshot
+        return cls(
+            bids["price"].to_numpy(dtype=float), bids["amount"].to_numpy(dtype=float),
+            asks["price"].to_numpy(dtype=float), asks["amount"].to_numpy(dtype=float),
+        )
+
+    @staticmethod
+    def _side(prices: Sequence[float], amounts: Sequence[float]) -> Dict[str, np.ndarray]:
+        prices = np.asarray(prices, dtype=float)
+        amounts = np.asarray(amounts, dtype=float)
+        return {
+            "prices": prices,
+            "cum_base": np.cumsum(amounts),
+            "cum_quote": np.cumsum(amounts * prices),
+        }
+
+    def query(self, queries: List[Dict]) -> List[Dict]:
+        """
+        Evaluate depth queries against this snapshot.
+
+        Args:
+            queries: Dicts with `query_type` (one of QUERY_TYPES), `is_buy` and `value` (the queried volume,
+                price or quote volume, depending on the query type)
+
+        Returns:
+            One result dict per query, in the same order
+        """
+        results: List[Optional[Dict]] = [None] * len(queries)
+        groups: Dict[tuple, List[int]] = {}
+        for index, query in enumerate(queries):
+            if query["query_type"] not in self.QUERY_TYPES:
+                raise ValueError(f"Unknown query type: {query['query_type']}")
+            groups.setdefault((query["query_type"], bool(query["is_buy"])), []).append(index)
+
+        for (query_type, is_buy), indexes in groups.items():
+            values = np.array([float(queries[index]["value"]) for index in indexes])
+            group_results = getattr(self, f"_{query_type}")(self._sides[is_buy], values, is_buy)
+            for index, result in zip(indexes, group_results):
+                result.update({"query_type": query_type, "is_buy": is_buy, "value": queries[index]["value"]})
+                reference_price = result.get("average_price") or result.get("result_price")
+                result["price_impact_pct"] = (
+                    round(abs(reference_price - self.mid_price) / self.mid_price * 100, 6)
+                    if reference_price and self.mid_price else None
+                )
+                results[index] = result
+        return results
+
+    @staticmethod
+    def _level_index(cumulative: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """Index of the first level where the cumulative volume reaches each value (len(cumulative) if never)."""
+        return np.searchsorted(cumulative, values, side="left")
+
+    @staticmethod
+    def _levels_within_price(side: Dict[str, np.ndarray], prices: np.ndarray, is_buy: bool) -> np.ndarray:
+        """Number of levels priced at or better than each limit price."""
+        if is_buy:
+            return np.searchsorted(side["prices"], prices, side="right")
+        return np.searchsorted(-side["prices"], -prices, side="right")
+
+    def _price_for_volume(self, side: Dict[str, np.ndarray], volumes: np.ndarray, is_buy: bool) -> List[Dict]:
+        levels = self._level_index(side["cum_base"], volumes)
+        total = float(side["cum_base"][-1]) if len(side["cum_base"]) else 0.0
+        return [
+            {
+                "result_price": float(side["prices"][level]) if level < len(side["prices"]) else None,
+                "result_volume": float(min(volume, total)),
+            }
+            for level, volume in zip(levels, volumes)
+        ]
+
+    def _price_for_quote_volume(self, side: Dict[str, np.ndarray], quote_volumes: np.ndarray, is_buy: bool) -> List[Dict]:
+        levels = self._level_index(side["cum_quote"], quote_volumes)
+        results = []
+        for level in levels:
+            if level < len(side["prices"]):
+                results.append({"result_price": float(side["prices"][level]),
+                                "result_quote_volume": float(side["cum_quote"][level])})
+            else:
+                total = float(side["cum_quote"][-1]) if len(side["cum_quote"]) else 0.0
+                results.append({"result_price": None, "result_quote_volume": total})
+        return results
+
+    def _vwap_for_volume(self, side: Dict[str, np.ndarray], volumes: np.ndarray, is_buy: bool) -> List[Dict]:
+        levels = self._level_index(side["cum_base"], volumes)
+        count = len(side["prices"])
+        results = []
+        for level, volume in zip(levels, volumes):
+            if level < count:
+                filled_base = side["cum_base"][level - 1] if level > 0 else 0.0
+                filled_quote = side["cum_quote"][level - 1] if level > 0 else 0.0
+                quote = filled_quote + (volume - filled_base) * side["prices"][level]
+                base = volume
+            else:
+                # Not enough depth: the whole side is consumed
+                base = side["cum_base"][-1] if count else 0.0
+                quote = side["cum_quote"][-1] if count else 0.0
+            results.append({
+                "average_price": float(quote / base) if base > 0 else None,
+                "result_volume": float(base),
+                "result_quote_volume": float(quote),
+            })
+        return results
+
+    def _volume_for_price(self, side: Dict[str, np.ndarray], prices: np.ndarray, is_buy: bool,
+                          quote: bool = False) -> List[Dict]:
+        counts = self._levels_within_price(side, prices, is_buy)
+        cumulative = side["cum_quote"] if quote else side["cum_base"]
+        key = "result_quote_volume" if quote else "result_volume"
+        return [
+            {
+                "result_price": float(side["prices"][count - 1]) if count > 0 else None,
+                key: float(cumulative[count - 1]) if count > 0 else 0.0,
+            }
+            for count in counts
+        ]
+
+    def _quote_volume_for_price(self, side: Dict[str, np.ndarray], prices: np.ndarray, is_buy: bool) -> List[Dict]:
+        return self._volume_for_price(side, prices, is_buy, quote=True)
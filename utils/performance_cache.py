@@ -0,0 +1,182 @@
+import asyncio
+import hashlib
+import logging
+import numbers
+import os
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+class PerformanceCache:
+    """
+    On-disk cache of computed performance frames of archived bot databases.
+
+    Archived databases do not change, so a frame is keyed by the database's absolute path, mtime and size and
+    stays valid until the file is replaced. Frames are stored column by column in an uncompressed `.npz` file
+    (strings as fixed-width unicode, no pickled objects). Object columns are stored as floats when they hold only
+    numbers and as strings otherwise, each with a null mask, so nulls come back as None instead of "None"/"nan"
+    strings. Beyond `max_entries` the least recently used frames
+    are evicted.
+    """
+
+    NULL_MASK_PREFIX = "__null__:"
+
+    def __init__(self, path: str, max_entries: int = 500):
+        self.path = path
+        self.max_entries = max_entries
+        self.metrics = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        self.precompute_status: Dict = {"running": False}
+        self._precompute_task: Optional[asyncio.Task] = None
+
+    def key(self, db_path: str) -> str:
+        stat = os.stat(db_path)
+        fingerprint = f"{os.path.abspath(db_path)}|{stat.st_mtime_ns}|{stat.st_size}"
+        return hashlib.sha256(fingerprint.encode()).hexdigest()[:32]
+
+    def get(self, db_path: str) -> Optional[pd.DataFrame]:
+        """Cached frame of a database, or None when it was not computed for the current file."""
+        path = self._path(self.key(db_path))
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                frame = self._decode({name: data[name] for name in data.files})
+        except (FileNotFoundError, ValueError, OSError):
+            self.metrics["misses"] += 1
+            return None
+        os.utime(path)
+        self.metrics["hits"] += 1
+        return frame
+
+    def put(self, db_path: str, frame: pd.DataFrame):
+        os.makedirs(self.path, exist_ok=True)
+        path = self._path(self.key(db_path))
+        columns = self._encode(frame)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **columns)
+        os.replace(tmp_path, path)
+        self.metrics["stores"] += 1
+        self._evict()
+
+    def get_or_compute(self, db_path: str, compute: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+        """Return the cached frame of a database, computing and storing it on a miss. Blocking."""
+        frame = self.get(db_path)
+        if frame is None:
+            frame = compute()
+            self.put(db_path, frame)
+        return frame
+
+    def start_precompute(self, db_paths: List[str], compute: Callable[[str], pd.DataFrame]) -> Dict:
+        """
+        Compute the frames of databases that are not cached yet in a background task.
+
+        Args:
+            db_paths: Databases to precompute
+            compute: Computes the frame of a database path; runs in a worker thread
+
+        Returns:
+            The precompute status; a run already in progress is left running
+        """
+        if self._precompute_task is None or self._precompute_task.done():
+            self.precompute_status = {"running": True, "total": len(db_paths), "done": 0, "computed": 0,
+                                      "cached": 0, "failed": 0, "errors": {}}
+            self._precompute_task = asyncio.create_task(self._precompute(db_paths, compute))
+        return self.precompute_status
+
+    async def _precompute(self, db_paths: List[str], compute: Callable[[str], pd.DataFrame]):
+        status = self.precompute_status
+        try:
+            for db_path in db_paths:
+                try:
+                    if os.path.exists(self._path(self.key(db_path))):
+                        status["cached"] += 1
+                    else:
+                        frame = await asyncio.to_thread(compute, db_path)
+                        await asyncio.to_thread(self.put, db_path, frame)
+                        status["computed"] += 1
+                except Exception as e:
+                    logger.warning(f"Error precomputing performance of {db_path}: {e}")
+                    status["failed"] += 1
+                    status["errors"][db_path] = str(e)
+                status["done"] += 1
+        finally:
+            status["running"] = False
+
+    async def stop(self):
+        if self._precompute_task and not self._precompute_task.done():
+            self._precompute_task.cancel()
+            try:
+                await self._precompute_task
+            except asyncio.CancelledError:
+                pass
+
+    def get_metrics(self) -> Dict:
+        entries = self._entries()
+        return {
+            **self.metrics,
+            "entries": len(entries),
+            "bytes": sum(os.path.getsize(path) for path, _ in entries),
+            "max_entries": self.max_entries,
+            "precompute": self.precompute_status,
+        }
+
+    @classmethod
+    def _encode(cls, frame: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """Arrays to store for a frame, without object dtypes."""
+        columns = {}
+        for column in frame.columns:
+            values = frame[column].to_numpy()
+            if values.dtype != object:
+                columns[str(column)] = values
+                continue
+            nulls = pd.isna(values)
+            present = values[~nulls]
+            if len(present) and all(isinstance(value, numbers.Number) and not isinstance(value, bool) for value in present):
+                columns[str(column)] = np.where(nulls, np.nan, values).astype(np.float64)
+            else:
+                columns[str(column)] = np.where(nulls, "", values).astype(str)
+            columns[f"{cls.NULL_MASK_PREFIX}{column}"] = nulls
+        return columns
+
+    @classmethod
+    def _decode(cls, arrays: Dict[str, np.ndarray]) -> pd.DataFrame:
+        """Rebuild a frame from stored arrays, restoring the nulls of string columns."""
+        columns = {}
+        for name, values in arrays.items():
+            if name.startswith(cls.NULL_MASK_PREFIX):
+                continue
+            nulls = arrays.get(f"{cls.NULL_MASK_PREFIX}{name}")
+            if nulls is not None and nulls.any():
+                values = values.astype(object)
+                values[nulls] = None
+            columns[name] = values
+        return pd.DataFrame(columns)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.path, f"{key}.npz")
+
+    def _entries(self):
+        """(path, last used) of every entry."""
+        if not os.path.isdir(self.path):
+            return []
+        entries = []
+        for file_name in os.listdir(self.path):
+            if file_name.endswith(".npz"):
+                path = os.path.join(self.path, file_name)
+                try:
+                    entries.append((path, os.path.getmtime(path)))
+                except OSError:
+                    continue
+        return entries
+
+    def _evict(self):
+        entries = sorted(self._entries(), key=lambda entry: entry[1])
+        for path, _ in entries[:max(0, len(entries) - self.max_entries)]:
+            try:
+                os.remove(path)
+                self.metrics["evictions"] += 1
+            except FileNotFoundError:
+                pass
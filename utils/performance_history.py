@@ -0,0 +1,90 @@
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+# Performance report fields kept in each sample
+SAMPLE_FIELDS = (
+    "realized_pnl_quote",
+    "unrealized_pnl_quote",
+    "global_pnl_quote",
+    "global_pnl_pct",
+    "volume_traded",
+)
+
+
+def performance_sample(report: Dict[str, Any], timestamp: float) -> Dict[str, Any]:
+    """
+    Reduce a controller report to a compact sample: PnL, traded volume and open positions.
+
+    Supports both the nested report format ({"performance": {...}, "custom_info": {...}}) and the older
+    flat one. Non-numeric values are left out.
+    """
+    performance = report.get("performance", report) if isinstance(report, dict) else {}
+    sample: Dict[str, Any] = {"timestamp": timestamp}
+    for field in SAMPLE_FIELDS:
+        value = performance.get(field)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            sample[field] = value
+    positions = performance.get("positions_summary")
+    if isinstance(positions, list):
+        sample["open_positions"] = len(positions)
+        sample["position_amount"] = sum(
+            position.get("amount", 0) for position in positions
+            if isinstance(position, dict) and isinstance(position.get("amount", 0), (int, float))
+        )
+    return sample
+
+
+class PerformanceHistory:
+    """
+    Ring buffer of compact performance samples per bot and controller.
+
+    Reports arriving within the same `resolution`-second bucket replace the bucket's sample, so each series
+    holds at most one sample per bucket and at most `max_samples` samples. A replaced sample takes the newer
+    timestamp, so `since` queries always see it.
+    """
+
+    def __init__(self, resolution: float = 10.0, max_samples: int = 720):
+        self.resolution = resolution
+        self.max_samples = max_samples
+        self._series: Dict[str, Dict[str, deque]] = {}
+
+    def record(self, bot_id: str, controller_id: str, report: Dict[str, Any], timestamp: float) -> Dict[str, Any]:
+        """Record a controller report and return its sample."""
+        sample = performance_sample(report, timestamp)
+        controllers = self._series.setdefault(bot_id, {})
+        series = controllers.get(controller_id)
+        if series is None:
+            series = controllers[controller_id] = deque(maxlen=self.max_samples)
+        if series and series[-1]["timestamp"] // self.resolution == timestamp // self.resolution:
+            series[-1] = sample
+        else:
+            series.append(sample)
+        return sample
+
+    def latest(self, bot_id: str) -> Dict[str, Dict[str, Any]]:
+        """Most recent sample of each controller of a bot."""
+        return {controller_id: series[-1] for controller_id, series in self._series.get(bot_id, {}).items() if series}
+
+    def since(self, bot_id: str, since: Optional[float] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """Samples of each controller of a bot newer than `since` (all samples when None); unchanged controllers are omitted."""
+        result = {}
+        for controller_id, series in self._series.get(bot_id, {}).items():
+            if since is None:
+                samples = list(series)
+            else:
+                samples = []
+                # Newest samples are at the end; stop at the first one that is not newer
+                for sample in reversed(series):
+                    if sample["timestamp"] <= since:
+                        break
+                    samples.append(sample)
+                samples.reverse()
+            if samples:
+                result[controller_id] = samples
+        return result
+
+    def bots(self) -> List[str]:
+        return list(self._series)
+
+    def clear(self, bot_id: str):
+        self._series.pop(bot_id, None)
@@ -0,0 +1,216 @@
+from typing import Dict, List, Optional, Set, Tuple
+
+
+class PortfolioAggregator:
+    """
+    Incrementally maintained token/account/connector totals for portfolio distribution queries.
+
+    AccountsService replaces whole connector entries (the token list of one account/connector) on every
+    balance refresh. Each replacement only touches the tokens, account and connector involved: their
+    totals are re-summed from the per-connector leaves, which keeps them free of floating point drift.
+    Rendered distributions are cached until the next change, so repeated polling is a dictionary lookup.
+
+    Rendered results are shared between callers and must not be mutated.
+    """
+    ALL_ACCOUNTS = "all_accounts"
+
+    def __init__(self):
+        # token -> account -> connector -> (value, units)
+        self._leaves: Dict[str, Dict[str, Dict[str, Tuple[float, float]]]] = {}
+        # account -> connector -> tokens held
+        self._connector_tokens: Dict[str, Dict[str, Set[str]]] = {}
+        # token -> (value, units)
+        self._token_totals: Dict[str, Tuple[float, float]] = {}
+        # token -> account -> (value, units)
+        self._token_account_totals: Dict[str, Dict[str, Tuple[float, float]]] = {}
+        # account -> connector -> value
+        self._connector_totals: Dict[str, Dict[str, float]] = {}
+        # account -> value
+        self._account_totals: Dict[str, float] = {}
+        self._total_value = 0.0
+
+        # account filter (None for all accounts) -> rendered distribution
+        self._portfolio_distribution_cache: Dict[Optional[str], Dict] = {}
+        self._account_distribution_cache: Optional[Dict] = None
+
+    @property
+    def total_value(self) -> float:
+        return self._total_value
+
+    def ensure_account(self, account_name: str):
+        """Track an account even if it has no connectors yet (it is listed with a zero value)."""
+        if account_name not in self._connector_tokens:
+            self._connector_tokens[account_name] = {}
+            self._connector_totals[account_name] = {}
+            self._account_totals[account_name] = 0.0
+            self._invalidate()
+
+    def set_connector(self, account_name: str, connector_name: str, tokens_info: List[Dict]):
+        """Replace the token balances of one account/connector, applying only the resulting deltas."""
+        self.ensure_account(account_name)
+
+        new_leaves: Dict[str, Tuple[float, float]] = {}
+        for token_info in tokens_info:
+            token = token_info.get("token", "")
+            value, units = new_leaves.get(token, (0.0, 0.0))
+            new_leaves[token] = (value + token_info.get("value", 0), units + token_info.get("units", 0))
+
+        old_tokens = self._connector_tokens[account_name].get(connector_name, set())
+        for token in old_tokens - new_leaves.keys():
+            self._leaves[token][account_name].pop(connector_name, None)
+        for token, leaf in new_leaves.items():
+            self._leaves.setdefault(token, {}).setdefault(account_name, {})[connector_name] = leaf
+        self._connector_tokens[account_name][connector_name] = set(new_leaves)
+
+        for token in old_tokens | new_leaves.keys():
+            self._refresh_token(token, account_name)
+        self._connector_totals[account_name][connector_name] = sum(value for value, _ in new_leaves.values())
+        self._refresh_account(account_name)
+
+    def remove_connector(self, account_name: str, connector_name: str):
+        """Remove one account/connector from the totals."""
+        if connector_name not in self._connector_tokens.get(account_name, {}):
+            return
+
+        old_tokens = self._connector_tokens[account_name].pop(connector_name)
+        for token in old_tokens:
+            self._leaves[token][account_name].pop(connector_name, None)
+            self._refresh_token(token, account_name)
+        self._connector_totals[account_name].pop(connector_name, None)
+        self._refresh_account(account_name)
+
+    def remove_account(self, account_name: str):
+        """Remove an account and all of its connectors from the totals."""
+        if account_name not in self._connector_tokens:
+            return
+
+        for connector_name in list(self._connector_tokens[account_name]):
+            self.remove_connector(account_name, connector_name)
+        del self._connector_tokens[account_name]
+        del self._connector_totals[account_name]
+        del self._account_totals[account_name]
+        self._total_value = sum(self._account_totals.values())
+        self._invalidate()
+
+    def _refresh_token(self, token: str, account_name: str):
+        connectors = self._leaves[token][account_name]
+        if connectors:
+            self._token_account_totals.setdefault(token, {})[account_name] = (
+                sum(value for value, _ in connectors.values()),
+                sum(units for _, units in connectors.values())
+            )
+        else:
+            del self._leaves[token][account_name]
+            self._token_account_totals.get(token, {}).pop(account_name, None)
+
+        accounts = self._token_account_totals.get(token)
+        if accounts:
+            self._token_totals[token] = (
+                sum(value for value, _ in accounts.values()),
+                sum(units for _, units in accounts.values())
+            )
+        else:
+            self._leaves.pop(token, None)
+            self._token_account_totals.pop(token, None)
+            self._token_totals.pop(token, None)
+
+    def _refresh_account(self, account_name: str):
+        self._account_totals[account_name] = sum(self._connector_totals[account_name].values())
+        self._total_value = sum(self._account_totals.values())
+        self._invalidate()
+
+    def _invalidate(self):
+        self._portfolio_distribution_cache.clear()
+        self._account_distribution_cache = None
+
+    def get_portfolio_distribution(self, account_name: Optional[str] = None) -> Dict:
+        """
+        Get portfolio distribution by tokens with percentages, optionally for a single account.
+        """
+        if account_name not in self._portfolio_distribution_cache:
+            self._portfolio_distribution_cache[account_name] = self._render_portfolio_distribution(account_name)
+        return self._portfolio_distribution_cache[account_name]
+
+    def _render_portfolio_distribution(self, account_name: Optional[str]) -> Dict:
+        if account_name:
+            tokens = set().union(*self._connector_tokens.get(account_name, {}).values())
+            token_totals = {token: self._token_account_totals[token][account_name] for token in tokens}
+            total_value = self._account_totals.get(account_name, 0.0)
+        else:
+            token_totals = self._token_totals
+            total_value = self._total_value
+
+        distribution = []
+        for token, (token_value, token_units) in token_totals.items():
+            percentage = (token_value / total_value * 100) if total_value > 0 else 0
+            token_dist = {
+                "token": token,
+                "total_value": round(token_value, 6),
+                "total_units": token_units,
+                "percentage": round(percentage, 4),
+                "accounts": {}
+            }
+
+            accounts = [account_name] if account_name else self._token_account_totals[token].keys()
+            for acc_name in accounts:
+                acc_value, acc_units = self._token_account_totals[token][acc_name]
+                acc_percentage = (acc_value / total_value * 100) if total_value > 0 else 0
+                token_dist["accounts"][acc_name] = {
+                    "value": round(acc_value, 6),
+                    "units": acc_units,
+                    "percentage": round(acc_percentage, 4),
+                    "connectors": {
+                        conn_name: {"value": round(conn_value, 6), "units": conn_units}
+                        for conn_name, (conn_value, conn_units) in self._leaves[token][acc_name].items()
+                    }
+                }
+
+            distribution.append(token_dist)
+
+        # Sort by value (descending)
+        distribution.sort(key=lambda x: x["total_value"], reverse=True)
+
+        return {
+            "total_portfolio_value": round(total_value, 6),
+            "token_count": len(distribution),
+            "distribution": distribution,
+            "account_filter": account_name if account_name else self.ALL_ACCOUNTS
+        }
+
+    def get_account_distribution(self) -> Dict:
+        """
+        Get portfolio distribution by accounts with percentages.
+        """
+        if self._account_distribution_cache is None:
+            self._account_distribution_cache = self._render_account_distribution()
+        return self._account_distribution_cache
+
+    def _render_account_distribution(self) -> Dict:
+        total_value = self._total_value
+
+        distribution = []
+        for acc_name, account_value in self._account_totals.items():
+            percentage = (account_value / total_value * 100) if total_value > 0 else 0
+            connector_dist = {}
+            for conn_name, conn_value in self._connector_totals[acc_name].items():
+                conn_percentage = (conn_value / total_value * 100) if total_value > 0 else 0
+                connector_dist[conn_name] = {
+                    "value": round(conn_value, 6),
+                    "percentage": round(conn_percentage, 4)
+                }
+
+            distribution.append({
+                "account": acc_name,
+                "total_value": round(account_value, 6),
+                "percentage": round(percentage, 4),
+                "connectors": connector_dist
+            })
+
+        # Sort by value (descending)
+        distribution.sort(key=lambda x: x["total_value"], reverse=True)
+
+        return {
+            "total_portfolio_value": round(total_value, 6),
+            "account_count": len(distribution),
+            "distribution": distribution
+        }
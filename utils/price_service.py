@@ -0,0 +1,130 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class PriceService:
+    """
+    Last traded prices with a short-TTL cache, request coalescing and multi-connector fan-out.
+
+    Prices are cached per connector/trading pair for `ttl` seconds. Pairs that are not cached are fetched with
+    one exchange request per connector; callers asking for pairs that are already being fetched wait for that
+    request instead of issuing their own. Fetches run as separate tasks, so a cancelled caller does not abort
+    a request other callers are waiting for.
+    """
+
+    def __init__(self, fetch_prices: Callable[[str, List[str]], Awaitable[Dict[str, float]]], ttl: float = 2.0):
+        """
+        Args:
+            fetch_prices: Coroutine fetching the last traded prices of trading pairs from one connector
+            ttl: Seconds a fetched price is served from the cache (0 disables caching, coalescing still applies)
+        """
+        self._fetch_prices = fetch_prices
+        self.ttl = ttl
+        self._cache: Dict[Tuple[str, str], Tuple[float, float]] = {}  # (connector, pair) -> (fetched_at, price)
+        self._in_flight: Dict[Tuple[str, str], asyncio.Task] = {}
+        self.metrics: Dict[str, int] = {
+            "cache_hits": 0,
+            "coalesced": 0,
+            "fetched_pairs": 0,
+            "exchange_requests": 0,
+            "errors": 0,
+        }
+
+    async def get_prices(self, connector_name: str, trading_pairs: List[str]) -> Dict[str, float]:
+        """
+        Get the last traded prices of trading pairs from one connector.
+
+        Pairs without a price on the exchange are omitted. Raises if the exchange request fails.
+        """
+        now = time.time()
+        result: Dict[str, float] = {}
+        pending: Dict[str, asyncio.Task] = {}
+        missing: List[str] = []
+
+        for trading_pair in dict.fromkeys(trading_pairs):
+            key = (connector_name, trading_pair)
+            cached = self._cache.get(key)
+            if cached and now - cached[0] < self.ttl:
+                result[trading_pair] = cached[1]
+                self.metrics["cache_hits"] += 1
+            elif key in self._in_flight:
+                pending[trading_pair] = self._in_flight[key]
+                self.metrics["coalesced"] += 1
+            else:
+                missing.append(trading_pair)
+
+        if missing:
+            task = asyncio.create_task(self._fetch(connector_name, missing))
+            # Retrieve the exception even if every caller went away, so it is not reported as unhandled
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            for trading_pair in missing:
+                self._in_flight[(connector_name, trading_pair)] = task
+                pending[trading_pair] = task
+
+        for trading_pair, task in pending.items():
+            prices = await asyncio.shield(task)
+            if trading_pair in prices:
+                result[trading_pair] = prices[trading_pair]
+        return result
+
+    async def _fetch(self, connector_name: str, trading_pairs: List[str]) -> Dict[str, float]:
+        self.metrics["exchange_requests"] += 1
+        self.metrics["fetched_pairs"] += len(trading_pairs)
+        try:
+            prices = await self._fetch_prices(connector_name, trading_pairs)
+            fetched_at = time.time()
+            for trading_pair, price in prices.items():
+                self._cache[(connector_name, trading_pair)] = (fetched_at, price)
+            return prices
+        except Exception:
+            self.metrics["errors"] += 1
+            raise
+        finally:
+            current = asyncio.current_task()
+            for trading_pair in trading_pairs:
+                if self._in_flight.get((connector_name, trading_pair)) is current:
+                    del self._in_flight[(connector_name, trading_pair)]
+
+    async def get_prices_batch(self, requests: Dict[str, List[str]]) -> Tuple[Dict[str, Dict[str, float]], Dict[str, str]]:
+        """
+        Get prices from several connectors in parallel.
+
+        Args:
+            requests: Mapping of connector name to the trading pairs to price
+
+        Returns:
+            Tuple of (prices per connector, error message per failed connector)
+        """
+        connector_names = list(requests)
+        results = await asyncio.gather(
+            *(self.get_prices(connector_name, requests[connector_name]) for connector_name in connector_names),
+            return_exceptions=True
+        )
+
+        prices, errors = {}, {}
+        for connector_name, result in zip(connector_names, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error getting prices for {connector_name}: {result}")
+                errors[connector_name] = str(result)
+            else:
+                prices[connector_name] = result
+        return prices, errors
+
+    def prune(self):
+        """Drop cached prices that expired."""
+        now = time.time()
+        for key in [key for key, (fetched_at, _) in self._cache.items() if now - fetched_at >= self.ttl]:
+            del self._cache[key]
+
+    def get_metrics(self) -> Dict:
+        """Get cache and coalescing counters."""
+        return {
+            **self.metrics,
+            "ttl": self.ttl,
+            "cached_prices": len(self._cache),
+            "in_flight_requests": len(set(self._in_flight.values())),
+        }
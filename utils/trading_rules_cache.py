@@ -0,0 +1,214 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _TradingRulesEntry:
+    trading_rules: Dict[str, Any]
+    symbol_map: Optional[Any]
+    fetched_at: float
+    fetches: int = 1
+    hits: int = 0
+    last_error: Optional[str] = None
+    failed_at: Optional[float] = None
+
+
+class TradingRulesCache:
+    """
+    Trading rules shared by every connector instance of the same exchange.
+
+    Trading rules (and the trading pair symbol map fetched with them) do not depend on the account, so one
+    exchange-info request serves all accounts. Rules are refetched once they are older than the TTL, either
+    by the background refresh loop or by the first connector update that finds them expired.
+    """
+
+    def __init__(self,
+                 get_connectors: Callable[[str], List[Any]],
+                 ttl: float = 3600.0,
+                 refresh_check_interval: float = 60.0,
+                 retry_interval: float = 60.0):
+        """
+        :param get_connectors: Returns the live connector instances of an exchange, used as fetch sources
+            and as targets of refreshed rules.
+        :param ttl: Seconds after which cached rules are refetched.
+        :param refresh_check_interval: How often the background loop looks for expired rules.
+        :param retry_interval: Seconds to wait before retrying a failed fetch (stale rules are kept meanwhile).
+        """
+        self.get_connectors = get_connectors
+        self.ttl = ttl
+        self.refresh_check_interval = refresh_check_interval
+        self.retry_interval = retry_interval
+        self._entries: Dict[str, _TradingRulesEntry] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def supports(connector) -> bool:
+        """Whether the connector keeps its rules in a `_trading_rules` dict that can be shared."""
+        return isinstance(getattr(connector, "_trading_rules", None), dict)
+
+    def start(self):
+        """Start the background refresh loop (idempotent, requires a running event loop)."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    def stop(self):
+        """Stop the background refresh loop."""
+        if self._refresh_task:
+            self._refresh_task.cancel()
+            self._refresh_task = None
+
+    def invalidate(self, connector_name: Optional[str] = None):
+        """Drop the cached rules of one exchange, or of all exchanges."""
+        if connector_name:
+            self._entries.pop(connector_name, None)
+        else:
+            self._entries.clear()
+
+    def _is_fresh(self, entry: Optional[_TradingRulesEntry]) -> bool:
+        if entry is None:
+            return False
+        if time.time() - entry.fetched_at < self.ttl:
+            return True
+        # Keep serving stale rules while a failed refresh is backing off
+        return entry.failed_at is not None and time.time() - entry.failed_at < self.retry_interval
+
+    def _is_due(self, entry: _TradingRulesEntry) -> bool:
+        # Refresh in the background one check interval ahead of expiry, so update cycles keep hitting the cache
+        if entry.failed_at is not None and time.time() - entry.failed_at < self.retry_interval:
+            return False
+        return time.time() - entry.fetched_at >= self.ttl - self.refresh_check_interval
+
+    def apply(self, connector_name: str, connector) -> bool:
+        """
+        Copy the cached rules of the exchange into a connector.
+
+        :return: True if cached rules were applied, False if the exchange has no cached rules yet.
+        """
+        entry = self._entries.get(connector_name)
+        if entry is None or not self.supports(connector):
+            return False
+        self._apply_entry(entry, connector)
+        entry.hits += 1
+        return True
+
+    # Connector attribute recording the `fetched_at` of the entry last copied into it
+    APPLIED_ATTRIBUTE = "_shared_trading_rules_fetched_at"
+
+    @classmethod
+    def _apply_entry(cls, entry: _TradingRulesEntry, connector):
+        # Skip the copy when the connector already holds this entry and has not replaced its rules since
+        if (getattr(connector, cls.APPLIED_ATTRIBUTE, None) == entry.fetched_at
+                and len(connector._trading_rules) == len(entry.trading_rules)):
+            return
+        # Each connector gets its own dict: its own refresh would otherwise clear the shared copy in place
+        connector._trading_rules.clear()
+        connector._trading_rules.update(entry.trading_rules)
+        if entry.symbol_map is not None and hasattr(connector, "_set_trading_pair_symbol_map"):
+            connector._set_trading_pair_symbol_map(entry.symbol_map)
+        try:
+            setattr(connector, cls.APPLIED_ATTRIBUTE, entry.fetched_at)
+        except AttributeError:
+            # Connectors without instance attributes just get the full copy every time
+            pass
+
+    async def ensure(self, connector_name: str, connector):
+        """
+        Make sure the connector holds current trading rules, fetching them only if the shared copy expired.
+        """
+        if not self.supports(connector):
+            await connector._update_trading_rules()
+            return
+
+        self.start()
+        entry = self._entries.get(connector_name)
+        if self._is_fresh(entry):
+            self._apply_entry(entry, connector)
+            entry.hits += 1
+            return
+        await self.refresh(connector_name, connector)
+
+    async def refresh(self, connector_name: str, source=None):
+        """
+        Fetch the trading rules of an exchange once and propagate them to all its connector instances.
+
+        Concurrent callers for the same exchange wait for a single fetch.
+
+        :param connector_name: The exchange connector name.
+        :param source: Connector instance used for the request (defaults to any live instance of the exchange).
+        """
+        lock = self._locks.setdefault(connector_name, asyncio.Lock())
+        requested_at = time.time()
+        async with lock:
+            entry = self._entries.get(connector_name)
+            if entry is not None and entry.fetched_at >= requested_at:
+                # Another caller refreshed while we were waiting
+                if source is not None and self.supports(source):
+                    self._apply_entry(entry, source)
+                return
+
+            targets = self.get_connectors(connector_name)
+            if source is None:
+                source = next((connector for connector in targets if self.supports(connector)), None)
+                if source is None:
+                    self._entries.pop(connector_name, None)
+                    return
+
+            try:
+                await source._update_trading_rules()
+            except Exception as e:
+                if entry is None:
+                    raise
+                entry.last_error = str(e)
+                entry.failed_at = time.time()
+                logger.warning(f"Error refreshing trading rules for {connector_name}, keeping cached rules: {e}")
+                self._apply_entry(entry, source)
+                return
+
+            new_entry = _TradingRulesEntry(
+                trading_rules=dict(source._trading_rules),
+                symbol_map=getattr(source, "_trading_pair_symbol_map", None),
+                fetched_at=time.time(),
+                fetches=entry.fetches + 1 if entry else 1,
+                hits=entry.hits if entry else 0,
+            )
+            self._entries[connector_name] = new_entry
+            for connector in targets:
+                if connector is not source and self.supports(connector):
+                    self._apply_entry(new_entry, connector)
+            logger.debug(f"Refreshed trading rules for {connector_name} ({len(new_entry.trading_rules)} pairs)")
+
+    async def _refresh_loop(self):
+        """Refetch expired rules in the background so connector updates rarely wait for exchange-info."""
+        while True:
+            try:
+                await asyncio.sleep(self.refresh_check_interval)
+                for connector_name, entry in list(self._entries.items()):
+                    if self._is_due(entry):
+                        try:
+                            await self.refresh(connector_name)
+                        except Exception as e:
+                            logger.error(f"Error refreshing trading rules for {connector_name}: {e}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error in trading rules refresh loop: {e}")
+
+    def get_metrics(self) -> Dict[str, Dict]:
+        """Get per-exchange cache metrics (age, size, fetch and hit counts, last error)."""
+        now = time.time()
+        return {
+            connector_name: {
+                "trading_pairs": len(entry.trading_rules),
+                "age_seconds": round(now - entry.fetched_at, 1),
+                "fetches": entry.fetches,
+                "hits": entry.hits,
+                "last_error": entry.last_error,
+            }
+            for connector_name, entry in self._entries.items()
+        }
@@ -0,0 +1,163 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# A batch is a list of (key, items) with the items of each key in arrival order
+Batch = List[Tuple[str, List[Any]]]
+
+
+class WriteBehindQueue:
+    """
+    In-memory write-behind buffer for event recorders.
+
+    Producers `put` items synchronously (event listeners cannot await). Items are grouped by key, such as a
+    client order ID, so all pending events of one order are written together and in arrival order. A single
+    flusher hands the pending items to the `flush` callback once `max_batch_size` items are buffered or the
+    oldest item has waited `flush_interval` seconds. Flushes never overlap, so ordering per key is preserved
+    across batches.
+
+    If a batch fails, its keys are retried one at a time so a single bad record does not drop the others.
+    If a key still fails, its items are retried one at a time in arrival order and only the items that fail
+    on their own are dropped and logged.
+    """
+
+    def __init__(self,
+                 flush: Callable[[Batch], Awaitable[None]],
+                 name: str = "write_behind",
+                 max_batch_size: int = 200,
+                 flush_interval: float = 0.25):
+        self._flush = flush
+        self.name = name
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+
+        self._pending: Dict[str, List[Any]] = {}
+        self._pending_count = 0
+        self._oldest_enqueued_at: Optional[float] = None
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._running = False
+
+        self.metrics: Dict = {
+            "enqueued": 0,
+            "flushed": 0,
+            "dropped": 0,
+            "flushes": 0,
+            "failed_flushes": 0,
+            "last_flush_size": 0,
+            "last_flush_duration_seconds": None,
+            "last_flush_lag_seconds": None,
+            "max_flush_lag_seconds": 0.0,
+        }
+
+    @property
+    def depth(self) -> int:
+        """Number of buffered items waiting to be flushed."""
+        return self._pending_count
+
+    def start(self):
+        """Start the background flusher (requires a running event loop)."""
+        if self._running:
+            return
+        self._running = True
+        self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        """Stop the flusher after writing everything still buffered."""
+        self._running = False
+        if self._flush_task:
+            # Let an in-flight flush finish instead of cancelling it: its batch is no longer in `_pending`
+            self._wakeup.set()
+            await self._flush_task
+            self._flush_task = None
+        await self.flush()
+
+    def put(self, key: str, item: Any):
+        """Buffer an item for the given key."""
+        if self._oldest_enqueued_at is None:
+            self._oldest_enqueued_at = time.time()
+        self._pending.setdefault(key, []).append(item)
+        self._pending_count += 1
+        self.metrics["enqueued"] += 1
+        if self._pending_count >= self.max_batch_size:
+            self._wakeup.set()
+
+    async def _flush_loop(self):
+        while self._running:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Error flushing {self.name} queue: {e}", exc_info=True)
+
+    async def flush(self):
+        """Write everything buffered so far."""
+        async with self._flush_lock:
+            while self._pending:
+                # Take at most one batch worth of keys, oldest keys first
+                batch: Batch = []
+                size = 0
+                for key in list(self._pending):
+                    if batch and size + len(self._pending[key]) > self.max_batch_size:
+                        break
+                    items = self._pending.pop(key)
+                    batch.append((key, items))
+                    size += len(items)
+                self._pending_count -= size
+                oldest_enqueued_at = self._oldest_enqueued_at
+                self._oldest_enqueued_at = time.time() if self._pending else None
+
+                await self._write(batch, size, oldest_enqueued_at)
+
+    async def _write(self, batch: Batch, size: int, oldest_enqueued_at: Optional[float]):
+        started = time.time()
+        try:
+            await self._flush(batch)
+        except Exception as e:
+            self.metrics["failed_flushes"] += 1
+            logger.warning(f"Batched flush of {self.name} failed ({e}), retrying {len(batch)} keys individually")
+            for key, items in batch:
+                try:
+                    await self._flush([(key, items)])
+                except Exception as key_error:
+                    if len(items) == 1:
+                        self.metrics["dropped"] += 1
+                        size -= 1
+                        logger.error(f"Dropping {self.name} event for {key}: {key_error}")
+                        continue
+                    logger.warning(f"Flush of {self.name} events for {key} failed ({key_error}), "
+                                   f"retrying {len(items)} events individually")
+                    for item in items:
+                        try:
+                            await self._flush([(key, [item])])
+                        except Exception as item_error:
+                            self.metrics["dropped"] += 1
+                            size -= 1
+                            logger.error(f"Dropping {self.name} event for {key}: {item_error}")
+
+        finished = time.time()
+        lag = finished - oldest_enqueued_at if oldest_enqueued_at else 0.0
+        self.metrics["flushes"] += 1
+        self.metrics["flushed"] += size
+        self.metrics["last_flush_size"] = size
+        self.metrics["last_flush_duration_seconds"] = round(finished - started, 4)
+        self.metrics["last_flush_lag_seconds"] = round(lag, 4)
+        self.metrics["max_flush_lag_seconds"] = round(max(self.metrics["max_flush_lag_seconds"], lag), 4)
+
+    def get_metrics(self) -> Dict:
+        """Get queue depth and flush metrics."""
+        oldest_age = time.time() - self._oldest_enqueued_at if self._oldest_enqueued_at else 0.0
+        return {
+            **self.metrics,
+            "queue_depth": self._pending_count,
+            "pending_keys": len(self._pending),
+            "oldest_pending_age_seconds": round(oldest_age, 4),
+        }